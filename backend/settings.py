@@ -197,7 +197,19 @@ CACHES = {
         'OPTIONS': {
             'MAX_ENTRIES': 1000
         }
-    }
+    },
+    # Push revision counters (game.push) must be seen by every worker; a per-process
+    # backend is refused by a system check. Prefer
+    # django.core.cache.backends.redis.RedisCache where Redis is available.
+    'game_push': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'game_push_cache',  # python manage.py createcachetable
+    },
+    # Catalog version (game.catalog), read by every worker to reload static data after admin edits
+    'game_catalog': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'game_catalog_cache',
+    },
 }
 
 # Cache timeout settings (in seconds)
@@ -209,6 +221,64 @@ CACHE_TTL = {
     'player_data': 60 * 5,  # 5 minutes
 }
 
+# In-memory catalog of static game data (game.catalog), reloaded on model writes
+CATALOG = {
+    'max_age': 300,  # seconds before a process reloads its catalog regardless
+    'cache': 'game_catalog',  # CACHES alias of the version shared by every process
+    'check_interval': 2,  # seconds between reads of the shared version
+}
+
+# Event-fed leaderboards (game.ranking): scores are incremented in the Leaderboard table as events
+# happen; set redis_url to also serve live ranks from shared Redis sorted sets
+LEADERBOARD_INDEX = {
+    'enabled': True,
+    'redis_url': None,  # e.g. 'redis://localhost:6379/1' (requires redis-py)
+    'key_prefix': 'leaderboard',
+}
+
+# Game event bus (game.events): achievements, quests and live leaderboards after each action
+GAME_EVENTS = {
+    'async': True,  # False runs subscribers inline after the commit
+    'workers': 2,
+    'batch_size': 200,
+    'notification_ttl': 3600,  # seconds undelivered achievement/quest notifications are kept
+}
+
+# Server push of state diffs (game.push): open streams check revisions every poll_interval seconds
+GAME_PUSH = {
+    'poll_interval': 1.0,
+    'heartbeat': 15,  # seconds of silence before a keepalive comment
+    'max_duration': 300,  # seconds before a stream is closed and the client reconnects
+    'retry': 3,
+    'refresh': {'player': 60, 'health': 60, 'time': 60, 'world': 600},  # seconds, rebuilt even without writes
+    'cache': 'game_push',  # CACHES alias of the revision counters, shared by every process
+    'revision_ttl': 86400,  # seconds a revision counter is kept after its last bump
+}
+
+# Persistent OSM tile cache (game.models.OSMTile), shared by all workers
+OSM_TILE_CACHE = {
+    'fresh_ttl': 6 * 3600,  # 6 hours - served without revalidation
+    'stale_ttl': 7 * 24 * 3600,  # 7 days - served stale while a refresh runs
+    'max_tiles': 50000,  # oldest-accessed tiles are evicted beyond this
+    'touch_interval': 3600,  # min seconds between last_accessed updates
+    'revalidate_in_background': True,
+}
+
+# Local OSM index filled by `manage.py import_osm_extract`; covered areas skip Overpass
+OSM_LOCAL_INDEX = {
+    'enabled': True,
+    'coverage_refresh': 60,  # seconds between reloads of imported extract bounds
+}
+
+# New map cells are generated procedurally; OSM enrichment runs on a thread pool
+CELL_GENERATION = {
+    'async_osm': True,  # False enriches inline (blocks the request on Overpass)
+    'osm_workers': 2,
+    'prefetch_radius': 1,  # neighbours warmed around the player (Manhattan distance)
+    'prefetch_workers': 2,
+    'prefetch_max_pending': 32,  # concurrency budget, extra prefetches are dropped
+}
+
 # Logging configuration
 LOGGING = {
     'version': 1,
@@ -23,19 +23,26 @@ import {
   FitnessCenter,
 } from '@mui/icons-material';
 import axios from 'axios';
+import { useStateStream } from '../../hooks/useStateStream';
 
 const HealthDisplay = ({ playerId }) => {
   const [healthData, setHealthData] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  // Updates are pushed by the server instead of polled
+  const pushedHealth = useStateStream('health');
 
   useEffect(() => {
     loadHealthData();
-    // Refresh every 30 seconds
-    const interval = setInterval(loadHealthData, 30000);
-    return () => clearInterval(interval);
   }, [playerId]);
 
+  useEffect(() => {
+    if (pushedHealth) {
+      setHealthData(pushedHealth);
+      setLoading(false);
+    }
+  }, [pushedHealth]);
+
   const loadHealthData = async () => {
     try {
       const token = localStorage.getItem('token');
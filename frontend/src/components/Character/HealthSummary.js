@@ -19,18 +19,25 @@ import {
   CheckCircle,
 } from '@mui/icons-material';
 import axios from 'axios';
+import { useStateStream } from '../../hooks/useStateStream';
 
 const HealthSummary = () => {
   const [healthData, setHealthData] = useState(null);
   const [loading, setLoading] = useState(true);
   const [expanded, setExpanded] = useState(false);
+  const pushedHealth = useStateStream('health');
 
   useEffect(() => {
     loadHealthData();
-    const interval = setInterval(loadHealthData, 30000);
-    return () => clearInterval(interval);
   }, []);
 
+  useEffect(() => {
+    if (pushedHealth) {
+      setHealthData(pushedHealth);
+      setLoading(false);
+    }
+  }, [pushedHealth]);
+
   const loadHealthData = async () => {
     console.log('[HealthSummary] Loading health data...');
     try {
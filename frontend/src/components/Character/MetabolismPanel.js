@@ -7,6 +7,7 @@ import {
     Divider,
 } from '@mui/material';
 import axios from 'axios';
+import { useStateStream } from '../../hooks/useStateStream';
 import Chart from 'react-apexcharts';
 import NutritionRadarChart from './NutritionRadarChart';
 
@@ -63,10 +64,10 @@ const MetabolismPanel = () => {
     const [healthData, setHealthData] = useState(null);
     const [loading, setLoading] = useState(true);
     const [ecgData, setEcgData] = useState(Array(50).fill(0));
+    const pushedHealth = useStateStream('health');
 
     useEffect(() => {
         loadHealthData();
-        const interval = setInterval(loadHealthData, 10000);
 
         // Simulate ECG data updates
         const ecgInterval = setInterval(() => {
@@ -77,11 +78,17 @@ const MetabolismPanel = () => {
         }, 100);
 
         return () => {
-            clearInterval(interval);
             clearInterval(ecgInterval);
         };
     }, []);
 
+    useEffect(() => {
+        if (pushedHealth) {
+            setHealthData(pushedHealth);
+            setLoading(false);
+        }
+    }, [pushedHealth]);
+
     const loadHealthData = async () => {
         try {
             const token = localStorage.getItem('token');
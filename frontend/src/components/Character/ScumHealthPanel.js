@@ -10,17 +10,24 @@ import {
   CardContent,
 } from '@mui/material';
 import axios from 'axios';
+import { useStateStream } from '../../hooks/useStateStream';
 
 const ScumHealthPanel = () => {
   const [healthData, setHealthData] = useState(null);
   const [loading, setLoading] = useState(true);
+  const pushedHealth = useStateStream('health');
 
   useEffect(() => {
     loadHealthData();
-    const interval = setInterval(loadHealthData, 10000);
-    return () => clearInterval(interval);
   }, []);
 
+  useEffect(() => {
+    if (pushedHealth) {
+      setHealthData(pushedHealth);
+      setLoading(false);
+    }
+  }, [pushedHealth]);
+
   const loadHealthData = async () => {
     try {
       const token = localStorage.getItem('token');
@@ -1,10 +1,12 @@
 import React, { useState, useEffect } from 'react';
 import { Box, Typography, Paper, Tooltip } from '@mui/material';
 import axios from 'axios';
+import { useStateStream } from '../../hooks/useStateStream';
 
 const TimeDisplay = () => {
     const [timeInfo, setTimeInfo] = useState(null);
     const [loading, setLoading] = useState(true);
+    const pushedTime = useStateStream('time');
 
     const fetchTime = async () => {
         try {
@@ -17,15 +19,17 @@ const TimeDisplay = () => {
     };
 
     useEffect(() => {
-        // Initial fetch
+        // Initial fetch; later updates are pushed by the server
         fetchTime();
-
-        // Update every 30 seconds
-        const interval = setInterval(fetchTime, 30000);
-
-        return () => clearInterval(interval);
     }, []);
 
+    useEffect(() => {
+        if (pushedTime) {
+            setTimeInfo(pushedTime);
+            setLoading(false);
+        }
+    }, [pushedTime]);
+
     if (loading || !timeInfo) {
         return null;
     }
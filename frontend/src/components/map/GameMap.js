@@ -46,7 +46,7 @@ function GameMap({ player, onPlayerUpdate, onGather, onCellUpdate }) {
     const [location, setLocation] = useState({ city: '', country: '' });
     const showNotification = useGameStore((state) => state.showNotification);
     const { flatInventory } = useInventory();
-    const { worldState } = useWorldState(60000);
+    const { worldState } = useWorldState();
 
     const fetchCurrentCell = useCallback(async () => {
         try {
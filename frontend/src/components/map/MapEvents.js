@@ -23,6 +23,7 @@ import {
   EmojiEvents as RewardIcon,
 } from '@mui/icons-material';
 import { eventsAPI } from '../../services/api';
+import { useStateStream } from '../../hooks/useStateStream';
 
 const MapEvents = ({ playerGridX, playerGridY }) => {
   const [nearbyEvents, setNearbyEvents] = useState([]);
@@ -30,14 +31,19 @@ const MapEvents = ({ playerGridX, playerGridY }) => {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
   const [success, setSuccess] = useState('');
+  // Nearby events are part of the pushed world state
+  const worldState = useStateStream('world');
 
   useEffect(() => {
     loadNearbyEvents();
-    // Refresh events every 30 seconds
-    const interval = setInterval(loadNearbyEvents, 30000);
-    return () => clearInterval(interval);
   }, [playerGridX, playerGridY]);
 
+  useEffect(() => {
+    if (worldState?.nearby_events) {
+      setNearbyEvents(worldState.nearby_events);
+    }
+  }, [worldState]);
+
   const loadNearbyEvents = async () => {
     try {
       const response = await eventsAPI.getNearby(10);
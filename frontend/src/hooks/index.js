@@ -17,3 +17,4 @@ export { useEquipment } from './useEquipment';
 export { useAchievements } from './useAchievements';
 export { usePlayerStats } from './usePlayerStats';
 export { useWorldState } from './useWorldState';
+export { useStateStream } from './useStateStream';
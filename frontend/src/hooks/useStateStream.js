@@ -0,0 +1,68 @@
+import { useEffect, useState } from 'react';
+import { API_BASE_URL } from '../services/api';
+
+// One EventSource per tab, shared by every component. The server sends each
+// topic in full ({ full }) and then only JSON merge patches ({ patch }) when
+// the player's state changes or a world tick runs (see game/push.py).
+const TOPICS = ['player', 'health', 'world', 'time'];
+const listeners = {};
+const states = {};
+let source = null;
+
+function applyPatch(target, patch) {
+  if (patch === null || typeof patch !== 'object' || Array.isArray(patch)) {
+    return patch;
+  }
+  const result = target && typeof target === 'object' && !Array.isArray(target) ? { ...target } : {};
+  Object.entries(patch).forEach(([key, value]) => {
+    if (value === null) {
+      delete result[key];
+    } else {
+      result[key] = applyPatch(result[key], value);
+    }
+  });
+  return result;
+}
+
+function openSource() {
+  const token = localStorage.getItem('token');
+  if (!token || typeof EventSource === 'undefined') {
+    return null;
+  }
+  const eventSource = new EventSource(`${API_BASE_URL}/stream/?token=${encodeURIComponent(token)}`);
+  TOPICS.forEach((topic) => {
+    eventSource.addEventListener(topic, (event) => {
+      const message = JSON.parse(event.data);
+      states[topic] = 'full' in message ? message.full : applyPatch(states[topic], message.patch);
+      (listeners[topic] || []).forEach((callback) => callback(states[topic]));
+    });
+  });
+  return eventSource;
+}
+
+function subscribe(topic, callback) {
+  listeners[topic] = [...(listeners[topic] || []), callback];
+  if (!source) {
+    source = openSource();
+  }
+  if (states[topic] !== undefined) {
+    callback(states[topic]);
+  }
+
+  return () => {
+    listeners[topic] = listeners[topic].filter((listener) => listener !== callback);
+    if (source && Object.values(listeners).every((topicListeners) => topicListeners.length === 0)) {
+      source.close();
+      source = null;
+    }
+  };
+}
+
+// Latest pushed state of a topic ('player', 'health', 'world' or 'time'), null until it arrives
+export function useStateStream(topic) {
+  const [state, setState] = useState(states[topic] ?? null);
+
+  useEffect(() => subscribe(topic, setState), [topic]);
+
+  return state;
+}
@@ -1,15 +1,16 @@
 import { useEffect, useState } from 'react';
 import { mapAPI } from '../services/api';
+import { useStateStream } from './useStateStream';
 
-// Simple hook to poll /map/world_state/ periodically
-export function useWorldState(pollIntervalMs = 60000) {
+// World state from /map/world_state/ once, then kept current by the server push stream
+export function useWorldState() {
   const [state, setState] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
+  const pushed = useStateStream('world');
 
   useEffect(() => {
     let isMounted = true;
-    let timer = null;
 
     const fetchState = async () => {
       setLoading(true);
@@ -33,15 +34,10 @@ export function useWorldState(pollIntervalMs = 60000) {
     // initial load
     fetchState();
 
-    if (pollIntervalMs > 0) {
-      timer = setInterval(fetchState, pollIntervalMs);
-    }
-
     return () => {
       isMounted = false;
-      if (timer) clearInterval(timer);
     };
-  }, [pollIntervalMs]);
+  }, []);
 
-  return { worldState: state, loading, error };
+  return { worldState: pushed || state, loading, error };
 }
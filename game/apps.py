@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class GameConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'game'
+
+    def ready(self):
+        from . import checks  # noqa: F401
+        from . import signals  # noqa: F401
+        from . import subscribers  # noqa: F401
@@ -120,6 +120,8 @@ class CacheManager:
             'game_config',
         ]
         cache.delete_many(patterns)
+        from .catalog import invalidate_catalog
+        invalidate_catalog()
 
     @staticmethod
     def clear_all():
@@ -0,0 +1,227 @@
+"""
+Process-wide catalog of static game data (materials, recipes, enemies, mobs, biomes,
+quests, and the achievement/quest trigger index)
+
+Static data only changes through admin edits or populate_* commands, so it is
+loaded once per process and served from memory, indexed by id and by name.
+Writes to the underlying models bump a version (game.signals); the next read
+reloads the whole catalog. The version is also published in the shared cache
+CATALOG['cache'] (checked at startup, see game.checks), which each process reads
+at most every CATALOG['check_interval'] seconds, so the other workers reload
+too; snapshots older than CATALOG['max_age'] are reloaded regardless.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Achievement, Material, Mob, Quest, RandomEnemy, Recipe, RecipeIngredient, Workstation
+from .resource_generator import BIOME_DATA
+
+CATALOG_VERSION_CACHE_KEY = 'catalog_version'
+
+# Models whose writes invalidate the catalog (see game.signals)
+CATALOG_MODELS = (Material, Recipe, RecipeIngredient, Workstation, RandomEnemy, Mob, Achievement, Quest)
+
+# Achievement requirement types whose requirement_target selects the triggering event
+TARGETED_REQUIREMENT_TYPES = (
+    'material_collected', 'recipe_crafted', 'biome_visited', 'mob_defeated', 'building_constructed',
+)
+
+# Quest task type -> requirement keys identifying its target
+QUEST_TASK_TARGETS = {
+    'gather': ('material_id',),
+    'craft': ('recipe_id',),
+    'defeat': ('mob_id',),
+    'visit': ('grid_x', 'grid_y'),
+}
+
+_CATALOG_DEFAULTS = {
+    'max_age': 300,  # seconds before a process reloads its catalog regardless
+    'cache': 'game_catalog',  # CACHES alias of the shared version, seen by every process
+    'check_interval': 2,  # seconds between reads of the shared version
+}
+
+_CATALOG = {
+    'version': 0,  # bumped locally on every invalidation
+    'snapshot': None,
+    'shared_version': 0,  # last read from the shared cache
+    'checked_at': 0.0,
+}
+_LOCK = threading.Lock()
+
+
+def _catalog_settings():
+    conf = dict(_CATALOG_DEFAULTS)
+    conf.update(getattr(settings, 'CATALOG', {}))
+    return conf
+
+
+def version_cache():
+    return caches[_catalog_settings()['cache']]
+
+
+def _shared_version():
+    """The version published by every process, read from the shared cache at most every check_interval"""
+    now = time.time()
+    if now - _CATALOG['checked_at'] >= _catalog_settings()['check_interval']:
+        _CATALOG['shared_version'] = version_cache().get(CATALOG_VERSION_CACHE_KEY, 0)
+        _CATALOG['checked_at'] = now
+    return _CATALOG['shared_version']
+
+
+class CatalogSnapshot:
+    """Immutable view of the static data at one version"""
+
+    def __init__(self, version, shared_version):
+        self.version = version
+        self.shared_version = shared_version
+        self.loaded_at = time.time()
+
+        materials = list(Material.objects.all())
+        self.materials_by_id = {m.id: m for m in materials}
+        self.materials_by_name = {m.name: m for m in materials}
+        self.material_ids = {m.name: m.id for m in materials}
+
+        self.workstations_by_id = {w.id: w for w in Workstation.objects.all()}
+
+        recipes = list(Recipe.objects.all())
+        for recipe in recipes:
+            # Resolve relations from the catalog so cached recipes never hit the DB
+            if recipe.result_material_id in self.materials_by_id:
+                recipe.result_material = self.materials_by_id[recipe.result_material_id]
+            if recipe.required_workstation_id in self.workstations_by_id:
+                recipe.required_workstation = self.workstations_by_id[recipe.required_workstation_id]
+        self.recipes_by_id = {r.id: r for r in recipes}
+        self.recipes_by_name = {r.name: r for r in recipes}
+
+        self.ingredients_by_recipe = {}
+        for ingredient in RecipeIngredient.objects.all():
+            if ingredient.material_id in self.materials_by_id:
+                ingredient.material = self.materials_by_id[ingredient.material_id]
+            self.ingredients_by_recipe.setdefault(ingredient.recipe_id, []).append(ingredient)
+
+        # Enemies/mobs with their biome lists parsed once
+        self.enemies = [(enemy, enemy.get_biomes()) for enemy in RandomEnemy.objects.all()]
+        self.enemies_by_id = {enemy.id: enemy for enemy, _ in self.enemies}
+        self.mobs = [(mob, mob.get_biomes()) for mob in Mob.objects.all()]
+        self.mobs_by_id = {mob.id: mob for mob, _ in self.mobs}
+
+        # Trigger index: which definitions an event can affect. Only ids are kept,
+        # callers load the (few) matching rows themselves.
+        self.achievement_triggers = {}
+        for achievement_id, req_type, target in Achievement.objects.values_list(
+            'id', 'requirement_type', 'requirement_target'
+        ).order_by():
+            key = (req_type, target if req_type in TARGETED_REQUIREMENT_TYPES else None)
+            self.achievement_triggers.setdefault(key, set()).add(achievement_id)
+
+        # Quests in board order (Quest.Meta.ordering); only active ones are offered
+        self.quests = list(Quest.objects.all())
+        self.quests_by_id = {quest.id: quest for quest in self.quests}
+
+        self.quest_triggers = {}
+        for quest in self.quests:
+            for task_type, tasks in (quest.requirements or {}).items():
+                fields = QUEST_TASK_TARGETS.get(task_type)
+                if fields is None:
+                    continue
+                for task in tasks:
+                    key = (task_type, quest_target(task_type, *(task.get(field) for field in fields)))
+                    self.quest_triggers.setdefault(key, set()).add(quest.id)
+
+
+def get_catalog():
+    """Current catalog snapshot, reloaded if invalidated or too old"""
+    snapshot = _CATALOG['snapshot']
+    shared_version = _shared_version()
+    if (
+        snapshot is None
+        or snapshot.version != _CATALOG['version']
+        or snapshot.shared_version != shared_version
+        or time.time() - snapshot.loaded_at > _catalog_settings()['max_age']
+    ):
+        with _LOCK:
+            current = _CATALOG['snapshot']
+            if current is not None and current is not snapshot and current.version == _CATALOG['version'] \
+                    and current.shared_version == shared_version:
+                # Another thread reloaded while we waited
+                return current
+            snapshot = CatalogSnapshot(_CATALOG['version'], shared_version)
+            _CATALOG['snapshot'] = snapshot
+    return snapshot
+
+
+def invalidate_catalog():
+    """Drop the catalog in this process and tell other processes to reload"""
+    with _LOCK:
+        _CATALOG['version'] += 1
+        _CATALOG['snapshot'] = None
+    shared = version_cache()
+    try:
+        version = shared.incr(CATALOG_VERSION_CACHE_KEY)
+    except ValueError:
+        version = 1 if shared.add(CATALOG_VERSION_CACHE_KEY, 1, None) else shared.incr(CATALOG_VERSION_CACHE_KEY)
+    _CATALOG['shared_version'] = version
+
+
+def get_material(material_id):
+    return get_catalog().materials_by_id.get(material_id)
+
+
+def get_material_by_name(name):
+    return get_catalog().materials_by_name.get(name)
+
+
+def get_material_ids():
+    """Material name -> id"""
+    return get_catalog().material_ids
+
+
+def get_recipe(recipe_id):
+    return get_catalog().recipes_by_id.get(recipe_id)
+
+
+def get_recipe_ingredients(recipe_id):
+    return get_catalog().ingredients_by_recipe.get(recipe_id, [])
+
+
+def quest_target(task_type, *values):
+    """Trigger index target of a quest task ((grid_x, grid_y) for visits, else the id)"""
+    return tuple(values) if task_type == 'visit' else values[0]
+
+
+def get_achievement_ids(requirement_type, target=None):
+    """Ids of achievements of a requirement type (and target, for targeted types)"""
+    if requirement_type not in TARGETED_REQUIREMENT_TYPES:
+        target = None
+    return get_catalog().achievement_triggers.get((requirement_type, target), set())
+
+
+def get_quest_ids(task_type, target):
+    """Ids of quests with a task of this type on this target"""
+    return get_catalog().quest_triggers.get((task_type, target), set())
+
+
+def get_active_quests():
+    """Active quests in board order"""
+    return [quest for quest in get_catalog().quests if quest.is_active]
+
+
+def get_enemies_for(biome, level):
+    """Random enemies that can spawn in a biome for a player level"""
+    return [
+        enemy for enemy, biomes in get_catalog().enemies
+        if enemy.min_level_required <= level and (not biomes or biome in biomes)
+    ]
+
+
+def get_mobs_for(biome):
+    """Mobs that can spawn in a biome"""
+    return [mob for mob, biomes in get_catalog().mobs if not biomes or biome in biomes]
+
+
+def get_biome(code):
+    """Static biome metadata (BIOME_DATA entry) or None"""
+    return BIOME_DATA.get(code)
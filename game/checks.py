@@ -0,0 +1,43 @@
+"""
+System checks run at startup (manage.py runserver/migrate/check)
+"""
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+def _shared_cache_errors(setting, alias, purpose):
+    """Errors for a CACHES alias that must be shared by every process"""
+    from . import push
+
+    if alias not in settings.CACHES:
+        return [Error(
+            f"{setting}['cache'] refers to the undefined cache '{alias}'.",
+            hint="Add it to CACHES with a shared backend (Redis or DatabaseCache).",
+            id='game.E001',
+        )]
+    backend = settings.CACHES[alias]['BACKEND']
+    if backend in push.PER_PROCESS_CACHE_BACKENDS:
+        return [Error(
+            f"The {purpose} cache '{alias}' uses {backend}, which is private to each process: "
+            "writes in one worker would never reach the others.",
+            hint="Use django.core.cache.backends.redis.RedisCache or "
+                 "django.core.cache.backends.db.DatabaseCache (python manage.py createcachetable).",
+            id='game.E002',
+        )]
+    return []
+
+
+@register()
+def check_push_cache(app_configs, **kwargs):
+    """Push revisions must live in a cache every process shares (see game.push)"""
+    from . import push
+
+    return _shared_cache_errors('GAME_PUSH', push._push_settings()['cache'], 'push revision')
+
+
+@register()
+def check_catalog_cache(app_configs, **kwargs):
+    """The catalog version must live in a cache every process shares (see game.catalog)"""
+    from . import catalog
+
+    return _shared_cache_errors('CATALOG', catalog._catalog_settings()['cache'], 'catalog version')
@@ -0,0 +1,232 @@
+"""
+In-process game event bus
+
+Services publish typed domain events (Moved, Gathered, Crafted, MobDefeated,
+LeveledUp, StatsChanged) instead of running achievement, quest and leaderboard
+side effects inline. Events are released when the publishing transaction commits and queued
+for a small thread pool; each worker drains the queue in batches and runs the
+subscribers (game.subscribers) once per player, inside one transaction with the
+player row locked. With GAME_EVENTS['async'] = False subscribers run inline
+right after the commit instead.
+
+Whatever subscribers report (unlocked achievements, completed quests) is stored
+per player in the PendingNotification table, shared by every process, and handed
+to the client with its next response (see pop_notifications).
+"""
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import PendingNotification, Player
+
+logger = logging.getLogger(__name__)
+
+_GAME_EVENTS_DEFAULTS = {
+    'async': True,  # False runs subscribers inline after the commit (blocks the request)
+    'workers': 2,
+    'batch_size': 200,  # events drained per worker run
+    'notification_ttl': 3600,  # seconds undelivered notifications are kept
+}
+
+
+@dataclass(frozen=True)
+class Moved:
+    player_id: int
+    grid_x: int
+    grid_y: int
+    biome: str
+
+
+@dataclass(frozen=True)
+class Gathered:
+    player_id: int
+    material_id: int
+    material_name: str
+    quantity: int
+
+
+@dataclass(frozen=True)
+class Crafted:
+    player_id: int
+    recipe_id: int
+    recipe_name: str
+    quantity: int
+
+
+@dataclass(frozen=True)
+class MobDefeated:
+    player_id: int
+    mob_id: int
+    mob_name: str
+    source: str = 'combat'  # 'combat' or 'hunt'
+
+
+@dataclass(frozen=True)
+class LeveledUp:
+    player_id: int
+    level: int
+
+
+@dataclass(frozen=True)
+class StatsChanged:
+    """A column ranked by the level, wealth or explorer leaderboards changed"""
+    player_id: int
+
+
+_SUBSCRIBERS = {}
+
+_QUEUE = queue.SimpleQueue()
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _events_settings():
+    conf = dict(_GAME_EVENTS_DEFAULTS)
+    conf.update(getattr(settings, 'GAME_EVENTS', {}))
+    return conf
+
+
+def subscribe(*event_types):
+    """
+    Register a subscriber for one or more event types (usable as a decorator).
+
+    Subscribers are called as handler(player, event) and may return a dict of
+    notification lists, e.g. {'achievements_unlocked': [...]}.
+    """
+    def register(handler):
+        for event_type in event_types:
+            handlers = _SUBSCRIBERS.setdefault(event_type, [])
+            if handler not in handlers:
+                handlers.append(handler)
+        return handler
+    return register
+
+
+def publish(*events):
+    """Publish events; subscribers run once the current transaction commits"""
+    if events:
+        transaction.on_commit(lambda: _release(events))
+
+
+def _release(events):
+    if not _events_settings()['async']:
+        dispatch(events)
+        return
+    for event in events:
+        _QUEUE.put(event)
+    try:
+        _get_executor().submit(_drain)
+    except RuntimeError:
+        # Executor shut down (interpreter exiting)
+        pass
+
+
+def _get_executor():
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=_events_settings()['workers'],
+                thread_name_prefix='game-events'
+            )
+        return _EXECUTOR
+
+
+def _drain():
+    batch_size = _events_settings()['batch_size']
+    try:
+        while True:
+            batch = []
+            while len(batch) < batch_size:
+                try:
+                    batch.append(_QUEUE.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            dispatch(batch)
+    except Exception:
+        logger.exception("Game event dispatch failed")
+    finally:
+        connection.close()
+
+
+def dispatch(events):
+    """
+    Run subscribers for a batch of events, grouped by player.
+
+    Each player's events are handled in one transaction with the player row
+    locked; a failing subscriber is logged and skipped. Returns the number of
+    events handled.
+    """
+    by_player = {}
+    for event in events:
+        by_player.setdefault(event.player_id, []).append(event)
+
+    handled = 0
+    for player_id, player_events in by_player.items():
+        notifications = {}
+        try:
+            with transaction.atomic():
+                player = Player.objects.select_for_update().select_related('user').filter(id=player_id).first()
+                if player is None:
+                    continue
+                for event in player_events:
+                    for handler in _SUBSCRIBERS.get(type(event), ()):
+                        try:
+                            with transaction.atomic():
+                                result = handler(player, event)
+                        except Exception:
+                            logger.exception(f"Subscriber {handler.__name__} failed on {event}")
+                            continue
+                        for key, items in (result or {}).items():
+                            notifications.setdefault(key, []).extend(items)
+                    handled += 1
+        except Exception:
+            logger.exception(f"Game events failed for player {player_id}")
+            continue
+        if notifications:
+            push_notifications(player_id, notifications)
+    return handled
+
+
+def _notification_cutoff():
+    return timezone.now() - timedelta(seconds=_events_settings()['notification_ttl'])
+
+
+def push_notifications(player_id, notifications):
+    """Queue notification lists for a player's next response (and drop every expired one)"""
+    PendingNotification.objects.filter(created_at__lt=_notification_cutoff()).delete()
+    PendingNotification.objects.create(player_id=player_id, payload=notifications)
+
+
+def pop_notifications(player_id):
+    """Take (and clear) the notifications queued for a player, dropping those older than notification_ttl"""
+    cutoff = _notification_cutoff()
+    pending = {}
+    with transaction.atomic():
+        rows = list(PendingNotification.objects.select_for_update().filter(player_id=player_id).values_list(
+            'id', 'payload', 'created_at'
+        ))
+        if not rows:
+            return pending
+        PendingNotification.objects.filter(id__in=[row_id for row_id, _, _ in rows]).delete()
+    for _, payload, created_at in rows:
+        if created_at >= cutoff:
+            for name, items in payload.items():
+                pending.setdefault(name, []).extend(items)
+    return pending
+
+
+def attach_notifications(player_id, response_data):
+    """Merge a player's queued notifications into an API response dict"""
+    for name, items in pop_notifications(player_id).items():
+        response_data.setdefault(name, []).extend(items)
+    return response_data
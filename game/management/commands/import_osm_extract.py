@@ -0,0 +1,56 @@
+"""
+Management command to import a local OSM extract so OSM lookups no longer need Overpass
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from game.models import OSMFeature, OSMImport
+from game.osm_import import OSMExtractImporter, OSMImportError
+
+
+class Command(BaseCommand):
+    help = (
+        'Import a local .osm / .osm.pbf / Overpass .json extract into the local OSM feature index. '
+        '.osm.pbf needs pyosmium (pip install osmium); .json is streamed only when ijson is installed '
+        '(pip install ijson), otherwise the whole file is loaded in memory.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='Path to the extract file')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Features written per database batch (default: 2000)'
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Remove previously imported features and coverage first'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+
+        if options['clear']:
+            deleted, _ = OSMFeature.objects.all().delete()
+            OSMImport.objects.all().delete()
+            self.stdout.write(self.style.WARNING(f'  Cleared {deleted} imported features'))
+
+        self.stdout.write(f'Importing OSM extract {path}...')
+        start = time.time()
+        try:
+            record = OSMExtractImporter(path, batch_size=options['batch_size'], stdout=self.stdout).run()
+        except FileNotFoundError:
+            raise CommandError(f'File not found: {path}')
+        except OSMImportError as e:
+            raise CommandError(str(e))
+
+        elapsed = time.time() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nImported {record.feature_count} features in {elapsed:.1f}s '
+                f'covering ({record.south:.4f}, {record.west:.4f}) - ({record.north:.4f}, {record.east:.4f})'
+            )
+        )
@@ -0,0 +1,164 @@
+"""
+Management command to pre-build a region of the world (cells and their procedural materials)
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from game.models import CellMaterial, MapCell
+from game.resource_generator import generate_procedural_cells
+from game.services.cell_generation_service import START_CELL, start_position
+from game.services.map_service import CRAFTED_ITEM_NAMES, get_material_id_map
+from game.utils.config_helper import GameSettings
+
+
+class Command(BaseCommand):
+    help = 'Generate MapCell and CellMaterial rows for a square region ahead of time'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--center',
+            type=str,
+            default=None,
+            help='Region center as "lat,lon" (default: player start position)'
+        )
+        parser.add_argument(
+            '--radius',
+            type=int,
+            default=25,
+            help='Region half-size in grid cells (default: 25, i.e. 51x51 cells)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Generator processes (default: 1, generation runs in this process)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Cells generated per worker task and written per database batch (default: 2000)'
+        )
+
+    def handle(self, *args, **options):
+        start_lat, start_lon = start_position()
+        if options['center']:
+            try:
+                lat, lon = (float(v) for v in options['center'].split(','))
+            except ValueError:
+                raise CommandError('--center must be "lat,lon"')
+        else:
+            lat, lon = start_lat, start_lon
+
+        radius = max(0, options['radius'])
+        workers = max(1, options['workers'])
+        batch_size = max(1, options['batch_size'])
+        offset = GameSettings.movement_grid_offset()
+
+        # Grid coordinates are relative to the start cell, like player movement
+        center_x = round((lon - start_lon) / offset)
+        center_y = round((lat - start_lat) / offset)
+        xs = range(center_x - radius, center_x + radius + 1)
+        ys = range(center_y - radius, center_y + radius + 1)
+
+        existing = set(
+            MapCell.objects.filter(
+                grid_x__gte=xs[0], grid_x__lte=xs[-1], grid_y__gte=ys[0], grid_y__lte=ys[-1]
+            ).values_list('grid_x', 'grid_y')
+        )
+        todo = []
+        for gy in ys:
+            for gx in xs:
+                if (gx, gy) in existing:
+                    continue
+                if (gx, gy) == START_CELL:
+                    todo.append((gx, gy, start_lat, start_lon, 'plains'))
+                else:
+                    todo.append((gx, gy, start_lat + gy * offset, start_lon + gx * offset, None))
+
+        self.stdout.write(
+            f'Pre-generating {len(todo)} cells around grid ({center_x}, {center_y}) '
+            f'({len(existing)} already exist) with {workers} worker(s)...'
+        )
+        if not todo:
+            self.stdout.write(self.style.SUCCESS('\nNothing to generate'))
+            return
+
+        material_ids = get_material_id_map()
+        chunks = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+
+        start = time.time()
+        created_cells = 0
+        created_materials = 0
+        if workers == 1:
+            results = map(generate_procedural_cells, chunks)
+            for batch in results:
+                cells, mats = self._write_batch(batch, material_ids)
+                created_cells += cells
+                created_materials += mats
+        else:
+            # Children must not share the parent's database connection
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for batch in pool.map(generate_procedural_cells, chunks):
+                    cells, mats = self._write_batch(batch, material_ids)
+                    created_cells += cells
+                    created_materials += mats
+                    self.stdout.write(f'  {created_cells}/{len(todo)} cells written...')
+
+        elapsed = time.time() - start
+        rate = created_cells / elapsed if elapsed > 0 else float(created_cells)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nGenerated {created_cells} cells and {created_materials} cell materials '
+                f'in {elapsed:.1f}s ({rate:.0f} cells/s)'
+            )
+        )
+
+    def _write_batch(self, batch, material_ids):
+        """
+        Insert one generated batch: cells first, then their materials.
+
+        Cells created by players meanwhile are kept as they are (with their
+        materials) and left out of the returned counts.
+        """
+        xs = [row[0] for row in batch]
+        ys = [row[1] for row in batch]
+        bounds = dict(grid_x__gte=min(xs), grid_x__lte=max(xs), grid_y__gte=min(ys), grid_y__lte=max(ys))
+        with transaction.atomic():
+            existing = set(MapCell.objects.filter(**bounds).values_list('grid_x', 'grid_y'))
+            new_rows = [row for row in batch if (row[0], row[1]) not in existing]
+            MapCell.objects.bulk_create(
+                [
+                    MapCell(
+                        grid_x=gx, grid_y=gy, center_lat=lat, center_lon=lon,
+                        biome=biome, osm_features=[], location_description=description,
+                    )
+                    for gx, gy, lat, lon, biome, description, _ in new_rows
+                ],
+                ignore_conflicts=True,  # a cell created by a player since the check above is kept
+            )
+
+            cell_ids = {
+                (gx, gy): cell_id
+                for cell_id, gx, gy in MapCell.objects.filter(**bounds).values_list('id', 'grid_x', 'grid_y')
+                if (gx, gy) not in existing
+            }
+
+            cell_materials = []
+            for gx, gy, _, _, _, _, materials in new_rows:
+                cell_id = cell_ids.get((gx, gy))
+                if cell_id is None:
+                    continue
+                for name, quantity in materials.items():
+                    material_id = material_ids.get(name)
+                    if material_id is None or name in CRAFTED_ITEM_NAMES:
+                        continue
+                    cell_materials.append(
+                        CellMaterial(cell_id=cell_id, material_id=material_id, quantity=quantity, max_quantity=100)
+                    )
+            CellMaterial.objects.bulk_create(cell_materials, batch_size=5000, ignore_conflicts=True)
+        return len(cell_ids), len(cell_materials)
@@ -0,0 +1,62 @@
+"""
+Management command to verify (and optionally repair) the denormalized player totals:
+carry weight and equipment bonuses, which are maintained incrementally.
+Run after manual data fixes or periodically to catch drift.
+"""
+from django.core.management.base import BaseCommand
+
+from game.models import Player
+from game.services.equipment_service import equipment_totals_subqueries
+from game.services.inventory_ledger_service import carry_weight_subquery
+
+TOLERANCE = 0.01
+
+
+class Command(BaseCommand):
+    help = 'Compare stored carry weights and equipment bonuses with inventories and gear, and fix them with --fix'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Rewrite the totals of the players that drifted'
+        )
+        parser.add_argument(
+            '--player',
+            type=int,
+            action='append',
+            dest='player_ids',
+            help='Only check this player id (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        expected = {'carry_weight': carry_weight_subquery(), **equipment_totals_subqueries()}
+        players = Player.objects.all()
+        if options['player_ids']:
+            players = players.filter(id__in=options['player_ids'])
+
+        rows = players.annotate(**{f'expected_{column}': expr for column, expr in expected.items()}).values(
+            'id', *expected, *[f'expected_{column}' for column in expected]
+        )
+
+        drifted = []
+        for row in rows:
+            diffs = {
+                column: (row[column], row[f'expected_{column}'])
+                for column in expected
+                if abs(row[column] - row[f'expected_{column}']) > TOLERANCE
+            }
+            if diffs:
+                drifted.append(row['id'])
+                details = ', '.join(f'{column} {stored:.2f} != {actual:.2f}' for column, (stored, actual) in diffs.items())
+                self.stdout.write(f'Player {row["id"]}: {details}')
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('All player totals are consistent'))
+            return
+
+        if options['fix']:
+            Player.objects.filter(id__in=drifted).update(**expected)
+            self.stdout.write(self.style.SUCCESS(f'\n{len(drifted)} players repaired'))
+        else:
+            self.stdout.write(self.style.WARNING(f'\n{len(drifted)} players drifted (run with --fix to repair)'))
@@ -0,0 +1,82 @@
+"""
+Management command to seed the OSM tile store for a region with batched Overpass queries
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from game.osm_utils import fetch_osm_features_bulk
+from game.utils.config_helper import GameSettings
+
+
+class Command(BaseCommand):
+    help = 'Fetch OSM features for a square region of grid cells, one Overpass request per block'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--center',
+            type=str,
+            default=None,
+            help='Region center as "lat,lon" (default: player start position)'
+        )
+        parser.add_argument(
+            '--radius',
+            type=int,
+            default=10,
+            help='Region half-size in grid cells (default: 10, i.e. 21x21 cells)'
+        )
+        parser.add_argument(
+            '--block',
+            type=int,
+            default=8,
+            help='Block size in cells fetched per Overpass request (default: 8)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Refetch tiles even if they are still fresh'
+        )
+
+    def handle(self, *args, **options):
+        if options['center']:
+            try:
+                lat, lon = (float(v) for v in options['center'].split(','))
+            except ValueError:
+                raise CommandError('--center must be "lat,lon"')
+        else:
+            lat, lon = GameSettings.player_start_lat(), GameSettings.player_start_lon()
+
+        radius = options['radius']
+        block = max(1, options['block'])
+        offset = GameSettings.movement_grid_offset()
+        span = range(-radius, radius + 1)
+
+        self.stdout.write(f'Seeding OSM tiles for {len(span) ** 2} cells around ({lat}, {lon})...')
+
+        start = time.time()
+        blocks = 0
+        stored = 0
+        failed_blocks = 0
+        for by in range(-radius, radius + 1, block):
+            for bx in range(-radius, radius + 1, block):
+                centers = [
+                    (lat + dy * offset, lon + dx * offset)
+                    for dy in range(by, min(by + block, radius + 1))
+                    for dx in range(bx, min(bx + block, radius + 1))
+                ]
+                blocks += 1
+                results = fetch_osm_features_bulk(centers, radius=100, force=options['force'])
+                if results is None:
+                    failed_blocks += 1
+                    self.stdout.write(self.style.WARNING(f'  Block ({bx}, {by}) failed'))
+                    continue
+                stored += len(results)
+
+        elapsed = time.time() - start
+        if failed_blocks:
+            self.stdout.write(self.style.WARNING(f'  {failed_blocks} blocks failed (Overpass unreachable)'))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nSeeded {stored} cells in {blocks} blocks in {elapsed:.1f}s'
+            )
+        )
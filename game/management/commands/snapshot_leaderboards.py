@@ -0,0 +1,28 @@
+"""
+Management command to refresh the stored leaderboard ranks
+This should be run periodically (e.g. every few minutes via cron job)
+"""
+from django.core.management.base import BaseCommand
+
+from game.services.leaderboard_service import LeaderboardService
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored leaderboard ranks (scores are kept current by game events)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Rebuild every category from the Player table and the game logs (repair)'
+        )
+
+    def handle(self, *args, **options):
+        if options['full']:
+            self.stdout.write('Rebuilding all leaderboards from game logs...')
+            count = LeaderboardService.rebuild_all_leaderboards()
+        else:
+            self.stdout.write('Refreshing leaderboard ranks...')
+            count = LeaderboardService.update_all_leaderboards()
+
+        self.stdout.write(self.style.SUCCESS(f'\n{count} leaderboard entries updated'))
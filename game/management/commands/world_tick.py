@@ -0,0 +1,59 @@
+"""
+Management command running the periodic health simulation for all players at once:
+bleeding, infections, diseases and natural healing, each as a set-based batch.
+Run it from cron (e.g. bleeding and infections every minute, diseases and healing
+every hour) or keep it running as a scheduler with --interval.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from game import push
+from game.services.health_service import TICK_STEPS
+
+
+class Command(BaseCommand):
+    help = 'Process bleeding, infections, diseases and natural healing for all players in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--steps',
+            nargs='+',
+            choices=list(TICK_STEPS),
+            default=list(TICK_STEPS),
+            help='Steps to run (default: all)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Keep ticking every N seconds instead of running once'
+        )
+
+    def handle(self, *args, **options):
+        steps = [name for name in TICK_STEPS if name in options['steps']]
+        while True:
+            started = time.perf_counter()
+            self.run_tick(steps)
+            if options['interval'] <= 0:
+                return
+            time.sleep(max(0, options['interval'] - (time.perf_counter() - started)))
+
+    def run_tick(self, steps):
+        tick_started = time.perf_counter()
+        total_rows = 0
+        for name in steps:
+            step_started = time.perf_counter()
+            with transaction.atomic():
+                rows = TICK_STEPS[name]()['rows']
+            total_rows += rows
+            self.stdout.write(f'{name}: {rows} rows in {(time.perf_counter() - step_started) * 1000:.1f} ms')
+
+        # Open client streams rebuild health and vitals and send whatever changed
+        if total_rows:
+            push.touch_world('health', 'player')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Tick done: {total_rows} rows touched in {(time.perf_counter() - tick_started) * 1000:.1f} ms'
+        ))
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-17 06:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0043_randomenemy_encounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OSMTile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tile_key', models.CharField(max_length=64, unique=True)),
+                ('lat', models.FloatField()),
+                ('lon', models.FloatField()),
+                ('radius', models.IntegerField(default=50)),
+                ('features', models.JSONField(blank=True, default=list)),
+                ('fetched_at', models.DateTimeField()),
+                ('last_accessed', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_accessed'], name='game_osmtile_accessed_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-17 06:18
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_existing_cells_enriched(apps, schema_editor):
+    """Cells generated before this field were enriched inline; don't queue them all for Overpass again"""
+    MapCell = apps.get_model('game', 'MapCell')
+    MapCell.objects.filter(osm_enriched_at__isnull=True).update(osm_enriched_at=F('last_regenerated'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0044_osmtile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mapcell',
+            name='osm_enriched_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(mark_existing_cells_enriched, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-17 06:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0045_mapcell_osm_enriched_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OSMImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255)),
+                ('south', models.FloatField()),
+                ('west', models.FloatField()),
+                ('north', models.FloatField()),
+                ('east', models.FloatField()),
+                ('feature_count', models.IntegerField(default=0)),
+                ('imported_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='OSMFeature',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('osm_type', models.CharField(max_length=8)),
+                ('osm_id', models.BigIntegerField()),
+                ('lat', models.FloatField()),
+                ('lon', models.FloatField()),
+                ('lat_bucket', models.IntegerField()),
+                ('lon_bucket', models.IntegerField()),
+                ('category', models.CharField(max_length=20)),
+                ('subcategory', models.CharField(blank=True, default='', max_length=100)),
+                ('feature', models.JSONField(default=dict)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['lat_bucket', 'lon_bucket'], name='game_osmfeature_bucket_idx')],
+                'unique_together': {('osm_type', 'osm_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-17 06:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def backfill_counters(apps, schema_editor):
+    """Seed counters from the existing gathering, crafting and combat logs"""
+    GatheringLog = apps.get_model('game', 'GatheringLog')
+    CraftingLog = apps.get_model('game', 'CraftingLog')
+    CombatLog = apps.get_model('game', 'CombatLog')
+    PlayerCounter = apps.get_model('game', 'PlayerCounter')
+
+    totals = {}
+
+    def add(player_id, key, value):
+        totals[(player_id, key)] = totals.get((player_id, key), 0) + value
+
+    for row in GatheringLog.objects.values('player_id', 'material__name').annotate(n=Count('id')):
+        add(row['player_id'], 'gathers', row['n'])
+        add(row['player_id'], f"gather_material:{row['material__name']}", row['n'])
+    for row in CraftingLog.objects.values('player_id', 'recipe__name').annotate(n=Count('id')):
+        add(row['player_id'], 'crafts', row['n'])
+        add(row['player_id'], f"craft_recipe:{row['recipe__name']}", row['n'])
+    for row in CombatLog.objects.filter(result='victory').values('player_id', 'mob__name').annotate(n=Count('id')):
+        add(row['player_id'], f"mob_defeated:{row['mob__name']}", row['n'])
+
+    PlayerCounter.objects.bulk_create(
+        [PlayerCounter(player_id=player_id, key=key[:150], value=value) for (player_id, key), value in totals.items()],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0046_osm_local_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text="e.g. 'gathers', 'gather_material:Bois', 'mob_defeated:Loup'", max_length=150)),
+                ('value', models.BigIntegerField(default=0)),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='counters', to='game.player')),
+            ],
+            options={
+                'unique_together': {('player', 'key')},
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:22
+
+from django.db import migrations, models
+from django.db.models import F, FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_totals(apps, schema_editor):
+    """Seed carry weight and equipment bonus from current inventories and gear"""
+    Player = apps.get_model('game', 'Player')
+    Inventory = apps.get_model('game', 'Inventory')
+    EquippedItem = apps.get_model('game', 'EquippedItem')
+
+    def per_player(queryset, expression):
+        return Coalesce(
+            Subquery(
+                queryset.filter(player=OuterRef('pk')).values('player').annotate(
+                    total=Sum(expression, output_field=FloatField())
+                ).values('total')
+            ),
+            Value(0.0),
+            output_field=FloatField()
+        )
+
+    Player.objects.update(
+        carry_weight=per_player(Inventory.objects, F('quantity') * F('material__weight')),
+        equipment_carry_bonus=per_player(EquippedItem.objects, F('material__weight_capacity_bonus')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0047_player_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='player',
+            name='carry_weight',
+            field=models.FloatField(default=0.0, help_text='Total inventory weight (kg)'),
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='equipment_carry_bonus',
+            field=models.FloatField(default=0.0, help_text='Carry capacity bonus from equipped items (kg)'),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:26
+
+from django.db import migrations, models
+from django.db.models import IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_equipment_stats(apps, schema_editor):
+    """Seed the stored attack, defense and speed bonus from the equipped items"""
+    Player = apps.get_model('game', 'Player')
+    EquippedItem = apps.get_model('game', 'EquippedItem')
+
+    def per_player(field):
+        return Coalesce(
+            Subquery(
+                EquippedItem.objects.filter(player=OuterRef('pk')).values('player').annotate(
+                    total=Sum(f'material__{field}')
+                ).values('total')
+            ),
+            Value(0),
+            output_field=IntegerField()
+        )
+
+    Player.objects.update(
+        equipment_attack=per_player('attack'),
+        equipment_defense=per_player('defense'),
+        equipment_speed_bonus=per_player('speed_bonus'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0048_player_carry_totals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='player',
+            name='equipment_attack',
+            field=models.IntegerField(default=0, help_text='Attack from equipped items'),
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='equipment_defense',
+            field=models.IntegerField(default=0, help_text='Defense from equipped items'),
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='equipment_speed_bonus',
+            field=models.IntegerField(default=0, help_text='Speed bonus from equipped items'),
+        ),
+        migrations.RunPython(backfill_equipment_stats, migrations.RunPython.noop),
+    ]
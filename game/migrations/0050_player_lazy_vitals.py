@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:36
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def anchor_radiation(apps, schema_editor):
+    """Radiation used to decay from the energy timestamp; start its own anchor there"""
+    Player = apps.get_model('game', 'Player')
+    Player.objects.update(last_radiation_update=F('last_energy_update'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0049_player_equipment_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='player',
+            name='last_radiation_update',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='player',
+            name='hunger',
+            field=models.FloatField(default=100.0),
+        ),
+        migrations.AlterField(
+            model_name='player',
+            name='thirst',
+            field=models.FloatField(default=100.0),
+        ),
+        migrations.RunPython(anchor_radiation, migrations.RunPython.noop),
+    ]
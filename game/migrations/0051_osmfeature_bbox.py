@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-17 09:40
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def set_point_bboxes(apps, schema_editor):
+    """Features imported before this field were stored as points; keep them as such until re-imported"""
+    OSMFeature = apps.get_model('game', 'OSMFeature')
+    OSMFeature.objects.update(min_lat=F('lat'), max_lat=F('lat'), min_lon=F('lon'), max_lon=F('lon'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0050_player_lazy_vitals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='osmfeature',
+            name='max_lat',
+            field=models.FloatField(default=0.0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='osmfeature',
+            name='max_lon',
+            field=models.FloatField(default=0.0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='osmfeature',
+            name='min_lat',
+            field=models.FloatField(default=0.0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='osmfeature',
+            name='min_lon',
+            field=models.FloatField(default=0.0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='osmfeature',
+            name='wide',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(set_point_bboxes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='osmfeature',
+            index=models.Index(fields=['wide', 'min_lat', 'max_lat'], name='game_osmfeature_wide_idx'),
+        ),
+    ]
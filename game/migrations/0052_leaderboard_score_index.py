@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0051_osmfeature_bbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaderboard',
+            index=models.Index(fields=['category', 'score'], name='game_leader_categor_12ffbb_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-17 09:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0052_leaderboard_score_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payload', models.JSONField(default=dict, help_text="{'achievements_unlocked': [...], 'quests_completed': [...]}")),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_notifications', to='game.player')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
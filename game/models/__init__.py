@@ -5,15 +5,15 @@ from .vehicles import (
 )
 # Keep old Vehicle for backwards compatibility during migration
 from .items import Vehicle
-from .world import MapCell, CellMaterial, GatheringLog
+from .world import MapCell, CellMaterial, GatheringLog, OSMTile, OSMFeature, OSMImport
 from .crafting import Workstation, Recipe, RecipeIngredient, CraftingLog
 from .buildings import BuildingType, BuildingRecipe, Building, House
 from .combat import Mob, CombatLog, RandomEnemy, Encounter
 from .economy import Shop, ShopItem, Bank, Transaction, TradeOffer
 from .skills import Skill, TalentNode
-from .achievements import Achievement, PlayerAchievement
+from .achievements import Achievement, PlayerAchievement, PlayerCounter
 from .quests import Quest, PlayerQuest
-from .events import DynamicEvent
+from .events import DynamicEvent, PendingNotification
 from .leaderboard import Leaderboard
 from .config import GameConfig
 from .player import Player, PlayerWorkstation, Inventory, EquippedItem, PlayerSkill, PlayerTalent
@@ -56,3 +56,16 @@ class PlayerAchievement(models.Model):
     def __str__(self):
         status = "✓" if self.completed else f"{self.progress}/{self.achievement.requirement_value}"
         return f"{self.player.user.username} - {self.achievement.name} ({status})"
+
+
+class PlayerCounter(models.Model):
+    """Per-player event counters (gathers, crafts, per material/recipe/mob/biome) read by achievements"""
+    player = models.ForeignKey('game.Player', on_delete=models.CASCADE, related_name='counters')
+    key = models.CharField(max_length=150, help_text="e.g. 'gathers', 'gather_material:Bois', 'mob_defeated:Loup'")
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('player', 'key')
+
+    def __str__(self):
+        return f"{self.player.user.username} - {self.key}: {self.value}"
@@ -54,3 +54,16 @@ class DynamicEvent(models.Model):
         if self.max_participants > 0 and self.participants.count() >= self.max_participants:
             return False
         return player not in self.participants.all()
+
+
+class PendingNotification(models.Model):
+    """Subscriber results (game.events) waiting for the player's next response"""
+    player = models.ForeignKey('game.Player', on_delete=models.CASCADE, related_name='pending_notifications')
+    payload = models.JSONField(default=dict, help_text="{'achievements_unlocked': [...], 'quests_completed': [...]}")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.player_id} - {', '.join(self.payload)}"
@@ -34,6 +34,7 @@ class Leaderboard(models.Model):
         ordering = ['category', 'rank']
         indexes = [
             models.Index(fields=['category', 'rank']),
+            models.Index(fields=['category', 'score']),  # live ranks counted from the table
         ]
 
     def __str__(self):
@@ -30,9 +30,9 @@ class Player(models.Model):
     last_energy_update = models.DateTimeField(null=True, blank=True)
 
     # Survival Stats (Day R inspired)
-    hunger = models.IntegerField(default=100)  # 0-100, decreases over time
+    hunger = models.FloatField(default=100.0)  # 0-100, decreases over time
     max_hunger = models.IntegerField(default=100)
-    thirst = models.IntegerField(default=100)  # 0-100, decreases faster than hunger
+    thirst = models.FloatField(default=100.0)  # 0-100, decreases faster than hunger
     max_thirst = models.IntegerField(default=100)
     radiation = models.IntegerField(default=0)  # 0-100, accumulated in certain biomes
 
@@ -42,10 +42,18 @@ class Player(models.Model):
 
     # Inventory capacity
     max_carry_weight = models.FloatField(default=50.0)  # Base carry capacity, increased by strength
+    # Denormalized totals: shifted by inventory_ledger_service and the Inventory/EquippedItem
+    # signals, never by a plain save() (see DERIVED_FIELDS); repair with `repair_player_totals`
+    carry_weight = models.FloatField(default=0.0, help_text="Total inventory weight (kg)")
+    equipment_carry_bonus = models.FloatField(default=0.0, help_text="Carry capacity bonus from equipped items (kg)")
+    equipment_attack = models.IntegerField(default=0, help_text="Attack from equipped items")
+    equipment_defense = models.IntegerField(default=0, help_text="Defense from equipped items")
+    equipment_speed_bonus = models.IntegerField(default=0, help_text="Speed bonus from equipped items")
 
     # Tracking for survival decay
     last_hunger_update = models.DateTimeField(null=True, blank=True)
     last_thirst_update = models.DateTimeField(null=True, blank=True)
+    last_radiation_update = models.DateTimeField(null=True, blank=True)
 
     # Realistic metabolism system (SCUM-inspired)
     satiety = models.FloatField(default=100.0, help_text="Satiety level (0-100), decays slower than hunger")
@@ -102,6 +110,26 @@ class Player(models.Model):
     # Vehicle
     current_vehicle = models.ForeignKey('PlayerVehicle', on_delete=models.SET_NULL, null=True, blank=True, related_name='driven_by')
 
+    # Columns maintained by their own UPDATEs; a full save() of a stale instance must not overwrite them
+    DERIVED_FIELDS = (
+        'carry_weight', 'equipment_carry_bonus', 'equipment_attack', 'equipment_defense', 'equipment_speed_bonus'
+    )
+
+    # Lazily evaluated vitals: each value is exact at its timestamp and caught up in closed form
+    # (SurvivalService.catch_up); writers save them together with their anchors
+    VITAL_FIELDS = (
+        'energy', 'hunger', 'thirst', 'satiety', 'hydration', 'radiation',
+        'last_energy_update', 'last_hunger_update', 'last_thirst_update', 'last_radiation_update',
+    )
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DERIVED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     def get_xp_for_level(self, level):
         """Calculate XP required for a given level using configurable formula"""
         if level <= 1:
@@ -125,42 +153,30 @@ class Player(models.Model):
 
     @property
     def total_defense(self):
-        """Calculate total defense from equipment"""
-        defense = 0
-        for item in self.equipped_items.all():
-            defense += item.material.defense
-        return defense
+        """Total defense from equipment (stored when gear changes)"""
+        return self.equipment_defense
 
     @property
     def total_attack(self):
-        """Calculate total attack from equipment"""
-        attack = 0
-        for item in self.equipped_items.all():
-            attack += item.material.attack
-        return attack
+        """Total attack from equipment (stored when gear changes)"""
+        return self.equipment_attack
 
     @property
     def total_speed_bonus(self):
-        """Calculate total speed bonus from equipment"""
-        speed = 0
-        for item in self.equipped_items.all():
-            speed += item.material.speed_bonus
-        return speed
+        """Total speed bonus from equipment (stored when gear changes)"""
+        return self.equipment_speed_bonus
 
     @property
     def current_carry_weight(self):
-        """Calculate current inventory weight"""
-        total_weight = 0.0
-        for inv_item in self.inventory.all():
-            total_weight += inv_item.material.weight * inv_item.quantity
-        return round(total_weight, 2)
+        """Current inventory weight"""
+        return round(self.carry_weight, 2)
 
     @property
     def effective_carry_capacity(self):
         """Calculate effective carry capacity (base + strength bonus + equipment)"""
         base = self.max_carry_weight
         strength_bonus = (self.strength - 10) * 2.0  # +2kg per strength point above 10
-        equipment_bonus = sum(item.material.weight_capacity_bonus for item in self.equipped_items.all())
+        equipment_bonus = self.equipment_carry_bonus
         
         vehicle_bonus = 0.0
         if self.current_vehicle:
@@ -288,6 +304,13 @@ class Inventory(models.Model):
         unique_together = ('player', 'material')
         verbose_name_plural = 'Inventories'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Quantity as stored, so direct saves/deletes can shift the player's carry weight
+        instance._stored_quantity = instance.__dict__.get('quantity')
+        return instance
+
     def __str__(self):
         return f"{self.player.user.username} - {self.material.name}: {self.quantity}"
 
@@ -9,6 +9,7 @@ class MapCell(models.Model):
     biome = models.CharField(max_length=50, default='plains')  # forest, water, mountain, etc.
     osm_features = models.JSONField(default=list, blank=True)  # Store OSM features data
     location_description = models.TextField(default='Zone inconnue', blank=True)  # Human-readable description
+    osm_enriched_at = models.DateTimeField(null=True, blank=True)  # Set once background OSM enrichment has run
     last_regenerated = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -40,3 +41,61 @@ class GatheringLog(models.Model):
 
     def __str__(self):
         return f"{self.player.user.username} gathered {self.quantity}x {self.material.name}"
+
+class OSMTile(models.Model):
+    """Persistent cache of OSM features for a quantized location, shared by all workers"""
+    tile_key = models.CharField(max_length=64, unique=True)  # "lat:lon:radius" quantized
+    lat = models.FloatField()
+    lon = models.FloatField()
+    radius = models.IntegerField(default=50)
+    features = models.JSONField(default=list, blank=True)
+    fetched_at = models.DateTimeField()
+    last_accessed = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['last_accessed'], name='game_osmtile_accessed_idx'),
+        ]
+
+    def __str__(self):
+        return f"OSM tile {self.tile_key} ({len(self.features or [])} features)"
+
+class OSMFeature(models.Model):
+    """OSM feature imported from a local extract, bucketed for spatial lookups"""
+    osm_type = models.CharField(max_length=8)  # node / way
+    osm_id = models.BigIntegerField()
+    lat = models.FloatField()  # bounding box center
+    lon = models.FloatField()
+    min_lat = models.FloatField()  # bounding box (a single point for nodes)
+    min_lon = models.FloatField()
+    max_lat = models.FloatField()
+    max_lon = models.FloatField()
+    wide = models.BooleanField(default=False)  # bbox larger than one bucket: looked up by bbox, not bucket
+    lat_bucket = models.IntegerField()  # floor(lat * LOCAL_INDEX_BUCKETS_PER_DEGREE)
+    lon_bucket = models.IntegerField()
+    category = models.CharField(max_length=20)
+    subcategory = models.CharField(max_length=100, blank=True, default='')
+    feature = models.JSONField(default=dict)  # parse_osm_features() output for this element
+
+    class Meta:
+        unique_together = ('osm_type', 'osm_id')
+        indexes = [
+            models.Index(fields=['lat_bucket', 'lon_bucket'], name='game_osmfeature_bucket_idx'),
+            models.Index(fields=['wide', 'min_lat', 'max_lat'], name='game_osmfeature_wide_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.osm_type}/{self.osm_id} {self.category}:{self.subcategory}"
+
+class OSMImport(models.Model):
+    """Area covered by an imported OSM extract; lookups inside it are served locally"""
+    source = models.CharField(max_length=255)
+    south = models.FloatField()
+    west = models.FloatField()
+    north = models.FloatField()
+    east = models.FloatField()
+    feature_count = models.IntegerField(default=0)
+    imported_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.source} ({self.feature_count} features)"
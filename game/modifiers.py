@@ -0,0 +1,66 @@
+"""
+Per-player snapshot of passive modifiers (talent effects and building bonuses)
+
+Talent effects and building bonuses only change when a talent unlocks or a
+building is completed, damaged or removed, yet every move, gather, craft and
+energy regeneration used to re-query them. They are now built once per request
+into a snapshot memoized on the Player instance (two queries).
+
+The snapshot is not cached across requests: the default cache is per process,
+so a version bumped by one worker would not retire the copies of the others.
+Writes to PlayerTalent and Building drop the memo of the Player instance they
+were made through (game.signals).
+"""
+from .models import Building, PlayerTalent
+
+BUILDING_BONUSES = {
+    'energy_regeneration': 'energy_regeneration_bonus',
+    'storage': 'storage_bonus',
+    'defense': 'defense_bonus',
+    'production': 'production_bonus',
+}
+
+
+def build_snapshot(player_id):
+    """Talent effects by skill and summed building bonuses, in two queries"""
+    talents = {}
+    rows = PlayerTalent.objects.filter(player_id=player_id).values_list(
+        'talent_node__skill__code', 'talent_node__effect_type', 'talent_node__effect_value'
+    )
+    for skill_code, effect_type, value in rows:
+        effects = talents.setdefault(skill_code, {})
+        effects[effect_type] = max(effects.get(effect_type, 0), value)
+
+    buildings = {'energy_regeneration': 0, 'storage': 0, 'defense': 0, 'production': 0.0}
+    rows = Building.objects.filter(player_id=player_id, status='completed').values_list(
+        *(f'building_type__{field}' for field in BUILDING_BONUSES.values())
+    )
+    for values in rows:
+        for bonus, value in zip(BUILDING_BONUSES, values):
+            buildings[bonus] += value
+
+    return {'talents': talents, 'buildings': buildings}
+
+
+def get_modifiers(player):
+    """The player's modifier snapshot, memoized on the instance"""
+    snapshot = getattr(player, '_modifiers', None)
+    if snapshot is None:
+        snapshot = player._modifiers = build_snapshot(player.id)
+    return snapshot
+
+
+def talent_effects(player, skill_code):
+    """Strongest value of each talent effect type unlocked for a skill"""
+    return dict(get_modifiers(player)['talents'].get(skill_code, {}))
+
+
+def building_bonuses(player):
+    """Bonuses summed over the player's completed buildings"""
+    return dict(get_modifiers(player)['buildings'])
+
+
+def forget(player):
+    """Drop the snapshot memoized on a Player instance"""
+    player.__dict__.pop('_modifiers', None)
+
@@ -0,0 +1,278 @@
+"""
+Streaming import of local OpenStreetMap extracts into the OSMFeature index
+
+Supported inputs:
+- .osm (XML): streamed with iterparse
+- .osm.pbf: streamed with pyosmium (optional dependency: pip install osmium)
+- .json / .osm.json (Overpass JSON): streamed with ijson when installed
+  (pip install ijson); without it the whole document is loaded in memory
+
+Node coordinates needed to place ways are kept in a temporary on-disk SQLite
+table, so memory use stays constant regardless of the extract size. Ways are
+stored with their bounding box, so lookups find them in every cell they cross.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import xml.etree.ElementTree as ET
+
+from .models import OSMFeature, OSMImport
+from .osm_utils import (
+    LOCAL_INDEX_BUCKETS_PER_DEGREE, OSM_NODE_KEYS, OSM_WAY_KEYS, _parse_osm_element, get_local_bucket,
+    reset_local_coverage
+)
+
+
+class OSMImportError(Exception):
+    """Raised when an extract cannot be read"""
+
+
+class _NodeLocationStore:
+    """Disk-backed node id -> (lat, lon) map used to compute way bounding boxes"""
+
+    def __init__(self, flush_size=10000):
+        fd, self.path = tempfile.mkstemp(suffix='.sqlite3', prefix='osm_nodes_')
+        os.close(fd)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute('CREATE TABLE nodes (id INTEGER PRIMARY KEY, lat REAL, lon REAL)')
+        self.pending = []
+        self.flush_size = flush_size
+
+    def add(self, node_id, lat, lon):
+        self.pending.append((node_id, lat, lon))
+        if len(self.pending) >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.db.executemany('INSERT OR REPLACE INTO nodes VALUES (?, ?, ?)', self.pending)
+            self.pending = []
+
+    def bbox(self, node_ids):
+        """(min_lat, min_lon, max_lat, max_lon) of the given nodes, or None if none are known"""
+        self.flush()
+        lats, lons = [], []
+        for start in range(0, len(node_ids), 500):
+            chunk = node_ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for lat, lon in self.db.execute(
+                f'SELECT lat, lon FROM nodes WHERE id IN ({placeholders})', chunk
+            ):
+                lats.append(lat)
+                lons.append(lon)
+        if not lats:
+            return None
+        return min(lats), min(lons), max(lats), max(lons)
+
+    def close(self):
+        self.db.close()
+        os.remove(self.path)
+
+
+class OSMExtractImporter:
+    """Stream an OSM extract and upsert matching features in batches"""
+
+    def __init__(self, path, batch_size=2000, stdout=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.stdout = stdout
+        self.batch = []
+        self.count = 0
+        self.bounds = None  # (south, west, north, east) from the file header
+        self.extent = None  # same, computed from imported features
+
+    def run(self):
+        """Import the file and record its coverage. Returns the OSMImport row."""
+        name = self.path.lower()
+        if name.endswith('.pbf'):
+            self._read_pbf()
+        elif name.endswith('.json'):
+            self._read_json()
+        elif name.endswith('.osm') or name.endswith('.xml'):
+            self._read_xml()
+        else:
+            raise OSMImportError(f"Unsupported extract format: {self.path}")
+        self._flush()
+
+        south, west, north, east = self.bounds or self.extent or (0, 0, 0, 0)
+        record = OSMImport.objects.create(
+            source=os.path.basename(self.path),
+            south=south, west=west, north=north, east=east,
+            feature_count=self.count,
+        )
+        reset_local_coverage()
+        return record
+
+    def add(self, osm_type, osm_id, bbox, tags):
+        """Queue a feature; bbox is (min_lat, min_lon, max_lat, max_lon), a single point for nodes"""
+        keys = OSM_NODE_KEYS if osm_type == 'node' else OSM_WAY_KEYS
+        if not any(key in tags for key in keys):
+            return
+        feature = _parse_osm_element({'type': osm_type, 'id': osm_id, 'tags': tags})
+        if feature is None:
+            return
+
+        min_lat, min_lon, max_lat, max_lon = bbox
+        lat, lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+        bucket_size = 1.0 / LOCAL_INDEX_BUCKETS_PER_DEGREE
+        self.batch.append(OSMFeature(
+            osm_type=osm_type,
+            osm_id=osm_id,
+            lat=lat,
+            lon=lon,
+            min_lat=min_lat,
+            min_lon=min_lon,
+            max_lat=max_lat,
+            max_lon=max_lon,
+            wide=max_lat - min_lat > bucket_size or max_lon - min_lon > bucket_size,
+            lat_bucket=get_local_bucket(lat),
+            lon_bucket=get_local_bucket(lon),
+            category=feature['category'],
+            subcategory=str(feature.get('subcategory', ''))[:100],
+            feature=feature,
+        ))
+        if self.extent is None:
+            self.extent = bbox
+        else:
+            s, w, n, e = self.extent
+            self.extent = (min(s, min_lat), min(w, min_lon), max(n, max_lat), max(e, max_lon))
+        if len(self.batch) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if not self.batch:
+            return
+        OSMFeature.objects.bulk_create(
+            self.batch,
+            update_conflicts=True,
+            unique_fields=['osm_type', 'osm_id'],
+            update_fields=[
+                'lat', 'lon', 'min_lat', 'min_lon', 'max_lat', 'max_lon', 'wide',
+                'lat_bucket', 'lon_bucket', 'category', 'subcategory', 'feature',
+            ],
+        )
+        self.count += len(self.batch)
+        self.batch = []
+        if self.stdout:
+            self.stdout.write(f'  {self.count} features imported...')
+
+    def _read_xml(self):
+        nodes = _NodeLocationStore()
+        try:
+            context = ET.iterparse(self.path, events=('start', 'end'))
+            _, root = next(context)
+            depth = 0
+            for event, elem in context:
+                if event == 'start':
+                    depth += 1
+                    continue
+                depth -= 1
+                if elem.tag == 'bounds':
+                    self.bounds = (
+                        float(elem.get('minlat')), float(elem.get('minlon')),
+                        float(elem.get('maxlat')), float(elem.get('maxlon')),
+                    )
+                elif elem.tag == 'node':
+                    node_id = int(elem.get('id'))
+                    lat, lon = float(elem.get('lat')), float(elem.get('lon'))
+                    nodes.add(node_id, lat, lon)
+                    tags = {t.get('k'): t.get('v') for t in elem.iter('tag')}
+                    if tags:
+                        self.add('node', node_id, (lat, lon, lat, lon), tags)
+                elif elem.tag == 'way':
+                    tags = {t.get('k'): t.get('v') for t in elem.iter('tag')}
+                    if any(key in tags for key in OSM_WAY_KEYS):
+                        refs = [int(nd.get('ref')) for nd in elem.iter('nd')]
+                        bbox = nodes.bbox(refs)
+                        if bbox:
+                            self.add('way', int(elem.get('id')), bbox, tags)
+                if depth == 0:
+                    # Drop every finished top-level element (relations included)
+                    # so memory stays constant
+                    root.clear()
+        except ET.ParseError as e:
+            raise OSMImportError(f"Invalid OSM XML: {str(e)}")
+        finally:
+            nodes.close()
+
+    def _read_json(self):
+        nodes = _NodeLocationStore()
+        try:
+            with open(self.path, 'rb') as f:
+                try:
+                    import ijson
+                    elements = ijson.items(f, 'elements.item', use_float=True)
+                except ImportError:
+                    # Without ijson the whole document is loaded at once
+                    if self.stdout:
+                        self.stdout.write('  ijson not installed: loading the whole JSON file in memory')
+                    elements = json.load(f).get('elements', [])
+                for element in elements:
+                    tags = element.get('tags', {})
+                    if element.get('type') == 'node':
+                        nodes.add(element['id'], element['lat'], element['lon'])
+                        if tags:
+                            lat, lon = element['lat'], element['lon']
+                            self.add('node', element['id'], (lat, lon, lat, lon), tags)
+                    elif element.get('type') == 'way' and any(key in tags for key in OSM_WAY_KEYS):
+                        bbox = self._json_way_bbox(element, nodes)
+                        if bbox:
+                            self.add('way', element['id'], bbox, tags)
+        except (ValueError, KeyError) as e:
+            raise OSMImportError(f"Invalid Overpass JSON: {str(e)}")
+        finally:
+            nodes.close()
+
+    @staticmethod
+    def _json_way_bbox(element, nodes):
+        if 'bounds' in element:
+            bounds = element['bounds']
+            return bounds['minlat'], bounds['minlon'], bounds['maxlat'], bounds['maxlon']
+        if element.get('geometry'):
+            lats = [p['lat'] for p in element['geometry']]
+            lons = [p['lon'] for p in element['geometry']]
+            return min(lats), min(lons), max(lats), max(lons)
+        bbox = nodes.bbox(element.get('nodes', []))
+        if bbox is None and 'center' in element:
+            # `out center` exports only carry the center point
+            lat, lon = element['center']['lat'], element['center']['lon']
+            return lat, lon, lat, lon
+        return bbox
+
+    def _read_pbf(self):
+        try:
+            import osmium
+        except ImportError:
+            raise OSMImportError("Reading .osm.pbf files requires pyosmium (pip install osmium)")
+
+        importer = self
+
+        class Handler(osmium.SimpleHandler):
+            def node(self, n):
+                if n.tags and n.location.valid():
+                    lat, lon = n.location.lat, n.location.lon
+                    importer.add('node', n.id, (lat, lon, lat, lon), {t.k: t.v for t in n.tags})
+
+            def way(self, w):
+                tags = {t.k: t.v for t in w.tags}
+                if not any(key in tags for key in OSM_WAY_KEYS):
+                    return
+                locations = [nd.location for nd in w.nodes if nd.location.valid()]
+                if not locations:
+                    return
+                lats = [loc.lat for loc in locations]
+                lons = [loc.lon for loc in locations]
+                importer.add('way', w.id, (min(lats), min(lons), max(lats), max(lons)), tags)
+
+        box = osmium.io.Reader(self.path, osmium.osm.osm_entity_bits.NOTHING).header().box()
+        if box.valid():
+            self.bounds = (box.bottom_left.lat, box.bottom_left.lon, box.top_right.lat, box.top_right.lon)
+
+        fd, index_path = tempfile.mkstemp(suffix='.idx', prefix='osm_locations_')
+        os.close(fd)
+        try:
+            # File-backed location index keeps memory constant on large extracts
+            Handler().apply_file(self.path, locations=True, idx=f'sparse_file_array,{index_path}')
+        finally:
+            os.remove(index_path)
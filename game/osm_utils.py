@@ -1,12 +1,46 @@
 """
 Utilities for fetching OpenStreetMap data and mapping to game materials
 """
+import logging
+import math
 import requests
+import threading
 import time
+from datetime import timedelta
 
-# Simple in-memory cache for OSM results
-_OSM_CACHE = {}
-_OSM_CACHE_TTL_SECONDS = 6 * 3600  # 6 hours TTL
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+from .models import OSMTile, OSMFeature, OSMImport
+
+logger = logging.getLogger(__name__)
+
+# Defaults for the persistent tile cache, overridable via settings.OSM_TILE_CACHE
+_OSM_TILE_DEFAULTS = {
+    'fresh_ttl': 6 * 3600,
+    'stale_ttl': 7 * 24 * 3600,
+    'max_tiles': 50000,
+    'touch_interval': 3600,
+    'revalidate_in_background': True,
+}
+
+# OSM keys queried per element type (same as the Overpass queries), used by offline imports
+OSM_NODE_KEYS = ('shop', 'amenity', 'natural', 'building')
+OSM_WAY_KEYS = ('shop', 'amenity', 'natural', 'landuse', 'building', 'waterway', 'leisure')
+
+# Local index buckets per degree (~111 m of latitude per bucket)
+LOCAL_INDEX_BUCKETS_PER_DEGREE = 1000
+
+# Imported extract bounds, reloaded periodically so new imports reach every worker
+_LOCAL_COVERAGE = {
+    'loaded_at': 0,
+    'bounds': [],
+}
+
+# Tile keys currently being refreshed by a background thread (process-level)
+_REVALIDATING = set()
+_REVALIDATING_LOCK = threading.Lock()
 
 # Circuit breaker state (process-level)
 _OSM_CB = {
@@ -14,32 +48,252 @@ _OSM_CB = {
     'opened_until': 0,  # epoch seconds when breaker closes again
 }
 
+
+def _local_index_settings():
+    conf = {'enabled': True, 'coverage_refresh': 60}
+    conf.update(getattr(settings, 'OSM_LOCAL_INDEX', {}))
+    return conf
+
+
+def local_index_covers(lat, lon):
+    """True if an imported OSM extract covers this location"""
+    conf = _local_index_settings()
+    if not conf['enabled']:
+        return False
+    now = time.time()
+    if now - _LOCAL_COVERAGE['loaded_at'] > conf['coverage_refresh']:
+        try:
+            _LOCAL_COVERAGE['bounds'] = list(
+                OSMImport.objects.values_list('south', 'west', 'north', 'east')
+            )
+        except DatabaseError:
+            _LOCAL_COVERAGE['bounds'] = []
+        _LOCAL_COVERAGE['loaded_at'] = now
+    return any(
+        south <= lat <= north and west <= lon <= east
+        for south, west, north, east in _LOCAL_COVERAGE['bounds']
+    )
+
+
+def reset_local_coverage():
+    """Force the next lookup to reload imported extract bounds"""
+    _LOCAL_COVERAGE['loaded_at'] = 0
+
+
+def get_local_bucket(value):
+    return math.floor(value * LOCAL_INDEX_BUCKETS_PER_DEGREE)
+
+
+def query_local_index(lat, lon, radius):
+    """
+    Features from the imported OSM index whose bounding box comes within radius meters of a location
+
+    Features no larger than one bucket are found through the bucket index (their
+    center is at most one bucket from any point of their bbox); wider ones, such
+    as rivers and forests, are matched on their bbox directly.
+    """
+    lat_margin = radius / 111320.0
+    lon_margin = radius / (111320.0 * max(0.01, math.cos(math.radians(lat))))
+    bucket_size = 1.0 / LOCAL_INDEX_BUCKETS_PER_DEGREE
+    columns = ('min_lat', 'min_lon', 'max_lat', 'max_lon', 'feature')
+    narrow = OSMFeature.objects.filter(
+        wide=False,
+        lat_bucket__gte=get_local_bucket(lat - lat_margin - bucket_size),
+        lat_bucket__lte=get_local_bucket(lat + lat_margin + bucket_size),
+        lon_bucket__gte=get_local_bucket(lon - lon_margin - bucket_size),
+        lon_bucket__lte=get_local_bucket(lon + lon_margin + bucket_size),
+    ).values_list(*columns)
+    wide = OSMFeature.objects.filter(
+        wide=True,
+        min_lat__lte=lat + lat_margin,
+        max_lat__gte=lat - lat_margin,
+        min_lon__lte=lon + lon_margin,
+        max_lon__gte=lon - lon_margin,
+    ).values_list(*columns)
+    return [
+        feature for rows in (narrow, wide) for min_lat, min_lon, max_lat, max_lon, feature in rows
+        if _bbox_distance_meters(lat, lon, min_lat, min_lon, max_lat, max_lon) <= radius
+    ]
+
+
+def has_osm_data(lat, lon, radius):
+    """True if OSM data for this location is known (local index or stored tile)"""
+    if local_index_covers(lat, lon):
+        return True
+    return get_cached_tile(get_tile_key(lat, lon, radius)) is not None
+
+
+def _tile_settings():
+    conf = dict(_OSM_TILE_DEFAULTS)
+    conf.update(getattr(settings, 'OSM_TILE_CACHE', {}))
+    return conf
+
+
+def get_tile_key(lat, lon, radius):
+    """Quantized tile ID grouping nearby requests in the same cell"""
+    return f"{round(lat, 4):.4f}:{round(lon, 4):.4f}:{int(radius)}"
+
+
+def get_cached_tile(key):
+    """Return the stored OSMTile for a key, or None (also on database errors)"""
+    try:
+        return OSMTile.objects.filter(tile_key=key).first()
+    except DatabaseError as e:
+        logger.warning(f"OSM tile lookup failed for {key}: {str(e)}")
+        return None
+
+
+def store_tile(key, lat, lon, radius, features):
+    """Persist features for a tile and evict old tiles if the store is full"""
+    now = timezone.now()
+    try:
+        _, created = OSMTile.objects.update_or_create(
+            tile_key=key,
+            defaults={
+                'lat': round(lat, 4),
+                'lon': round(lon, 4),
+                'radius': int(radius),
+                'features': features,
+                'fetched_at': now,
+                'last_accessed': now,
+            }
+        )
+        if created:
+            evict_tiles()
+    except DatabaseError as e:
+        logger.warning(f"Failed to store OSM tile {key}: {str(e)}")
+
+
+def store_tiles(entries):
+    """
+    Persist many tiles in one statement.
+    entries: iterable of (key, lat, lon, radius, features)
+    """
+    now = timezone.now()
+    tiles = [
+        OSMTile(
+            tile_key=key,
+            lat=round(lat, 4),
+            lon=round(lon, 4),
+            radius=int(radius),
+            features=features,
+            fetched_at=now,
+            last_accessed=now,
+        )
+        for key, lat, lon, radius, features in entries
+    ]
+    if not tiles:
+        return
+    try:
+        OSMTile.objects.bulk_create(
+            tiles,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['tile_key'],
+            update_fields=['features', 'fetched_at', 'last_accessed'],
+        )
+        evict_tiles()
+    except DatabaseError as e:
+        logger.warning(f"Failed to store {len(tiles)} OSM tiles: {str(e)}")
+
+
+def evict_tiles(max_tiles=None):
+    """Delete least recently accessed tiles beyond max_tiles. Returns deleted count."""
+    if max_tiles is None:
+        max_tiles = _tile_settings()['max_tiles']
+    excess = OSMTile.objects.count() - max_tiles
+    if excess <= 0:
+        return 0
+    stale_ids = list(
+        OSMTile.objects.order_by('last_accessed').values_list('id', flat=True)[:excess]
+    )
+    deleted, _ = OSMTile.objects.filter(id__in=stale_ids).delete()
+    logger.debug(f"Evicted {deleted} OSM tiles (max {max_tiles})")
+    return deleted
+
+
+def _touch_tile(tile, touch_interval):
+    """Refresh last_accessed at most once per touch_interval to keep reads cheap"""
+    now = timezone.now()
+    if now - tile.last_accessed < timedelta(seconds=touch_interval):
+        return
+    try:
+        OSMTile.objects.filter(pk=tile.pk).update(last_accessed=now)
+    except DatabaseError:
+        pass
+
+
+def _revalidate_tile(key, lat, lon, radius):
+    try:
+        features = _query_overpass(lat, lon, radius)
+        if features is not None:
+            store_tile(key, lat, lon, radius, features)
+    finally:
+        with _REVALIDATING_LOCK:
+            _REVALIDATING.discard(key)
+
+
+def _revalidate_tile_async(key, lat, lon, radius):
+    """Refresh a stale tile in a background thread, deduplicated per key"""
+    with _REVALIDATING_LOCK:
+        if key in _REVALIDATING:
+            return
+        _REVALIDATING.add(key)
+
+    def run():
+        try:
+            _revalidate_tile(key, lat, lon, radius)
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, name=f"osm-revalidate-{key}", daemon=True).start()
+
+
 def fetch_osm_features(lat, lon, radius=50):
     """
     Fetch OSM features around a location using Overpass API
     radius: in meters (default 50m for cell size)
-    """
-    # Cache key with rounded coords to group nearby requests in same cell
-    key = (round(lat, 4), round(lon, 4), int(radius))
-    now = time.time()
-    cached = _OSM_CACHE.get(key)
-    if cached and (now - cached['ts'] < _OSM_CACHE_TTL_SECONDS):
-        return cached['features']
 
-    # Circuit breaker: if opened, serve stale cache (if any) or empty
-    if now < _OSM_CB.get('opened_until', 0):
-        if cached:
-            return cached['features']
+    Locations covered by an imported extract are served from the local index.
+    Otherwise results are kept in the persistent OSMTile store: fresh tiles are
+    served directly, stale tiles are served while a background refresh runs, and
+    Overpass is only queried synchronously for tiles we have never fetched.
+    """
+    if local_index_covers(lat, lon):
+        return query_local_index(lat, lon, radius)
+
+    conf = _tile_settings()
+    key = get_tile_key(lat, lon, radius)
+    tile = get_cached_tile(key)
+
+    if tile:
+        age = (timezone.now() - tile.fetched_at).total_seconds()
+        if age < conf['fresh_ttl']:
+            _touch_tile(tile, conf['touch_interval'])
+            return tile.features
+        if age < conf['stale_ttl'] and conf['revalidate_in_background']:
+            _touch_tile(tile, conf['touch_interval'])
+            _revalidate_tile_async(key, lat, lon, radius)
+            return tile.features
+
+    features = _query_overpass(lat, lon, radius)
+    if features is None:
+        # Serve stale if available
+        if tile:
+            print(f"DEBUG: Serving stale OSM tile with {len(tile.features)} features")
+            return tile.features
+        print(f"DEBUG: No cache available, returning empty list")
         return []
-    # Try multiple Overpass API servers for better reliability
-    overpass_urls = [
-        "https://overpass-api.de/api/interpreter",
-        "https://lz4.overpass-api.de/api/interpreter",
-        "https://overpass.kumi.systems/api/interpreter",
-        "https://overpass.openstreetmap.ru/api/interpreter",
-        "https://overpass.osm.ch/api/interpreter"
-    ]
 
+    store_tile(key, lat, lon, radius, features)
+    return features
+
+
+def _query_overpass(lat, lon, radius):
+    """
+    Query the Overpass mirrors for features around a location.
+    Returns the parsed features, or None if the circuit breaker is open or all mirrors failed.
+    """
     # Query for shops, amenities, natural features, landuse, waterways, and leisure
     overpass_query = f"""
     [out:json][timeout:5];
@@ -59,30 +313,53 @@ def fetch_osm_features(lat, lon, radius=50):
     out body;
     """
 
+    data = _run_overpass_query(overpass_query, f"coords ({lat}, {lon})", timeout=8)
+    if data is None:
+        return None
+    features = parse_osm_features(data)
+    print(f"DEBUG: OSM Success! Found {len(features)} features at ({lat}, {lon})")
+    if len(features) > 0:
+        print(f"DEBUG: Feature types: {[f.get('category') + ':' + f.get('subcategory', 'unknown') for f in features[:5]]}")
+    return features
+
+
+def _run_overpass_query(overpass_query, label, timeout=8):
+    """
+    Send a query to the Overpass mirrors in turn, maintaining the circuit breaker.
+    Returns the decoded JSON response, or None if the breaker is open or all mirrors failed.
+    """
+    now = time.time()
+    # Circuit breaker: if opened, do not hit the network
+    if now < _OSM_CB.get('opened_until', 0):
+        return None
+
+    # Try multiple Overpass API servers for better reliability
+    overpass_urls = [
+        "https://overpass-api.de/api/interpreter",
+        "https://lz4.overpass-api.de/api/interpreter",
+        "https://overpass.kumi.systems/api/interpreter",
+        "https://overpass.openstreetmap.ru/api/interpreter",
+        "https://overpass.osm.ch/api/interpreter"
+    ]
+
     for overpass_url in overpass_urls:
         try:
-            print(f"DEBUG: Trying OSM API: {overpass_url} for coords ({lat}, {lon})")
-            print(f"DEBUG: Query timeout: 8s, Overpass timeout: 5s")
+            print(f"DEBUG: Trying OSM API: {overpass_url} for {label}")
+            print(f"DEBUG: Query timeout: {timeout}s")
             start_time = time.time()
             # Add headers to avoid some SSL issues
             headers = {'User-Agent': 'CraftingGame/1.0 (crafting-game@example.com)'}
-            response = requests.get(overpass_url, params={'data': overpass_query}, timeout=8, headers=headers)
+            response = requests.get(overpass_url, params={'data': overpass_query}, timeout=timeout, headers=headers)
             elapsed = time.time() - start_time
             print(f"DEBUG: Request to {overpass_url} took {elapsed:.2f}s")
             if response.status_code == 200:
                 data = response.json()
                 print(f"DEBUG: OSM response elements count: {len(data.get('elements', []))}")
-                features = parse_osm_features(data)
-                print(f"DEBUG: OSM Success! Found {len(features)} features at ({lat}, {lon})")
-                if len(features) > 0:
-                    print(f"DEBUG: Feature types: {[f.get('category') + ':' + f.get('subcategory', 'unknown') for f in features[:5]]}")
-                # Store in cache
-                _OSM_CACHE[key] = {'ts': now, 'features': features}
                 # reset circuit breaker
                 _OSM_CB['fail_count'] = 0
                 _OSM_CB['opened_until'] = 0
                 print(f"DEBUG: Circuit breaker reset")
-                return features
+                return data
             else:
                 print(f"DEBUG: OSM API error {response.status_code} from {overpass_url}")
         except requests.exceptions.SSLError as ssl_e:
@@ -98,70 +375,199 @@ def fetch_osm_features(lat, lon, radius=50):
             print(f"DEBUG: General error fetching from {overpass_url}: {str(e)}")
             continue
 
-    print(f"DEBUG: All OSM APIs failed for ({lat}, {lon})")
+    print(f"DEBUG: All OSM APIs failed for {label}")
     # Increment circuit breaker and backoff (exponential-ish)
     _OSM_CB['fail_count'] = _OSM_CB.get('fail_count', 0) + 1
     backoff = min(3600, 120 * (2 ** min(5, _OSM_CB['fail_count'] - 1)))  # 2m,4m,8m,16m,32m,64m max 60m
     _OSM_CB['opened_until'] = now + backoff
     print(f"DEBUG: Circuit breaker activated - fail_count: {_OSM_CB['fail_count']}, backoff: {backoff}s")
+    return None
 
-    # Serve stale if available
-    if cached:
-        print(f"DEBUG: Serving stale cache with {len(cached['features'])} features")
-        return cached['features']
 
-    print(f"DEBUG: No cache available, returning empty list")
-    # Cache empty result to avoid hammering
-    _OSM_CACHE[key] = {'ts': now, 'features': []}
-    return []
+def get_block_cell_centers(center_lat, center_lon, size, offset):
+    """
+    Centers of an size x size block of grid cells around (center_lat, center_lon),
+    spaced by the movement grid offset (in degrees).
+    """
+    half = size // 2
+    return [
+        (center_lat + dy * offset, center_lon + dx * offset)
+        for dy in range(-half, size - half)
+        for dx in range(-half, size - half)
+    ]
 
 
-def parse_osm_features(osm_data):
-    """Parse OSM JSON response and extract relevant features"""
-    features = []
+def fetch_osm_features_bulk(centers, radius=100, force=False):
+    """
+    Fetch OSM features for many cells with a single Overpass bbox query.
 
-    for element in osm_data.get('elements', []):
-        tags = element.get('tags', {})
+    centers: list of (lat, lon) cell centers, typically from get_block_cell_centers.
+    Elements are bucketed into every cell whose center lies within `radius` meters
+    of the element (ways by their bounding box, so a way crossing a cell is kept
+    even when its center is elsewhere), and all tiles are stored at once.
+    Cells that already have a fresh tile are skipped unless force is True.
 
-        feature = {
-            'type': element.get('type'),
-            'id': element.get('id'),
-            'tags': tags
+    Returns {(lat, lon): features} for the requested centers, or None if Overpass
+    could not be reached.
+    """
+    conf = _tile_settings()
+    keys = {center: get_tile_key(center[0], center[1], radius) for center in centers}
+    results = {}
+
+    if not force:
+        fresh_after = timezone.now() - timedelta(seconds=conf['fresh_ttl'])
+        fresh = {
+            tile.tile_key: tile.features
+            for tile in OSMTile.objects.filter(tile_key__in=keys.values(), fetched_at__gte=fresh_after)
         }
+        for center, key in keys.items():
+            if key in fresh:
+                results[center] = fresh[key]
+
+    for center in centers:
+        if center not in results and local_index_covers(center[0], center[1]):
+            results[center] = query_local_index(center[0], center[1], radius)
+
+    missing = [center for center in centers if center not in results]
+    if not missing:
+        return results
+
+    # Bounding box covering every missing cell plus the search radius
+    lat_margin = radius / 111320.0
+    lon_margin = radius / (111320.0 * max(0.01, math.cos(math.radians(missing[0][0]))))
+    south = min(lat for lat, _ in missing) - lat_margin
+    north = max(lat for lat, _ in missing) + lat_margin
+    west = min(lon for _, lon in missing) - lon_margin
+    east = max(lon for _, lon in missing) + lon_margin
+    bbox = f"{south:.6f},{west:.6f},{north:.6f},{east:.6f}"
 
-        # Extract the main category - priority order matters!
-        if 'shop' in tags:
-            feature['category'] = 'shop'
-            feature['subcategory'] = tags['shop']
-        elif 'amenity' in tags:
-            feature['category'] = 'amenity'
-            feature['subcategory'] = tags['amenity']
-        elif 'natural' in tags:
-            feature['category'] = 'natural'
-            feature['subcategory'] = tags['natural']
-        elif 'waterway' in tags:
-            feature['category'] = 'waterway'
-            feature['subcategory'] = tags['waterway']
-        elif 'leisure' in tags:
-            feature['category'] = 'leisure'
-            feature['subcategory'] = tags['leisure']
-        elif 'landuse' in tags:
-            feature['category'] = 'landuse'
-            feature['subcategory'] = tags['landuse']
-        elif 'building' in tags:
-            feature['category'] = 'building'
-            feature['subcategory'] = tags['building']
+    overpass_query = f"""
+    [out:json][timeout:25][bbox:{bbox}];
+    (
+      node["shop"];
+      node["amenity"];
+      node["natural"];
+      node["building"];
+      way["shop"];
+      way["amenity"];
+      way["natural"];
+      way["landuse"];
+      way["building"];
+      way["waterway"];
+      way["leisure"];
+    );
+    out bb;
+    """
+
+    data = _run_overpass_query(overpass_query, f"bbox ({bbox}) covering {len(missing)} cells", timeout=30)
+    if data is None:
+        return None
+
+    buckets = bucket_osm_elements(data.get('elements', []), missing, radius)
+    store_tiles([(keys[center], center[0], center[1], radius, buckets[center]) for center in missing])
+    results.update(buckets)
+    logger.debug(f"Bulk OSM fetch stored {len(missing)} tiles from {len(data.get('elements', []))} elements")
+    return results
+
+
+def bucket_osm_elements(elements, centers, radius):
+    """
+    Assign parsed OSM elements to every cell center within radius meters
+
+    Ways are measured to their bounding box ('bounds', from `out bb`), so they
+    land in every cell they may cross; elements with only a 'center' fall back
+    to that point.
+    """
+    buckets = {center: [] for center in centers}
+    for element in elements:
+        feature = _parse_osm_element(element)
+        if feature is None:
+            continue
+        if 'lat' in element:
+            bbox = (element['lat'], element['lon'], element['lat'], element['lon'])
+        elif 'bounds' in element:
+            bounds = element['bounds']
+            bbox = (bounds['minlat'], bounds['minlon'], bounds['maxlat'], bounds['maxlon'])
+        elif 'center' in element:
+            bbox = (element['center']['lat'], element['center']['lon'],
+                    element['center']['lat'], element['center']['lon'])
         else:
             continue
+        for center in centers:
+            if _bbox_distance_meters(center[0], center[1], *bbox) <= radius:
+                buckets[center].append(feature)
+    return buckets
+
+
+def _bbox_distance_meters(lat, lon, min_lat, min_lon, max_lat, max_lon):
+    """Distance from a point to the nearest point of a bounding box (0 inside it)"""
+    return _distance_meters(
+        lat, lon,
+        min(max(lat, min_lat), max_lat),
+        min(max(lon, min_lon), max_lon),
+    )
+
 
-        if 'name' in tags:
-            feature['name'] = tags['name']
+def _distance_meters(lat1, lon1, lat2, lon2):
+    """Equirectangular approximation, accurate enough at cell scale"""
+    x = math.radians(lon2 - lon1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    return 6371000 * math.sqrt(x * x + y * y)
 
-        features.append(feature)
+
+def parse_osm_features(osm_data):
+    """Parse OSM JSON response and extract relevant features"""
+    features = []
+
+    for element in osm_data.get('elements', []):
+        feature = _parse_osm_element(element)
+        if feature is not None:
+            features.append(feature)
 
     return features
 
 
+def _parse_osm_element(element):
+    """Build a feature dict from one OSM element, or None if it has no relevant tag"""
+    tags = element.get('tags', {})
+
+    feature = {
+        'type': element.get('type'),
+        'id': element.get('id'),
+        'tags': tags
+    }
+
+    # Extract the main category - priority order matters!
+    if 'shop' in tags:
+        feature['category'] = 'shop'
+        feature['subcategory'] = tags['shop']
+    elif 'amenity' in tags:
+        feature['category'] = 'amenity'
+        feature['subcategory'] = tags['amenity']
+    elif 'natural' in tags:
+        feature['category'] = 'natural'
+        feature['subcategory'] = tags['natural']
+    elif 'waterway' in tags:
+        feature['category'] = 'waterway'
+        feature['subcategory'] = tags['waterway']
+    elif 'leisure' in tags:
+        feature['category'] = 'leisure'
+        feature['subcategory'] = tags['leisure']
+    elif 'landuse' in tags:
+        feature['category'] = 'landuse'
+        feature['subcategory'] = tags['landuse']
+    elif 'building' in tags:
+        feature['category'] = 'building'
+        feature['subcategory'] = tags['building']
+    else:
+        return None
+
+    if 'name' in tags:
+        feature['name'] = tags['name']
+
+    return feature
+
+
 def get_materials_from_osm_features(features):
     """
     Map OSM features to game materials (only raw materials, no crafted items)
@@ -0,0 +1,265 @@
+"""
+Server push of player and world state (Server-Sent Events)
+
+Instead of polling the health, world and time endpoints, the client keeps one
+EventSource open on /api/stream/. Writers mark a topic dirty with touch()
+(touch_world() for every player) once their transaction commits, which only
+bumps a revision counter in the GAME_PUSH['cache'] cache. Writers and streams
+run in different processes, so that cache must be shared (Redis or database):
+a system check refuses per-process backends. Each open stream compares the
+revisions every poll_interval seconds; when one moved it rebuilds that topic
+and sends a JSON merge patch (RFC 7386) against the last payload it sent, or
+nothing if the payload came out the same.
+
+'player', 'health' and 'time' also drift without any write (lazily caught up
+vitals, the game clock), so streams rebuild them on the slower GAME_PUSH['refresh']
+cadence as well.
+
+Under ASGI (uvicorn, as in start_game.sh) the stream is an async iterator and
+costs no worker thread while idle; under WSGI (runserver) it falls back to a
+blocking iterator that holds one server thread per open stream.
+
+A Player save only touches the topics whose columns it wrote
+(PUSHED_PLAYER_FIELDS).
+"""
+import asyncio
+import json
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from .models import Player
+from .services import map_service
+from .services.energy_service import catch_up_energy
+from .services.health_display_service import get_complete_health_display
+from .services.survival_service import SurvivalService
+from .services.time_service import TimeService
+
+logger = logging.getLogger(__name__)
+
+_GAME_PUSH_DEFAULTS = {
+    'poll_interval': 1.0,  # seconds between revision checks of an open stream
+    'heartbeat': 15,  # seconds of silence before a keepalive comment
+    'max_duration': 300,  # seconds before the server closes a stream (the client reconnects)
+    'retry': 3,  # seconds the client waits before reconnecting
+    'refresh': {'player': 60, 'health': 60, 'time': 60, 'world': 600},  # rebuild even without a write
+    'cache': 'game_push',  # CACHES alias of the revision counters, shared by every process
+    'revision_ttl': 86400,  # seconds a revision counter is kept after its last bump
+}
+
+# Cache backends that are private to one process: writers would never reach the streams
+PER_PROCESS_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+REVISION_CACHE_KEY = 'game_push:rev:{}:{}'
+WORLD = 'world'
+
+
+def _push_settings():
+    conf = dict(_GAME_PUSH_DEFAULTS)
+    conf.update(getattr(settings, 'GAME_PUSH', {}))
+    return conf
+
+
+def revision_cache():
+    return caches[_push_settings()['cache']]
+
+
+def player_vitals(player):
+    """Vitals caught up to now in memory, as on /players/me/ (no writes)"""
+    catch_up_energy(player)
+    SurvivalService.catch_up(player)
+    return {
+        'health': player.health,
+        'max_health': player.max_health,
+        'energy': player.energy,
+        'max_energy': player.max_energy,
+        'hunger': round(player.hunger, 1),
+        'thirst': round(player.thirst, 1),
+        'satiety': round(player.satiety, 1),
+        'hydration': round(player.hydration, 1),
+        'radiation': player.radiation,
+        'level': player.level,
+        'experience': player.experience,
+        'money': player.money,
+        'current_carry_weight': player.current_carry_weight,
+        'effective_carry_capacity': player.effective_carry_capacity,
+        'survival_warnings': SurvivalService.get_survival_warnings(player),
+    }
+
+
+# Player columns each per-player topic shows; a save limited to other columns pushes nothing
+PUSHED_PLAYER_FIELDS = {
+    'player': frozenset({
+        'health', 'max_health', 'energy', 'max_energy', 'hunger', 'thirst', 'satiety', 'hydration', 'radiation',
+        'last_energy_update', 'last_hunger_update', 'last_thirst_update', 'last_radiation_update',
+        'level', 'experience', 'money', 'carry_weight', 'max_carry_weight', 'strength', 'equipment_carry_bonus',
+        'current_vehicle',
+    }),
+    'health': frozenset({
+        'health', 'energy_regen_modifier', 'stamina_modifier', 'strength_modifier',
+        'last_meal_time', 'last_drink_time', 'calories_stored', 'max_calories', 'protein_stored', 'carbs_stored',
+        'fat_stored', 'water_volume', 'max_water_volume', 'body_weight', 'body_fat', 'muscle_mass',
+        'stomach_fullness', 'intestine_contents', 'bladder_fullness', 'bowel_fullness',
+        'needs_bathroom', 'is_hungry', 'is_starving', 'is_overfed', 'is_thirsty', 'is_dehydrated',
+    }),
+}
+
+
+def player_topics(update_fields=None):
+    """Per-player topics a Player save changes (all of them for a save of every column)"""
+    if update_fields is None:
+        return list(PUSHED_PLAYER_FIELDS)
+    return [topic for topic, fields in PUSHED_PLAYER_FIELDS.items() if not fields.isdisjoint(update_fields)]
+
+
+# Topic -> payload builder, same data as the endpoint the client used to poll
+TOPICS = {
+    'player': player_vitals,
+    'health': get_complete_health_display,  # /character/health-display/
+    'world': map_service.get_world_state,  # /map/world_state/
+    'time': TimeService.get_time_info,  # /time/
+}
+
+
+def touch(player_id, *topics):
+    """Mark topics of one player as changed once the current transaction commits"""
+    keys = [REVISION_CACHE_KEY.format(player_id, topic) for topic in topics]
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def touch_world(*topics):
+    """Mark topics as changed for every player (world tick, world events)"""
+    touch(WORLD, *topics)
+
+
+def _bump(keys):
+    cache = revision_cache()
+    ttl = _push_settings()['revision_ttl']
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, 1, ttl):
+                cache.incr(key)
+        # Counters only have to outlive the streams comparing them; an expired
+        # one reads as None, which streams take as a change and rebuild
+        cache.touch(key, ttl)
+
+
+def revisions(player_id, topics):
+    """Current (player, world) revision pair of each topic"""
+    keys = {
+        topic: (REVISION_CACHE_KEY.format(player_id, topic), REVISION_CACHE_KEY.format(WORLD, topic))
+        for topic in topics
+    }
+    found = revision_cache().get_many([key for pair in keys.values() for key in pair])
+    return {topic: (found.get(own), found.get(world)) for topic, (own, world) in keys.items()}
+
+
+def merge_patch(old, new):
+    """JSON merge patch turning `old` into `new` (removed keys map to None)"""
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return new
+    patch = {key: None for key in old.keys() - new.keys()}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+        elif old[key] != value:
+            patch[key] = merge_patch(old[key], value)
+    return patch
+
+
+class StateStream:
+    """One client's stream: remembers what was sent and emits only the changes"""
+
+    def __init__(self, player_id, topics=None):
+        self.player_id = player_id
+        self.topics = [topic for topic in TOPICS if topics is None or topic in topics]
+        self.sent = {}
+        self.seen_revisions = {}
+        self.built_at = {}
+        self.event_id = 0
+        self.started = self.last_output = time.monotonic()
+
+    def poll(self, now=None):
+        """SSE frames due now; only topics whose revision moved (or are due a refresh) are rebuilt"""
+        now = time.monotonic() if now is None else now
+        refresh = _push_settings()['refresh']
+        current = revisions(self.player_id, self.topics)
+        due = [
+            topic for topic in self.topics
+            if topic not in self.built_at
+            or current[topic] != self.seen_revisions.get(topic)
+            or (topic in refresh and now - self.built_at[topic] >= refresh[topic])
+        ]
+        if not due:
+            return []
+
+        player = Player.objects.select_related('user').filter(id=self.player_id).first()
+        if player is None:
+            return []
+
+        frames = []
+        for topic in due:
+            self.seen_revisions[topic] = current[topic]
+            self.built_at[topic] = now
+            try:
+                # Round-trip through JSON so payloads compare the way the client sees them
+                payload = json.loads(json.dumps(TOPICS[topic](player), cls=DjangoJSONEncoder))
+            except Exception:
+                logger.exception(f"Building push topic {topic} failed for player {self.player_id}")
+                continue
+            if topic in self.sent:
+                patch = merge_patch(self.sent[topic], payload)
+                if patch:
+                    frames.append(self._frame(topic, {'patch': patch}))
+            else:
+                frames.append(self._frame(topic, {'full': payload}))
+            self.sent[topic] = payload
+        return frames
+
+    def _frame(self, topic, data):
+        self.event_id += 1
+        return f'id: {self.event_id}\nevent: {topic}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
+
+    def step(self):
+        """Text to send after one poll: frames, a keepalive comment, or '' """
+        now = time.monotonic()
+        chunk = ''.join(self.poll(now))
+        if not chunk and now - self.last_output >= _push_settings()['heartbeat']:
+            chunk = ': keepalive\n\n'
+        if chunk:
+            self.last_output = now
+        return chunk
+
+    def expired(self):
+        return time.monotonic() - self.started >= _push_settings()['max_duration']
+
+    def preamble(self):
+        return f"retry: {int(_push_settings()['retry'] * 1000)}\n\n"
+
+    def iter_frames(self):
+        """Blocking iterator, for WSGI servers"""
+        yield self.preamble()
+        while not self.expired():
+            chunk = self.step()
+            if chunk:
+                yield chunk
+            time.sleep(_push_settings()['poll_interval'])
+
+    async def aiter_frames(self):
+        """Async iterator, for ASGI servers"""
+        yield self.preamble()
+        while not self.expired():
+            chunk = await sync_to_async(self.step)()
+            if chunk:
+                yield chunk
+            await asyncio.sleep(_push_settings()['poll_interval'])
@@ -0,0 +1,114 @@
+"""
+Live leaderboard ranking index
+
+Scores of the event-fed categories are persisted as they happen with F()
+increments on their Leaderboard rows (LeaderboardService.record_event), so the
+table is always current and shared by every worker. When
+LEADERBOARD_INDEX['redis_url'] is set and redis-py is installed, one Redis
+sorted set per category mirrors those scores so ranks and top-N lists are
+served without SQL; otherwise they are counted from the table.
+
+The Redis index is seeded lazily from the Leaderboard table and re-seeded from
+it by LeaderboardService.snapshot_index().
+"""
+import threading
+
+from django.conf import settings
+
+# Categories fed by game events (gather/craft/combat/quest)
+INDEXED_CATEGORIES = ('gatherer', 'crafter', 'combatant', 'quests')
+
+
+class RedisRankingBackend:
+    """Sorted sets shared by all worker processes through Redis"""
+
+    def __init__(self, url, prefix):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, category):
+        return f'{self.prefix}:{category}'
+
+    def is_loaded(self, category):
+        return bool(self.client.exists(self._key(category) + ':loaded'))
+
+    def load(self, category, scores):
+        key = self._key(category)
+        pipe = self.client.pipeline()
+        pipe.delete(key)
+        mapping = {str(member): score for member, score in scores}
+        if mapping:
+            pipe.zadd(key, mapping)
+        pipe.set(key + ':loaded', 1)
+        pipe.execute()
+
+    def increment(self, category, member, delta):
+        return int(self.client.zincrby(self._key(category), delta, str(member)))
+
+    def set_score(self, category, member, score):
+        self.client.zadd(self._key(category), {str(member): score})
+
+    def score(self, category, member):
+        score = self.client.zscore(self._key(category), str(member))
+        return None if score is None else int(score)
+
+    def rank(self, category, member):
+        """1-based rank with ties sharing a rank, like RANK() in recompute_ranks; None if not indexed"""
+        key = self._key(category)
+        score = self.client.zscore(key, str(member))
+        if score is None:
+            return None
+        return self.client.zcount(key, f'({score}', '+inf') + 1
+
+    def range(self, category, start, stop):
+        if stop <= start:
+            return []
+        rows = self.client.zrevrange(self._key(category), start, stop - 1, withscores=True)
+        return [(int(member), int(score)) for member, score in rows]
+
+    def count(self, category):
+        return self.client.zcard(self._key(category))
+
+    def all_scores(self, category):
+        rows = self.client.zrange(self._key(category), 0, -1, withscores=True)
+        return {int(member): int(score) for member, score in rows}
+
+    def clear(self):
+        for category in INDEXED_CATEGORIES:
+            self.client.delete(self._key(category), self._key(category) + ':loaded')
+
+
+_BACKEND = None
+_BACKEND_LOCK = threading.Lock()
+
+
+def _index_settings():
+    conf = {'enabled': True, 'redis_url': None, 'key_prefix': 'leaderboard'}
+    conf.update(getattr(settings, 'LEADERBOARD_INDEX', {}))
+    return conf
+
+
+def index_enabled():
+    return _index_settings()['enabled']
+
+
+def get_backend():
+    """Shared Redis ranking index, or None when it is not configured"""
+    global _BACKEND
+    with _BACKEND_LOCK:
+        if _BACKEND is None:
+            conf = _index_settings()
+            if conf['enabled'] and conf['redis_url']:
+                try:
+                    _BACKEND = RedisRankingBackend(conf['redis_url'], conf['key_prefix'])
+                except ImportError:
+                    print("[WARNING] redis is not installed, leaderboard ranks are read from the table")
+        return _BACKEND
+
+
+def reset_index():
+    """Forget all indexed scores; categories are reloaded from the table on next use"""
+    backend = get_backend()
+    if backend is not None:
+        backend.clear()
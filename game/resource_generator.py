@@ -3,6 +3,19 @@ Smart resource generation system based on coordinates and biome
 """
 import random
 import math
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional: batched biome fields fall back to the scalar path
+    np = None
+
+
+# Bounds of the per-process memo caches around the deterministic generators
+BIOME_CACHE_SIZE = 65536
+RESOURCE_CACHE_SIZE = 16384
+# Decimal places kept from lat/lon before they key the resource memo (~0.1 m)
+RESOURCE_COORD_DECIMALS = 6
 
 
 # Comprehensive biome metadata
@@ -414,10 +427,11 @@ def _fbm_noise(x, y, salt=0, octaves=4, lacunarity=2.0, gain=0.5):
         freq *= lacunarity
     return total / max(1e-9, norm)
 
+@lru_cache(maxsize=BIOME_CACHE_SIZE)
 def get_biome_from_coordinates(lat, lon, grid_x, grid_y):
     """
     Determine biome using a simple temperature/moisture model + patterns.
-    Deterministic per (lat,lon,grid_x,grid_y).
+    Deterministic per (lat,lon,grid_x,grid_y), so results are memoized (LRU).
     """
     try:
         # Normalize coordinates for noise (float domain)
@@ -534,14 +548,186 @@ def get_biome_from_coordinates(lat, lon, grid_x, grid_y):
         return 'plains'
 
 
+def _hash_noise_array(x, y, salt=0):
+    """Vectorized _hash_noise over int64 arrays (bit-identical)"""
+    n = ((x * 73856093) ^ (y * 19349663) ^ (salt * 83492791)) & 0xFFFFFFFF
+    n = ((n ^ (n >> 13)) * 1274126177) & 0xFFFFFFFF
+    return ((n ^ (n >> 16)) & 0xFFFFFFFF) / 0xFFFFFFFF
+
+
+def _fbm_noise_array(x, y, salt=0, octaves=4, lacunarity=2.0, gain=0.5):
+    """Vectorized _fbm_noise over float arrays (bit-identical)"""
+    amp = 1.0
+    freq = 1.0
+    total = np.zeros(np.shape(x))
+    norm = 0.0
+    for i in range(octaves):
+        nx = np.trunc(x * freq).astype(np.int64)
+        ny = np.trunc(y * freq).astype(np.int64)
+        total += amp * _hash_noise_array(nx, ny, salt + i)
+        norm += amp
+        amp *= gain
+        freq *= lacunarity
+    return total / max(1e-9, norm)
+
+
+def _map_unique(func, values):
+    """Apply a scalar math function once per distinct value (keeps libm rounding)"""
+    uniq, inverse = np.unique(values, return_inverse=True)
+    mapped = np.array([func(v) for v in uniq.tolist()], dtype=np.float64)
+    return mapped[inverse].reshape(np.shape(values))
+
+
+def get_biome_field(lats, lons, grid_xs, grid_ys):
+    """
+    Batched get_biome_from_coordinates over arrays of cells (any matching shape).
+
+    Returns a dict of numpy arrays: 'temperature', 'moisture', 'elevation' and
+    'biome' (object array of biome codes), bit-identical to the scalar function.
+    """
+    if np is None:
+        raise ImportError("get_biome_field requires numpy")
+
+    lat = np.asarray(lats, dtype=np.float64)
+    lon = np.asarray(lons, dtype=np.float64)
+    gx = np.asarray(grid_xs, dtype=np.int64)
+    gy = np.asarray(grid_ys, dtype=np.int64)
+
+    fx = gx / 8.0 + lat * 0.5
+    fy = gy / 8.0 + lon * 0.5
+
+    lat_factor = np.clip(0.5 - (lat - 45.0) / 60.0, 0.0, 1.0)
+    temp = 0.55 * lat_factor + 0.45 * _fbm_noise_array(fx * 1.7, fy * 1.7, salt=11, octaves=5)
+
+    # Trigonometric bands only depend on one grid axis: evaluate with math.* per distinct value
+    band_y = _map_unique(lambda v: 0.5 * (1.0 + math.sin(v / 6.0)), gy)
+    band_x = _map_unique(lambda v: 0.5 * (1.0 + math.cos(v / 9.0)), gx)
+    coast_river = np.where((band_y > 0.95) | (band_x > 0.96), 1.0, 0.0)
+    moist = 0.75 * _fbm_noise_array(fx * 1.3, fy * 1.3, salt=22, octaves=5) + 0.25 * coast_river
+    moist = np.clip(moist, 0.0, 1.0)
+
+    dist = np.sqrt((gx ** 2 + gy ** 2).astype(np.float64))
+    ridge = _map_unique(lambda v: 0.5 * (1.0 + math.sin(v / 8.0)), gx + gy)
+    elev_noise = _fbm_noise_array(fx * 0.9, fy * 0.9, salt=33, octaves=4)
+    elev = 0.3 * (dist / 25.0) + 0.4 * ridge + 0.3 * elev_noise
+    elev = np.clip(elev, 0.0, 1.0)
+
+    def _neighbor_avg(base_val, salt):
+        acc = base_val
+        for dx in (-0.5, 0.0, 0.5):
+            for dy in (-0.5, 0.0, 0.5):
+                if dx == 0.0 and dy == 0.0:
+                    continue
+                acc = acc + _fbm_noise_array((fx + dx) * 1.2, (fy + dy) * 1.2, salt=salt, octaves=3)
+        return acc / 9.0
+    temp = 0.7 * temp + 0.3 * _neighbor_avg(temp, salt=14)
+    moist = 0.7 * moist + 0.3 * _neighbor_avg(moist, salt=25)
+
+    # Base biome grid from temp/moist, then overrides in the scalar function's order
+    cold = temp < 0.25
+    mild = ~cold & (temp < 0.6)
+    hot = ~cold & ~mild
+    biome = np.full(temp.shape, 'plains', dtype=object)
+    biome[cold & (moist < 0.35)] = 'tundra'
+    biome[cold & (moist >= 0.35) & (moist < 0.7)] = 'taiga'
+    biome[cold & (moist >= 0.7)] = 'bog'
+    biome[mild & (moist < 0.25)] = 'steppe'
+    biome[mild & (moist >= 0.7)] = 'forest'
+    biome[hot & (moist < 0.25)] = 'desert'
+    biome[hot & (moist >= 0.25) & (moist < 0.6)] = 'savanna'
+    biome[hot & (moist >= 0.6)] = 'rainforest'
+
+    biome[elev > 0.78] = 'mountain'
+    biome[(elev > 0.88) & (temp > 0.7)] = 'volcano'
+    biome[(elev > 0.85) & (temp < 0.2)] = 'glacier'
+    biome[band_y > 0.96] = 'coast'
+    biome[((band_x > 0.94) | (band_y > 0.9)) & (moist > 0.6) & (temp < 0.7)] = 'wetland'
+    biome[(band_y > 0.97) & (temp > 0.65) & (_fbm_noise_array(fx * 3.1, fy * 3.1, salt=88) > 0.6)] = 'coral_reef'
+    biome[(temp > 0.75) & (moist < 0.2) & (elev > 0.4) & (elev < 0.7)
+          & (_fbm_noise_array(fx * 2.7, fy * 2.7, salt=66) > 0.7)] = 'canyon'
+    biome[(temp > 0.8) & (moist > 0.85)] = 'jungle'
+    biome[(temp > 0.4) & (temp < 0.65) & (moist > 0.75)
+          & (_fbm_noise_array(fx * 2.5, fy * 2.5, salt=55) > 0.75)] = 'mushroom_forest'
+    biome[(_fbm_noise_array(fx * 2.3, fy * 2.3, salt=77) > 0.8) & (dist < 12)] = 'urban'
+
+    # Spawn bias: around origin, favor plains/forest
+    spawn = dist < 3
+    bias = _hash_noise_array(gx + 5, gy + 7, salt=99)
+    biome[spawn & (bias < 0.6)] = 'plains'
+    biome[spawn & (bias >= 0.6) & (bias < 0.9)] = 'forest'
+
+    return {
+        'temperature': temp,
+        'moisture': moist,
+        'elevation': elev,
+        'biome': biome,
+    }
+
+
+def get_biome_region(origin_lat, origin_lon, origin_x, origin_y, radius, offset):
+    """
+    Biomes for the square of cells within `radius` grid steps of (origin_x, origin_y).
+
+    Cell coordinates follow movement: one grid step = `offset` degrees.
+    Returns {(grid_x, grid_y): biome}. Uses get_biome_field when numpy is
+    installed and the scalar generator otherwise.
+    """
+    cells = [
+        (origin_x + dx, origin_y + dy, origin_lat + dy * offset, origin_lon + dx * offset)
+        for dy in range(-radius, radius + 1)
+        for dx in range(-radius, radius + 1)
+    ]
+    if np is None:
+        return {
+            (gx, gy): get_biome_from_coordinates(lat, lon, gx, gy)
+            for gx, gy, lat, lon in cells
+        }
+
+    gxs, gys, lats, lons = zip(*cells)
+    biomes = get_biome_field(lats, lons, gxs, gys)['biome']
+    return {(gx, gy): biome for gx, gy, biome in zip(gxs, gys, biomes.tolist())}
+
+
 def get_smart_resources(lat, lon, grid_x, grid_y, biome, osm_context=None):
     """
     Generate smart resource list based on biome and coordinates
     Returns a dict with material names and their quantities
+
+    Results are memoized (LRU) on the inputs, with lat/lon rounded to
+    RESOURCE_COORD_DECIMALS so float noise in cell centers shares one entry;
+    callers get a fresh dict they are free to modify.
     """
-    # Use coordinates as seed for deterministic randomness
+    context_key = tuple(sorted((osm_context or {}).items()))
+    lat = round(lat, RESOURCE_COORD_DECIMALS)
+    lon = round(lon, RESOURCE_COORD_DECIMALS)
+    return dict(_get_smart_resources_cached(lat, lon, grid_x, grid_y, biome, context_key))
+
+
+@lru_cache(maxsize=RESOURCE_CACHE_SIZE)
+def _get_smart_resources_cached(lat, lon, grid_x, grid_y, biome, context_key):
+    materials = _generate_smart_resources(lat, lon, grid_x, grid_y, biome, dict(context_key))
+    return tuple(materials.items())
+
+
+def get_generator_cache_stats():
+    """Hit/miss counters and sizes of the generator memo caches"""
+    return {
+        'biome': get_biome_from_coordinates.cache_info()._asdict(),
+        'resources': _get_smart_resources_cached.cache_info()._asdict(),
+    }
+
+
+def clear_generator_caches():
+    """Drop memoized generator results (e.g. after changing generation rules)"""
+    get_biome_from_coordinates.cache_clear()
+    _get_smart_resources_cached.cache_clear()
+
+
+def _generate_smart_resources(lat, lon, grid_x, grid_y, biome, osm_context=None):
+    # Use coordinates as seed for deterministic randomness; a local generator
+    # keeps the global one untouched for the other generation threads
     seed = int((lat * 1000 + lon * 1000 + grid_x * 41 + grid_y * 83) * 100)
-    random.seed(seed)
+    rng = random.Random(seed)
 
     # Base materials by biome with expanded variety from actual materials
     biome_resources = {
@@ -656,106 +842,105 @@ def get_smart_resources(lat, lon, grid_x, grid_y, biome, osm_context=None):
     materials = {}
 
     # Always add 2-3 common resources
-    num_common = random.randint(2, 3)
+    num_common = rng.randint(2, 3)
     for _ in range(num_common):
-        material = random.choice(resources['common'])
+        material = rng.choice(resources['common'])
         if material not in materials:
-            materials[material] = random.randint(20, 50)
+            materials[material] = rng.randint(20, 50)
         else:
-            materials[material] += random.randint(10, 20)
+            materials[material] += rng.randint(10, 20)
 
     # Add basic gathering resources (branches, leaves) to all biomes - always available
-    materials['Branches'] = materials.get('Branches', random.randint(15, 40))
-    materials['Feuilles'] = materials.get('Feuilles', random.randint(10, 30))
+    materials['Branches'] = materials.get('Branches', rng.randint(15, 40))
+    materials['Feuilles'] = materials.get('Feuilles', rng.randint(10, 30))
 
     # Add primitive tools scattered around (always present in some cells)
     primitive_tools = ['Bâton', 'Silex', 'Pierre taillée']
-    if random.random() < 0.4:  # 40% chance per cell for basic tools
-        tool = random.choice(primitive_tools)
+    if rng.random() < 0.4:  # 40% chance per cell for basic tools
+        tool = rng.choice(primitive_tools)
         if tool not in materials:
-            materials[tool] = random.randint(1, 3)
+            materials[tool] = rng.randint(1, 3)
 
     # Add 1-2 uncommon resources (70% chance)
-    if random.random() < 0.7:
-        num_uncommon = random.randint(1, 2)
+    if rng.random() < 0.7:
+        num_uncommon = rng.randint(1, 2)
         for _ in range(num_uncommon):
-            material = random.choice(resources['uncommon'])
+            material = rng.choice(resources['uncommon'])
             if material not in materials:
-                materials[material] = random.randint(10, 30)
+                materials[material] = rng.randint(10, 30)
 
     # Add 0-1 rare resource (30% chance)
-    if random.random() < 0.3:
-        material = random.choice(resources['rare'])
+    if rng.random() < 0.3:
+        material = rng.choice(resources['rare'])
         if material not in materials:
-            materials[material] = random.randint(5, 15)
+            materials[material] = rng.randint(5, 15)
 
     # Special zones based on grid position
     # Diamond zones (very rare, specific coordinates)
     if (grid_x % 7 == 0 and grid_y % 7 == 0) and distance_from_origin(grid_x, grid_y) > 5:
-        materials['Diamant'] = random.randint(1, 5)
+        materials['Diamant'] = rng.randint(1, 5)
 
     # Gold zones (specific pattern)
     if (grid_x + grid_y) % 11 == 0:
-        materials['Minerai d\'Or'] = random.randint(5, 15)
+        materials['Minerai d\'Or'] = rng.randint(5, 15)
 
     # Food zones (specific pattern)
     if abs(grid_x - grid_y) % 4 == 0:
         food_items = ['Baie', 'Pomme', 'Champignon']
-        food = random.choice(food_items)
-        materials[food] = random.randint(15, 35)
+        food = rng.choice(food_items)
+        materials[food] = rng.randint(15, 35)
 
     # Fishing zones (rivers/lakes approximation)
     if (grid_x % 4 == 1 or grid_y % 5 == 2):
-        materials['Poisson'] = materials.get('Poisson', 0) + random.randint(10, 30)
+        materials['Poisson'] = materials.get('Poisson', 0) + rng.randint(10, 30)
 
     # Hunting zones (fauna clusters)
     if (grid_x + 2 * grid_y) % 6 == 0:
-        materials['Viande'] = materials.get('Viande', 0) + random.randint(10, 25)
-        if random.random() < 0.5:
-            materials['Cuir brut'] = materials.get('Cuir brut', 0) + random.randint(5, 15)
+        materials['Viande'] = materials.get('Viande', 0) + rng.randint(10, 25)
+        if rng.random() < 0.5:
+            materials['Cuir brut'] = materials.get('Cuir brut', 0) + rng.randint(5, 15)
 
     # Iron/Coal zones (industrial areas)
     if (grid_x % 3 == 0 or grid_y % 3 == 0) and biome == 'mountain':
-        materials['Minerai de Fer'] = materials.get('Minerai de Fer', 0) + random.randint(5, 20)
-        materials['Charbon'] = materials.get('Charbon', 0) + random.randint(5, 20)
+        materials['Minerai de Fer'] = materials.get('Minerai de Fer', 0) + rng.randint(5, 20)
+        materials['Charbon'] = materials.get('Charbon', 0) + rng.randint(5, 20)
 
     # Bush gathering zones - add extra branches and leaves
     if (grid_x + grid_y) % 8 == 0:
-        materials['Branches'] = materials.get('Branches', 0) + random.randint(20, 50)
-        materials['Feuilles'] = materials.get('Feuilles', 0) + random.randint(15, 40)
+        materials['Branches'] = materials.get('Branches', 0) + rng.randint(20, 50)
+        materials['Feuilles'] = materials.get('Feuilles', 0) + rng.randint(15, 40)
 
     # Primitive tool zones - scattered stone tools
     if (grid_x % 5 == 0 and grid_y % 5 == 0) and distance_from_origin(grid_x, grid_y) > 3:
         primitive_tools = ['Silex', 'Pierre taillée']
         for tool in primitive_tools:
             if tool not in materials:
-                materials[tool] = random.randint(1, 5)
+                materials[tool] = rng.randint(1, 5)
 
     # Spawn-friendly resources near origin to ease testing of tools
     if distance_from_origin(grid_x, grid_y) <= 2:
-        materials['Bois'] = max(materials.get('Bois', 0), random.randint(40, 80))
-        materials['Pierre'] = max(materials.get('Pierre', 0), random.randint(30, 60))
+        materials['Bois'] = max(materials.get('Bois', 0), rng.randint(40, 80))
+        materials['Pierre'] = max(materials.get('Pierre', 0), rng.randint(30, 60))
         # ensure at least some food/hunting and fishing nearby
-        materials['Poisson'] = max(materials.get('Poisson', 0), random.randint(15, 30))
-        materials['Viande'] = max(materials.get('Viande', 0), random.randint(10, 20))
+        materials['Poisson'] = max(materials.get('Poisson', 0), rng.randint(15, 30))
+        materials['Viande'] = max(materials.get('Viande', 0), rng.randint(10, 20))
         # Add basic gathering materials near spawn
-        materials['Branches'] = max(materials.get('Branches', 0), random.randint(25, 50))
-        materials['Feuilles'] = max(materials.get('Feuilles', 0), random.randint(20, 40))
+        materials['Branches'] = max(materials.get('Branches', 0), rng.randint(25, 50))
+        materials['Feuilles'] = max(materials.get('Feuilles', 0), rng.randint(20, 40))
 
     # OSM modifiers (optional): boost certain pools based on local hints
     if osm_context:
         if osm_context.get('has_water'):
-            materials['Poisson'] = materials.get('Poisson', 0) + random.randint(10, 30)
-            materials['Argile'] = max(materials.get('Argile', 0), random.randint(5, 20))
+            materials['Poisson'] = materials.get('Poisson', 0) + rng.randint(10, 30)
+            materials['Argile'] = max(materials.get('Argile', 0), rng.randint(5, 20))
         if osm_context.get('has_forest'):
-            materials['Bois'] = max(materials.get('Bois', 0), random.randint(40, 80))
-            materials['Champignon'] = max(materials.get('Champignon', 0), random.randint(10, 25))
-            materials['Viande'] = max(materials.get('Viande', 0), random.randint(10, 20))
+            materials['Bois'] = max(materials.get('Bois', 0), rng.randint(40, 80))
+            materials['Champignon'] = max(materials.get('Champignon', 0), rng.randint(10, 25))
+            materials['Viande'] = max(materials.get('Viande', 0), rng.randint(10, 20))
         if osm_context.get('urban'):
-            materials['Pierre'] = max(materials.get('Pierre', 0), random.randint(20, 50))
-            materials['Charbon'] = max(materials.get('Charbon', 0), random.randint(10, 25))
+            materials['Pierre'] = max(materials.get('Pierre', 0), rng.randint(20, 50))
+            materials['Charbon'] = max(materials.get('Charbon', 0), rng.randint(10, 25))
 
-    random.seed()  # Reset random seed
     return materials
 
 
@@ -816,3 +1001,39 @@ def get_location_description_smart(lat, lon, grid_x, grid_y, biome, materials):
         descriptions.append('🏞️ Terres explorées')
 
     return ' | '.join(descriptions) if descriptions else 'Zone standard'
+
+
+# OSM context of a cell generated without OSM features (see populate_cell_materials)
+PROCEDURAL_OSM_CONTEXT = {'has_water': False, 'has_forest': False, 'urban': False}
+
+
+def generate_procedural_cells(cells):
+    """
+    Procedural content for a batch of cells, as populate_cell_materials(cell, features=[])
+    would produce it.
+
+    cells: iterable of (grid_x, grid_y, lat, lon, biome) where biome may be None.
+    Returns a list of (grid_x, grid_y, lat, lon, biome, description, materials).
+    Pure function (no database access), safe to run in worker processes.
+    """
+    cells = list(cells)
+    missing = [i for i, cell in enumerate(cells) if cell[4] is None]
+    biomes = [cell[4] for cell in cells]
+    if missing and np is not None:
+        field = get_biome_field(
+            [cells[i][2] for i in missing], [cells[i][3] for i in missing],
+            [cells[i][0] for i in missing], [cells[i][1] for i in missing],
+        )
+        for i, biome in zip(missing, field['biome'].tolist()):
+            biomes[i] = biome
+    else:
+        for i in missing:
+            gx, gy, lat, lon, _ = cells[i]
+            biomes[i] = get_biome_from_coordinates(lat, lon, gx, gy)
+
+    results = []
+    for (gx, gy, lat, lon, _), biome in zip(cells, biomes):
+        materials = get_smart_resources(lat, lon, gx, gy, biome, osm_context=PROCEDURAL_OSM_CONTEXT)
+        description = get_location_description_smart(lat, lon, gx, gy, biome, materials)
+        results.append((gx, gy, lat, lon, biome, description, materials))
+    return results
@@ -4,6 +4,7 @@ from . import advanced_nutrition_service
 from . import advanced_vehicle_service
 from . import biome_service
 from . import building_service
+from . import cell_generation_service
 from . import combat_service
 from . import crafting_service
 from . import durability_service
@@ -17,12 +18,14 @@ from . import health_display_service
 from . import health_service
 from . import house_service
 from . import hunting_service
+from . import inventory_ledger_service
 from . import inventory_service
 from . import leaderboard_service
 from . import map_service
 from . import metabolism_service
 from . import movement_service
 from . import osm_biome_service
+from . import player_payload_service
 from . import player_service
 from . import poi_service
 from . import quest_service
@@ -39,6 +42,7 @@ __all__ = [
     'advanced_vehicle_service',
     'biome_service',
     'building_service',
+    'cell_generation_service',
     'combat_service',
     'crafting_service',
     'durability_service',
@@ -52,12 +56,14 @@ __all__ = [
     'health_service',
     'house_service',
     'hunting_service',
+    'inventory_ledger_service',
     'inventory_service',
     'leaderboard_service',
     'map_service',
     'metabolism_service',
     'movement_service',
     'osm_biome_service',
+    'player_payload_service',
     'player_service',
     'poi_service',
     'quest_service',
@@ -3,11 +3,30 @@ Achievement service for tracking and unlocking achievements
 """
 from django.utils import timezone
 from django.db import models
-from ..models import Achievement, PlayerAchievement, Player, GatheringLog, CraftingLog
+from django.db.models import F
+from ..models import Achievement, PlayerAchievement, PlayerCounter, Player
+from .. import catalog
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Counter key prefixes of targeted achievements ('<prefix>:<requirement_target>')
+COUNTER_PREFIXES = {
+    'material_collected': 'gather_material',
+    'recipe_crafted': 'craft_recipe',
+    'mob_defeated': 'mob_defeated',
+    'biome_visited': 'biome_visited',
+}
+
+# Event keyword argument naming the target of targeted achievements
+TARGET_KWARGS = {
+    'material_collected': 'material_name',
+    'recipe_crafted': 'recipe_name',
+    'biome_visited': 'biome',
+    'mob_defeated': 'mob_name',
+    'building_constructed': 'building_name',
+}
+
 
 class AchievementService:
     """Service for managing player achievements"""
@@ -17,6 +36,9 @@ class AchievementService:
         """
         Check and update achievements based on player actions
 
+        Progress is read from the player's counters (see increment_counters);
+        only achievements whose threshold is crossed get a PlayerAchievement write.
+
         Args:
             player: Player instance
             event_type: Type of event ('gather', 'craft', 'move', 'level_up', 'mob_defeat')
@@ -25,43 +47,56 @@ class AchievementService:
         Returns:
             List of newly completed achievements
         """
-        newly_completed = []
-
-        # Get all relevant achievements for this event type
-        achievements = Achievement.objects.filter(
-            requirement_type__in=AchievementService._get_relevant_types(event_type)
+        # Only the achievements the trigger index links to this event (and target)
+        achievement_ids = set()
+        for req_type in AchievementService._get_relevant_types(event_type):
+            achievement_ids |= catalog.get_achievement_ids(req_type, kwargs.get(TARGET_KWARGS.get(req_type)))
+        if not achievement_ids:
+            return []
+
+        achievements = list(Achievement.objects.filter(id__in=achievement_ids))
+        if not achievements:
+            return []
+
+        completed_ids = set(PlayerAchievement.objects.filter(
+            player=player,
+            completed=True,
+            achievement__in=achievements
+        ).values_list('achievement_id', flat=True))
+        pending = [a for a in achievements if a.id not in completed_ids]
+        if not pending:
+            return []
+
+        progress = AchievementService.get_progress_map(player, pending)
+        newly_completed = [a for a in pending if progress[a.id] >= a.requirement_value]
+        if not newly_completed:
+            return []
+
+        now = timezone.now()
+        PlayerAchievement.objects.bulk_create(
+            [
+                PlayerAchievement(
+                    player=player,
+                    achievement=achievement,
+                    progress=progress[achievement.id],
+                    completed=True,
+                    completed_at=now
+                )
+                for achievement in newly_completed
+            ],
+            update_conflicts=True,
+            unique_fields=['player', 'achievement'],
+            update_fields=['progress', 'completed', 'completed_at'],
         )
 
-        for achievement in achievements:
-            # Get or create player achievement
-            player_achievement, created = PlayerAchievement.objects.get_or_create(
-                player=player,
-                achievement=achievement,
-                defaults={'progress': 0}
-            )
-
-            # Skip if already completed
-            if player_achievement.completed:
-                continue
-
-            # Update progress based on achievement type
-            updated = AchievementService._update_progress(
-                player, player_achievement, achievement, event_type, **kwargs
-            )
-
-            if updated and player_achievement.progress >= achievement.requirement_value:
-                # Achievement completed!
-                player_achievement.completed = True
-                player_achievement.completed_at = timezone.now()
-                player_achievement.save()
-
-                # Award XP
-                if achievement.reward_xp > 0:
-                    player.experience += achievement.reward_xp
-                    player.save()
+        # Award XP
+        reward_xp = sum(achievement.reward_xp for achievement in newly_completed)
+        if reward_xp > 0:
+            from .player_service import grant_rewards
+            grant_rewards(player, xp=reward_xp)
 
-                newly_completed.append(achievement)
-                logger.info(f"Player {player.user.username} unlocked achievement: {achievement.name}")
+        for achievement in newly_completed:
+            logger.info(f"Player {player.user.username} unlocked achievement: {achievement.name}")
 
         return newly_completed
 
@@ -80,98 +115,88 @@ class AchievementService:
         return mapping.get(event_type, [])
 
     @staticmethod
-    def _update_progress(player, player_achievement, achievement, event_type, **kwargs):
-        """Update achievement progress based on event"""
+    def _counter_key(achievement):
+        """Counter backing an achievement, or None if progress comes from elsewhere"""
         req_type = achievement.requirement_type
-        updated = False
-
         if req_type == 'gather_count':
-            # Count total gatherings
-            count = GatheringLog.objects.filter(player=player).count()
-            player_achievement.progress = count
-            updated = True
-
-        elif req_type == 'craft_count':
-            # Count total crafts
-            count = CraftingLog.objects.filter(player=player).count()
-            player_achievement.progress = count
-            updated = True
-
-        elif req_type == 'move_count':
-            # Use player's total_moves counter
-            player_achievement.progress = player.total_moves
-            updated = True
-
-        elif req_type == 'level_reached':
-            # Check current level
-            player_achievement.progress = player.level
-            updated = True
-
-        elif req_type == 'material_collected':
-            # Check if specific material was gathered
-            material_name = kwargs.get('material_name')
-            if material_name == achievement.requirement_target:
-                # Count total quantity of this material gathered
-                count = GatheringLog.objects.filter(
-                    player=player,
-                    material__name=material_name
-                ).count()
-                player_achievement.progress = count
-                updated = True
-
-        elif req_type == 'recipe_crafted':
-            # Check if specific recipe was crafted
-            recipe_name = kwargs.get('recipe_name')
-            if recipe_name == achievement.requirement_target:
-                count = CraftingLog.objects.filter(
+            return 'gathers'
+        if req_type == 'craft_count':
+            return 'crafts'
+        if req_type in COUNTER_PREFIXES:
+            return f"{COUNTER_PREFIXES[req_type]}:{achievement.requirement_target}"
+        return None
+
+    @staticmethod
+    def get_progress_map(player, achievements):
+        """
+        Current progress of a player for several achievements
+
+        Returns:
+            dict achievement_id -> progress
+        """
+        keys = {AchievementService._counter_key(a) for a in achievements} - {None}
+        counters = AchievementService.get_counters(player, keys) if keys else {}
+
+        progress = {}
+        for achievement in achievements:
+            req_type = achievement.requirement_type
+            key = AchievementService._counter_key(achievement)
+            if key is not None:
+                progress[achievement.id] = counters.get(key, 0)
+            elif req_type == 'move_count':
+                progress[achievement.id] = player.total_moves
+            elif req_type == 'level_reached':
+                progress[achievement.id] = player.level
+            elif req_type == 'building_count':
+                from ..models import Building
+                progress[achievement.id] = Building.objects.filter(
                     player=player,
-                    recipe__name=recipe_name
+                    status__in=['under_construction', 'completed']
                 ).count()
-                player_achievement.progress = count
-                updated = True
-
-        elif req_type == 'biome_visited':
-            # Track unique biomes visited (requires separate tracking)
-            # For now, increment on each new biome
-            if event_type == 'move':
-                biome = kwargs.get('biome')
-                if biome and biome == achievement.requirement_target:
-                    player_achievement.progress = 1  # Simple flag for visited
-                    updated = True
-
-        elif req_type == 'mob_defeated':
-            # Track mob defeats
-            mob_name = kwargs.get('mob_name')
-            if mob_name == achievement.requirement_target:
-                player_achievement.progress += kwargs.get('quantity', 1)
-                updated = True
-
-        elif req_type == 'building_count':
-            # Count total buildings owned by player
-            from ..models import Building
-            count = Building.objects.filter(
-                player=player,
-                status__in=['under_construction', 'completed']
-            ).count()
-            player_achievement.progress = count
-            updated = True
-
-        elif req_type == 'building_constructed':
-            # Check if specific building type was constructed
-            building_name = kwargs.get('building_name')
-            if building_name == achievement.requirement_target:
+            elif req_type == 'building_constructed':
                 from ..models import Building
-                count = Building.objects.filter(
+                progress[achievement.id] = Building.objects.filter(
                     player=player,
-                    building_type__name=building_name
+                    building_type__name=achievement.requirement_target
                 ).count()
-                player_achievement.progress = count
-                updated = True
+            else:
+                progress[achievement.id] = 0
+        return progress
 
-        if updated:
-            player_achievement.save()
+    @staticmethod
+    def get_progress(player, achievement):
+        """Current progress of a player for one achievement"""
+        return AchievementService.get_progress_map(player, [achievement])[achievement.id]
 
-        return updated
+    @staticmethod
+    def get_counters(player, keys):
+        """Counter values for the given keys (missing counters are omitted)"""
+        return dict(PlayerCounter.objects.filter(player=player, key__in=list(keys)).values_list('key', 'value'))
+
+    @staticmethod
+    def increment_counters(player_id, deltas):
+        """
+        Atomically add to a player's counters (F() increments, rows created on first use)
+
+        Args:
+            player_id: Player id
+            deltas: dict counter key -> increment
+        """
+        deltas = {key[:150]: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        missing = []
+        for key, delta in deltas.items():
+            updated = PlayerCounter.objects.filter(player_id=player_id, key=key).update(value=F('value') + delta)
+            if not updated:
+                missing.append(key)
+        if missing:
+            PlayerCounter.objects.bulk_create(
+                [PlayerCounter(player_id=player_id, key=key, value=0) for key in missing],
+                ignore_conflicts=True
+            )
+            for key in missing:
+                PlayerCounter.objects.filter(player_id=player_id, key=key).update(value=F('value') + deltas[key])
 
     @staticmethod
     def get_player_achievements(player, include_hidden=False):
@@ -199,6 +224,12 @@ class AchievementService:
             for pa in PlayerAchievement.objects.filter(player=player).select_related('achievement')
         }
 
+        all_achievements = list(all_achievements)
+        progress = AchievementService.get_progress_map(player, [
+            achievement for achievement in all_achievements
+            if not (achievement.id in player_achievements and player_achievements[achievement.id].completed)
+        ])
+
         completed = []
         in_progress = []
 
@@ -214,7 +245,7 @@ class AchievementService:
             else:
                 in_progress.append({
                     'achievement': achievement,
-                    'progress': pa.progress if pa else 0,
+                    'progress': progress[achievement.id],
                     'max_progress': achievement.requirement_value,
                 })
 
@@ -321,9 +321,10 @@ class AdvancedNutritionService:
         return 1.0
 
     @staticmethod
-    def apply_nutrition_health_effects(player, minutes_passed):
+    def apply_nutrition_health_effects(player, minutes_passed, commit=True):
         """
         Apply real-time health effects based on vitamin/mineral levels
+        Pass commit=False to leave saving the player to the caller
         Returns: dict with effects applied
         """
         from game.models.nutrition import PlayerNutrition
@@ -393,7 +394,8 @@ class AdvancedNutritionService:
 
         # Save changes
         nutrition_status.save()
-        player.save()
+        if commit:
+            player.save()
 
         return {
             'effects': effects,
@@ -4,7 +4,8 @@ Biome Service
 Manages biome-related logic, effects, and information.
 """
 from typing import Dict, Any, List
-from ..resource_generator import BIOME_DATA, get_biome_info, get_biome_from_coordinates
+from ..resource_generator import BIOME_DATA, get_biome_info, get_biome_from_coordinates, get_biome_region
+from ..utils.config_helper import GameSettings
 from ..models import Player
 import random
 
@@ -51,6 +52,31 @@ class BiomeService:
         """
         return get_biome_from_coordinates(lat, lon, grid_x, grid_y)
     
+    @staticmethod
+    def get_biome_map(player: Player, radius: int) -> List[Dict[str, Any]]:
+        """
+        Procedural biomes for the square of cells around the player (map preview).
+        
+        Args:
+            player: The player instance
+            radius: Number of cells on each side of the player
+        
+        Returns:
+            List of {'grid_x', 'grid_y', 'biome'} dicts
+        """
+        region = get_biome_region(
+            player.current_y,
+            player.current_x,
+            player.grid_x,
+            player.grid_y,
+            radius,
+            GameSettings.movement_grid_offset()
+        )
+        return [
+            {'grid_x': gx, 'grid_y': gy, 'biome': biome}
+            for (gx, gy), biome in region.items()
+        ]
+    
     @staticmethod
     def apply_biome_effects(player: Player, biome: str, action: str) -> Dict[str, float]:
         """
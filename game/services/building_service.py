@@ -5,6 +5,7 @@ Handles construction, completion, and building management
 from django.utils import timezone
 from django.db.models import Q
 from game.models import Building, BuildingType, BuildingRecipe, Inventory, MapCell, Player
+from game import modifiers
 from game.services import house_service
 from game.exceptions import (
     InsufficientMaterialsError,
@@ -159,6 +160,7 @@ def complete_construction(building_id, player):
     building.construction_progress = 100
     building.construction_completed_at = timezone.now()
     building.save()
+    modifiers.forget(player)
 
     # If this is a housing-type building, create or ensure a House exists on this cell
     house_created = False
@@ -232,23 +234,5 @@ def get_cell_buildings(cell):
 
 
 def calculate_player_bonuses(player):
-    """Calculate total bonuses from all completed buildings"""
-    buildings = Building.objects.filter(
-        player=player,
-        status='completed'
-    ).select_related('building_type')
-
-    bonuses = {
-        'energy_regeneration': 0,
-        'storage': 0,
-        'defense': 0,
-        'production': 0.0,
-    }
-
-    for building in buildings:
-        bonuses['energy_regeneration'] += building.building_type.energy_regeneration_bonus
-        bonuses['storage'] += building.building_type.storage_bonus
-        bonuses['defense'] += building.building_type.defense_bonus
-        bonuses['production'] += building.building_type.production_bonus
-
-    return bonuses
+    """Calculate total bonuses from all completed buildings (from the player's modifier snapshot)"""
+    return modifiers.building_bonuses(player)
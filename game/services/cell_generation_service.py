@@ -0,0 +1,274 @@
+"""
+Cell generation pipeline
+
+New map cells are created immediately from the procedural generator
+(get_biome_from_coordinates / get_smart_resources) so requests never wait on
+Overpass. OSM enrichment then runs on a background thread pool and patches the
+MapCell (biome, features, description, materials) once the data is available.
+
+Cells around the player are prefetched the same way, so the next one-step
+move usually finds its cell already generated and enriched.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import MapCell
+from ..osm_utils import fetch_osm_features, has_osm_data
+from ..resource_generator import get_biome_from_coordinates
+from ..utils.config_helper import GameSettings
+from . import map_service
+
+logger = logging.getLogger(__name__)
+
+_CELL_GENERATION_DEFAULTS = {
+    'async_osm': True,  # False runs OSM enrichment inline (legacy, blocking)
+    'osm_workers': 2,
+    'prefetch_radius': 1,  # Manhattan distance around the player, 0 disables prefetch
+    'prefetch_workers': 2,
+    'prefetch_max_pending': 32,  # prefetches beyond this budget are dropped
+}
+
+# Start cell (0,0) is always plains, centered on the configured player start
+# (GameSettings.player_start_lat/lon, Valence by default)
+START_CELL = (0, 0)
+
+_EXECUTOR = None
+_PREFETCH_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+# Cell ids with an enrichment queued or running in this process
+_IN_FLIGHT = set()
+_IN_FLIGHT_LOCK = threading.Lock()
+
+# (grid_x, grid_y) positions with a prefetch queued or running in this process
+_PREFETCHING = set()
+
+
+def start_position():
+    """(lat, lon) of the start cell, from the configured player start"""
+    return GameSettings.player_start_lat(), GameSettings.player_start_lon()
+
+
+def _generation_settings():
+    conf = dict(_CELL_GENERATION_DEFAULTS)
+    conf.update(getattr(settings, 'CELL_GENERATION', {}))
+    return conf
+
+
+def _get_executor():
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=_generation_settings()['osm_workers'],
+                thread_name_prefix='cell-osm'
+            )
+        return _EXECUTOR
+
+
+def _get_prefetch_executor():
+    global _PREFETCH_EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _PREFETCH_EXECUTOR is None:
+            _PREFETCH_EXECUTOR = ThreadPoolExecutor(
+                max_workers=_generation_settings()['prefetch_workers'],
+                thread_name_prefix='cell-prefetch'
+            )
+        return _PREFETCH_EXECUTOR
+
+
+def get_or_create_cell(grid_x, grid_y, lat, lon, biome=None, schedule_enrichment=True):
+    """
+    Return (cell, created) for a grid position without blocking on Overpass.
+
+    Missing cells get a procedural biome and procedural materials right away;
+    OSM enrichment is scheduled to run once the current transaction commits
+    (unless schedule_enrichment is False, for callers already off the request path).
+    """
+    if biome is None:
+        try:
+            biome = get_biome_from_coordinates(lat, lon, grid_x, grid_y)
+        except Exception as e:
+            logger.warning(f"Procedural biome failed for ({grid_x}, {grid_y}): {str(e)}")
+            biome = 'plains'
+
+    cell, created = MapCell.objects.get_or_create(
+        grid_x=grid_x,
+        grid_y=grid_y,
+        defaults={
+            'center_lat': lat,
+            'center_lon': lon,
+            'biome': biome
+        }
+    )
+
+    if created or not cell.materials.exists():
+        try:
+            map_service.populate_cell_materials(cell, features=[])
+        except Exception as e:
+            logger.warning(f"Procedural population failed for ({grid_x}, {grid_y}): {str(e)}")
+
+    if schedule_enrichment and cell.osm_enriched_at is None:
+        schedule_osm_enrichment(cell)
+
+    return cell, created
+
+
+def schedule_osm_enrichment(cell):
+    """Queue OSM enrichment for a cell, deduplicated per process"""
+    if not _generation_settings()['async_osm']:
+        enrich_cell(cell.id)
+        return
+
+    with _IN_FLIGHT_LOCK:
+        if cell.id in _IN_FLIGHT:
+            return
+        _IN_FLIGHT.add(cell.id)
+
+    cell_id = cell.id
+    # The worker uses its own connection, so only hand over committed cells
+    transaction.on_commit(lambda: _submit(cell_id))
+
+
+def _submit(cell_id):
+    try:
+        _get_executor().submit(_run_enrichment, cell_id)
+    except RuntimeError:
+        # Executor shut down (interpreter exiting)
+        with _IN_FLIGHT_LOCK:
+            _IN_FLIGHT.discard(cell_id)
+
+
+def _run_enrichment(cell_id):
+    try:
+        enrich_cell(cell_id)
+    except Exception:
+        logger.exception(f"OSM enrichment failed for cell {cell_id}")
+    finally:
+        with _IN_FLIGHT_LOCK:
+            _IN_FLIGHT.discard(cell_id)
+        connection.close()
+
+
+def enrich_cell(cell_id):
+    """
+    Fetch OSM features for a cell and patch it in place.
+    Returns the updated cell, or None if it no longer exists.
+    """
+    cell = MapCell.objects.filter(id=cell_id).first()
+    if cell is None:
+        return None
+    if cell.osm_enriched_at is not None:
+        return cell
+
+    features = fetch_osm_features(cell.center_lat, cell.center_lon, radius=100)
+    if not features and not has_osm_data(cell.center_lat, cell.center_lon, 100):
+        # Overpass unreachable: leave the cell procedural and retry on a later visit
+        return cell
+
+    if features:
+        map_service.populate_cell_materials(cell, features=features)
+
+    cell.osm_enriched_at = timezone.now()
+    cell.save(update_fields=['osm_enriched_at'])
+    logger.debug(f"OSM enrichment done for cell ({cell.grid_x}, {cell.grid_y}): {len(features)} features, biome '{cell.biome}'")
+    return cell
+
+
+def get_neighbour_positions(grid_x, grid_y, radius):
+    """Grid positions within Manhattan distance `radius` of (grid_x, grid_y), excluding it"""
+    positions = []
+    for dx in range(-radius, radius + 1):
+        span = radius - abs(dx)
+        for dy in range(-span, span + 1):
+            if dx or dy:
+                positions.append((grid_x + dx, grid_y + dy))
+    return positions
+
+
+def prefetch_neighbours(player, radius=None):
+    """
+    Warm the cells the player can reach next (procedural cell, materials and OSM
+    features) on a background pool, once the current transaction commits.
+
+    Positions already generated and enriched are skipped, in-flight positions are
+    deduplicated, and requests beyond prefetch_max_pending are dropped.
+    Returns the number of positions queued.
+    """
+    conf = _generation_settings()
+    if radius is None:
+        radius = conf['prefetch_radius']
+    if radius <= 0:
+        return 0
+
+    positions = get_neighbour_positions(player.grid_x, player.grid_y, radius)
+    ring = Q()
+    for gx, gy in positions:
+        ring |= Q(grid_x=gx, grid_y=gy)
+    warm = set(
+        MapCell.objects.filter(ring, osm_enriched_at__isnull=False).values_list('grid_x', 'grid_y')
+    )
+
+    offset = GameSettings.movement_grid_offset()
+    queued = []
+    with _IN_FLIGHT_LOCK:
+        for gx, gy in positions:
+            if (gx, gy) in warm or (gx, gy) in _PREFETCHING:
+                continue
+            if len(_PREFETCHING) >= conf['prefetch_max_pending']:
+                break
+            _PREFETCHING.add((gx, gy))
+            lat = player.current_y + (gy - player.grid_y) * offset
+            lon = player.current_x + (gx - player.grid_x) * offset
+            queued.append((gx, gy, lat, lon))
+
+    for args in queued:
+        transaction.on_commit(lambda args=args: _submit_prefetch(*args))
+    return len(queued)
+
+
+def _submit_prefetch(grid_x, grid_y, lat, lon):
+    try:
+        _get_prefetch_executor().submit(_run_prefetch, grid_x, grid_y, lat, lon)
+    except RuntimeError:
+        with _IN_FLIGHT_LOCK:
+            _PREFETCHING.discard((grid_x, grid_y))
+
+
+def _run_prefetch(grid_x, grid_y, lat, lon):
+    try:
+        prefetch_cell(grid_x, grid_y, lat, lon)
+    except Exception:
+        logger.exception(f"Prefetch failed for cell ({grid_x}, {grid_y})")
+    finally:
+        with _IN_FLIGHT_LOCK:
+            _PREFETCHING.discard((grid_x, grid_y))
+        connection.close()
+
+
+def prefetch_cell(grid_x, grid_y, lat, lon):
+    """Generate and enrich one cell inline (runs on a prefetch worker)"""
+    biome = None
+    if (grid_x, grid_y) == START_CELL:
+        (lat, lon), biome = start_position(), 'plains'
+
+    cell, _ = get_or_create_cell(grid_x, grid_y, lat, lon, biome=biome, schedule_enrichment=False)
+    if cell.osm_enriched_at is not None:
+        return cell
+
+    # Skip if a move already queued enrichment for this cell
+    with _IN_FLIGHT_LOCK:
+        if cell.id in _IN_FLIGHT:
+            return cell
+        _IN_FLIGHT.add(cell.id)
+    try:
+        return enrich_cell(cell.id)
+    finally:
+        with _IN_FLIGHT_LOCK:
+            _IN_FLIGHT.discard(cell.id)
@@ -5,8 +5,10 @@ import random
 import json
 from ..models import Player, Mob, CombatLog, MapCell, Inventory, Material
 from . import player_service
+from .. import events
 from .survival_service import SurvivalService
 from .durability_service import DurabilityService
+from .energy_service import catch_up_energy
 from ..utils.config_helper import GameSettings
 
 
@@ -208,6 +210,9 @@ def process_combat_action(player, combat_state, action='attack'):
         mob = Mob.objects.get(id=combat_state['mob_id'])
     except Mob.DoesNotExist:
         return {'error': 'Mob introuvable'}, 404
+
+    # Energy is spent below: bring it up to date first
+    catch_up_energy(player)
     
     # Execute combat round
     player_dmg, mob_dmg, is_crit, round_log, fled = execute_combat_round(
@@ -221,7 +226,7 @@ def process_combat_action(player, combat_state, action='attack'):
         combat_state['status'] = 'fled'
         combat_state['combat_log'].extend(round_log)
         player.energy = max(0, player.energy - 2)
-        player.save()
+        player.save(update_fields=SurvivalService.vital_update_fields('energy'))
         return combat_state, 200
 
     # Consume weapon durability on attack
@@ -243,7 +248,7 @@ def process_combat_action(player, combat_state, action='attack'):
     
     # Synchronize player health immediately to prevent desync
     player.health = combat_state['player_health']
-    player.save()
+    player.save(update_fields=['health'])
     
     # Check victory/defeat
     if combat_state['mob_health'] <= 0:
@@ -285,7 +290,6 @@ def resolve_combat_victory(player, mob, combat_state):
         bonus_messages.append(f"⚡ Victoire rapide! +{quick_bonus} XP bonus")
     
     total_xp = base_xp + bonus_xp
-    player.experience += total_xp
     combat_state['xp_gained'] = total_xp
     combat_state['base_xp'] = base_xp
     combat_state['bonus_xp'] = bonus_xp
@@ -342,17 +346,10 @@ def resolve_combat_victory(player, mob, combat_state):
     # Update health
     player.health = combat_state['player_health']
     
-    # Handle level up with improved rewards
-    from ..models import GameConfig
-    level_up_bonus = GameConfig.get_config('level_up_energy_bonus', 10)
-    leveled_up = False
-    while player.experience >= player.get_xp_for_level(player.level + 1):
-        player.experience -= player.get_xp_for_level(player.level + 1)
-        old_level = player.level
-        player.level += 1
-
-        # Increase max stats
-        player.max_energy += level_up_bonus
+    # Award XP as increments, so rewards granted meanwhile are kept, then the level-up rewards
+    levels_gained = player_service.grant_rewards(player, xp=total_xp)
+    for level in range(player.level - levels_gained + 1, player.level + 1):
+        # Increase max stats (max energy is raised by grant_rewards)
         player.max_health += GameSettings.combat_level_up_health_bonus()
 
         # Full heal on level up
@@ -360,7 +357,7 @@ def resolve_combat_victory(player, mob, combat_state):
         player.health = player.max_health
 
         # Bonus stats every 5 levels
-        if player.level % 5 == 0:
+        if level % 5 == 0:
             stat_bonus = GameSettings.combat_level_5_stat_bonus()
             luck_bonus = GameSettings.combat_level_5_luck_bonus()
             player.strength += stat_bonus
@@ -368,12 +365,13 @@ def resolve_combat_victory(player, mob, combat_state):
             player.intelligence += stat_bonus
             player.luck += luck_bonus
             combat_state['combat_log'].append(f"⭐ Bonus de stats! STR+{stat_bonus}, AGI+{stat_bonus}, INT+{stat_bonus}, LUCK+{luck_bonus}")
-        
-        leveled_up = True
-        combat_state['combat_log'].append(f"🎉 Niveau {old_level} → {player.level}! Santé et énergie restaurées!")
-    
-    player.save()
-    
+
+        combat_state['combat_log'].append(f"🎉 Niveau {level - 1} → {level}! Santé et énergie restaurées!")
+
+    player.save(update_fields=SurvivalService.vital_update_fields(
+        'energy', 'health', 'max_health', 'strength', 'agility', 'intelligence', 'luck'
+    ))
+
     # Log combat
     try:
         cell = MapCell.objects.get(grid_x=player.grid_x, grid_y=player.grid_y)
@@ -391,6 +389,9 @@ def resolve_combat_victory(player, mob, combat_state):
     except MapCell.DoesNotExist:
         pass
 
+    # Achievements, quest progress and the live combatant board run off the request path
+    events.publish(events.MobDefeated(player_id=player.id, mob_id=mob.id, mob_name=mob.name, source='combat'))
+
 
 def resolve_combat_defeat(player, mob, combat_state):
     """
@@ -403,7 +404,7 @@ def resolve_combat_defeat(player, mob, combat_state):
     # Deduct energy
     player.energy = max(0, player.energy - 3)
     
-    player.save()
+    player.save(update_fields=SurvivalService.vital_update_fields('health', 'energy'))
     
     # Log combat
     try:
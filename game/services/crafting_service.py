@@ -3,12 +3,17 @@ import random
 from ..models import Recipe, Player, Inventory, PlayerWorkstation, Workstation, CraftingLog, RecipeIngredient, Material, PlayerSkill, PlayerTalent
 from ..serializers import PlayerSkillSerializer, PlayerTalentSerializer
 from . import player_service
+from .survival_service import SurvivalService
+from .. import catalog, events
 from ..utils.config_helper import GameSettings
+from .inventory_ledger_service import InsufficientQuantity, ItemDelta, apply_deltas, get_quantities
 
 def craft_recipe(player, recipe_id, quantity=1):
     try:
-        recipe = Recipe.objects.get(id=recipe_id)
-    except Recipe.DoesNotExist:
+        recipe = catalog.get_recipe(int(recipe_id))
+    except (TypeError, ValueError):
+        recipe = None
+    if recipe is None:
         return {'error': 'Recette introuvable'}, 404
 
     # Define energy cost for crafting (configurable)
@@ -17,9 +22,10 @@ def craft_recipe(player, recipe_id, quantity=1):
     energy_cost = base_craft_energy * quantity
 
     # Apply building bonuses to reduce energy cost
-    from ..services.energy_service import apply_building_effects_to_action
+    from ..services.energy_service import apply_building_effects_to_action, catch_up_energy
     energy_cost = apply_building_effects_to_action(player, 'craft', energy_cost)
 
+    catch_up_energy(player)
     if player.energy < energy_cost:
         return {'error': 'Pas assez d\'énergie'}, 400
 
@@ -40,7 +46,7 @@ def craft_recipe(player, recipe_id, quantity=1):
             }, 400
 
     # Check if player has all ingredients (apply material cost reduction if any)
-    ingredients = RecipeIngredient.objects.filter(recipe=recipe)
+    ingredients = catalog.get_recipe_ingredients(recipe.id)
     # compute effects
     effects = player_service.get_active_effects(player, 'crafting')
     cost_reduction = effects.get('material_cost_reduction', 0)
@@ -51,18 +57,17 @@ def craft_recipe(player, recipe_id, quantity=1):
         new_q = math.ceil(q * (1 - cost_reduction / 100.0))
         return max(1, new_q)
 
+    held = get_quantities(player.id, [ingredient.material_id for ingredient in ingredients])
     for ingredient in ingredients:
-        try:
-            inventory = Inventory.objects.get(player=player, material=ingredient.material)
-            need = reduced(ingredient.quantity) * quantity
-            if inventory.quantity < need:
-                return {
-                    'error': f'Pas assez de {ingredient.material.name}. Besoin de {need}, vous avez {inventory.quantity}'
-                }, 400
-        except Inventory.DoesNotExist:
+        if ingredient.material_id not in held:
             return {
                 'error': f'Matériau manquant: {ingredient.material.name}'
             }, 400
+        need = reduced(ingredient.quantity) * quantity
+        if held[ingredient.material_id] < need:
+            return {
+                'error': f'Pas assez de {ingredient.material.name}. Besoin de {need}, vous avez {held[ingredient.material_id]}'
+            }, 400
 
     # Check if materials should be consumed (talent: no material consumption)
     no_consumption_chance = effects.get('no_material_consumption_chance', 0)
@@ -71,28 +76,20 @@ def craft_recipe(player, recipe_id, quantity=1):
         should_consume_materials = False
 
     # Deduct ingredients with reduction (unless no consumption triggered)
+    item_deltas = []
     if should_consume_materials:
         for ingredient in ingredients:
-            inventory = Inventory.objects.get(player=player, material=ingredient.material)
             need = reduced(ingredient.quantity) * quantity
-            inventory.quantity -= need
-            inventory.save()
+            item_deltas.append(ItemDelta(player.id, ingredient.material_id, -need))
 
     # Deduct energy cost
     player.energy -= energy_cost
 
-    # Add result to inventory
-    result_inventory, created = Inventory.objects.get_or_create(
-        player=player,
-        material=recipe.result_material,
-        defaults={'quantity': 0}
-    )
     # Apply bonus output chance
     bonus_chance = effects.get('bonus_output_chance', 0)
     bonus = 0
     if bonus_chance > 0 and random.randint(1, 100) <= bonus_chance:
         bonus = recipe.result_quantity
-    result_inventory.quantity += recipe.result_quantity * quantity + bonus
     # Initialize durability for tools
     tool_name = recipe.result_material.name.lower()
     def tool_durability_for(name: str):
@@ -112,11 +109,22 @@ def craft_recipe(player, recipe_id, quantity=1):
             return 100
         return 0
     dur_max = tool_durability_for(tool_name)
-    if dur_max > 0:
-        result_inventory.durability_max = dur_max
-        # If crafted multiple, reset current to max (single stack behavior)
-        result_inventory.durability_current = dur_max
-    result_inventory.save()
+    # If crafted multiple, reset current to max (single stack behavior)
+    item_deltas.append(ItemDelta(
+        player.id, recipe.result_material_id, recipe.result_quantity * quantity + bonus,
+        durability=(dur_max, dur_max) if dur_max > 0 else None
+    ))
+
+    # Ingredients out and result in as one ledger batch
+    try:
+        apply_deltas(item_deltas, players=[player])
+    except InsufficientQuantity as exc:
+        # Stock changed since the check above
+        material = catalog.get_material(exc.material_id)
+        name = material.name if material else exc.material_id
+        return {
+            'error': f'Pas assez de {name}. Besoin de {exc.required}, vous avez {exc.available}'
+        }, 400
 
     # Log crafting
     CraftingLog.objects.create(
@@ -137,43 +145,18 @@ def craft_recipe(player, recipe_id, quantity=1):
     xp_gain = base_xp_gain + rarity_bonus
     player_service.award_xp(player, 'crafting', xp_gain * quantity)
 
-    # Award experience for crafting
+    # Award experience for crafting, written as increments so rewards granted meanwhile are kept
     crafting_xp = GameSettings.crafting_xp_per_item() * quantity
-    player.experience += crafting_xp
-
-    # Handle level progression
-    level_up_bonus = GameConfig.get_config('level_up_energy_bonus', 10)
-    leveled_up = False
-    while player.experience >= player.get_xp_for_level(player.level + 1):
-        player.experience -= player.get_xp_for_level(player.level + 1)
-        player.level += 1
-        player.max_energy += level_up_bonus  # Increase max energy on level up
-        player.energy = min(player.energy, player.max_energy)  # Cap current energy
-        leveled_up = True
-
-    player.save()
-
-    # Check achievements
-    from .achievement_service import check_achievements
-    new_achievements = check_achievements(
-        player,
-        'craft',
-        recipe_name=recipe.name
-    )
-
-    # Check level up achievements
-    if leveled_up:
-        level_achievements = check_achievements(player, 'level_up')
-        new_achievements.extend(level_achievements)
-
-    # Update quest progress
-    from .quest_service import QuestService
-    completed_quests = QuestService.update_quest_progress(
-        player,
-        'craft',
-        recipe_id=recipe_id,
+    player_service.grant_rewards(player, xp=crafting_xp)
+    player.save(update_fields=SurvivalService.vital_update_fields('energy'))
+
+    # Achievements, quest progress and live leaderboards run off the request path
+    events.publish(events.Crafted(
+        player_id=player.id,
+        recipe_id=recipe.id,
+        recipe_name=recipe.name,
         quantity=quantity
-    )
+    ))
 
     # Check if this recipe builds a workstation
     workstation_mapping = {
@@ -231,32 +214,6 @@ def craft_recipe(player, recipe_id, quantity=1):
         'talents': PlayerTalentSerializer(talents, many=True).data,
     }
 
-    # Add achievements to response if any were completed
-    if new_achievements:
-        response_data['achievements_unlocked'] = [
-            {
-                'name': ach.name,
-                'description': ach.description,
-                'icon': ach.icon,
-                'reward_xp': ach.reward_xp
-            }
-            for ach in new_achievements
-        ]
-
-    # Add completed quests to response
-    if completed_quests:
-        response_data['quests_completed'] = [
-            {
-                'quest': {
-                    'name': q['quest'].name,
-                    'icon': q['quest'].icon,
-                    'description': q['quest'].description
-                },
-                'rewards': q['rewards']
-            }
-            for q in completed_quests
-        ]
-
     return response_data, 200
 
 def install_workstation(player, material_id):
@@ -2,8 +2,10 @@
 Economy service for managing player money and transactions
 """
 from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
 from ..models import Player, Transaction, Shop, ShopItem, Inventory, Material
+from .inventory_ledger_service import ItemDelta, apply_deltas, remove_items
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,6 +14,23 @@ logger = logging.getLogger(__name__)
 class EconomyService:
     """Service for managing player economy"""
 
+    @staticmethod
+    def _change_money(player, delta):
+        """
+        Add delta to the stored balance as an increment, so quest or achievement
+        rewards granted meanwhile are kept; a debit only applies if the stored
+        balance covers it. The instance gets the stored balance either way.
+
+        Returns:
+            bool: whether the balance was changed
+        """
+        players = Player.objects.filter(id=player.id)
+        if delta < 0:
+            players = players.filter(money__gte=-delta)
+        changed = players.update(money=F('money') + delta) > 0
+        player.money = Player.objects.values_list('money', flat=True).get(id=player.id)
+        return changed
+
     @staticmethod
     @transaction.atomic
     def add_money(player, amount, transaction_type='other', description='', material=None, shop=None):
@@ -32,8 +51,7 @@ class EconomyService:
         if amount <= 0:
             raise ValueError("Amount must be positive")
         
-        player.money += amount
-        player.save()
+        EconomyService._change_money(player, amount)
         
         trans = Transaction.objects.create(
             player=player,
@@ -71,12 +89,9 @@ class EconomyService:
         if amount <= 0:
             raise ValueError("Amount must be positive")
         
-        if player.money < amount:
+        if not EconomyService._change_money(player, -amount):
             raise ValueError(f"Insufficient funds. Has {player.money}, needs {amount}")
         
-        player.money -= amount
-        player.save()
-        
         trans = Transaction.objects.create(
             player=player,
             transaction_type=transaction_type,
@@ -138,16 +153,13 @@ class EconomyService:
 
             # Deduct from card
             player.credit_card_balance -= total_cost
-            player.save()
+            player.save(update_fields=['credit_card_balance'])
 
             payment_method = "carte de crédit"
         else:
-            if player.money < total_cost:
-                raise ValueError(f"Argent liquide insuffisant. Coût: {total_cost}₡, Liquide: {player.money}₡")
-
             # Deduct from cash
-            player.money -= total_cost
-            player.save()
+            if not EconomyService._change_money(player, -total_cost):
+                raise ValueError(f"Argent liquide insuffisant. Coût: {total_cost}₡, Liquide: {player.money}₡")
 
             payment_method = "argent liquide"
 
@@ -162,20 +174,14 @@ class EconomyService:
             shop=shop_item.shop
         )
 
-        # Add to inventory
-        inv_item, created = Inventory.objects.get_or_create(
-            player=player,
-            material=shop_item.material,
-            defaults={'quantity': 0}
-        )
-        inv_item.quantity += quantity
-
-        # Set durability for tools/equipment
-        if shop_item.material.max_durability > 0 and inv_item.durability_max == 0:
-            inv_item.durability_max = shop_item.material.max_durability
-            inv_item.durability_current = shop_item.material.max_durability
-
-        inv_item.save()
+        # Add to inventory, setting durability for tools/equipment on stacks that have none
+        max_durability = shop_item.material.max_durability
+        results = apply_deltas([ItemDelta(
+            player.id, shop_item.material_id, quantity,
+            durability=(max_durability, max_durability) if max_durability > 0 else None,
+            init_durability_only=True
+        )], players=[player])
+        inv_item = results[(player.id, shop_item.material_id)]
 
         # Update shop stock
         if shop_item.stock != -1:
@@ -242,11 +248,7 @@ class EconomyService:
         )
         
         # Remove from inventory
-        inv_item.quantity -= quantity
-        if inv_item.quantity <= 0:
-            inv_item.delete()
-        else:
-            inv_item.save()
+        remove_items(player, material.id, quantity)
         
         # Update shop stock
         if shop_item.max_stock != -1:
@@ -5,6 +5,7 @@ import random
 import json
 from django.utils import timezone
 from ..models import RandomEnemy, Encounter, Player, MapCell, Material, Inventory
+from .. import catalog
 
 
 class EncounterService:
@@ -23,17 +24,8 @@ class EncounterService:
         # Get biome of current cell
         biome = cell.biome
 
-        # Get all enemies that can spawn in this biome
-        potential_enemies = RandomEnemy.objects.filter(
-            min_level_required__lte=player.level
-        )
-
-        # Filter by biome
-        eligible_enemies = []
-        for enemy in potential_enemies:
-            enemy_biomes = enemy.get_biomes()
-            if not enemy_biomes or biome in enemy_biomes:
-                eligible_enemies.append(enemy)
+        # Get all enemies that can spawn in this biome (from the static data catalog)
+        eligible_enemies = catalog.get_enemies_for(biome, player.level)
 
         if not eligible_enemies:
             return False, None, False
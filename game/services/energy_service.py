@@ -12,47 +12,76 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-def regenerate_player_energy(player):
+def energy_regen_rate(player):
+    """Energy regenerated per minute: base rate plus building bonuses (from the modifier snapshot)"""
+    bonuses = calculate_player_bonuses(player)
+    return GameSettings.energy_base_regen_per_minute() + bonuses.get('energy_regeneration', 0)
+
+
+def project_energy(energy, max_energy, rate, minutes):
     """
-    Regenerate player energy based on time passed and buildings owned
+    Closed-form energy regeneration over a span of minutes
 
-    Args:
-        player: Player instance
+    Only whole points are restored; the minutes not yet turned into a point are
+    kept so the anchor can advance by what was consumed and lose nothing.
 
     Returns:
-        tuple: (energy_restored, time_passed_minutes)
+        tuple: (energy, minutes_consumed)
     """
-    # Get player's building bonuses
-    bonuses = calculate_player_bonuses(player)
-    base_regen = GameSettings.energy_base_regen_per_minute()
-    bonus_regen = bonuses.get('energy_regeneration', 0)
-    total_regen_per_minute = base_regen + bonus_regen
+    if energy >= max_energy or rate <= 0 or minutes <= 0:
+        return energy, max(0, minutes)
+
+    restored = int(rate * minutes)
+    if energy + restored >= max_energy:
+        return max_energy, minutes
+    return energy + restored, restored / rate
 
-    # Calculate time since last update
-    now = timezone.now()
-    last_update = getattr(player, 'last_energy_update', None)
+
+def catch_up_energy(player, now=None):
+    """
+    Bring player.energy up to date in memory, without saving
+
+    Returns:
+        tuple: (energy_restored, time_passed_minutes)
+    """
+    now = now or timezone.now()
+    last_update = player.last_energy_update
 
     if not last_update:
-        # First time, set it to now
         player.last_energy_update = now
-        player.save()
         return 0, 0
 
-    time_passed = now - last_update
-    minutes_passed = time_passed.total_seconds() / 60  # Changed from hours
+    minutes_passed = max(0, (now - last_update).total_seconds() / 60)
+    old_energy = player.energy
+    player.energy, consumed = project_energy(
+        player.energy, player.max_energy, energy_regen_rate(player), minutes_passed
+    )
+    player.last_energy_update = now if consumed >= minutes_passed else last_update + timedelta(minutes=consumed)
+    return player.energy - old_energy, int(minutes_passed)
 
-    # Calculate energy to restore
-    energy_to_restore = int(total_regen_per_minute * minutes_passed)
 
-    if energy_to_restore > 0:
-        old_energy = player.energy
-        player.energy = min(player.max_energy, player.energy + energy_to_restore)
-        player.last_energy_update = now
-        player.save()
+def regenerate_player_energy(player):
+    """
+    Regenerate player energy based on time passed and buildings owned
+
+    Only writes when energy was actually restored (or on the first call, to set
+    the anchor); reads should use catch_up_energy instead.
+
+    Args:
+        player: Player instance
+
+    Returns:
+        tuple: (energy_restored, time_passed_minutes)
+    """
+    first_time = not player.last_energy_update
+    actual_restored, minutes_passed = catch_up_energy(player)
+
+    if first_time or actual_restored > 0:
+        player.save(update_fields=['energy', 'last_energy_update'])
 
-        actual_restored = player.energy - old_energy
+    if actual_restored > 0:
         logger.info(f"Regenerated {actual_restored} energy for {player.user.username}")
-        return actual_restored, int(minutes_passed)
+        return actual_restored, minutes_passed
 
     return 0, 0
 
@@ -3,7 +3,50 @@
 Handles equipping and unequipping items for players.
 """
 from typing import Tuple, Dict, Any
-from ..models import Inventory, Player
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from ..models import EquippedItem, Inventory, Player
+from .inventory_ledger_service import add_items, remove_items
+
+# Player column -> Material field summed over the equipped items
+EQUIPMENT_TOTALS = {
+    'equipment_carry_bonus': 'weight_capacity_bonus',
+    'equipment_attack': 'attack',
+    'equipment_defense': 'defense',
+    'equipment_speed_bonus': 'speed_bonus',
+}
+
+
+def refresh_equipment_totals(player_id: int) -> Dict[str, float]:
+    """
+    Recompute and store a player's equipment totals.
+
+    Called whenever equipped gear changes (see game.signals), so combat,
+    movement and the character sheet read Player.total_attack & co. and
+    effective_carry_capacity without walking equipped_items.
+    """
+    totals = EquippedItem.objects.filter(player_id=player_id).aggregate(**{
+        column: Sum(f'material__{field}') for column, field in EQUIPMENT_TOTALS.items()
+    })
+    totals = {column: value or 0 for column, value in totals.items()}
+    Player.objects.filter(id=player_id).update(**totals)
+    return totals
+
+
+def equipment_totals_subqueries() -> Dict[str, Any]:
+    """Per-player equipment totals as expressions, for annotate()/update() on Player"""
+    return {
+        column: Coalesce(
+            Subquery(
+                EquippedItem.objects.filter(player=OuterRef('pk')).values('player').annotate(
+                    total=Sum(f'material__{field}')
+                ).values('total')
+            ),
+            Value(0),
+            output_field=Player._meta.get_field(column).__class__()
+        )
+        for column, field in EQUIPMENT_TOTALS.items()
+    }
 
 
 def equip_item(player: Player, item_id: int) -> Tuple[Dict[str, Any], int]:
@@ -17,8 +60,6 @@ def equip_item(player: Player, item_id: int) -> Tuple[Dict[str, Any], int]:
     Returns:
         Tuple of (response dict, status code)
     """
-    from ..models import EquippedItem
-    
     try:
         inventory_item = Inventory.objects.get(player=player, id=item_id)
     except Inventory.DoesNotExist:
@@ -44,11 +85,8 @@ def equip_item(player: Player, item_id: int) -> Tuple[Dict[str, Any], int]:
     )
     
     # Remove from inventory (reduce quantity or delete)
-    if inventory_item.quantity > 1:
-        inventory_item.quantity -= 1
-        inventory_item.save()
-    else:
-        inventory_item.delete()
+    remove_items(player, material.id, 1)
+    player.refresh_from_db(fields=list(EQUIPMENT_TOTALS))
         
     return {'message': f'{material.name} équipé avec succès'}, 200
 
@@ -63,21 +101,14 @@ def unequip_item(player: Player, slot: str) -> Tuple[Dict[str, Any], int]:
     Returns:
         Tuple of (response dict, status code)
     """
-    from ..models import EquippedItem
-    
     try:
         equipped = EquippedItem.objects.get(player=player, slot=slot)
     except EquippedItem.DoesNotExist:
         return {'error': 'Aucun objet équipé dans cet emplacement'}, 404
         
     # Add back to inventory
-    inventory, created = Inventory.objects.get_or_create(
-        player=player,
-        material=equipped.material,
-        defaults={'quantity': 0}
-    )
-    inventory.quantity += 1
-    inventory.save()
+    add_items(player, equipped.material_id, 1)
     
     equipped.delete()
+    player.refresh_from_db(fields=list(EQUIPMENT_TOTALS))
     return {'message': 'Objet déséquipé'}, 200
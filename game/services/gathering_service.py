@@ -1,11 +1,11 @@
 import random
-from ..models import MapCell, CellMaterial, Material, GatheringLog, Inventory, GameConfig
+from ..models import MapCell, CellMaterial, GatheringLog, Inventory, GameConfig
 from . import player_service
 from .survival_service import SurvivalService
 from ..utils.config_helper import GameSettings
 from ..services.energy_service import apply_building_effects_to_action
-from .achievement_service import check_achievements
-from .quest_service import QuestService
+from .. import catalog, events
+from .inventory_ledger_service import ItemDelta, apply_deltas
 
 def gather_material(player, cell, material_id):
     # Update survival stats before action
@@ -196,14 +196,16 @@ def gather_material(player, cell, material_id):
     cell_material.quantity -= gather_amount
     cell_material.save()
 
-    # Add to player inventory
-    inventory, created = Inventory.objects.get_or_create(
+    # Inventory changes (gathered item, byproducts, tool wear) go to the ledger in one batch
+    item_deltas = [ItemDelta(player.id, cell_material.material_id, gather_amount)]
+
+    # Log gathering (achievements and gatherer leaderboard)
+    GatheringLog.objects.create(
         player=player,
+        cell=cell_material.cell,
         material=cell_material.material,
-        defaults={'quantity': 0}
+        quantity=gather_amount
     )
-    inventory.quantity += gather_amount
-    inventory.save()
 
     # Extra byproducts based on source type (multi-yield)
     extra_plan = {}
@@ -220,17 +222,13 @@ def gather_material(player, cell, material_id):
         extra_plan['Pierre'] = random.randint(1, 2)
 
     extras_awarded = []
-    if extra_plan:
+    for mname, qty in extra_plan.items():
         # Only add extras for materials that actually exist
-        existing = {m.name: m for m in Material.objects.filter(name__in=list(extra_plan.keys()))}
-        for mname, qty in extra_plan.items():
-            mat = existing.get(mname)
-            if not mat or qty <= 0:
-                continue
-            inv, _ = Inventory.objects.get_or_create(player=player, material=mat, defaults={'quantity': 0})
-            inv.quantity += qty
-            inv.save()
-            extras_awarded.append((mname, qty))
+        mat = catalog.get_material_by_name(mname)
+        if not mat or qty <= 0:
+            continue
+        item_deltas.append(ItemDelta(player.id, mat.id, qty))
+        extras_awarded.append((mname, qty))
 
     # Tool durability loss
     tool_broke = False
@@ -239,7 +237,10 @@ def gather_material(player, cell, material_id):
         # Durability loss chance (default 100%, reduced by talents/stats?)
         # For now, 1 point per use
         used_tool.durability_current -= 1
-        used_tool.save()
+        item_deltas.append(ItemDelta(
+            player.id, used_tool.material_id,
+            durability=(used_tool.durability_current, used_tool.durability_max)
+        ))
         tool_name = used_tool.material.name
 
         if used_tool.durability_current <= 0:
@@ -249,6 +250,8 @@ def gather_material(player, cell, material_id):
             # Maybe auto-delete or mark broken?
             # For now, just mark broken in UI.
 
+    apply_deltas(item_deltas, players=[player])
+
     player.energy -= energy_cost
 
     # Award gathering skill XP
@@ -270,39 +273,18 @@ def gather_material(player, cell, material_id):
 
     rarity_multiplier = rarity_multipliers.get(cell_material.material.rarity, 1)
     total_xp = int(base_xp * rarity_multiplier)
-    player.experience += total_xp
-
-    # Handle level progression
-    level_up_bonus = GameConfig.get_config('level_up_energy_bonus', 10)
-    leveled_up = False
-    while player.experience >= player.get_xp_for_level(player.level + 1):
-        player.experience -= player.get_xp_for_level(player.level + 1)
-        player.level += 1
-        player.max_energy += level_up_bonus  # Increase max energy on level up
-        player.energy = min(player.energy, player.max_energy)  # Cap current energy
-        leveled_up = True
-
-    player.save()
-
-    # Check achievements
-    new_achievements = check_achievements(
-        player,
-        'gather',
-        material_name=cell_material.material.name
-    )
 
-    # Check level up achievements
-    if leveled_up:
-        level_achievements = check_achievements(player, 'level_up')
-        new_achievements.extend(level_achievements)
+    # Written as increments, so rewards granted meanwhile by a subscriber are kept
+    player_service.grant_rewards(player, xp=total_xp)
+    player.save(update_fields=SurvivalService.vital_update_fields('energy'))
 
-    # Update quest progress
-    completed_quests = QuestService.update_quest_progress(
-        player,
-        'gather',
-        material_id=material_id,
+    # Achievements, quest progress and live leaderboards run off the request path
+    events.publish(events.Gathered(
+        player_id=player.id,
+        material_id=cell_material.material_id,
+        material_name=cell_material.material.name,
         quantity=gather_amount
-    )
+    ))
 
     extra_msg = ''
     if extras_awarded:
@@ -322,30 +304,4 @@ def gather_material(player, cell, material_id):
         'tool_broke': tool_broke
     }
 
-    # Add achievements to response if any were completed
-    if new_achievements:
-        response_data['achievements_unlocked'] = [
-            {
-                'name': ach.name,
-                'description': ach.description,
-                'icon': ach.icon,
-                'reward_xp': ach.reward_xp
-            }
-            for ach in new_achievements
-        ]
-
-    # Add completed quests to response
-    if completed_quests:
-        response_data['quests_completed'] = [
-            {
-                'quest': {
-                    'name': q['quest'].name,
-                    'icon': q['quest'].icon,
-                    'description': q['quest'].description
-                },
-                'rewards': q['rewards']
-            }
-            for q in completed_quests
-        ]
-
     return response_data, 200
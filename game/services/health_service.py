@@ -3,8 +3,9 @@ Health management service
 Handles injuries, bleeding, diseases, and body part health
 Inspired by SCUM's detailed health system
 """
+from collections import defaultdict
 from django.utils import timezone
-from django.db.models import F
+from django.db.models import F, FloatField, Q, Sum
 from decimal import Decimal
 import random
 
@@ -12,6 +13,10 @@ from ..models import (
     Player, BodyPart, PlayerBodyPart, PlayerHealthStatus,
     Disease, PlayerDisease, MedicalItem
 )
+from ..models.nutrition import PlayerNutrition
+
+# Rows per UPDATE statement when a world tick writes back its batches
+TICK_BATCH_SIZE = 1000
 
 
 def initialize_player_health(player):
@@ -147,24 +152,41 @@ def update_overall_health(player):
     return overall_health
 
 
-def process_bleeding(player):
+def refresh_overall_health(player_ids):
     """
-    Process bleeding for all injured body parts
-    Called periodically (e.g., every minute)
-
-    Returns:
-        dict with total blood loss
+    Set Player.health from the weighted body part health of many players at once
+    (batched update_overall_health: one aggregate read, one bulk write)
     """
-    health_status = PlayerHealthStatus.objects.get(player=player)
-    bleeding_parts = PlayerBodyPart.objects.filter(player=player, is_bleeding=True)
+    rows = PlayerBodyPart.objects.filter(player_id__in=player_ids).order_by().values('player_id').annotate(
+        weighted_health=Sum(F('health') * F('body_part__critical_multiplier'), output_field=FloatField()),
+        total_weight=Sum('body_part__critical_multiplier'),
+    )
+    players = [
+        Player(id=row['player_id'], health=int(row['weighted_health'] / row['total_weight'] if row['total_weight'] else 100.0))
+        for row in rows
+    ]
+    Player.objects.bulk_update(players, ['health'], batch_size=TICK_BATCH_SIZE)
+    return len(players)
+
 
-    total_blood_loss = 0.0
+def tick_bleeding(player_ids=None):
+    """
+    Process one minute of bleeding for every bleeding body part (or only those of player_ids)
 
-    for part in bleeding_parts:
+    Returns:
+        dict with rows written and blood lost per player id
+    """
+    now = timezone.now()
+    parts = PlayerBodyPart.objects.filter(is_bleeding=True)
+    if player_ids is not None:
+        parts = parts.filter(player_id__in=player_ids)
+
+    blood_loss = defaultdict(float)
+    changed_parts = []
+    for part in parts:
         if not part.is_bandaged:
             # Lose blood based on bleeding rate
-            blood_loss = part.bleeding_rate * 0.1  # Per minute
-            total_blood_loss += blood_loss
+            blood_loss[part.player_id] += part.bleeding_rate * 0.1  # Per minute
 
             # Increase pain
             part.pain_level = min(100, part.pain_level + 1)
@@ -173,30 +195,60 @@ def process_bleeding(player):
             if random.random() < 0.01:  # 1% chance per minute
                 part.is_infected = True
                 part.infection_level = 5.0
-
-            part.save()
+        elif part.bandage_quality > 50:
+            # Good bandage stops bleeding
+            part.is_bleeding = False
+            part.bleeding_rate = 0.0
+            part.bleeding_severity = 'none'
         else:
-            # Bandaged wounds have reduced bleeding
-            if part.bandage_quality > 50:
-                # Good bandage stops bleeding
-                part.is_bleeding = False
-                part.bleeding_rate = 0.0
-                part.bleeding_severity = 'none'
-                part.save()
+            continue
+        part.last_update = now
+        changed_parts.append(part)
+
+    PlayerBodyPart.objects.bulk_update(
+        changed_parts,
+        ['pain_level', 'is_infected', 'infection_level', 'is_bleeding', 'bleeding_rate', 'bleeding_severity', 'last_update'],
+        batch_size=TICK_BATCH_SIZE
+    )
 
     # Update blood volume
-    health_status.blood_volume = max(0, health_status.blood_volume - total_blood_loss)
-    health_status.save()
+    statuses = list(PlayerHealthStatus.objects.filter(player_id__in=list(blood_loss)))
+    for health_status in statuses:
+        health_status.blood_volume = max(0, health_status.blood_volume - blood_loss[health_status.player_id])
+        health_status.last_vital_update = now
+    PlayerHealthStatus.objects.bulk_update(statuses, ['blood_volume', 'last_vital_update'], batch_size=TICK_BATCH_SIZE)
+
+    # Critical blood loss affects overall health: gradual health loss
+    critical = Player.objects.filter(health_status__blood_volume__lt=50)
+    if player_ids is not None:
+        critical = critical.filter(id__in=player_ids)
+    critical_players = list(critical.only('id', 'health'))
+    for player in critical_players:
+        player.health = int(player.health * 0.98)
+    Player.objects.bulk_update(critical_players, ['health'], batch_size=TICK_BATCH_SIZE)
+
+    return {
+        'rows': len(changed_parts) + len(statuses) + len(critical_players),
+        'blood_loss': dict(blood_loss),
+    }
 
-    # Critical blood loss affects overall health
-    if health_status.blood_volume < 50:
-        player.health = int(player.health * 0.98)  # Gradual health loss
-        player.save()
+
+def process_bleeding(player):
+    """
+    Process bleeding for all injured body parts
+    Called periodically (e.g., every minute); see tick_bleeding for all players at once
+
+    Returns:
+        dict with total blood loss
+    """
+    result = tick_bleeding([player.id])
+    health_status = PlayerHealthStatus.objects.get(player=player)
+    player.refresh_from_db(fields=['health'])
 
     return {
-        'total_blood_loss': total_blood_loss,
+        'total_blood_loss': result['blood_loss'].get(player.id, 0.0),
         'current_blood_volume': health_status.blood_volume,
-        'bleeding_parts_count': bleeding_parts.count(),
+        'bleeding_parts_count': PlayerBodyPart.objects.filter(player=player, is_bleeding=True).count(),
     }
 
 
@@ -293,14 +345,21 @@ def heal_body_part(player, body_part_type, heal_amount):
     }
 
 
-def process_infections(player):
-    """
-    Process infections in body parts
-    Called periodically
+def tick_infections(player_ids=None):
     """
-    infected_parts = PlayerBodyPart.objects.filter(player=player, is_infected=True)
+    Worsen every infected body part (or only those of player_ids)
 
-    for part in infected_parts:
+    Returns:
+        dict with rows written and the number of infected parts
+    """
+    now = timezone.now()
+    parts = PlayerBodyPart.objects.filter(is_infected=True)
+    if player_ids is not None:
+        parts = parts.filter(player_id__in=player_ids)
+    parts = list(parts)
+
+    spreading = set()
+    for part in parts:
         # Infection worsens over time if not treated
         part.infection_level = min(100, part.infection_level + 1.0)
 
@@ -314,14 +373,35 @@ def process_infections(player):
 
         # Very high infection can spread to disease
         if part.infection_level > 80 and random.random() < 0.05:
-            contract_disease(player, 'Infection bactérienne')
+            spreading.add(part.player_id)
+
+        part.last_update = now
+
+    PlayerBodyPart.objects.bulk_update(
+        parts, ['infection_level', 'health', 'pain_level', 'last_update'], batch_size=TICK_BATCH_SIZE
+    )
+
+    for player in Player.objects.filter(id__in=spreading):
+        contract_disease(player, 'Infection bactérienne')
 
-        part.save()
+    players_updated = refresh_overall_health({part.player_id for part in parts})
 
+    return {
+        'rows': len(parts) + players_updated,
+        'infected_parts_count': len(parts),
+    }
+
+
+def process_infections(player):
+    """
+    Process infections in body parts
+    Called periodically; see tick_infections for all players at once
+    """
+    result = tick_infections([player.id])
     update_overall_health(player)
 
     return {
-        'infected_parts_count': infected_parts.count(),
+        'infected_parts_count': result['infected_parts_count'],
     }
 
 
@@ -367,18 +447,32 @@ def contract_disease(player, disease_name, initial_severity=10.0):
     }
 
 
-def process_diseases(player):
-    """
-    Process all active diseases affecting the player
-    Called periodically (e.g., every hour)
+def tick_diseases(player_ids=None):
     """
-    active_diseases = PlayerDisease.objects.filter(player=player, current_severity__gt=0)
-    health_status = PlayerHealthStatus.objects.get(player=player)
+    Progress every active disease (or only those of player_ids) and update
+    the sickness, fever and fatigue of the affected players
 
-    total_health_drain = 0.0
-    total_stat_penalty = 0.0
+    Returns:
+        dict with rows written and health drained per player id
+    """
+    now = timezone.now()
+    active_diseases = PlayerDisease.objects.filter(current_severity__gt=0).select_related('disease')
+    statuses = PlayerHealthStatus.objects.filter(Q(player_id__in=active_diseases.values('player_id')) | Q(is_sick=True))
+    if player_ids is not None:
+        active_diseases = active_diseases.filter(player_id__in=player_ids)
+        statuses = statuses.filter(player_id__in=player_ids)
+    active_diseases = list(active_diseases)
+    statuses = {health_status.player_id: health_status for health_status in statuses}
+
+    health_drain = defaultdict(float)
+    stat_penalty = defaultdict(float)
+    sickness = defaultdict(float)
+    still_sick = set()
 
     for player_disease in active_diseases:
+        health_status = statuses.get(player_disease.player_id)
+        if health_status is None:
+            continue
         disease = player_disease.disease
 
         # Disease progression
@@ -397,8 +491,9 @@ def process_diseases(player):
 
         # Apply disease effects
         if player_disease.current_severity > 0:
-            total_health_drain += disease.health_drain_rate * (player_disease.current_severity / 100.0)
-            total_stat_penalty += disease.stat_penalty * (player_disease.current_severity / 100.0)
+            still_sick.add(player_disease.player_id)
+            health_drain[player_disease.player_id] += disease.health_drain_rate * (player_disease.current_severity / 100.0)
+            stat_penalty[player_disease.player_id] += disease.stat_penalty * (player_disease.current_severity / 100.0)
 
             # Symptoms
             if disease.causes_fever:
@@ -407,64 +502,102 @@ def process_diseases(player):
             if disease.causes_fatigue:
                 health_status.exhaustion_level = min(100, health_status.exhaustion_level + 1)
 
-        player_disease.save()
-
-    # Apply total health drain
-    if total_health_drain > 0:
-        player.health = max(0, int(player.health - total_health_drain))
-        player.save()
+        sickness[player_disease.player_id] = max(sickness[player_disease.player_id], player_disease.current_severity)
+        player_disease.last_progression_update = now
 
     # Check if still sick
-    if not active_diseases.exists():
-        health_status.is_sick = False
-        health_status.body_temperature = 37.0
+    for player_id, health_status in statuses.items():
+        if player_id not in still_sick:
+            health_status.is_sick = False
+            health_status.body_temperature = 37.0
+        health_status.sickness_severity = sickness[player_id] if player_id in still_sick else 0
+        health_status.last_vital_update = now
+
+    PlayerDisease.objects.bulk_update(
+        active_diseases, ['current_severity', 'last_progression_update'], batch_size=TICK_BATCH_SIZE
+    )
+    PlayerHealthStatus.objects.bulk_update(
+        list(statuses.values()),
+        ['is_sick', 'body_temperature', 'exhaustion_level', 'sickness_severity', 'last_vital_update'],
+        batch_size=TICK_BATCH_SIZE
+    )
 
-    health_status.sickness_severity = max(pd.current_severity for pd in active_diseases) if active_diseases.exists() else 0
-    health_status.save()
+    # Apply total health drain
+    drained = list(Player.objects.filter(id__in=[pid for pid, drain in health_drain.items() if drain > 0]).only('id', 'health'))
+    for player in drained:
+        player.health = max(0, int(player.health - health_drain[player.id]))
+    Player.objects.bulk_update(drained, ['health'], batch_size=TICK_BATCH_SIZE)
 
     return {
-        'active_diseases_count': active_diseases.count(),
-        'total_health_drain': total_health_drain,
-        'total_stat_penalty': total_stat_penalty,
+        'rows': len(active_diseases) + len(statuses) + len(drained),
+        'active_diseases_count': sum(1 for player_disease in active_diseases if player_disease.current_severity > 0),
+        'health_drain': dict(health_drain),
+        'stat_penalty': dict(stat_penalty),
     }
 
 
-def natural_healing(player):
+def process_diseases(player):
     """
-    Process natural health regeneration
-    Called periodically (e.g., every hour)
-    Healing is affected by nutrition, rest, and overall condition
+    Process all active diseases affecting the player
+    Called periodically (e.g., every hour); see tick_diseases for all players at once
     """
-    health_status = PlayerHealthStatus.objects.get(player=player)
-
-    # Base healing rate
-    healing = health_status.health_regen_rate
+    result = tick_diseases([player.id])
+    player.refresh_from_db(fields=['health'])
 
-    # Nutrition affects healing
-    try:
-        nutrition_status = player.nutrition_status
-        nutrition_score = nutrition_status.overall_nutrition_score / 100.0
-        healing *= nutrition_status.healing_rate * nutrition_score
-    except:
-        pass
+    return {
+        'active_diseases_count': result['active_diseases_count'],
+        'total_health_drain': result['health_drain'].get(player.id, 0.0),
+        'total_stat_penalty': result['stat_penalty'].get(player.id, 0.0),
+    }
 
-    # Exhaustion reduces healing
-    if health_status.exhaustion_level > 50:
-        healing *= 0.5
 
-    # Disease reduces healing
-    if health_status.is_sick:
-        healing *= 0.3
+def tick_healing(player_ids=None):
+    """
+    Heal every damaged, unfractured body part (or only those of player_ids)
+    Healing is affected by nutrition, rest, and overall condition
 
-    # Heal body parts gradually
+    Returns:
+        dict with rows written and the healing rate per player id
+    """
+    now = timezone.now()
     damaged_parts = PlayerBodyPart.objects.filter(
-        player=player,
         health__lt=100
     ).exclude(is_fractured=True)  # Fractured parts need splints
+    if player_ids is not None:
+        damaged_parts = damaged_parts.filter(player_id__in=player_ids)
+
+    player_filter = Q(player_id__in=damaged_parts.values('player_id'))
+    statuses = PlayerHealthStatus.objects.filter(player_filter)
+    nutrition = {status.player_id: status for status in PlayerNutrition.objects.filter(player_filter)}
+
+    healing = {}
+    for health_status in statuses:
+        # Base healing rate
+        rate = health_status.health_regen_rate
+
+        # Nutrition affects healing
+        nutrition_status = nutrition.get(health_status.player_id)
+        if nutrition_status:
+            rate *= nutrition_status.healing_rate * nutrition_status.overall_nutrition_score / 100.0
+
+        # Exhaustion reduces healing
+        if health_status.exhaustion_level > 50:
+            rate *= 0.5
 
+        # Disease reduces healing
+        if health_status.is_sick:
+            rate *= 0.3
+
+        healing[health_status.player_id] = (rate, health_status.immune_strength)
+
+    # Heal body parts gradually
+    healed_parts = []
     for part in damaged_parts:
+        if part.player_id not in healing:
+            continue
+        part_healing, immune_strength = healing[part.player_id]
+
         # Faster healing if splinted
-        part_healing = healing
         if part.is_splinted:
             part_healing *= 1.5
 
@@ -474,21 +607,51 @@ def natural_healing(player):
         part.pain_level = max(0, part.pain_level - 0.5)
 
         # Reduce infection if immune system is strong
-        if part.is_infected and health_status.immune_strength > 70:
+        if part.is_infected and immune_strength > 70:
             part.infection_level = max(0, part.infection_level - 0.5)
             if part.infection_level == 0:
                 part.is_infected = False
 
-        part.save()
+        part.last_update = now
+        healed_parts.append(part)
+
+    PlayerBodyPart.objects.bulk_update(
+        healed_parts, ['health', 'pain_level', 'infection_level', 'is_infected', 'last_update'],
+        batch_size=TICK_BATCH_SIZE
+    )
+    players_updated = refresh_overall_health({part.player_id for part in healed_parts})
 
+    return {
+        'rows': len(healed_parts) + players_updated,
+        'healing': {player_id: rate for player_id, (rate, _) in healing.items()},
+        'parts_healed': len(healed_parts),
+    }
+
+
+def natural_healing(player):
+    """
+    Process natural health regeneration
+    Called periodically (e.g., every hour); see tick_healing for all players at once
+    """
+    health_status = PlayerHealthStatus.objects.get(player=player)
+    result = tick_healing([player.id])
     update_overall_health(player)
 
     return {
-        'healing_amount': healing,
-        'parts_healed': damaged_parts.count(),
+        'healing_amount': result['healing'].get(player.id, health_status.health_regen_rate),
+        'parts_healed': result['parts_healed'],
     }
 
 
+# World tick steps, in the order they run (see the world_tick management command)
+TICK_STEPS = {
+    'bleeding': tick_bleeding,
+    'infections': tick_infections,
+    'diseases': tick_diseases,
+    'healing': tick_healing,
+}
+
+
 def get_player_health_summary(player):
     """
     Get comprehensive health summary for the player
@@ -1,7 +1,9 @@
 import random
 import math
-from ..models import MapCell, Mob, Inventory, Material
+from ..models import MapCell, Mob
 from . import player_service
+from .inventory_ledger_service import ItemDelta, apply_deltas
+from .. import catalog
 from ..services.energy_service import apply_building_effects_to_action
 
 def hunt_at_location(player):
@@ -91,6 +93,7 @@ def hunt_at_location(player):
     # Loot
     loot_table = mob.get_loot_table()
     loot_results = []
+    loot_deltas = []
     
     # Loot bonus from talents
     loot_bonus_chance = hunting_effects.get('loot_bonus_chance', 0)
@@ -112,14 +115,10 @@ def hunt_at_location(player):
                 
             quantity = random.randint(min_q, max_q)
             
-            try:
-                material = Material.objects.get(name=mat_name)
-                inv_item, _ = Inventory.objects.get_or_create(player=player, material=material)
-                inv_item.quantity += quantity
-                inv_item.save()
+            material = catalog.get_material_by_name(mat_name)
+            if material:
+                loot_deltas.append(ItemDelta(player.id, material.id, quantity))
                 loot_results.append({'name': mat_name, 'quantity': quantity})
-            except Material.DoesNotExist:
-                pass
 
     # Rare loot chance from talents
     rare_loot_chance = hunting_effects.get('rare_loot_chance', 0)
@@ -127,28 +126,22 @@ def hunt_at_location(player):
         # Add a bonus rare item (e.g., extra leather or bones)
         rare_items = ['Cuir', 'Os']
         for rare_item_name in rare_items:
-            try:
-                rare_material = Material.objects.get(name=rare_item_name)
-                inv_item, _ = Inventory.objects.get_or_create(player=player, material=rare_material)
+            rare_material = catalog.get_material_by_name(rare_item_name)
+            if rare_material:
                 bonus_qty = random.randint(1, 2)
-                inv_item.quantity += bonus_qty
-                inv_item.save()
+                loot_deltas.append(ItemDelta(player.id, rare_material.id, bonus_qty))
                 loot_results.append({'name': rare_item_name, 'quantity': bonus_qty, 'rare': True})
-            except Material.DoesNotExist:
-                pass
+
+    # All loot lands in the inventory in one batch
+    apply_deltas(loot_deltas, players=[player])
 
     # Award hunting skill XP
     hunting_xp = mob.xp_reward
     player_service.award_xp(player, 'hunting', hunting_xp)
 
-    # Update quest progress for defeating mobs
-    from .quest_service import QuestService
-    completed_quests = QuestService.update_quest_progress(
-        player,
-        'defeat',
-        mob_id=mob.id,
-        quantity=1
-    )
+    # Quest progress and achievements for defeating mobs run off the request path
+    from .. import events
+    events.publish(events.MobDefeated(player_id=player.id, mob_id=mob.id, mob_name=mob.name, source='hunt'))
 
     result = {
         'message': f'Vous avez chassé un {mob.name} !',
@@ -159,11 +152,4 @@ def hunt_at_location(player):
         'loot': loot_results
     }
 
-    # Add completed quests info if any
-    if completed_quests:
-        result['completed_quests'] = [{
-            'name': cq['quest'].name,
-            'rewards': cq['rewards']
-        } for cq in completed_quests]
-
     return result, 200
@@ -0,0 +1,242 @@
+"""
+Inventory Ledger Service - the single write path for item movements
+
+Callers describe a batch of ItemDelta changes (player, material, quantity
+delta, optional durability) and apply_deltas() applies them in one
+transaction: the players' rows and then the stacks involved are locked and
+read, validated against that snapshot (no stack may go negative), then written
+with one bulk update, one bulk insert and at most one delete, whatever the
+batch size.
+
+It also keeps Player.carry_weight in step: each batch shifts it by the weight
+it moved, in the same transaction. Direct Inventory saves and deletes made
+outside the ledger shift it through game.signals (shift_carry_weight), and
+recompute_carry_weights() rebuilds it from the inventory when it has drifted.
+"""
+import threading
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Case, F, FloatField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from ..models import Inventory, Material, Player
+from .. import catalog
+
+_APPLYING = threading.local()
+
+
+@dataclass(frozen=True)
+class ItemDelta:
+    player_id: int
+    material_id: int
+    delta: int = 0
+    durability: tuple = None  # (current, max) to set on the stack
+    init_durability_only: bool = False  # only set durability on stacks that have none
+
+
+class InsufficientQuantity(Exception):
+    """A batch would take more of a material than the player has"""
+
+    def __init__(self, player_id, material_id, available, required, has_stack):
+        self.player_id = player_id
+        self.material_id = material_id
+        self.available = available
+        self.required = required
+        self.has_stack = has_stack
+        super().__init__(f"Player {player_id} has {available} of material {material_id}, needs {required}")
+
+
+def get_quantities(player_id, material_ids):
+    """Current stack quantities {material_id: quantity} (unlocked read, for checks and messages)"""
+    return dict(
+        Inventory.objects.filter(player_id=player_id, material_id__in=list(material_ids))
+        .values_list('material_id', 'quantity')
+    )
+
+
+def apply_deltas(deltas, players=()):
+    """
+    Apply a batch of inventory changes atomically.
+
+    `players` are in-memory Player instances of the batch whose carry_weight
+    should be updated along with the database.
+
+    Deltas on the same (player, material) are merged, but removals are checked
+    against the stack as it was before the batch: items received in a batch
+    cannot be spent in that same batch. Stacks reaching zero are deleted,
+    missing stacks are created.
+
+    Returns:
+        {(player_id, material_id): Inventory or None if the stack was removed}
+
+    Raises:
+        InsufficientQuantity: if a stack would go negative (nothing is written)
+    """
+    merged = {}
+    taken = {}
+    for change in deltas:
+        key = (change.player_id, int(change.material_id))
+        if change.delta < 0:
+            taken[key] = taken.get(key, 0) - change.delta
+        previous = merged.get(key)
+        if previous is None:
+            merged[key] = change
+        else:
+            merged[key] = ItemDelta(
+                player_id=change.player_id,
+                material_id=key[1],
+                delta=previous.delta + change.delta,
+                durability=change.durability or previous.durability,
+                init_durability_only=change.init_durability_only if change.durability else previous.init_durability_only,
+            )
+    if not merged:
+        return {}
+
+    player_ids = {player_id for player_id, _ in merged}
+    material_ids = {material_id for _, material_id in merged}
+
+    with transaction.atomic():
+        # Player rows first, then stacks, each in id order: the same order as callers that lock the
+        # player before moving items (events.dispatch, trading), so concurrent batches never deadlock
+        list(Player.objects.select_for_update().filter(id__in=player_ids).order_by('id').values_list('id', flat=True))
+        stacks = {
+            (inv.player_id, inv.material_id): inv
+            for inv in Inventory.objects.select_for_update().filter(
+                player_id__in=player_ids,
+                material_id__in=material_ids
+            ).order_by('player_id', 'material_id')
+        }
+
+        for key, required in taken.items():
+            inv = stacks.get(key)
+            available = inv.quantity if inv else 0
+            if available < required:
+                raise InsufficientQuantity(key[0], key[1], available, required, inv is not None)
+
+        results = {}
+        to_update, to_create, to_delete = [], [], []
+        for key, change in merged.items():
+            inv = stacks.get(key)
+            if inv is None:
+                if change.delta <= 0:
+                    continue
+                inv = Inventory(player_id=key[0], material_id=key[1], quantity=0)
+                to_create.append(inv)
+            elif change.delta or change.durability:
+                to_update.append(inv)
+            else:
+                results[key] = inv
+                continue
+
+            inv.quantity += change.delta
+            if change.durability and not (change.init_durability_only and inv.durability_max > 0):
+                inv.durability_current, inv.durability_max = change.durability
+
+            if inv.quantity <= 0 and inv.pk:
+                to_delete.append(inv.pk)
+                to_update.remove(inv)
+                results[key] = None
+            else:
+                results[key] = inv
+
+        if to_update:
+            Inventory.objects.bulk_update(to_update, ['quantity', 'durability_current', 'durability_max'])
+        if to_create:
+            Inventory.objects.bulk_create(to_create)
+        for inv in to_update + to_create:
+            # bulk writes send no post_save: record the new stored quantity so a later
+            # save/delete of a returned stack shifts the carry weight from here
+            inv._stored_quantity = inv.quantity
+        if to_delete:
+            # The batch accounts for these rows itself (see is_applying)
+            _APPLYING.active = True
+            try:
+                Inventory.objects.filter(pk__in=to_delete).delete()
+            finally:
+                _APPLYING.active = False
+
+        weights = material_weights(material_ids)
+        weight_deltas = {}
+        for (player_id, material_id), change in merged.items():
+            if change.delta:
+                weight_deltas[player_id] = weight_deltas.get(player_id, 0.0) + weights.get(material_id, 0.0) * change.delta
+        _shift_carry_weights(weight_deltas, players)
+
+    return results
+
+
+def add_items(player, material_id, quantity, durability=None):
+    """Give a player some of a material; returns the resulting stack"""
+    results = apply_deltas([ItemDelta(player.id, material_id, quantity, durability)], players=[player])
+    return results.get((player.id, int(material_id)))
+
+
+def remove_items(player, material_id, quantity):
+    """Take some of a material from a player; returns the stack or None once emptied"""
+    results = apply_deltas([ItemDelta(player.id, material_id, -quantity)], players=[player])
+    return results.get((player.id, int(material_id)))
+
+
+def is_applying():
+    """True while a ledger batch deletes its emptied stacks (signal handlers skip those rows)"""
+    return getattr(_APPLYING, 'active', False)
+
+
+def material_weights(material_ids):
+    """{material_id: weight}, from the catalog when possible"""
+    weights = {}
+    missing = set()
+    for material_id in material_ids:
+        material = catalog.get_material(material_id)
+        if material is None:
+            missing.add(material_id)
+        else:
+            weights[material_id] = material.weight
+    if missing:
+        weights.update(Material.objects.filter(id__in=missing).values_list('id', 'weight'))
+    return weights
+
+
+def shift_carry_weight(player_id, material_id, quantity_delta):
+    """Shift a player's stored carry weight by a quantity change of one material"""
+    weight = material_weights([material_id]).get(material_id, 0.0)
+    if weight and quantity_delta:
+        _shift_carry_weights({player_id: weight * quantity_delta})
+
+
+def _shift_carry_weights(weight_deltas, players=()):
+    weight_deltas = {player_id: delta for player_id, delta in weight_deltas.items() if delta}
+    if not weight_deltas:
+        return
+    # One UPDATE whatever the number of players in the batch
+    Player.objects.filter(id__in=list(weight_deltas)).update(
+        carry_weight=F('carry_weight') + Case(
+            *[When(id=player_id, then=Value(delta)) for player_id, delta in weight_deltas.items()],
+            default=Value(0.0),
+            output_field=FloatField()
+        )
+    )
+    for player in players:
+        player.carry_weight += weight_deltas.get(player.id, 0.0)
+
+
+def carry_weight_subquery():
+    """Per-player inventory weight, for annotate()/update() on Player"""
+    return Coalesce(
+        Subquery(
+            Inventory.objects.filter(player=OuterRef('pk')).values('player').annotate(
+                total=Sum(F('quantity') * F('material__weight'), output_field=FloatField())
+            ).values('total')
+        ),
+        Value(0.0),
+        output_field=FloatField()
+    )
+
+
+def recompute_carry_weights(player_ids=None):
+    """Rebuild Player.carry_weight from the inventory; returns the number of rows updated"""
+    players = Player.objects.all()
+    if player_ids is not None:
+        players = players.filter(id__in=list(player_ids))
+    return players.update(carry_weight=carry_weight_subquery())
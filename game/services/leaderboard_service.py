@@ -1,21 +1,84 @@
 """
 Leaderboard Service - Manages global rankings
 """
-from django.db import transaction
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import JSONObject
+from django.utils import timezone
 from game.models import Leaderboard, Player, GatheringLog, CraftingLog, CombatLog, PlayerQuest
-from django.db.models import Sum, Count
+from game import ranking
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Metadata key carrying the score of event-fed categories
+INDEXED_METADATA_KEYS = {
+    'gatherer': 'total_gathered',
+    'crafter': 'total_crafted',
+    'combatant': 'victories',
+    'quests': 'quests_completed',
+}
+
+
+def _level_score(player):
+    return player.level * 1000000 + player.experience, {'level': player.level, 'experience': player.experience}
+
+
+def _wealth_score(player):
+    """Cash + bank card balance"""
+    total_wealth = player.money + player.credit_card_balance
+    return total_wealth, {'money': player.money, 'bank_balance': player.credit_card_balance, 'total': total_wealth}
+
+
+def _explorer_score(player):
+    return player.total_moves, {'total_moves': player.total_moves, 'current_pos': f"({player.grid_x}, {player.grid_y})"}
+
+
+# Categories scored from Player columns: {category: score function}, and the columns they read
+PLAYER_CATEGORIES = {
+    'level': _level_score,
+    'wealth': _wealth_score,
+    'explorer': _explorer_score,
+}
+PLAYER_SCORE_FIELDS = ('level', 'experience', 'money', 'credit_card_balance', 'total_moves', 'grid_x', 'grid_y')
+
 
 class LeaderboardService:
     """Service for managing leaderboards"""
 
     @staticmethod
-    @transaction.atomic
     def update_all_leaderboards():
-        """Update all leaderboard categories"""
+        """
+        Refresh the stored ranks of every category.
+
+        Scores are kept current as players change: event-fed categories by
+        record_event, level/wealth/explorer by sync_players (StatsChanged
+        events). This only recomputes ranks, in SQL, writing the rows whose
+        rank moved, and re-seeds the shared index; no Player row or game log
+        is read.
+
+        Returns:
+            Number of entries whose rank changed
+        """
+        updated_count = 0
+        for category, _ in Leaderboard.CATEGORY_CHOICES:
+            if category not in ranking.INDEXED_CATEGORIES:
+                with transaction.atomic():
+                    updated_count += LeaderboardService.recompute_ranks(category)
+        updated_count += LeaderboardService.snapshot_index()
+
+        logger.info(f"Re-ranked {updated_count} leaderboard entries")
+        return updated_count
+
+    @staticmethod
+    def rebuild_all_leaderboards():
+        """
+        Recompute every category from the Player table and the game logs.
+
+        Repair tool (snapshot_leaderboards --full): reads every player and
+        aggregates the full logs. Each category is synced on its own short
+        transaction and only entries whose score changed are written.
+        """
         updated_count = 0
 
         updated_count += LeaderboardService.update_level_leaderboard()
@@ -26,137 +89,91 @@ class LeaderboardService:
         updated_count += LeaderboardService.update_combatant_leaderboard()
         updated_count += LeaderboardService.update_quests_leaderboard()
 
-        logger.info(f"Updated {updated_count} leaderboard entries")
+        logger.info(f"Rebuilt {updated_count} leaderboard entries")
         return updated_count
 
     @staticmethod
-    def update_level_leaderboard():
-        """Update level leaderboard"""
-        players = Player.objects.all().order_by('-level', '-experience')
-        count = 0
-
-        for rank, player in enumerate(players, start=1):
-            entry, created = Leaderboard.objects.update_or_create(
-                category='level',
-                player=player,
-                defaults={
-                    'score': player.level * 1000000 + player.experience,
-                    'rank': rank,
-                    'metadata': {
-                        'level': player.level,
-                        'experience': player.experience
-                    }
-                }
+    def sync_players(players):
+        """
+        Bring the level, wealth and explorer entries of some players up to date.
+
+        Args:
+            players: loaded Player instances (current values)
+
+        Returns:
+            Number of entries written (new or changed)
+        """
+        players = list(players)
+        if not players:
+            return 0
+        existing = {
+            (category, player_id): (score, metadata)
+            for category, player_id, score, metadata in Leaderboard.objects.filter(
+                category__in=list(PLAYER_CATEGORIES), player_id__in=[player.id for player in players]
+            ).values_list('category', 'player_id', 'score', 'metadata')
+        }
+        changed = []
+        for player in players:
+            for category, score_of in PLAYER_CATEGORIES.items():
+                score, metadata = score_of(player)
+                if existing.get((category, player.id)) != (score, metadata):
+                    changed.append(Leaderboard(category=category, player=player, score=score, metadata=metadata))
+        if changed:
+            Leaderboard.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=['category', 'player'],
+                update_fields=['score', 'metadata', 'last_updated'],
             )
-            count += 1
+        return len(changed)
+
+    @staticmethod
+    def _player_category(category):
+        """Full recompute of a Player-column category"""
+        fields = ['id', *PLAYER_SCORE_FIELDS]
+        score_of = PLAYER_CATEGORIES[category]
+        scores = {
+            player.id: score_of(player)
+            for player in Player.objects.only(*fields).iterator(chunk_size=2000)
+        }
+        return LeaderboardService.sync_category(category, scores)
 
-        return count
+    @staticmethod
+    def update_level_leaderboard():
+        """Update level leaderboard"""
+        return LeaderboardService._player_category('level')
 
     @staticmethod
     def update_wealth_leaderboard():
-        """Update wealth leaderboard"""
-        players = Player.objects.all().order_by('-money', '-bank_balance')
-        count = 0
-
-        for rank, player in enumerate(players, start=1):
-            total_wealth = player.money + player.bank_balance
-            entry, created = Leaderboard.objects.update_or_create(
-                category='wealth',
-                player=player,
-                defaults={
-                    'score': total_wealth,
-                    'rank': rank,
-                    'metadata': {
-                        'money': player.money,
-                        'bank_balance': player.bank_balance,
-                        'total': total_wealth
-                    }
-                }
-            )
-            count += 1
-
-        return count
+        """Update wealth leaderboard (cash + bank card balance)"""
+        return LeaderboardService._player_category('wealth')
 
     @staticmethod
     def update_gatherer_leaderboard():
         """Update gatherer leaderboard"""
         # Count total gathering actions
-        stats = GatheringLog.objects.values('player').annotate(
-            total=Count('id')
-        ).order_by('-total')
-
-        count = 0
-        for rank, stat in enumerate(stats, start=1):
-            try:
-                player = Player.objects.get(id=stat['player'])
-                entry, created = Leaderboard.objects.update_or_create(
-                    category='gatherer',
-                    player=player,
-                    defaults={
-                        'score': stat['total'],
-                        'rank': rank,
-                        'metadata': {
-                            'total_gathered': stat['total']
-                        }
-                    }
-                )
-                count += 1
-            except Player.DoesNotExist:
-                continue
-
-        return count
+        stats = GatheringLog.objects.values('player').annotate(total=Count('id'))
+        scores = {
+            stat['player']: (stat['total'], {'total_gathered': stat['total']})
+            for stat in stats
+        }
+        return LeaderboardService.sync_category('gatherer', scores)
 
     @staticmethod
     def update_crafter_leaderboard():
         """Update crafter leaderboard"""
-        # Count total crafting actions
-        stats = CraftingLog.objects.values('player').annotate(
-            total=Sum('quantity')
-        ).order_by('-total')
-
-        count = 0
-        for rank, stat in enumerate(stats, start=1):
-            try:
-                player = Player.objects.get(id=stat['player'])
-                entry, created = Leaderboard.objects.update_or_create(
-                    category='crafter',
-                    player=player,
-                    defaults={
-                        'score': stat['total'] or 0,
-                        'rank': rank,
-                        'metadata': {
-                            'total_crafted': stat['total'] or 0
-                        }
-                    }
-                )
-                count += 1
-            except Player.DoesNotExist:
-                continue
-
-        return count
+        # Count total crafted items
+        stats = CraftingLog.objects.values('player').annotate(total=Sum('quantity'))
+        scores = {
+            stat['player']: (stat['total'] or 0, {'total_crafted': stat['total'] or 0})
+            for stat in stats
+        }
+        return LeaderboardService.sync_category('crafter', scores)
 
     @staticmethod
     def update_explorer_leaderboard():
         """Update explorer leaderboard"""
-        players = Player.objects.all().order_by('-total_moves')
-        count = 0
-
-        for rank, player in enumerate(players, start=1):
-            entry, created = Leaderboard.objects.update_or_create(
-                category='explorer',
-                player=player,
-                defaults={
-                    'score': player.total_moves,
-                    'rank': rank,
-                    'metadata': {
-                        'total_moves': player.total_moves,
-                        'current_pos': f"({player.grid_x}, {player.grid_y})"
-                    }
-                }
-            )
-            count += 1
-
-        return count
+        return LeaderboardService._player_category('explorer')
 
     @staticmethod
     def update_combatant_leaderboard():
@@ -164,30 +181,12 @@ class LeaderboardService:
         # Count victories
         stats = CombatLog.objects.filter(
             result='victory'
-        ).values('player').annotate(
-            victories=Count('id')
-        ).order_by('-victories')
-
-        count = 0
-        for rank, stat in enumerate(stats, start=1):
-            try:
-                player = Player.objects.get(id=stat['player'])
-                entry, created = Leaderboard.objects.update_or_create(
-                    category='combatant',
-                    player=player,
-                    defaults={
-                        'score': stat['victories'],
-                        'rank': rank,
-                        'metadata': {
-                            'victories': stat['victories']
-                        }
-                    }
-                )
-                count += 1
-            except Player.DoesNotExist:
-                continue
-
-        return count
+        ).values('player').annotate(victories=Count('id'))
+        scores = {
+            stat['player']: (stat['victories'], {'victories': stat['victories']})
+            for stat in stats
+        }
+        return LeaderboardService.sync_category('combatant', scores)
 
     @staticmethod
     def update_quests_leaderboard():
@@ -195,30 +194,168 @@ class LeaderboardService:
         # Count completed quests
         stats = PlayerQuest.objects.filter(
             status='completed'
-        ).values('player').annotate(
-            total=Sum('times_completed')
-        ).order_by('-total')
+        ).values('player').annotate(total=Sum('times_completed'))
+        scores = {
+            stat['player']: (stat['total'] or 0, {'quests_completed': stat['total'] or 0})
+            for stat in stats
+        }
+        return LeaderboardService.sync_category('quests', scores)
+
+    @staticmethod
+    def sync_category(category, scores):
+        """
+        Bring a category in line with freshly computed scores.
+
+        Args:
+            category: Leaderboard category code
+            scores: {player_id: (score, metadata)} for every ranked player
+
+        Returns:
+            Number of entries written (new or changed)
+        """
+        existing = {
+            player_id: (score, metadata)
+            for player_id, score, metadata in Leaderboard.objects.filter(
+                category=category
+            ).values_list('player_id', 'score', 'metadata')
+        }
+        changed = [
+            Leaderboard(category=category, player_id=player_id, score=score, metadata=metadata)
+            for player_id, (score, metadata) in scores.items()
+            if existing.get(player_id) != (score, metadata)
+        ]
+        removed = [player_id for player_id in existing if player_id not in scores]
+
+        if not changed and not removed:
+            return 0
+
+        with transaction.atomic():
+            Leaderboard.objects.bulk_create(
+                changed,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=['category', 'player'],
+                update_fields=['score', 'metadata', 'last_updated'],
+            )
+            if removed:
+                Leaderboard.objects.filter(category=category, player_id__in=removed).delete()
+            LeaderboardService.recompute_ranks(category)
+
+        if category in ranking.INDEXED_CATEGORIES and ranking.get_backend() is not None:
+            # Re-seed the live index from the reconciled scores once they are committed
+            transaction.on_commit(lambda: ranking.get_backend().load(
+                category, [(player_id, score) for player_id, (score, _) in scores.items()]
+            ))
+
+        return len(changed)
+
+    @staticmethod
+    def recompute_ranks(category):
+        """
+        Recompute ranks of a category with a single windowed UPDATE.
+        Players with equal scores share a rank; only rows whose rank moved are written.
+
+        Returns:
+            Number of entries whose rank changed
+        """
+        table = connection.ops.quote_name(Leaderboard._meta.db_table)
+        rank = connection.ops.quote_name('rank')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {table} SET {rank} = ranked.new_rank
+                FROM (
+                    SELECT id, RANK() OVER (ORDER BY score DESC) AS new_rank
+                    FROM {table} WHERE category = %s
+                ) AS ranked
+                WHERE {table}.id = ranked.id AND {table}.{rank} <> ranked.new_rank
+                """,
+                [category]
+            )
+            return cursor.rowcount
+
+    @staticmethod
+    def _indexed(category):
+        """Shared ranking index of an event-fed category (seeded from the table), or None"""
+        if category not in ranking.INDEXED_CATEGORIES or not ranking.index_enabled():
+            return None
+        backend = ranking.get_backend()
+        if backend is not None and not backend.is_loaded(category):
+            backend.load(category, Leaderboard.objects.filter(
+                category=category
+            ).values_list('player_id', 'score'))
+        return backend
+
+    @staticmethod
+    def record_event(player_id, category, delta=1):
+        """
+        Add to a player's score in the current transaction.
+
+        The Leaderboard row is incremented with F() (created if missing), so
+        concurrent events from any worker add up and a rollback drops them.
+        The shared index, when configured, follows once the transaction commits.
 
-        count = 0
-        for rank, stat in enumerate(stats, start=1):
+        Args:
+            player_id: Player id
+            category: One of ranking.INDEXED_CATEGORIES
+            delta: Score increment
+        """
+        if category not in ranking.INDEXED_CATEGORIES or not delta or not ranking.index_enabled():
+            return
+
+        LeaderboardService._add_score(player_id, category, delta)
+
+        def apply():
             try:
-                player = Player.objects.get(id=stat['player'])
-                entry, created = Leaderboard.objects.update_or_create(
-                    category='quests',
-                    player=player,
-                    defaults={
-                        'score': stat['total'] or 0,
-                        'rank': rank,
-                        'metadata': {
-                            'quests_completed': stat['total'] or 0
-                        }
-                    }
+                backend = ranking.get_backend()
+                if backend is not None and backend.is_loaded(category):
+                    backend.increment(category, player_id, delta)
+            except Exception as e:
+                logger.error(f"Error updating live leaderboard {category}: {e}")
+
+        transaction.on_commit(apply)
+
+    @staticmethod
+    def _add_score(player_id, category, delta):
+        key = INDEXED_METADATA_KEYS[category]
+        entries = Leaderboard.objects.filter(category=category, player_id=player_id)
+        increment = {
+            'score': F('score') + delta,
+            'metadata': JSONObject(**{key: F('score') + delta}),
+            'last_updated': timezone.now(),
+        }
+        if entries.update(**increment):
+            return
+        try:
+            with transaction.atomic():
+                Leaderboard.objects.create(
+                    category=category, player_id=player_id, score=delta, metadata={key: delta}
                 )
-                count += 1
-            except Player.DoesNotExist:
-                continue
+        except IntegrityError:
+            # Created by a concurrent event in the meantime
+            entries.update(**increment)
+
+    @staticmethod
+    def snapshot_index():
+        """
+        Refresh the stored ranks of the event-fed categories.
 
-        return count
+        Their scores are already persisted by record_event; this recomputes the
+        rank column and re-seeds the shared index, if any, from the table.
+
+        Returns:
+            Number of entries whose rank changed
+        """
+        updated_count = 0
+        backend = ranking.get_backend()
+        for category in ranking.INDEXED_CATEGORIES:
+            with transaction.atomic():
+                updated_count += LeaderboardService.recompute_ranks(category)
+            if backend is not None:
+                backend.load(category, Leaderboard.objects.filter(
+                    category=category
+                ).values_list('player_id', 'score'))
+        return updated_count
 
     @staticmethod
     def get_leaderboard(category, limit=100):
@@ -227,9 +364,55 @@ class LeaderboardService:
             category=category
         ).select_related('player__user').order_by('rank')[:limit]
 
+    @staticmethod
+    def get_live_top(category, limit=10):
+        """
+        Top players of an event-fed category (shared index, or the table).
+
+        Returns:
+            [{'player_id', 'rank', 'score'}], or None if the category is not indexed
+        """
+        if category not in ranking.INDEXED_CATEGORIES or not ranking.index_enabled():
+            return None
+        backend = LeaderboardService._indexed(category)
+        if backend is not None:
+            rows = backend.range(category, 0, limit)
+        else:
+            rows = Leaderboard.objects.filter(category=category).order_by(
+                '-score', 'player_id'
+            ).values_list('player_id', 'score')[:limit]
+        return [
+            {'player_id': player_id, 'rank': position + 1, 'score': score}
+            for position, (player_id, score) in enumerate(rows)
+        ]
+
+    @staticmethod
+    def _live_rank(player_id, category):
+        backend = LeaderboardService._indexed(category)
+        if backend is not None:
+            rank = backend.rank(category, player_id)
+            if rank is None:
+                return None
+            score = backend.score(category, player_id)
+        else:
+            score = Leaderboard.objects.filter(
+                category=category, player_id=player_id
+            ).values_list('score', flat=True).first()
+            if score is None:
+                return None
+            # Same as RANK() in recompute_ranks: ties share a rank
+            rank = Leaderboard.objects.filter(category=category, score__gt=score).count() + 1
+        return {
+            'rank': rank,
+            'score': score,
+            'metadata': {INDEXED_METADATA_KEYS[category]: score}
+        }
+
     @staticmethod
     def get_player_rank(player, category):
-        """Get player's rank in a category"""
+        """Get player's rank in a category (live for event-fed categories)"""
+        if category in ranking.INDEXED_CATEGORIES and ranking.index_enabled():
+            return LeaderboardService._live_rank(player.id, category)
         try:
             entry = Leaderboard.objects.get(category=category, player=player)
             return {
@@ -243,7 +426,10 @@ class LeaderboardService:
     @staticmethod
     def get_all_player_ranks(player):
         """Get player's ranks in all categories"""
+        live = ranking.index_enabled()
         entries = Leaderboard.objects.filter(player=player)
+        if live:
+            entries = entries.exclude(category__in=ranking.INDEXED_CATEGORIES)
 
         ranks = {}
         for entry in entries:
@@ -254,4 +440,11 @@ class LeaderboardService:
                 'category_display': entry.get_category_display()
             }
 
+        if live:
+            labels = dict(Leaderboard.CATEGORY_CHOICES)
+            for category in ranking.INDEXED_CATEGORIES:
+                rank_info = LeaderboardService._live_rank(player.id, category)
+                if rank_info:
+                    ranks[category] = {**rank_info, 'category_display': labels[category]}
+
         return ranks
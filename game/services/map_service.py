@@ -1,12 +1,15 @@
+import logging
 import random
+from django.utils import timezone
 from ..models import MapCell, CellMaterial, Material, GatheringLog, Inventory
 from ..resource_generator import get_biome_from_coordinates, get_smart_resources, get_location_description_smart
-from ..osm_utils import fetch_osm_features
+from ..osm_utils import fetch_osm_features, reverse_geocode
 from . import player_service
 from .survival_service import SurvivalService
 from .durability_service import DurabilityService
 from .quest_service import QuestService
 from ..utils.config_helper import GameSettings
+from .. import catalog
 from .osm_biome_service import detect_biome_from_osm, get_osm_context
 
 # Import extracted services to expose them
@@ -14,16 +17,26 @@ from .gathering_service import gather_material
 from .hunting_service import hunt_at_location
 from .scavenging_service import scavenge_location
 
-def populate_cell_materials(cell):
-    """Populate cell with materials using smart resource generation"""
+logger = logging.getLogger(__name__)
+
+# Crafted items the generator may name but that never spawn on a cell
+CRAFTED_ITEM_NAMES = ['Planches', 'Bâton', 'Barre de Fer', 'Barre d\'Or', 'Pioche', 'Épée']
+
+def populate_cell_materials(cell, features=None):
+    """
+    Populate cell with materials using smart resource generation
+
+    features: pre-fetched OSM features. When None they are fetched here;
+    pass [] to generate a purely procedural cell without touching Overpass.
+    """
     # Fetch OSM features to refine biome and resource hints
-    features = []
-    try:
-        features = fetch_osm_features(cell.center_lat, cell.center_lon, radius=100)
-        print(f"DEBUG: Fetched {len(features)} OSM features for cell ({cell.grid_x}, {cell.grid_y})")
-    except Exception as e:
-        print(f"DEBUG: OSM fetch failed in populate_cell_materials: {str(e)}")
-        features = []
+    if features is None:
+        try:
+            features = fetch_osm_features(cell.center_lat, cell.center_lon, radius=100)
+            print(f"DEBUG: Fetched {len(features)} OSM features for cell ({cell.grid_x}, {cell.grid_y})")
+        except Exception as e:
+            print(f"DEBUG: OSM fetch failed in populate_cell_materials: {str(e)}")
+            features = []
 
     # Use centralized OSM biome detection
     osm_biome = detect_biome_from_osm(features) if features else None
@@ -53,32 +66,6 @@ def populate_cell_materials(cell):
 
     # Store OSM features for future reference
     cell.osm_features = features
-    cell.save()
-    # After setting biome, automatically create a house if residential area detected
-    if has_residential:
-        try:
-            from ..services.house_service import create_house
-            from ..models import Player
-            owner = Player.objects.first()
-            if owner:
-                house, created = create_house(owner, cell)
-                if created:
-                    print(f"DEBUG: Created house for player {owner.user.username} at ({cell.grid_x}, {cell.grid_y})")
-        except Exception as e:
-            print(f"DEBUG: Failed to create house: {str(e)}")
-
-
-
-    # After adjusting biome, check if we need to regenerate features with new biome context
-    if has_water or has_forest or has_mountain:
-        # Re-fetch with potentially different radius for water/forest detection
-        try:
-            features = fetch_osm_features(cell.center_lat, cell.center_lon, radius=100)
-            cell.osm_features = features
-            cell.save()
-        except Exception as e:
-            print(f"DEBUG: Failed to re-fetch OSM features after biome adjustment: {str(e)}")
-            features = cell.osm_features or []
 
     # Use smart resource system based on coordinates (with possibly adjusted biome)
     smart_materials = get_smart_resources(
@@ -132,30 +119,49 @@ def populate_cell_materials(cell):
         hints.append('⛏️ Minage favorable')
         
     cell.location_description = base_desc + (" | " + " | ".join(hints) if hints else '')
+    # Single write for biome, features and description
     cell.save()
 
+    # After setting biome, automatically create a house if residential area detected
+    if has_residential:
+        try:
+            from ..services.house_service import create_house
+            from ..models import Player
+            owner = Player.objects.first()
+            if owner:
+                house, created = create_house(owner, cell)
+                if created:
+                    print(f"DEBUG: Created house for player {owner.user.username} at ({cell.grid_x}, {cell.grid_y})")
+        except Exception as e:
+            print(f"DEBUG: Failed to create house: {str(e)}")
+
     print(f"Generated resources for cell ({cell.grid_x}, {cell.grid_y}): {smart_materials}")
 
     # Filter to only include existing raw materials (not crafted items)
-    crafted_items = ['Planches', 'Bâton', 'Barre de Fer', 'Barre d\'Or', 'Pioche', 'Épée']
-    filtered_materials = {k: v for k, v in smart_materials.items() if k not in crafted_items}
-    print(f"DEBUG: Filtered out crafted items {crafted_items}, remaining materials: {filtered_materials}")
-
-    for material_name, quantity in filtered_materials.items():
-        print(f"DEBUG: Attempting to create CellMaterial for {material_name} with quantity {quantity}")
-        try:
-            material = Material.objects.get(name=material_name)
-            cell_mat, created = CellMaterial.objects.get_or_create(
-                cell=cell,
-                material=material,
-                defaults={
-                    'quantity': quantity,
-                    'max_quantity': 100
-                }
-            )
-            print(f"DEBUG: CellMaterial {'created' if created else 'exists'} for {material_name}: quantity={cell_mat.quantity}")
-        except Material.DoesNotExist:
+    material_ids = get_material_id_map()
+    rows = []
+    for material_name, quantity in smart_materials.items():
+        if material_name in CRAFTED_ITEM_NAMES:
+            continue
+        material_id = material_ids.get(material_name)
+        if material_id is None:
             print(f"Warning: Material '{material_name}' does not exist in database")
+            continue
+        rows.append(CellMaterial(cell=cell, material_id=material_id, quantity=quantity, max_quantity=100))
+
+    # One upsert for all materials; quantities of existing rows (possibly depleted) are kept
+    CellMaterial.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['cell', 'material'],
+        update_fields=['max_quantity'],
+    )
+    logger.debug(f"Upserted {len(rows)} CellMaterial rows for cell ({cell.grid_x}, {cell.grid_y})")
+
+
+def get_material_id_map():
+    """Material name -> id, served from the in-memory game catalog"""
+    return catalog.get_material_ids()
 
 def refresh_cell_environment(cell):
     """Refresh biome and description using OSM hints without changing materials"""
@@ -260,3 +266,97 @@ def refresh_cell_environment(cell):
             
         cell.location_description = base_desc + (" | " + " | ".join(hints) if hints else '')
         cell.save()
+
+
+def get_world_state(player, now=None):
+    """Return current world state: time of day, season, weather, temperature.
+
+    This is computed from server time, player position and current biome,
+    in a deterministic way for a given day so the weather does not change
+    every request.
+    """
+    now = now or timezone.now()
+    hour = now.hour
+    month = now.month
+
+    # Time of day buckets
+    if 5 <= hour < 8:
+        time_of_day = 'dawn'
+    elif 8 <= hour < 18:
+        time_of_day = 'day'
+    elif 18 <= hour < 21:
+        time_of_day = 'evening'
+    else:
+        time_of_day = 'night'
+
+    # Season by month (northern hemisphere)
+    if month in (12, 1, 2):
+        season = 'winter'
+    elif month in (3, 4, 5):
+        season = 'spring'
+    elif month in (6, 7, 8):
+        season = 'summer'
+    else:
+        season = 'autumn'
+
+    # Determine biome for weather bias
+    try:
+        biome = get_biome_from_coordinates(player.current_y, player.current_x, player.grid_x, player.grid_y)
+    except Exception:
+        biome = 'plains'
+
+    # Deterministic RNG per day/biome so weather is stable
+    seed_str = f"{now.date()}:{biome}:{player.grid_x}:{player.grid_y}"
+    rng = random.Random(seed_str)
+
+    # Base temperature by season (Celsius), with biome adjustments
+    base_temp_by_season = {
+        'winter': 0,
+        'spring': 10,
+        'summer': 22,
+        'autumn': 12,
+    }
+    temp = base_temp_by_season.get(season, 10)
+
+    if biome in ('mountain', 'glacier'):
+        temp -= 8
+    elif biome in ('desert', 'volcano'):
+        temp += 8
+
+    temp += rng.randint(-3, 3)
+
+    # Weather distribution depending on biome & season
+    if biome in ('forest', 'swamp'):
+        weather_options = ['clear', 'cloudy', 'rain', 'rain', 'storm']
+    elif biome in ('mountain', 'glacier'):
+        weather_options = ['clear', 'cloudy', 'snow', 'snow', 'storm']
+    elif biome in ('desert', 'volcano'):
+        weather_options = ['clear', 'clear', 'clear', 'storm']
+    else:
+        weather_options = ['clear', 'cloudy', 'rain']
+
+    # In winter, bias towards snow in cold biomes
+    if season == 'winter' and biome in ('plains', 'forest', 'mountain', 'glacier'):
+        weather_options.append('snow')
+
+    weather = rng.choice(weather_options)
+
+    # Get location information (city and country)
+    location = reverse_geocode(player.current_y, player.current_x)
+
+    # Get nearby events
+    from .event_spawner_service import EventSpawnerService
+    from ..serializers import DynamicEventSerializer
+    nearby_events = EventSpawnerService.get_events_near_player(player, radius=10)
+    events_data = DynamicEventSerializer(nearby_events, many=True).data
+
+    return {
+        'time_of_day': time_of_day,
+        'season': season,
+        'weather': weather,
+        'temperature': temp,
+        'biome': biome,
+        'city': location.get('city'),
+        'country': location.get('country'),
+        'nearby_events': events_data,
+    }
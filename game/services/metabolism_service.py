@@ -204,6 +204,7 @@ def _process_hydration(player, elapsed_minutes):
     # Sync with old system
     player.thirst = int(hydration_pct)
     player.hydration = hydration_pct
+    player.last_thirst_update = timezone.now()
 
 
 def _update_body_composition(player):
@@ -254,6 +255,7 @@ def _update_condition_flags(player):
     # Sync with old system
     player.hunger = int(calorie_pct)
     player.satiety = calorie_pct
+    player.last_hunger_update = timezone.now()
 
 
 def _apply_stat_modifiers(player):
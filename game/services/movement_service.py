@@ -1,6 +1,6 @@
 from ..models import Player, MapCell, GameConfig
 from ..resource_generator import get_biome_from_coordinates
-from . import map_service
+from . import cell_generation_service
 from .survival_service import SurvivalService
 from ..utils.config_helper import GameSettings
 from django.utils import timezone
@@ -188,68 +188,34 @@ def move_player(player, direction):
         player.save()
     else:
         # adjust_survival_for_environment already saved fields, but ensure all movement-related fields are saved
-        player.save(update_fields=['grid_x', 'grid_y', 'current_x', 'current_y', 'energy', 'total_moves'])
+        player.save(update_fields=SurvivalService.vital_update_fields(
+            'grid_x', 'grid_y', 'current_x', 'current_y', 'energy', 'total_moves'
+        ))
 
-    # Get or create the new cell with OSM-aware biome detection
+    # Get or create the new cell from the procedural generator; OSM enrichment
+    # runs in the background so the move never waits on Overpass.
     # Ensure starting cell (0,0) is always plains in Valence
-    if player.grid_x == 0 and player.grid_y == 0:
-        biome = 'plains'
-        default_lat = 44.933
-        default_lon = 4.893
+    if (player.grid_x, player.grid_y) == cell_generation_service.START_CELL:
+        cell, created = cell_generation_service.get_or_create_cell(
+            player.grid_x, player.grid_y, *cell_generation_service.start_position(), biome='plains'
+        )
     else:
-        default_lat = player.current_y
-        default_lon = player.current_x
-        
-        # Try to fetch OSM features for better biome detection
-        try:
-            from ..osm_utils import fetch_osm_features
-            from .osm_biome_service import detect_biome_from_osm
-            
-            osm_features = fetch_osm_features(default_lat, default_lon, radius=100)
-            osm_biome = detect_biome_from_osm(osm_features) if osm_features else None
-            
-            if osm_biome:
-                biome = osm_biome
-                print(f"[MAP] Using OSM biome '{biome}' for new cell at ({player.grid_x}, {player.grid_y})")
-            else:
-                # Fallback to procedural generation
-                biome = get_biome_from_coordinates(default_lat, default_lon, player.grid_x, player.grid_y)
-                print(f"[MAP] Using procedural biome '{biome}' for new cell at ({player.grid_x}, {player.grid_y})")
-        except Exception as e:
-            # If OSM fails, use procedural generation
-            print(f"[WARNING] OSM fetch failed, using procedural biome: {str(e)}")
-            biome = get_biome_from_coordinates(default_lat, default_lon, player.grid_x, player.grid_y)
-
-    cell, created = MapCell.objects.get_or_create(
+        cell, created = cell_generation_service.get_or_create_cell(
+            player.grid_x, player.grid_y, player.current_y, player.current_x
+        )
+
+    # Warm the neighbouring cells so the next move is a cache hit
+    cell_generation_service.prefetch_neighbours(player)
+
+    # Achievements and quest progress run off the request path; results reach
+    # the client with a later response (game.events.pop_notifications)
+    from .. import events
+    events.publish(events.Moved(
+        player_id=player.id,
         grid_x=player.grid_x,
         grid_y=player.grid_y,
-        defaults={
-            'center_lat': default_lat,
-            'center_lon': default_lon,
-            'biome': biome
-        }
-    )
-
-    if created or not cell.materials.exists():
-        # Populate cell with biome-specific materials
-        map_service.populate_cell_materials(cell)
-
-    # Check achievements for movement
-    from .achievement_service import check_achievements
-    new_achievements = check_achievements(
-        player,
-        'move',
         biome=cell.biome
-    )
-
-    # Update quest progress
-    from .quest_service import QuestService
-    completed_quests = QuestService.update_quest_progress(
-        player,
-        'visit',
-        grid_x=player.grid_x,
-        grid_y=player.grid_y
-    )
+    ))
 
     # Check for random enemy encounter
     from .encounter_service import EncounterService
@@ -276,5 +242,5 @@ def move_player(player, direction):
             'encounter_id': encounter.id
         }
 
-    # Return player, achievements, and encounter data
-    return player, 200, new_achievements if new_achievements else [], completed_quests, encounter_data
+    # Return player, achievements, quests (now delivered as notifications) and encounter data
+    return player, 200, [], [], encounter_data
@@ -0,0 +1,180 @@
+"""
+Player payload read model
+
+Builds the same payload as PlayerSerializer as plain dicts: each related set
+(inventory, workstations, equipment) is fetched with one query for all the
+players being built, and materials and workstations come from the catalog,
+serialized once per catalog snapshot instead of once per row. Callers can
+pass the top-level fields they render; related sets that are not asked for
+are not queried.
+"""
+from django.db.models import prefetch_related_objects
+
+from game import catalog
+from game.exceptions import GameException
+from game.models import EquippedItem, Inventory, Material, PlayerWorkstation, Workstation
+from game.serializers import MaterialSerializer, WorkstationSerializer
+
+# Top-level fields of PlayerSerializer, in its order
+SCALAR_FIELDS = (
+    'id', 'current_x', 'current_y', 'grid_x', 'grid_y',
+    'energy', 'max_energy', 'health', 'max_health',
+    'hunger', 'max_hunger', 'thirst', 'max_thirst', 'radiation',
+    'satiety', 'hydration', 'metabolism_rate',
+    'strength', 'agility', 'intelligence', 'luck',
+    'level', 'experience', 'money', 'credit_card_balance',
+    'total_defense', 'total_attack', 'total_speed_bonus',
+)
+RELATED_FIELDS = ('user', 'inventory', 'workstations', 'equipped_items')
+CARRY_FIELDS = ('current_carry_weight', 'effective_carry_capacity', 'is_overencumbered')
+PLAYER_FIELDS = SCALAR_FIELDS + RELATED_FIELDS + CARRY_FIELDS
+
+# Serialized catalog rows, rebuilt with the catalog snapshot
+_CATALOG_PAYLOADS = {
+    'snapshot': None,
+    'materials': {},
+    'workstations': {},
+}
+
+
+def parse_fields(value, allowed=PLAYER_FIELDS):
+    """
+    Field selection from a ?fields=a,b,c query parameter
+
+    Returns:
+        set or None: the selected fields, None when every field is wanted
+    """
+    if not value:
+        return None
+    fields = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = fields - set(allowed)
+    if unknown:
+        raise GameException(f"Champs inconnus: {', '.join(sorted(unknown))}")
+    return fields
+
+
+def _catalog_payloads():
+    snapshot = catalog.get_catalog()
+    if _CATALOG_PAYLOADS['snapshot'] is not snapshot:
+        _CATALOG_PAYLOADS.update(snapshot=snapshot, materials={}, workstations={})
+    return snapshot, _CATALOG_PAYLOADS
+
+
+def material_payload(material_id):
+    """MaterialSerializer output of a material, serialized once per catalog snapshot"""
+    snapshot, payloads = _catalog_payloads()
+    data = payloads['materials'].get(material_id)
+    if data is None:
+        material = snapshot.materials_by_id.get(material_id) or Material.objects.get(id=material_id)
+        data = payloads['materials'][material_id] = dict(MaterialSerializer(material).data)
+    return data
+
+
+def workstation_payload(workstation_id):
+    """WorkstationSerializer output of a workstation, serialized once per catalog snapshot"""
+    snapshot, payloads = _catalog_payloads()
+    data = payloads['workstations'].get(workstation_id)
+    if data is None:
+        workstation = snapshot.workstations_by_id.get(workstation_id) or Workstation.objects.get(id=workstation_id)
+        data = payloads['workstations'][workstation_id] = dict(WorkstationSerializer(workstation).data)
+    return data
+
+
+def _durability_percentage(current, maximum):
+    if maximum <= 0:
+        return 100
+    return int((current / maximum) * 100)
+
+
+def _group(rows):
+    grouped = {}
+    for player_id, item in rows:
+        grouped.setdefault(player_id, []).append(item)
+    return grouped
+
+
+def _inventories(player_ids):
+    rows = Inventory.objects.filter(player_id__in=player_ids).values_list(
+        'player_id', 'id', 'material_id', 'quantity', 'durability_current', 'durability_max'
+    )
+    return _group(
+        (player_id, {
+            'id': inventory_id,
+            'material': material_payload(material_id),
+            'quantity': quantity,
+            'category': material_payload(material_id)['category'],
+            'durability_current': current,
+            'durability_max': maximum,
+            'durability_percentage': _durability_percentage(current, maximum),
+        })
+        for player_id, inventory_id, material_id, quantity, current, maximum in rows
+    )
+
+
+def _workstations(player_ids):
+    rows = PlayerWorkstation.objects.filter(player_id__in=player_ids).values_list(
+        'player_id', 'id', 'workstation_id', 'quantity'
+    )
+    return _group(
+        (player_id, {
+            'id': row_id,
+            'workstation': workstation_payload(workstation_id),
+            'quantity': quantity,
+            'player': player_id,
+        })
+        for player_id, row_id, workstation_id, quantity in rows
+    )
+
+
+def _equipped_items(player_ids):
+    rows = EquippedItem.objects.filter(player_id__in=player_ids).values_list('player_id', 'id', 'slot', 'material_id')
+    return _group(
+        (player_id, {'id': item_id, 'slot': slot, 'material': material_payload(material_id)})
+        for player_id, item_id, slot, material_id in rows
+    )
+
+
+def build_player_payloads(players, fields=None):
+    """
+    PlayerSerializer-shaped payloads of already loaded players
+
+    Args:
+        players: Player instances
+        fields: top-level fields to include (see parse_fields), None for all
+
+    Returns:
+        list: one dict per player, in the same order
+    """
+    players = list(players)
+    wanted = [name for name in PLAYER_FIELDS if fields is None or name in fields]
+    player_ids = [player.id for player in players]
+
+    if 'user' in wanted:
+        prefetch_related_objects(players, 'user')
+    if 'effective_carry_capacity' in wanted or 'is_overencumbered' in wanted:
+        prefetch_related_objects([player for player in players if player.current_vehicle_id], 'current_vehicle')
+    related = {
+        'inventory': _inventories(player_ids) if 'inventory' in wanted else None,
+        'workstations': _workstations(player_ids) if 'workstations' in wanted else None,
+        'equipped_items': _equipped_items(player_ids) if 'equipped_items' in wanted else None,
+    }
+
+    payloads = []
+    for player in players:
+        data = {}
+        for name in wanted:
+            if name == 'user':
+                data['user'] = {'id': player.user.id, 'username': player.user.username, 'email': player.user.email}
+            elif name in related:
+                data[name] = related[name].get(player.id, [])
+            elif name in ('current_carry_weight', 'effective_carry_capacity'):
+                data[name] = float(getattr(player, name))
+            else:
+                data[name] = getattr(player, name)
+        payloads.append(data)
+    return payloads
+
+
+def build_player_payload(player, fields=None):
+    """Payload of one player (see build_player_payloads)"""
+    return build_player_payloads([player], fields)[0]
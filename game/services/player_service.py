@@ -1,19 +1,64 @@
 from ..models import Player, GameConfig, Inventory, GatheringLog, CraftingLog
+from django.db.models import F
 from django.utils import timezone
+from .. import events
 
 # Import extracted services to expose them
 from .movement_service import move_player
-from .equipment_service import equip_item, unequip_item
+from .equipment_service import EQUIPMENT_TOTALS, equip_item, unequip_item
 from .skills_service import (
     ensure_default_skills, get_or_create_player_skill, award_xp,
     auto_unlock_talents, get_active_effects
 )
 
+def grant_rewards(player, xp=0, money=0):
+    """
+    Add reward XP and money to the stored player row and level it up
+
+    Written with F() increments, and the level recomputed from the stored row
+    (only if nobody changed it meanwhile), so a reward and a concurrent write
+    of the same player never overwrite each other. The instance is updated to
+    the stored values.
+
+    Returns:
+        int: levels gained
+    """
+    if xp or money:
+        Player.objects.filter(id=player.id).update(experience=F('experience') + xp, money=F('money') + money)
+
+    level_up_bonus = GameConfig.get_config('level_up_energy_bonus', 10)
+    levels_gained = 0
+    while True:
+        experience, level, max_energy, stored_money = Player.objects.filter(id=player.id).values_list(
+            'experience', 'level', 'max_energy', 'money'
+        ).get()
+        new_experience, new_level = experience, level
+        while new_experience >= player.get_xp_for_level(new_level + 1):
+            new_experience -= player.get_xp_for_level(new_level + 1)
+            new_level += 1
+        if new_level == level:
+            break
+        if Player.objects.filter(id=player.id, experience=experience, level=level).update(
+            experience=new_experience, level=new_level, max_energy=F('max_energy') + (new_level - level) * level_up_bonus
+        ):
+            levels_gained = new_level - level
+            experience, level, max_energy = new_experience, new_level, max_energy + levels_gained * level_up_bonus
+            break
+
+    player.experience, player.level, player.max_energy, player.money = experience, level, max_energy, stored_money
+    if xp or money:
+        # Written with update(), which sends no post_save: tell the leaderboards
+        events.publish(events.StatsChanged(player_id=player.id))
+    if levels_gained:
+        events.publish(events.LeveledUp(player_id=player.id, level=level))
+    return levels_gained
+
+
 def restart_player(player):
     """Restart the game - reset player position and inventory"""
-    # Reset player stats - Start in Valence center
-    player.current_x = 4.893  # Valence longitude
-    player.current_y = 44.933  # Valence latitude
+    # Reset player stats - Start on the configured start cell (Valence by default)
+    from .cell_generation_service import start_position
+    player.current_y, player.current_x = start_position()
     player.grid_x = 0
     player.grid_y = 0
 
@@ -34,6 +79,7 @@ def restart_player(player):
     player.last_energy_update = timezone.now()
     player.last_hunger_update = timezone.now()
     player.last_thirst_update = timezone.now()
+    player.last_radiation_update = timezone.now()
 
     # Reset stats
     player.strength = 10
@@ -51,9 +97,22 @@ def restart_player(player):
     # Clear equipped items
     from ..models import EquippedItem
     EquippedItem.objects.filter(player=player).delete()
+    # Nothing carried or worn any more (reset exactly, without float drift)
+    cleared = {'carry_weight': 0.0, **{column: 0 for column in EQUIPMENT_TOTALS}}
+    Player.objects.filter(id=player.id).update(**cleared)
+    for column, value in cleared.items():
+        setattr(player, column, value)
+    events.publish(events.StatsChanged(player_id=player.id))
 
     # Clear gathering and crafting logs
     GatheringLog.objects.filter(player=player).delete()
     CraftingLog.objects.filter(player=player).delete()
 
+    # Clear the achievement counters derived from those logs
+    from django.db.models import Q
+    from ..models import PlayerCounter
+    PlayerCounter.objects.filter(player=player).filter(
+        Q(key__in=['gathers', 'crafts']) | Q(key__startswith='gather_material:') | Q(key__startswith='craft_recipe:')
+    ).delete()
+
     return player
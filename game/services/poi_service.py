@@ -6,6 +6,8 @@ import random
 from datetime import timedelta
 from django.utils import timezone
 from ..models import Material, Inventory, Player
+from .. import catalog
+from .inventory_ledger_service import add_items, remove_items
 
 class POIService:
     """Service for handling POI interactions"""
@@ -184,9 +186,11 @@ class POIService:
 
         menu = []
         for material_name, details in offerings.items():
-            # Check if material exists in database
+            # Check if material exists (static data catalog)
             try:
-                material = Material.objects.get(name=material_name)
+                material = catalog.get_material_by_name(material_name)
+                if material is None:
+                    raise Material.DoesNotExist
 
                 # Calculate dynamic price
                 base_price = details['price']
@@ -243,7 +247,7 @@ class POIService:
             return False, f"Pas assez d'argent ! Requis: {total_cost}₡, Disponible: {player.money}₡", None
 
         # Check weight capacity
-        material = Material.objects.get(id=material_id)
+        material = catalog.get_material(material_id) or Material.objects.get(id=material_id)
         additional_weight = material.weight * quantity
 
         if player.current_carry_weight + additional_weight > player.effective_carry_capacity:
@@ -253,30 +257,17 @@ class POIService:
         player.money -= total_cost
         player.save()
 
-        # Add item to inventory
-        inventory_item, created = Inventory.objects.get_or_create(
-            player=player,
-            material=material,
-            defaults={'quantity': 0, 'durability_current': 0, 'durability_max': 0}
-        )
-
-        inventory_item.quantity += quantity
-
-        # If item has durability, set it to max
-        if material.max_durability > 0:
-            # For multiple items, we'd need to handle stacking properly
-            # For now, set the durability on the stack
-            inventory_item.durability_max = material.max_durability
-            inventory_item.durability_current = material.max_durability
-
-        inventory_item.save()
+        # Add item to inventory; if it has durability, set the stack's to max
+        # (for multiple items we'd need to handle stacking properly)
+        durability = (material.max_durability, material.max_durability) if material.max_durability > 0 else None
+        add_items(player, material.id, quantity, durability=durability)
 
         # Success message
         message = f"✅ Acheté {quantity}x {material.name} pour {total_cost}₡!"
 
         # Return updated player data
-        from ..serializers import PlayerSerializer
-        player_data = PlayerSerializer(player).data
+        from .player_payload_service import build_player_payload
+        player_data = build_player_payload(player)
 
         return True, message, player_data
 
@@ -312,11 +303,7 @@ class POIService:
         total_earned = sell_price * quantity
 
         # Remove item from inventory
-        inventory_item.quantity -= quantity
-        if inventory_item.quantity == 0:
-            inventory_item.delete()
-        else:
-            inventory_item.save()
+        remove_items(player, material.id, quantity)
 
         # Add money to player
         player.money += total_earned
@@ -326,8 +313,8 @@ class POIService:
         message = f"✅ Vendu {quantity}x {material.name} pour {total_earned}₡!"
 
         # Return updated player data
-        from ..serializers import PlayerSerializer
-        player_data = PlayerSerializer(player).data
+        from .player_payload_service import build_player_payload
+        player_data = build_player_payload(player)
 
         return True, message, player_data
 
@@ -4,7 +4,11 @@ Quest Service - Manages quests, player progress, and rewards
 from django.utils import timezone
 from django.db import transaction
 from datetime import timedelta
-from game.models import Quest, PlayerQuest, Player, Material, Inventory
+from game.models import Quest, PlayerQuest, Player, Material
+from game.services.inventory_ledger_service import add_items
+from game.services.leaderboard_service import LeaderboardService
+from game.services import player_service
+from game import catalog
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,42 +20,50 @@ class QuestService:
     @staticmethod
     def get_available_quests(player):
         """Get all quests available to the player"""
-        # Get quests player meets level requirement for
-        available_quests = Quest.objects.filter(
-            is_active=True,
-            required_level__lte=player.level
-        )
-
-        result = []
-        for quest in available_quests:
+        quests = catalog.get_catalog().quests_by_id
+        return [quests[quest_id] for quest_id in QuestService.get_quest_board(player) if quest_id in quests]
+
+    @staticmethod
+    def get_quest_board(player):
+        """
+        Ids of the quests available to the player, in board order
+
+        Built from the catalog and one query of the player's PlayerQuest rows,
+        whatever the number of quests.
+        """
+        now = timezone.now()
+
+        # quest_id -> (status, can_repeat_at), one query for the whole board
+        index = {
+            quest_id: (quest_status, can_repeat_at)
+            for quest_id, quest_status, can_repeat_at in PlayerQuest.objects.filter(player=player)
+            .values_list('quest_id', 'status', 'can_repeat_at').order_by()
+        }
+
+        quest_ids = []
+        for quest in catalog.get_active_quests():
+            if quest.required_level > player.level:
+                continue
+
             # Check if player has completed prerequisite
-            if quest.prerequisite_quest:
-                prereq_complete = PlayerQuest.objects.filter(
-                    player=player,
-                    quest=quest.prerequisite_quest,
-                    status='completed'
-                ).exists()
-                if not prereq_complete:
+            if quest.prerequisite_quest_id:
+                prereq_status, _ = index.get(quest.prerequisite_quest_id, (None, None))
+                if prereq_status != 'completed':
                     continue
 
             # Check if quest is already active or completed
-            player_quest = PlayerQuest.objects.filter(
-                player=player,
-                quest=quest
-            ).first()
-
-            if player_quest:
-                if player_quest.status == 'active':
-                    continue  # Already active
-                elif player_quest.status == 'completed':
-                    if not quest.is_repeatable:
-                        continue  # Can't repeat
-                    elif player_quest.can_repeat_at and timezone.now() < player_quest.can_repeat_at:
-                        continue  # Still on cooldown
+            quest_status, can_repeat_at = index.get(quest.id, (None, None))
+            if quest_status == 'active':
+                continue  # Already active
+            elif quest_status == 'completed':
+                if not quest.is_repeatable:
+                    continue  # Can't repeat
+                elif can_repeat_at and now < can_repeat_at:
+                    continue  # Still on cooldown
 
-            result.append(quest)
+            quest_ids.append(quest.id)
 
-        return result
+        return quest_ids
 
     @staticmethod
     def get_active_quests(player):
@@ -125,9 +137,19 @@ class QuestService:
     @staticmethod
     def update_quest_progress(player, action_type, **kwargs):
         """Update quest progress based on player actions"""
+        # Only the quests the trigger index links to this action's target
+        if action_type == 'visit':
+            target = catalog.quest_target('visit', kwargs.get('grid_x'), kwargs.get('grid_y'))
+        else:
+            target = kwargs.get({'gather': 'material_id', 'craft': 'recipe_id', 'defeat': 'mob_id'}.get(action_type))
+        quest_ids = catalog.get_quest_ids(action_type, target)
+        if not quest_ids:
+            return []
+
         active_quests = PlayerQuest.objects.filter(
             player=player,
-            status='active'
+            status='active',
+            quest_id__in=quest_ids
         ).select_related('quest')
 
         completed_quests = []
@@ -268,61 +290,42 @@ class QuestService:
                 player_quest.can_repeat_at = timezone.now() + timedelta(hours=quest.cooldown_hours)
 
             player_quest.save()
+            LeaderboardService.record_event(player.id, 'quests')
 
             # Grant rewards
             reward_info = {}
 
             # XP
             if quest.reward_xp > 0:
-                player.experience += quest.reward_xp
                 reward_info['xp'] = quest.reward_xp
 
             # Money
             if quest.reward_money > 0:
-                player.money += quest.reward_money
                 reward_info['money'] = quest.reward_money
 
-            # Items
+            # Items, through the inventory ledger like every other item movement
             reward_items = []
-            if quest.reward_items:
-                for item_data in quest.reward_items:
-                    material_id = item_data.get('material_id')
-                    quantity = item_data.get('quantity', 1)
-
-                    try:
-                        material = Material.objects.get(id=material_id)
-
-                        # Add to inventory
-                        inventory_item, created = Inventory.objects.get_or_create(
-                            player=player,
-                            material=material,
-                            defaults={'quantity': 0}
-                        )
-                        inventory_item.quantity += quantity
-                        inventory_item.save()
-
-                        reward_items.append({
-                            'material': material.name,
-                            'quantity': quantity,
-                            'icon': material.icon
-                        })
-
-                    except Material.DoesNotExist:
-                        logger.warning(f"Reward material {material_id} not found")
-
-            reward_info['items'] = reward_items
+            for item_data in quest.reward_items or []:
+                material_id = item_data.get('material_id')
+                quantity = item_data.get('quantity', 1)
+
+                try:
+                    material = Material.objects.get(id=material_id)
+                except Material.DoesNotExist:
+                    logger.warning(f"Reward material {material_id} not found")
+                    continue
+                add_items(player, material.id, quantity)
 
-            # Check if player leveled up
-            level_before = player.level
-            xp_required = 100 * (player.level ** 2)
-            while player.experience >= xp_required:
-                player.level += 1
-                player.experience -= xp_required
-                xp_required = 100 * (player.level ** 2)
+                reward_items.append({
+                    'material': material.name,
+                    'quantity': quantity,
+                    'icon': material.icon
+                })
 
-            player.save()
+            reward_info['items'] = reward_items
 
-            if player.level > level_before:
+            # XP and money are added to the stored row, which also levels the player up
+            if player_service.grant_rewards(player, xp=max(0, quest.reward_xp), money=max(0, quest.reward_money)):
                 reward_info['level_up'] = True
                 reward_info['new_level'] = player.level
 
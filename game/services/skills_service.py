@@ -4,6 +4,7 @@ Skills and Talents Service
 Manages player skills, XP progression, talent unlocking, and active effects.
 """
 from typing import Dict, Tuple
+from .. import modifiers
 from ..models import Skill, PlayerSkill, TalentNode, PlayerTalent, GameConfig, Player
 from django.core.management import call_command
 
@@ -112,6 +113,10 @@ def get_active_effects(player: Player, skill_code: str) -> Dict[str, int]:
     """
     Get all active talent effects for a player's skill.
     
+    Read from the player's modifier snapshot (game.modifiers), so repeated
+    calls within a request, and across requests until a talent unlocks,
+    do not query the database.
+    
     Args:
         player: The player instance
         skill_code: The skill code
@@ -119,15 +124,4 @@ def get_active_effects(player: Player, skill_code: str) -> Dict[str, int]:
     Returns:
         Dictionary mapping effect types to their maximum values
     """
-    skill = Skill.objects.get(code=skill_code)
-    talents = PlayerTalent.objects.filter(
-        player=player, 
-        talent_node__skill=skill
-    ).select_related('talent_node')
-    
-    effects = {}
-    for pt in talents:
-        effect_type = pt.talent_node.effect_type
-        effects[effect_type] = max(effects.get(effect_type, 0), pt.talent_node.effect_value)
-    
-    return effects
+    return modifiers.talent_effects(player, skill_code)
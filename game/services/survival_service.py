@@ -42,21 +42,37 @@ class SurvivalService:
         'combat': 2.0        # Combat
     }
 
+    # Lazily evaluated vitals and the timestamp each one is exact at
+    VITAL_ANCHORS = {
+        'energy': 'last_energy_update',
+        'hunger': 'last_hunger_update',
+        'satiety': 'last_hunger_update',
+        'thirst': 'last_thirst_update',
+        'hydration': 'last_thirst_update',
+        'radiation': 'last_radiation_update',
+    }
+
+    @staticmethod
+    def _level(value, levels):
+        """
+        Level whose range holds value; ranges are checked highest first by their
+        lower bound, so a fractional value between two ranges (79.5) falls in the
+        lower one and values out of 0-100 in the end ones
+        """
+        for level, (min_val, _max_val) in levels.items():
+            if value >= min_val:
+                break
+        return level
+
     @staticmethod
     def get_hunger_level(hunger_value):
         """Get descriptive hunger level"""
-        for level, (min_val, max_val) in SurvivalService.HUNGER_LEVELS.items():
-            if min_val <= hunger_value <= max_val:
-                return level
-        return 'normal'
+        return SurvivalService._level(hunger_value, SurvivalService.HUNGER_LEVELS)
 
     @staticmethod
     def get_thirst_level(thirst_value):
         """Get descriptive thirst level"""
-        for level, (min_val, max_val) in SurvivalService.THIRST_LEVELS.items():
-            if min_val <= thirst_value <= max_val:
-                return level
-        return 'normal'
+        return SurvivalService._level(thirst_value, SurvivalService.THIRST_LEVELS)
 
     @staticmethod
     def calculate_decay_rate(current_value, base_rate, activity_multiplier=1.0):
@@ -75,95 +91,168 @@ class SurvivalService:
         return decay
 
     @staticmethod
-    def update_survival_stats(player, activity='walking'):
+    def _decay_drive(rate, reserve, drain, minutes):
         """
-        Update player survival stats based on time passed and activity
-        More realistic simulation with progressive effects
+        Integral over the span of rate * max(0.5, reserve / 100), with the
+        reserve (satiety or hydration) draining linearly at `drain` per minute
         """
-        now = timezone.now()
+        if minutes <= 0:
+            return 0.0
+        if drain <= 0 or reserve <= 50:
+            return rate * max(0.5, reserve / 100) * minutes
 
-        # Calculate time passed
-        hunger_minutes = 0
-        thirst_minutes = 0
+        above_half = min(minutes, (reserve - 50) / drain)
+        drive = rate * (reserve * above_half - drain * above_half ** 2 / 2) / 100
+        return drive + rate * 0.5 * (minutes - above_half)
 
-        # Get activity multiplier
-        activity_mult = SurvivalService.ACTIVITY_MULTIPLIERS.get(activity, 1.0)
+    @staticmethod
+    def _decay(value, drive):
+        """
+        Closed form of calculate_decay_rate integrated over a drive:
+        linear above 30, then accelerating as (60 - value) / 30 down to 0
+        """
+        if value > 30:
+            if drive <= value - 30:
+                return value - drive
+            drive -= value - 30
+            value = 30
+        return max(0.0, 60 - (60 - value) * math.exp(drive / 30))
 
-        # Update hunger with realistic decay
-        if player.last_hunger_update:
-            hunger_minutes = (now - player.last_hunger_update).total_seconds() / 60
+    @staticmethod
+    def project_hunger(hunger, satiety, minutes, activity_mult=1.0):
+        """Hunger and satiety after `minutes`, evaluated in closed form"""
+        base_rate = GameSettings.survival_hunger_decrease_rate()
+        drain = base_rate * 0.3  # Satiety decays slower
+        drive = SurvivalService._decay_drive(base_rate * activity_mult, satiety, drain, minutes)
+        return SurvivalService._decay(hunger, drive), max(0.0, satiety - drain * minutes)
 
-            # Realistic hunger decay (slower with satiety)
-            base_hunger_rate = GameSettings.survival_hunger_decrease_rate()
+    @staticmethod
+    def project_thirst(thirst, hydration, minutes, activity_mult=1.0):
+        """Thirst and hydration after `minutes`, evaluated in closed form"""
+        base_rate = GameSettings.survival_thirst_decrease_rate()
+        drain = base_rate * 0.4  # Hydration decays slower
+        # Thirst affected more by activity
+        drive = SurvivalService._decay_drive(base_rate * activity_mult * 1.2, hydration, drain, minutes)
+        return SurvivalService._decay(thirst, drive), max(0.0, hydration - drain * minutes)
 
-            # Satiety slows down hunger
-            satiety_factor = max(0.5, player.satiety / 100)
+    @staticmethod
+    def project_radiation(radiation, minutes):
+        """
+        Radiation after `minutes` of natural decay, in whole points
 
-            hunger_decay = SurvivalService.calculate_decay_rate(
-                player.hunger,
-                base_hunger_rate * satiety_factor,
-                activity_mult
-            )
+        Returns:
+            tuple: (radiation, minutes_consumed)
+        """
+        rate = GameSettings.survival_radiation_decay_rate()
+        if radiation <= 0 or rate <= 0 or minutes <= 0:
+            return radiation, max(0, minutes)
 
-            hunger_loss = hunger_decay * hunger_minutes
-            player.hunger = max(0, player.hunger - hunger_loss)
+        decayed = int(rate * minutes)
+        if decayed >= radiation:
+            return 0, minutes
+        return radiation - decayed, decayed / rate
 
-            # Satiety decays slower
-            satiety_loss = (base_hunger_rate * 0.3) * hunger_minutes
-            player.satiety = max(0, player.satiety - satiety_loss)
+    @staticmethod
+    def catch_up(player, now=None, activity='walking'):
+        """
+        Bring hunger, thirst and radiation up to `now` in memory, without saving
 
-        player.last_hunger_update = now
+        Each vital is stored as a value exact at its last_*_update timestamp and
+        evaluated in closed form from there, so the result does not depend on
+        how often it is called. Reads (e.g. PlayerViewSet.me) stop here; writes
+        go through update_survival_stats.
 
-        # Update thirst with realistic decay (faster than hunger)
-        if player.last_thirst_update:
-            thirst_minutes = (now - player.last_thirst_update).total_seconds() / 60
+        Returns:
+            dict: minutes elapsed for hunger and thirst
+        """
+        now = now or timezone.now()
+        activity_mult = SurvivalService.ACTIVITY_MULTIPLIERS.get(activity, 1.0)
 
-            # Realistic thirst decay
-            base_thirst_rate = GameSettings.survival_thirst_decrease_rate()
+        def minutes_since(anchor):
+            return max(0, (now - anchor).total_seconds() / 60) if anchor else 0
 
-            # Hydration slows down thirst
-            hydration_factor = max(0.5, player.hydration / 100)
+        hunger_minutes = minutes_since(player.last_hunger_update)
+        if hunger_minutes:
+            player.hunger, player.satiety = SurvivalService.project_hunger(
+                player.hunger, player.satiety, hunger_minutes, activity_mult
+            )
+        player.last_hunger_update = now
 
-            thirst_decay = SurvivalService.calculate_decay_rate(
-                player.thirst,
-                base_thirst_rate * hydration_factor,
-                activity_mult * 1.2  # Thirst affected more by activity
+        thirst_minutes = minutes_since(player.last_thirst_update)
+        if thirst_minutes:
+            player.thirst, player.hydration = SurvivalService.project_thirst(
+                player.thirst, player.hydration, thirst_minutes, activity_mult
             )
+        player.last_thirst_update = now
 
-            thirst_loss = thirst_decay * thirst_minutes
-            player.thirst = max(0, player.thirst - thirst_loss)
+        # Natural radiation decay; the anchor keeps the part of a point not decayed yet
+        radiation_anchor = player.last_radiation_update
+        radiation_minutes = minutes_since(radiation_anchor)
+        player.radiation, consumed = SurvivalService.project_radiation(player.radiation, radiation_minutes)
+        if radiation_anchor and consumed < radiation_minutes:
+            player.last_radiation_update = radiation_anchor + timedelta(minutes=consumed)
+        else:
+            player.last_radiation_update = now
 
-            # Hydration decays slower
-            hydration_loss = (base_thirst_rate * 0.4) * thirst_minutes
-            player.hydration = max(0, player.hydration - hydration_loss)
+        return {'hunger_minutes': hunger_minutes, 'thirst_minutes': thirst_minutes}
 
-        player.last_thirst_update = now
+    @staticmethod
+    def catch_up_vitals(player, now=None, activity='walking'):
+        """
+        catch_up plus energy, in memory: what a writer runs before changing a vital
+
+        A vital changed on an instance whose anchor is in the past would have the
+        elapsed time replayed on top of the new value; caught up first, the new
+        value is exact at the (new) anchor saved with it, see vital_update_fields.
+        """
+        from game.services.energy_service import catch_up_energy
 
-        # Natural radiation decay
-        if player.radiation > 0:
-            if player.last_energy_update:
-                minutes_passed = (now - player.last_energy_update).total_seconds() / 60
-                rad_decay = int(GameSettings.survival_radiation_decay_rate() * minutes_passed)
-                player.radiation = max(0, player.radiation - rad_decay)
+        now = now or timezone.now()
+        catch_up_energy(player, now)
+        return SurvivalService.catch_up(player, now=now, activity=activity)
+
+    @staticmethod
+    def vital_update_fields(*fields):
+        """update_fields for a write of `fields`, with the anchors of the vitals among them"""
+        anchors = [SurvivalService.VITAL_ANCHORS[name] for name in fields if name in SurvivalService.VITAL_ANCHORS]
+        return list(dict.fromkeys([*fields, *anchors]))
+
+    @staticmethod
+    def update_survival_stats(player, activity='walking'):
+        """
+        Update player survival stats based on time passed and activity
+        More realistic simulation with progressive effects
+
+        Energy is caught up as well, so the action that follows can spend it.
+        The caught-up vitals are exact at any time, so the player is only saved
+        when regeneration or an effect changed something; otherwise the stored
+        anchors stay and the minutes count towards the next call.
+        """
+        minutes = SurvivalService.catch_up_vitals(player, activity=activity)
+        minutes_passed = max(minutes['hunger_minutes'], minutes['thirst_minutes'])
+        before = (player.health, player.max_energy)
 
         # Health regeneration (realistic)
-        health_regen = SurvivalService.regenerate_health(player, max(hunger_minutes, thirst_minutes))
+        health_regen = SurvivalService.regenerate_health(player, minutes_passed)
 
         # Apply nutrition effects (vitamins/minerals)
         nutrition_effects = {'effects': [], 'health_drain': 0, 'stat_modifiers': {}}
         try:
             from game.services.advanced_nutrition_service import AdvancedNutritionService
             nutrition_effects = AdvancedNutritionService.apply_nutrition_health_effects(
-                player, max(hunger_minutes, thirst_minutes)
+                player, minutes_passed, commit=False
             )
         except Exception as e:
             import logging
             logging.error(f"Error applying nutrition effects: {e}")
 
-        player.save()
-
         # Apply survival effects (damage, penalties)
-        effects = SurvivalService.apply_survival_effects(player, max(hunger_minutes, thirst_minutes))
+        effects = SurvivalService.apply_survival_effects(player, minutes_passed, commit=False)
+
+        if (player.health, player.max_energy) != before:
+            player.save(update_fields=SurvivalService.vital_update_fields(
+                *SurvivalService.VITAL_ANCHORS, 'health', 'max_energy'
+            ))
 
         # Combine effects
         all_effects = effects + nutrition_effects['effects']
@@ -311,10 +400,11 @@ class SurvivalService:
         return multipliers
 
     @staticmethod
-    def apply_survival_effects(player, minutes_passed=0):
+    def apply_survival_effects(player, minutes_passed=0, commit=True):
         """
         Apply realistic negative effects from low survival stats
         Progressive damage only in extreme conditions
+        Pass commit=False to leave saving the player to the caller
         """
         effects_applied = []
 
@@ -352,7 +442,7 @@ class SurvivalService:
                 player.health = max(0, player.health - damage_per_10_rad)
                 effects_applied.append(f"Radiation: -{damage_per_10_rad} santé")
 
-        if effects_applied:
+        if effects_applied and commit:
             player.save()
 
         return effects_applied
@@ -507,6 +597,7 @@ class SurvivalService:
             raise GameException(f"{material.name} n'est pas consommable")
 
         now = timezone.now()
+        SurvivalService.catch_up_vitals(player, now=now)
 
         # Calculate restoration (can't exceed max)
         hunger_restored = min(material.hunger_restore * quantity, 100 - player.hunger)
@@ -539,7 +630,9 @@ class SurvivalService:
         else:
             player.radiation = min(100, player.radiation + radiation_change)
 
-        player.save()
+        player.save(update_fields=SurvivalService.vital_update_fields(
+            *SurvivalService.VITAL_ANCHORS, 'health', 'last_meal_time', 'last_drink_time'
+        ))
 
         # Build detailed feedback
         effects = []
@@ -577,8 +670,9 @@ class SurvivalService:
     @staticmethod
     def add_radiation(player, amount):
         """Add radiation to player (from biome or event)"""
+        SurvivalService.catch_up(player)
         player.radiation = min(100, player.radiation + amount)
-        player.save()
+        player.save(update_fields=SurvivalService.vital_update_fields('radiation'))
         return player.radiation
 
     @staticmethod
@@ -677,7 +771,7 @@ class SurvivalService:
         if metabolism_change != 0:
             player.metabolism_rate = max(0.5, min(2.0, player.metabolism_rate + metabolism_change))
 
-        player.save(update_fields=['hunger', 'thirst', 'radiation', 'metabolism_rate'])
+        player.save(update_fields=SurvivalService.vital_update_fields('hunger', 'thirst', 'radiation', 'metabolism_rate'))
 
     @staticmethod
     def update_with_activity(player, activity_type='walking', duration_minutes=1):
@@ -692,13 +786,14 @@ class SurvivalService:
         thirst_per_min = GameSettings.survival_thirst_decrease_rate() * activity_mult
 
         # Apply consumption
+        SurvivalService.catch_up(player)
         hunger_loss = hunger_per_min * duration_minutes * player.metabolism_rate
         thirst_loss = thirst_per_min * duration_minutes * player.metabolism_rate
 
         player.hunger = max(0, player.hunger - hunger_loss)
         player.thirst = max(0, player.thirst - thirst_loss)
 
-        player.save(update_fields=['hunger', 'thirst'])
+        player.save(update_fields=SurvivalService.vital_update_fields('hunger', 'thirst'))
 
         return {
             'hunger_lost': int(hunger_loss),
@@ -5,6 +5,8 @@ from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 from game.models import TradeOffer, Player, Material, Inventory
+from game import catalog, events
+from game.services.inventory_ledger_service import InsufficientQuantity, ItemDelta, apply_deltas
 import logging
 
 logger = logging.getLogger(__name__)
@@ -70,7 +72,15 @@ class TradingService:
     @staticmethod
     @transaction.atomic
     def accept_trade(trade_id, accepting_player):
-        """Accept a trade offer"""
+        """
+        Accept a trade offer
+
+        Locks the offer, then both players (by id) and all their inventory rows
+        involved (by player, material) in that order, so concurrent accepts on
+        overlapping players queue up instead of deadlocking. Everything is
+        validated from that locked snapshot and written in a fixed number of
+        queries, whatever the number of items.
+        """
         try:
             trade = TradeOffer.objects.select_for_update().get(
                 id=trade_id,
@@ -82,123 +92,85 @@ class TradingService:
             if not can_accept:
                 return False, error
 
-            # Check if accepting player has requested items
-            for item in trade.requested_items:
-                material_id = item.get('material_id')
-                quantity = item.get('quantity', 1)
-
-                try:
-                    inv = Inventory.objects.get(player=accepting_player, material_id=material_id)
-                    if inv.quantity < quantity:
-                        material = Material.objects.get(id=material_id)
-                        return False, f"Vous n'avez pas assez de {material.name}"
-                except Inventory.DoesNotExist:
-                    material = Material.objects.get(id=material_id)
-                    return False, f"Vous n'avez pas de {material.name}"
+            offered = TradingService._item_totals(trade.offered_items)
+            requested = TradingService._item_totals(trade.requested_items)
+            for material_id in set(offered) | set(requested):
+                if catalog.get_material(material_id) is None:
+                    return False, "Matériau introuvable"
+
+            from_id, to_id = trade.from_player_id, accepting_player.id
+            players = {
+                player.id: player
+                for player in Player.objects.select_for_update(of=('self',)).select_related('user').filter(
+                    id__in=[from_id, to_id]
+                ).order_by('id')
+            }
+            from_player, to_player = players[from_id], players[to_id]
 
             # Check money
-            if trade.requested_money > accepting_player.money:
+            if trade.requested_money > to_player.money:
                 return False, f"Argent insuffisant. Requis: {trade.requested_money}"
 
-            # Verify from_player still has offered items
-            for item in trade.offered_items:
-                material_id = item.get('material_id')
-                quantity = item.get('quantity', 1)
-
-                try:
-                    inv = Inventory.objects.get(player=trade.from_player, material_id=material_id)
-                    if inv.quantity < quantity:
-                        material = Material.objects.get(id=material_id)
-                        return False, f"L'offrant n'a plus assez de {material.name}"
-                except Inventory.DoesNotExist:
-                    return False, "L'offre n'est plus valide"
-
             # Verify from_player money
-            if trade.offered_money > trade.from_player.money:
+            if trade.offered_money > from_player.money:
                 return False, "L'offrant n'a plus assez d'argent"
 
-            # Execute trade: Remove from from_player
-            for item in trade.offered_items:
-                material_id = item.get('material_id')
-                quantity = item.get('quantity', 1)
-
-                inv = Inventory.objects.get(player=trade.from_player, material_id=material_id)
-                inv.quantity -= quantity
-                if inv.quantity <= 0:
-                    inv.delete()
-                else:
-                    inv.save()
-
-            # Remove money from from_player
-            trade.from_player.money -= trade.offered_money
-            trade.from_player.save()
-
-            # Remove from to_player (accepting player)
-            for item in trade.requested_items:
-                material_id = item.get('material_id')
-                quantity = item.get('quantity', 1)
-
-                inv = Inventory.objects.get(player=accepting_player, material_id=material_id)
-                inv.quantity -= quantity
-                if inv.quantity <= 0:
-                    inv.delete()
-                else:
-                    inv.save()
-
-            # Remove money from accepting player
-            accepting_player.money -= trade.requested_money
-            accepting_player.save()
-
-            # Add to accepting player
-            for item in trade.offered_items:
-                material_id = item.get('material_id')
-                quantity = item.get('quantity', 1)
-                material = Material.objects.get(id=material_id)
-
-                inv, created = Inventory.objects.get_or_create(
-                    player=accepting_player,
-                    material=material,
-                    defaults={'quantity': 0}
-                )
-                inv.quantity += quantity
-                inv.save()
-
-            # Add money to accepting player
-            accepting_player.money += trade.offered_money
-            accepting_player.save()
-
-            # Add to from_player
-            for item in trade.requested_items:
-                material_id = item.get('material_id')
-                quantity = item.get('quantity', 1)
-                material = Material.objects.get(id=material_id)
-
-                inv, created = Inventory.objects.get_or_create(
-                    player=trade.from_player,
-                    material=material,
-                    defaults={'quantity': 0}
-                )
-                inv.quantity += quantity
-                inv.save()
+            # Move the items both ways in one ledger batch (locked and validated there)
+            item_deltas = []
+            for material_id, quantity in offered.items():
+                item_deltas.append(ItemDelta(from_id, material_id, -quantity))
+                item_deltas.append(ItemDelta(to_id, material_id, quantity))
+            for material_id, quantity in requested.items():
+                item_deltas.append(ItemDelta(to_id, material_id, -quantity))
+                item_deltas.append(ItemDelta(from_id, material_id, quantity))
+            try:
+                apply_deltas(item_deltas, players=[from_player, to_player, accepting_player])
+            except InsufficientQuantity as exc:
+                name = catalog.get_material(exc.material_id).name
+                if exc.player_id == to_id:
+                    # Accepting player lacks requested items
+                    if not exc.has_stack:
+                        return False, f"Vous n'avez pas de {name}"
+                    return False, f"Vous n'avez pas assez de {name}"
+                # from_player no longer has offered items
+                if not exc.has_stack:
+                    return False, "L'offre n'est plus valide"
+                return False, f"L'offrant n'a plus assez de {name}"
 
-            # Add money to from_player
-            trade.from_player.money += trade.requested_money
-            trade.from_player.save()
+            # Exchange money
+            money_delta = trade.requested_money - trade.offered_money
+            if money_delta:
+                from_player.money += money_delta
+                to_player.money -= money_delta
+                Player.objects.bulk_update([from_player, to_player], ['money'])
+                events.publish(*(events.StatsChanged(player_id=player.id) for player in (from_player, to_player)))
+            accepting_player.money = to_player.money
 
             # Mark trade as completed
             trade.status = 'completed'
             trade.completed_at = timezone.now()
-            trade.save()
+            trade.save(update_fields=['status', 'completed_at'])
 
-            logger.info(f"Trade completed: {trade.from_player.user.username} ↔ {accepting_player.user.username}")
+            logger.info(f"Trade completed: {from_player.user.username} ↔ {to_player.user.username}")
             return True, None
 
         except TradeOffer.DoesNotExist:
             return False, "Offre introuvable"
         except Exception as e:
+            # Never commit a half-applied trade
+            transaction.set_rollback(True)
             logger.error(f"Error accepting trade: {e}")
             return False, str(e)
 
+    @staticmethod
+    def _item_totals(items):
+        """Trade item list -> {material_id: total quantity}"""
+        totals = {}
+        for item in items or []:
+            material_id = int(item.get('material_id'))
+            totals[material_id] = totals.get(material_id, 0) + int(item.get('quantity', 1))
+        return totals
+
     @staticmethod
     def reject_trade(trade_id, player):
         """Reject a trade offer"""
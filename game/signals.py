@@ -0,0 +1,133 @@
+"""
+Signal handlers keeping cached game data, player modifiers, achievement counters and pushed client
+state in sync with the database
+"""
+from django.db.models.signals import post_delete, post_save
+
+from . import events, modifiers, push
+from .catalog import CATALOG_MODELS, invalidate_catalog
+from .models import (
+    Building, CombatLog, CraftingLog, DigestingFood, DynamicEvent, EquippedItem, GatheringLog, Inventory, Player,
+    PlayerBodyPart, PlayerDisease, PlayerHealthStatus, PlayerNutrition, PlayerTalent
+)
+from .services.achievement_service import AchievementService
+from .services import equipment_service, inventory_ledger_service
+from .services.leaderboard_service import PLAYER_SCORE_FIELDS
+
+
+def invalidate_catalog_on_write(sender, **kwargs):
+    invalidate_catalog()
+
+
+for _model in CATALOG_MODELS:
+    post_save.connect(invalidate_catalog_on_write, sender=_model, dispatch_uid=f'catalog_{_model.__name__}_save')
+    post_delete.connect(invalidate_catalog_on_write, sender=_model, dispatch_uid=f'catalog_{_model.__name__}_delete')
+
+
+def count_gathering(sender, instance, created, **kwargs):
+    if not created:
+        return
+    AchievementService.increment_counters(instance.player_id, {
+        'gathers': 1,
+        f'gather_material:{instance.material.name}': 1,
+    })
+
+
+def count_crafting(sender, instance, created, **kwargs):
+    if not created:
+        return
+    AchievementService.increment_counters(instance.player_id, {
+        'crafts': 1,
+        f'craft_recipe:{instance.recipe.name}': 1,
+    })
+
+
+def count_victory(sender, instance, created, **kwargs):
+    if not created or instance.result != 'victory':
+        return
+    AchievementService.increment_counters(instance.player_id, {f'mob_defeated:{instance.mob.name}': 1})
+
+
+post_save.connect(count_gathering, sender=GatheringLog, dispatch_uid='counters_gathering')
+post_save.connect(count_crafting, sender=CraftingLog, dispatch_uid='counters_crafting')
+post_save.connect(count_victory, sender=CombatLog, dispatch_uid='counters_victory')
+
+
+def shift_saved_inventory(sender, instance, created, raw=False, **kwargs):
+    """Writes outside the inventory ledger still move the player's carry weight"""
+    if raw:
+        return
+    stored = 0 if created else getattr(instance, '_stored_quantity', None)
+    if stored is None:
+        # Saved without being loaded first: the previous quantity is unknown
+        inventory_ledger_service.recompute_carry_weights([instance.player_id])
+    else:
+        inventory_ledger_service.shift_carry_weight(instance.player_id, instance.material_id, instance.quantity - stored)
+    instance._stored_quantity = instance.quantity
+
+
+def shift_deleted_inventory(sender, instance, **kwargs):
+    if inventory_ledger_service.is_applying():
+        return
+    stored = getattr(instance, '_stored_quantity', instance.quantity)
+    inventory_ledger_service.shift_carry_weight(instance.player_id, instance.material_id, -stored)
+
+
+def refresh_equipment_totals(sender, instance, raw=False, **kwargs):
+    if not raw:
+        equipment_service.refresh_equipment_totals(instance.player_id)
+
+
+post_save.connect(shift_saved_inventory, sender=Inventory, dispatch_uid='carry_weight_inventory_save')
+post_delete.connect(shift_deleted_inventory, sender=Inventory, dispatch_uid='carry_weight_inventory_delete')
+post_save.connect(refresh_equipment_totals, sender=EquippedItem, dispatch_uid='equipment_totals_save')
+post_delete.connect(refresh_equipment_totals, sender=EquippedItem, dispatch_uid='equipment_totals_delete')
+
+
+def invalidate_player_modifiers(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if sender.player.is_cached(instance):
+        modifiers.forget(instance.player)
+
+
+for _model in (PlayerTalent, Building):
+    post_save.connect(invalidate_player_modifiers, sender=_model, dispatch_uid=f'modifiers_{_model.__name__}_save')
+    post_delete.connect(invalidate_player_modifiers, sender=_model, dispatch_uid=f'modifiers_{_model.__name__}_delete')
+
+
+def push_player_state(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+    topics = push.player_topics(update_fields)
+    if topics:
+        push.touch(instance.id, *topics)
+
+
+def push_health_state(sender, instance, raw=False, **kwargs):
+    if not raw:
+        push.touch(instance.player_id, 'health')
+
+
+def push_world_events(sender, instance, raw=False, **kwargs):
+    if not raw:
+        push.touch_world('world')
+
+
+post_save.connect(push_player_state, sender=Player, dispatch_uid='push_player_save')
+for _model in (PlayerBodyPart, PlayerHealthStatus, PlayerDisease, PlayerNutrition, DigestingFood):
+    post_save.connect(push_health_state, sender=_model, dispatch_uid=f'push_{_model.__name__}_save')
+    post_delete.connect(push_health_state, sender=_model, dispatch_uid=f'push_{_model.__name__}_delete')
+post_save.connect(push_world_events, sender=DynamicEvent, dispatch_uid='push_dynamic_event_save')
+post_delete.connect(push_world_events, sender=DynamicEvent, dispatch_uid='push_dynamic_event_delete')
+
+
+def publish_player_stats(sender, instance, created=False, update_fields=None, raw=False, **kwargs):
+    """Level, wealth and explorer leaderboards follow the players whose ranked columns changed"""
+    if raw:
+        return
+    if created or update_fields is None or not set(update_fields).isdisjoint(PLAYER_SCORE_FIELDS):
+        events.publish(events.StatsChanged(player_id=instance.id))
+
+
+post_save.connect(publish_player_stats, sender=Player, dispatch_uid='leaderboard_player_stats')
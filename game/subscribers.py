@@ -0,0 +1,92 @@
+"""
+Game event subscribers: achievements, quest progress, live leaderboards and pushed world state
+
+Registered on the event bus (game.events) when the app is ready.
+"""
+from . import push
+from .events import Crafted, Gathered, LeveledUp, MobDefeated, Moved, StatsChanged, subscribe
+from .services.achievement_service import AchievementService, check_achievements
+from .services.leaderboard_service import LeaderboardService
+from .services.quest_service import QuestService
+
+
+def achievement_payload(achievements):
+    return [
+        {
+            'name': ach.name,
+            'description': ach.description,
+            'icon': ach.icon,
+            'reward_xp': ach.reward_xp
+        }
+        for ach in achievements
+    ]
+
+
+def quest_payload(completed_quests):
+    return [
+        {
+            'quest': {
+                'name': q['quest'].name,
+                'icon': q['quest'].icon,
+                'description': q['quest'].description
+            },
+            'rewards': q['rewards']
+        }
+        for q in completed_quests
+    ]
+
+
+@subscribe(Moved, Gathered, Crafted, MobDefeated, LeveledUp)
+def update_achievements(player, event):
+    if isinstance(event, Moved):
+        AchievementService.increment_counters(player.id, {f'biome_visited:{event.biome}': 1})
+        unlocked = check_achievements(player, 'move', biome=event.biome)
+    elif isinstance(event, Gathered):
+        unlocked = check_achievements(player, 'gather', material_name=event.material_name)
+    elif isinstance(event, Crafted):
+        unlocked = check_achievements(player, 'craft', recipe_name=event.recipe_name)
+    elif isinstance(event, MobDefeated):
+        unlocked = check_achievements(player, 'mob_defeat', mob_name=event.mob_name)
+    else:
+        unlocked = check_achievements(player, 'level_up')
+    return {'achievements_unlocked': achievement_payload(unlocked)} if unlocked else None
+
+
+@subscribe(Moved, Gathered, Crafted, MobDefeated)
+def update_quests(player, event):
+    if isinstance(event, Moved):
+        completed = QuestService.update_quest_progress(player, 'visit', grid_x=event.grid_x, grid_y=event.grid_y)
+    elif isinstance(event, Gathered):
+        completed = QuestService.update_quest_progress(
+            player, 'gather', material_id=event.material_id, quantity=event.quantity
+        )
+    elif isinstance(event, Crafted):
+        completed = QuestService.update_quest_progress(
+            player, 'craft', recipe_id=event.recipe_id, quantity=event.quantity
+        )
+    else:
+        completed = QuestService.update_quest_progress(player, 'defeat', mob_id=event.mob_id, quantity=1)
+    return {'quests_completed': quest_payload(completed)} if completed else None
+
+
+@subscribe(Gathered, Crafted, MobDefeated)
+def update_live_leaderboards(player, event):
+    if isinstance(event, Gathered):
+        LeaderboardService.record_event(player.id, 'gatherer')
+    elif isinstance(event, Crafted):
+        LeaderboardService.record_event(player.id, 'crafter', event.quantity)
+    elif event.source == 'combat':
+        # The combatant board counts logged combat victories, not hunts
+        LeaderboardService.record_event(player.id, 'combatant')
+
+
+@subscribe(StatsChanged)
+def update_player_leaderboards(player, event):
+    # Level, wealth and explorer scores are columns of the (freshly loaded) player row
+    LeaderboardService.sync_players([player])
+
+
+@subscribe(Moved)
+def push_world_state(player, event):
+    # Biome, weather and nearby events depend on where the player stands
+    push.touch(player.id, 'world')
@@ -0,0 +1,58 @@
+"""
+Unit tests for the in-memory static data catalog
+"""
+from django.core.checks import run_checks
+from django.test import TestCase, override_settings
+
+from game import catalog
+from game.models import Material, RandomEnemy, Recipe, RecipeIngredient
+
+
+class CatalogTest(TestCase):
+    def setUp(self):
+        self.wood = Material.objects.create(name='Bois')
+        self.plank = Material.objects.create(name='Planches')
+        self.recipe = Recipe.objects.create(name='Planches', description='', result_material=self.plank)
+        RecipeIngredient.objects.create(recipe=self.recipe, material=self.wood, quantity=2)
+
+    def test_reads_are_served_from_memory(self):
+        """After the first load, lookups by id and name do not query the database"""
+        catalog.get_catalog()
+        with self.assertNumQueries(0):
+            self.assertEqual(catalog.get_material_by_name('Bois').id, self.wood.id)
+            self.assertEqual(catalog.get_material(self.plank.id).name, 'Planches')
+            recipe = catalog.get_recipe(self.recipe.id)
+            self.assertEqual(recipe.result_material.name, 'Planches')
+            ingredients = catalog.get_recipe_ingredients(self.recipe.id)
+            self.assertEqual([(i.material.name, i.quantity) for i in ingredients], [('Bois', 2)])
+
+    def test_writes_invalidate_the_catalog(self):
+        """Saving or deleting a catalog model is visible on the next read"""
+        catalog.get_catalog()
+        stone = Material.objects.create(name='Pierre')
+        self.assertEqual(catalog.get_material_ids()['Pierre'], stone.id)
+
+        stone.delete()
+        self.assertIsNone(catalog.get_material_by_name('Pierre'))
+
+    def test_other_process_writes_reload_the_catalog(self):
+        """A version bumped in the shared cache by another worker is picked up after check_interval"""
+        catalog.get_catalog()
+        Material.objects.filter(id=self.wood.id).update(name='Chêne')  # no signal: as seen from another process
+        catalog.version_cache().incr(catalog.CATALOG_VERSION_CACHE_KEY)
+
+        with override_settings(CATALOG={'check_interval': 0}):
+            self.assertEqual(catalog.get_material(self.wood.id).name, 'Chêne')
+
+    def test_per_process_version_cache_is_refused(self):
+        """A LocMem version cache fails the system check"""
+        with override_settings(CATALOG={'cache': 'default'}):
+            self.assertEqual([e.id for e in run_checks() if e.id.startswith('game.')], ['game.E002'])
+
+    def test_enemies_filtered_by_biome_and_level(self):
+        """Enemy eligibility uses the pre-parsed biome lists"""
+        RandomEnemy.objects.create(name='Bandit', description='', biomes_json='["forest"]', min_level_required=1)
+        RandomEnemy.objects.create(name='Pillard', description='', biomes_json='[]', min_level_required=5)
+
+        self.assertEqual([e.name for e in catalog.get_enemies_for('forest', 1)], ['Bandit'])
+        self.assertEqual(sorted(e.name for e in catalog.get_enemies_for('desert', 5)), ['Pillard'])
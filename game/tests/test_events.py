@@ -0,0 +1,123 @@
+"""
+Unit tests for the game event bus and its subscribers
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from game import events, ranking
+from game.models import (
+    Achievement, CellMaterial, MapCell, Material, Player, PlayerAchievement, PlayerQuest, Quest
+)
+from game.services.gathering_service import gather_material
+from game.services.leaderboard_service import LeaderboardService
+
+
+@override_settings(GAME_EVENTS={'async': False})
+class GameEventBusTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        ranking.reset_index()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.player = Player.objects.create(user=self.user, energy=100, max_energy=100, hunger=80, thirst=80)
+        self.cell = MapCell.objects.create(grid_x=0, grid_y=0, center_lat=44.933, center_lon=4.893, biome='forest')
+        self.berry = Material.objects.create(name='Baie', category='resource', weight=0.5)
+        CellMaterial.objects.create(cell=self.cell, material=self.berry, quantity=100, max_quantity=100)
+
+        self.achievement = Achievement.objects.create(
+            name='Première baie', description='', requirement_type='material_collected',
+            requirement_target='Baie', requirement_value=1, reward_xp=0
+        )
+        quest = Quest.objects.create(
+            name='Cueilleur', description='', quest_type='gather',
+            requirements={'gather': [{'material_id': self.berry.id, 'quantity': 1000}]}
+        )
+        self.player_quest = PlayerQuest.objects.create(
+            player=self.player, quest=quest, status='active', accepted_at=timezone.now(), progress={}
+        )
+
+    def test_side_effects_run_after_commit(self):
+        """Gathering only publishes; achievements, quests and ranks follow the commit"""
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            result, status_code = gather_material(self.player, self.cell, self.berry.id)
+            self.assertEqual(status_code, 200)
+            self.assertNotIn('achievements_unlocked', result)
+            self.assertFalse(PlayerAchievement.objects.filter(player=self.player).exists())
+        self.assertTrue(callbacks)
+
+        self.assertTrue(PlayerAchievement.objects.get(player=self.player, achievement=self.achievement).completed)
+        self.player_quest.refresh_from_db()
+        self.assertEqual(self.player_quest.progress['gather'][str(self.berry.id)], result['gathered'])
+        self.assertEqual(LeaderboardService.get_player_rank(self.player, 'gatherer')['score'], 1)
+
+    def test_results_delivered_with_next_response(self):
+        """Unlocked achievements are queued for the player and handed out once"""
+        with self.captureOnCommitCallbacks(execute=True):
+            gather_material(self.player, self.cell, self.berry.id)
+
+        notifications = events.pop_notifications(self.player.id)
+        self.assertEqual([a['name'] for a in notifications['achievements_unlocked']], ['Première baie'])
+        self.assertEqual(events.pop_notifications(self.player.id), {})
+
+    def test_notifications_are_shared_and_expire(self):
+        """Queued notifications are stored in the database and dropped after notification_ttl"""
+        from datetime import timedelta
+        from game.models import PendingNotification
+
+        events.push_notifications(self.player.id, {'quests_completed': [{'name': 'old'}]})
+        PendingNotification.objects.update(created_at=timezone.now() - timedelta(hours=2))
+        events.push_notifications(self.player.id, {'quests_completed': [{'name': 'new'}]})
+
+        self.assertEqual(PendingNotification.objects.filter(player=self.player).count(), 1)
+        self.assertEqual(events.pop_notifications(self.player.id), {'quests_completed': [{'name': 'new'}]})
+        self.assertFalse(PendingNotification.objects.exists())
+
+    def test_rolled_back_events_are_dropped(self):
+        """Events of a transaction that never commits are not handled"""
+        with self.captureOnCommitCallbacks(execute=False):
+            gather_material(self.player, self.cell, self.berry.id)
+
+        self.assertFalse(PlayerAchievement.objects.filter(player=self.player).exists())
+        self.assertEqual(events.pop_notifications(self.player.id), {})
+
+    def test_failing_subscriber_does_not_block_others(self):
+        """A subscriber error is logged and the remaining subscribers still run"""
+        calls = []
+
+        class Probe(events.Moved):
+            pass
+
+        def broken(player, event):
+            raise RuntimeError('boom')
+
+        def working(player, event):
+            calls.append(event)
+            return {'achievements_unlocked': [{'name': 'probe'}]}
+
+        events.subscribe(Probe)(broken)
+        events.subscribe(Probe)(working)
+        self.addCleanup(events._SUBSCRIBERS.pop, Probe, None)
+        with self.assertLogs('game.events', level='ERROR'):
+            handled = events.dispatch([Probe(player_id=self.player.id, grid_x=0, grid_y=0, biome='forest')])
+
+        self.assertEqual((handled, len(calls)), (1, 1))
+        self.assertEqual(events.pop_notifications(self.player.id), {'achievements_unlocked': [{'name': 'probe'}]})
+
+    def test_stale_instance_keeps_subscriber_rewards(self):
+        """Rewards granted by subscribers survive a later action on an instance loaded before them"""
+        self.achievement.reward_xp = 500
+        self.achievement.save()
+        stale = Player.objects.get(id=self.player.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            gather_material(self.player, self.cell, self.berry.id)
+        rewarded = Player.objects.get(id=self.player.id)
+        self.assertGreater(rewarded.level, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            gather_material(stale, self.cell, self.berry.id)
+
+        stored = Player.objects.get(id=self.player.id)
+        self.assertEqual(stored.level, rewarded.level)
+        self.assertGreater(stored.experience, rewarded.experience)
@@ -0,0 +1,57 @@
+"""
+Unit tests for the per-player modifier snapshot (talent effects and building bonuses)
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from game.models import Building, BuildingType, MapCell, Player, PlayerTalent, Skill, TalentNode
+from game.services.building_service import calculate_player_bonuses, complete_construction
+from game.services.energy_service import apply_building_effects_to_action
+from game.services.skills_service import get_active_effects
+
+
+class PlayerModifiersTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.player = Player.objects.create(user=self.user)
+        self.cell = MapCell.objects.create(grid_x=0, grid_y=0, center_lat=44.933, center_lon=4.893, biome='plains')
+        self.skill, _ = Skill.objects.get_or_create(code='gathering', defaults={'name': 'Cueillette'})
+        self.node, _ = TalentNode.objects.update_or_create(
+            skill=self.skill, code='g_test_yield', defaults={'name': 'Récolte', 'effect_type': 'gather_yield_pct', 'effect_value': 10}
+        )
+        self.workshop = BuildingType.objects.create(
+            name='Atelier', category='production', production_bonus=0.5, energy_regeneration_bonus=2
+        )
+
+    def test_action_paths_share_one_snapshot(self):
+        """Talents and buildings are read once per request"""
+        with self.assertNumQueries(2):
+            get_active_effects(self.player, 'gathering')
+            get_active_effects(self.player, 'crafting')
+            calculate_player_bonuses(self.player)
+            apply_building_effects_to_action(self.player, 'move', 10)
+
+        next_request = Player.objects.get(id=self.player.id)
+        with self.assertNumQueries(2):
+            self.assertEqual(get_active_effects(next_request, 'gathering'), {})
+
+    def test_talent_unlock_invalidates(self):
+        """A new talent shows up on the same instance and on later requests"""
+        self.assertEqual(get_active_effects(self.player, 'gathering'), {})
+
+        PlayerTalent.objects.create(player=self.player, talent_node=self.node)
+
+        self.assertEqual(get_active_effects(self.player, 'gathering'), {'gather_yield_pct': 10})
+        self.assertEqual(get_active_effects(Player.objects.get(id=self.player.id), 'gathering'), {'gather_yield_pct': 10})
+
+    def test_completed_building_invalidates(self):
+        """Completing a construction applies its bonuses to the next action"""
+        building = Building.objects.create(player=self.player, cell=self.cell, building_type=self.workshop)
+        self.assertEqual(apply_building_effects_to_action(self.player, 'gather', 10), 10)
+
+        complete_construction(building.id, self.player)
+
+        self.assertEqual(apply_building_effects_to_action(self.player, 'gather', 10), 5)
+        self.assertEqual(calculate_player_bonuses(Player.objects.get(id=self.player.id))['energy_regeneration'], 2)
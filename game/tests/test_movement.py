@@ -3,6 +3,7 @@ Unit tests for movement service
 """
 from django.test import TestCase
 from django.contrib.auth.models import User
+from game import catalog
 from game.models import Player, MapCell
 from game.services import movement_service
 from decimal import Decimal
@@ -11,6 +12,9 @@ from decimal import Decimal
 class MovementServiceTest(TestCase):
     def setUp(self):
         """Set up test user and player"""
+        # Cell generation reads material ids from the catalog; drop any snapshot
+        # loaded by a previous (rolled back) test
+        catalog.invalidate_catalog()
         self.user = User.objects.create_user(username='testuser', password='testpass')
         self.player = Player.objects.create(
             user=self.user,
@@ -0,0 +1,259 @@
+"""
+Unit tests for the persistent OSM tile cache
+"""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from game import osm_utils
+from game.models import OSMTile
+
+
+FEATURES = [{'type': 'node', 'id': 1, 'tags': {'shop': 'bakery'}, 'category': 'shop', 'subcategory': 'bakery'}]
+
+
+class OSMTileCacheTest(TestCase):
+    def setUp(self):
+        osm_utils._OSM_CB['fail_count'] = 0
+        osm_utils._OSM_CB['opened_until'] = 0
+
+    @patch('game.osm_utils._query_overpass', return_value=FEATURES)
+    def test_miss_fetches_and_stores_tile(self, mock_query):
+        """A cold tile queries Overpass once and is persisted"""
+        features = osm_utils.fetch_osm_features(44.93301, 4.89302, radius=100)
+
+        self.assertEqual(features, FEATURES)
+        mock_query.assert_called_once()
+        tile = OSMTile.objects.get(tile_key=osm_utils.get_tile_key(44.93301, 4.89302, 100))
+        self.assertEqual(tile.features, FEATURES)
+
+    @patch('game.osm_utils._query_overpass', return_value=FEATURES)
+    def test_fresh_tile_is_served_without_query(self, mock_query):
+        """Nearby coordinates in the same tile are served from the store"""
+        osm_utils.fetch_osm_features(44.93301, 4.89302, radius=100)
+        features = osm_utils.fetch_osm_features(44.93299, 4.89298, radius=100)
+
+        self.assertEqual(features, FEATURES)
+        self.assertEqual(mock_query.call_count, 1)
+
+    @patch('game.osm_utils._revalidate_tile_async')
+    @patch('game.osm_utils._query_overpass', return_value=[])
+    def test_stale_tile_served_while_revalidating(self, mock_query, mock_revalidate):
+        """Stale tiles are returned immediately and refreshed in the background"""
+        old = timezone.now() - timedelta(days=1)
+        key = osm_utils.get_tile_key(44.933, 4.893, 100)
+        OSMTile.objects.create(tile_key=key, lat=44.933, lon=4.893, radius=100,
+                               features=FEATURES, fetched_at=old, last_accessed=old)
+
+        features = osm_utils.fetch_osm_features(44.933, 4.893, radius=100)
+
+        self.assertEqual(features, FEATURES)
+        mock_query.assert_not_called()
+        mock_revalidate.assert_called_once_with(key, 44.933, 4.893, 100)
+
+    @patch('game.osm_utils._query_overpass', return_value=None)
+    def test_expired_tile_served_when_overpass_fails(self, mock_query):
+        """Expired tiles are still better than nothing when Overpass is down"""
+        old = timezone.now() - timedelta(days=30)
+        key = osm_utils.get_tile_key(44.933, 4.893, 100)
+        OSMTile.objects.create(tile_key=key, lat=44.933, lon=4.893, radius=100,
+                               features=FEATURES, fetched_at=old, last_accessed=old)
+
+        self.assertEqual(osm_utils.fetch_osm_features(44.933, 4.893, radius=100), FEATURES)
+        mock_query.assert_called_once()
+
+    @patch('game.osm_utils._query_overpass', return_value=None)
+    def test_failure_without_tile_returns_empty(self, mock_query):
+        """Failures are not persisted so other workers can retry"""
+        self.assertEqual(osm_utils.fetch_osm_features(44.933, 4.893, radius=100), [])
+        self.assertFalse(OSMTile.objects.exists())
+
+    @override_settings(OSM_TILE_CACHE={'max_tiles': 2})
+    @patch('game.osm_utils._query_overpass', return_value=FEATURES)
+    def test_eviction_keeps_most_recently_accessed(self, mock_query):
+        """The store is bounded and evicts least recently accessed tiles"""
+        osm_utils.fetch_osm_features(44.0, 4.0, radius=100)
+        OSMTile.objects.update(last_accessed=timezone.now() - timedelta(days=1))
+        osm_utils.fetch_osm_features(45.0, 4.0, radius=100)
+        osm_utils.fetch_osm_features(46.0, 4.0, radius=100)
+
+        self.assertEqual(OSMTile.objects.count(), 2)
+        self.assertFalse(OSMTile.objects.filter(tile_key=osm_utils.get_tile_key(44.0, 4.0, 100)).exists())
+
+
+class OSMBulkFetchTest(TestCase):
+    def setUp(self):
+        osm_utils._OSM_CB['fail_count'] = 0
+        osm_utils._OSM_CB['opened_until'] = 0
+        self.centers = osm_utils.get_block_cell_centers(44.933, 4.893, 2, 0.0009)
+
+    def test_block_cell_centers(self):
+        """An N x N block yields N*N evenly spaced centers"""
+        self.assertEqual(len(self.centers), 4)
+        self.assertIn((44.933, 4.893), self.centers)
+        self.assertIn((44.933 - 0.0009, 4.893 - 0.0009), self.centers)
+
+    def test_bucket_elements_by_distance(self):
+        """Elements are assigned to each cell within radius, ways by their center"""
+        elements = [
+            {'type': 'node', 'id': 1, 'lat': 44.933, 'lon': 4.893, 'tags': {'shop': 'bakery'}},
+            {'type': 'way', 'id': 2, 'center': {'lat': 44.9321, 'lon': 4.8921}, 'tags': {'landuse': 'forest'}},
+            {'type': 'node', 'id': 3, 'lat': 44.933, 'lon': 4.893, 'tags': {'highway': 'crossing'}},
+        ]
+        buckets = osm_utils.bucket_osm_elements(elements, self.centers, 50)
+
+        self.assertEqual([f['id'] for f in buckets[(44.933, 4.893)]], [1])
+        self.assertEqual([f['id'] for f in buckets[(44.933 - 0.0009, 4.893 - 0.0009)]], [2])
+
+    def test_bucket_ways_by_bounding_box(self):
+        """A way crossing a cell is kept there even when its center is far away"""
+        cell = (44.933, 4.893)
+        # A long river: center ~600m east of the cell, bbox runs through it
+        elements = [{
+            'type': 'way', 'id': 7, 'tags': {'waterway': 'river'},
+            'center': {'lat': 44.933, 'lon': 4.9006},
+            'bounds': {'minlat': 44.9328, 'minlon': 4.8920, 'maxlat': 44.9332, 'maxlon': 4.9092},
+        }]
+        self.assertGreater(osm_utils._distance_meters(*cell, 44.933, 4.9006), 50)
+
+        buckets = osm_utils.bucket_osm_elements(elements, self.centers, 50)
+
+        self.assertEqual([f['id'] for f in buckets[cell]], [7])
+        self.assertEqual(buckets[(44.933 - 0.0009, 4.893 - 0.0009)], [])
+
+    @patch('game.osm_utils._run_overpass_query')
+    def test_bulk_fetch_stores_all_tiles_in_one_query(self, mock_run):
+        """One Overpass request fills the tile store for the whole block"""
+        mock_run.return_value = {'elements': [
+            {'type': 'node', 'id': 1, 'lat': 44.933, 'lon': 4.893, 'tags': {'shop': 'bakery'}},
+        ]}
+
+        results = osm_utils.fetch_osm_features_bulk(self.centers, radius=50)
+
+        mock_run.assert_called_once()
+        self.assertEqual(len(results), 4)
+        self.assertEqual(OSMTile.objects.count(), 4)
+        with patch('game.osm_utils._query_overpass') as mock_query:
+            self.assertEqual(osm_utils.fetch_osm_features(44.933, 4.893, radius=50)[0]['id'], 1)
+            mock_query.assert_not_called()
+
+    @patch('game.osm_utils._run_overpass_query', return_value={'elements': []})
+    def test_bulk_fetch_skips_fresh_tiles(self, mock_run):
+        """Blocks whose tiles are all fresh do not hit Overpass"""
+        osm_utils.fetch_osm_features_bulk(self.centers, radius=50)
+        osm_utils.fetch_osm_features_bulk(self.centers, radius=50)
+
+        self.assertEqual(mock_run.call_count, 1)
+
+
+OSM_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<osm version="0.6">
+  <bounds minlat="44.92" minlon="4.88" maxlat="44.94" maxlon="4.90"/>
+  <node id="1" lat="44.9330" lon="4.8930"><tag k="shop" v="bakery"/><tag k="name" v="Chez Paul"/></node>
+  <node id="2" lat="44.9331" lon="4.8931"/>
+  <node id="3" lat="44.9333" lon="4.8933"/>
+  <node id="4" lat="44.9300" lon="4.8800"><tag k="highway" v="crossing"/></node>
+  <node id="5" lat="44.9330" lon="4.8930"><tag k="leisure" v="park"/></node>
+  <way id="10"><nd ref="2"/><nd ref="3"/><tag k="landuse" v="forest"/></way>
+</osm>
+"""
+
+# A river crossing the extract: its bbox center is ~600m from its western end
+OSM_RIVER_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<osm version="0.6">
+  <bounds minlat="44.92" minlon="4.88" maxlat="44.94" maxlon="4.90"/>
+  <node id="20" lat="44.9380" lon="4.8810"/>
+  <node id="21" lat="44.9382" lon="4.8990"/>
+  <way id="30"><nd ref="20"/><nd ref="21"/><tag k="waterway" v="river"/></way>
+</osm>
+"""
+
+
+class OSMLocalIndexTest(TestCase):
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.NamedTemporaryFile('w', suffix='.osm', delete=False)
+        self.tmp.write(OSM_XML)
+        self.tmp.close()
+        osm_utils.reset_local_coverage()
+
+    def tearDown(self):
+        import os
+        os.remove(self.tmp.name)
+        osm_utils.reset_local_coverage()
+
+    def test_import_xml_extract(self):
+        """Only elements matching the Overpass categories are indexed"""
+        from django.core.management import call_command
+        from io import StringIO
+        from game.models import OSMFeature, OSMImport
+
+        call_command('import_osm_extract', self.tmp.name, stdout=StringIO())
+
+        self.assertEqual(
+            set(OSMFeature.objects.values_list('osm_type', 'osm_id')),
+            {('node', 1), ('way', 10)}
+        )
+        way = OSMFeature.objects.get(osm_type='way', osm_id=10)
+        self.assertAlmostEqual(way.lat, 44.9332)
+        record = OSMImport.objects.get()
+        self.assertEqual((record.south, record.east), (44.92, 4.90))
+
+    def test_relations_are_cleared_while_streaming(self):
+        """Every finished top-level element is dropped, not only nodes and ways"""
+        import xml.etree.ElementTree as ET
+        from game.osm_import import OSMExtractImporter
+
+        # Enough relations to outrun the parser's read-ahead after the last way
+        relations = ''.join(
+            f'  <relation id="{i}"><member type="way" ref="10" role="outer"/></relation>\n' for i in range(2000)
+        )
+        with open(self.tmp.name, 'w') as f:
+            f.write(OSM_XML.replace('</osm>', relations + '</osm>'))
+        roots = []
+        original = ET.iterparse
+
+        def iterparse(*args, **kwargs):
+            context = original(*args, **kwargs)
+            for event, elem in context:
+                if not roots:
+                    roots.append(elem)
+                yield event, elem
+
+        with patch('game.osm_import.ET.iterparse', iterparse):
+            OSMExtractImporter(self.tmp.name).run()
+
+        self.assertEqual(len(roots[0]), 0)
+
+    @patch('game.osm_utils._query_overpass')
+    def test_covered_location_served_locally(self, mock_query):
+        """Lookups inside an imported extract never reach Overpass"""
+        from game.osm_import import OSMExtractImporter
+
+        OSMExtractImporter(self.tmp.name).run()
+        features = osm_utils.fetch_osm_features(44.9330, 4.8930, radius=100)
+
+        mock_query.assert_not_called()
+        self.assertEqual({f['subcategory'] for f in features}, {'bakery', 'forest'})
+        self.assertEqual(osm_utils.fetch_osm_features(44.9250, 4.8850, radius=100), [])
+        self.assertTrue(osm_utils.has_osm_data(44.9250, 4.8850, 100))
+
+    def test_wide_way_found_by_bounding_box(self):
+        """A way is returned for a cell its bbox crosses even when its center is far away"""
+        from game.models import OSMFeature
+        from game.osm_import import OSMExtractImporter
+
+        with open(self.tmp.name, 'w') as f:
+            f.write(OSM_RIVER_XML)
+        OSMExtractImporter(self.tmp.name).run()
+
+        river = OSMFeature.objects.get(osm_type='way', osm_id=30)
+        self.assertTrue(river.wide)
+        self.assertEqual((river.min_lon, river.max_lon), (4.8810, 4.8990))
+        self.assertGreater(osm_utils._distance_meters(44.9381, 4.8820, river.lat, river.lon), 500)
+
+        features = osm_utils.query_local_index(44.9381, 4.8820, 50)
+        self.assertEqual([f['subcategory'] for f in features], ['river'])
+        self.assertEqual(osm_utils.query_local_index(44.9330, 4.8820, 50), [])
@@ -0,0 +1,139 @@
+"""
+Unit tests for the server push channel (state diffs over Server-Sent Events)
+"""
+import json
+
+from django.contrib.auth.models import User
+from django.core.checks import run_checks
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from game import push
+from game.models import Player
+
+
+def parse_frames(frames):
+    """[(event, data)] from SSE frames"""
+    parsed = []
+    for frame in frames:
+        fields = dict(line.split(': ', 1) for line in frame.strip().splitlines())
+        parsed.append((fields['event'], json.loads(fields['data'])))
+    return parsed
+
+
+class MergePatchTest(TestCase):
+    def test_only_changes_are_kept(self):
+        old = {'health': 90, 'alerts': ['a'], 'vitals': {'temp': 37, 'pulse': 70}, 'gone': 1}
+        new = {'health': 90, 'alerts': ['a', 'b'], 'vitals': {'temp': 38, 'pulse': 70}}
+
+        self.assertEqual(push.merge_patch(old, new), {'alerts': ['a', 'b'], 'vitals': {'temp': 38}, 'gone': None})
+        self.assertEqual(push.merge_patch(new, new), {})
+
+
+@override_settings(GAME_EVENTS={'async': False})
+class StateStreamTest(TestCase):
+    def setUp(self):
+        push.revision_cache().clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.player = Player.objects.create(user=self.user, money=100)
+
+    def test_first_poll_sends_full_state_then_nothing(self):
+        """An idle player costs one revision lookup per poll and no frame"""
+        stream = push.StateStream(self.player.id, ['player'])
+
+        (event, data), = parse_frames(stream.poll())
+        self.assertEqual(event, 'player')
+        self.assertEqual(data['full']['money'], 100)
+
+        # The revision lookup (database cache here), no Player load
+        with self.assertNumQueries(1):
+            self.assertEqual(stream.poll(), [])
+
+    def test_player_write_sends_a_patch(self):
+        """A committed write is pushed as the keys that changed"""
+        stream = push.StateStream(self.player.id, ['player'])
+        stream.poll()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.player.money = 250
+            self.player.save()
+
+        self.assertEqual(parse_frames(stream.poll()), [('player', {'patch': {'money': 250}})])
+
+    def test_unpushed_columns_touch_nothing(self):
+        """Saves limited to columns no topic shows cost no revision bump"""
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.player.metabolism_rate = 1.2
+            self.player.save(update_fields=['metabolism_rate'])
+        self.assertEqual(callbacks, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.player.money = 250
+            self.player.save(update_fields=['money'])
+        self.assertEqual(push.revisions(self.player.id, ['player', 'health']), {
+            'player': (1, None), 'health': (None, None)
+        })
+
+    def test_world_touch_reaches_every_stream(self):
+        """A world tick marks the topic for all players; unchanged payloads send nothing"""
+        stream = push.StateStream(self.player.id, ['player'])
+        stream.poll()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            push.touch_world('player')
+
+        # Revision lookup, then the Player load
+        with self.assertNumQueries(2):
+            self.assertEqual(stream.poll(), [])
+
+    def test_expired_revision_reads_as_a_change(self):
+        """Once a revision counter times out, streams rebuild instead of missing writes"""
+        stream = push.StateStream(self.player.id, ['player'])
+        with self.captureOnCommitCallbacks(execute=True):
+            push.touch(self.player.id, 'player')
+        stream.poll()
+        key = push.REVISION_CACHE_KEY.format(self.player.id, 'player')
+        self.assertEqual(stream.seen_revisions['player'], (1, None))
+
+        push.revision_cache().delete(key)  # as the timeout would
+
+        with self.assertNumQueries(2):
+            stream.poll()
+        self.assertEqual(stream.seen_revisions['player'], (None, None))
+
+
+class PushCacheCheckTest(TestCase):
+    def test_shared_cache_passes(self):
+        self.assertEqual([e for e in run_checks() if e.id.startswith('game.')], [])
+
+    def test_per_process_cache_is_refused(self):
+        """A LocMem revision cache fails loudly: writers and streams would not see each other"""
+        caches = {
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'game_push': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'game_catalog': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'game_catalog_cache'},
+        }
+        with override_settings(CACHES=caches):
+            self.assertEqual([e.id for e in run_checks() if e.id.startswith('game.')], ['game.E002'])
+
+
+@override_settings(GAME_PUSH={'max_duration': 0})
+class StateStreamViewTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        Player.objects.create(user=self.user)
+
+    def test_requires_authentication(self):
+        response = self.client.get(reverse('state-stream'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_token_in_query_string(self):
+        """EventSource cannot set headers, so the token is read from the query string"""
+        token = Token.objects.create(user=self.user)
+
+        response = self.client.get(reverse('state-stream'), {'token': token.key, 'topics': 'player'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(b''.join(response.streaming_content), b'retry: 3000\n\n')
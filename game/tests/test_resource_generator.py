@@ -0,0 +1,92 @@
+"""
+Unit tests for the batched biome field generator
+"""
+import random
+import unittest
+
+from django.test import SimpleTestCase
+
+from game import resource_generator
+from game.resource_generator import get_biome_from_coordinates, get_biome_field, get_biome_region
+
+
+@unittest.skipIf(resource_generator.np is None, "numpy is not installed")
+class BiomeFieldTest(SimpleTestCase):
+    def test_field_matches_scalar_on_random_cells(self):
+        """Vectorized biomes are identical to the scalar generator"""
+        rng = random.Random(42)
+        cells = [
+            (rng.uniform(-80, 80), rng.uniform(-180, 180), rng.randint(-200, 200), rng.randint(-200, 200))
+            for _ in range(2000)
+        ]
+        lats, lons, gxs, gys = zip(*cells)
+
+        field = get_biome_field(lats, lons, gxs, gys)
+
+        expected = [get_biome_from_coordinates(*cell) for cell in cells]
+        self.assertEqual(field['biome'].tolist(), expected)
+        self.assertEqual(field['temperature'].shape, (2000,))
+
+    def test_region_matches_scalar_around_spawn(self):
+        """A region preview agrees cell by cell with on-demand generation"""
+        offset = 0.0009
+        region = get_biome_region(44.933, 4.893, 0, 0, 8, offset)
+
+        self.assertEqual(len(region), 17 * 17)
+        for (gx, gy), biome in region.items():
+            self.assertEqual(biome, get_biome_from_coordinates(44.933 + gy * offset, 4.893 + gx * offset, gx, gy))
+
+    def test_fields_are_clipped(self):
+        """Moisture and elevation stay in [0, 1]"""
+        field = get_biome_field([44.9] * 50, [4.9] * 50, range(50), range(-25, 25))
+        self.assertTrue(((field['moisture'] >= 0) & (field['moisture'] <= 1)).all())
+        self.assertTrue(((field['elevation'] >= 0) & (field['elevation'] <= 1)).all())
+
+
+class GeneratorCacheTest(SimpleTestCase):
+    def setUp(self):
+        resource_generator.clear_generator_caches()
+
+    def test_biome_lookups_are_memoized(self):
+        """Repeated cells are served from the cache and counted as hits"""
+        first = get_biome_from_coordinates(44.933, 4.893, 0, 0)
+        second = get_biome_from_coordinates(44.933, 4.893, 0, 0)
+
+        stats = resource_generator.get_generator_cache_stats()['biome']
+        self.assertEqual(first, second)
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_resources_are_copied_out_of_the_cache(self):
+        """Callers may modify the returned dict without corrupting later results"""
+        context = {'near_water': True, 'building_count': 2}
+        first = resource_generator.get_smart_resources(44.933, 4.893, 0, 0, 'forest', context)
+        first['Bois'] = -1
+        second = resource_generator.get_smart_resources(
+            44.933, 4.893, 0, 0, 'forest', {'building_count': 2, 'near_water': True}
+        )
+
+        self.assertNotEqual(second.get('Bois'), -1)
+        self.assertEqual(resource_generator.get_generator_cache_stats()['resources']['hits'], 1)
+
+    def test_cache_matches_uncached_generator(self):
+        """Memoized results are identical to a fresh generation"""
+        cached = resource_generator.get_smart_resources(45.1, 5.2, 3, -4, 'plains')
+        fresh = resource_generator._generate_smart_resources(45.1, 5.2, 3, -4, 'plains', {})
+        self.assertEqual(cached, fresh)
+
+    def test_generation_leaves_the_global_random_alone(self):
+        """The seeded draws use a local generator, not the shared module state"""
+        random.seed(1234)
+        expected = random.random()
+        random.seed(1234)
+        resource_generator.get_smart_resources(44.933, 4.893, 3, 4, 'plains')
+
+        self.assertEqual(random.random(), expected)
+
+    def test_float_noise_shares_a_cache_entry(self):
+        """Coordinates that only differ past the quantization step hit the same entry"""
+        first = resource_generator.get_smart_resources(0.1 + 0.2, 4.893, 0, 0, 'plains')
+        second = resource_generator.get_smart_resources(0.3, 4.893, 0, 0, 'plains')
+
+        self.assertEqual(first, second)
+        self.assertEqual(resource_generator.get_generator_cache_stats()['resources']['hits'], 1)
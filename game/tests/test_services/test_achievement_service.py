@@ -7,10 +7,11 @@ from django.test import TestCase
 from django.contrib.auth.models import User
 from django.utils import timezone
 from game.models import (
-    Player, Achievement, PlayerAchievement,
+    Player, Achievement, PlayerAchievement, PlayerCounter,
     Material, GatheringLog, CraftingLog, Recipe,
     MapCell, Building, BuildingType
 )
+from game import catalog
 from game.services.achievement_service import (
     AchievementService,
     check_achievements
@@ -121,13 +122,12 @@ class AchievementUnlockingTests(TestCase):
         # Should not have unlocked
         self.assertEqual(len(completed), 0)
 
-        # Progress should be tracked
-        pa = PlayerAchievement.objects.get(
+        # Progress is tracked by the counters, without a PlayerAchievement row
+        self.assertFalse(PlayerAchievement.objects.filter(
             player=self.player,
             achievement=self.gather_achievement
-        )
-        self.assertFalse(pa.completed)
-        self.assertEqual(pa.progress, 5)
+        ).exists())
+        self.assertEqual(AchievementService.get_progress(self.player, self.gather_achievement), 5)
 
     def test_achievement_not_unlocked_twice(self):
         """Test already completed achievement is not re-awarded"""
@@ -197,8 +197,7 @@ class AchievementProgressTrackingTests(TestCase):
 
         check_achievements(self.player, 'gather')
 
-        pa = PlayerAchievement.objects.get(player=self.player, achievement=achievement)
-        self.assertEqual(pa.progress, 5)
+        self.assertEqual(AchievementService.get_progress(self.player, achievement), 5)
 
     def test_craft_count_tracking(self):
         """Test craft_count type tracks total crafts"""
@@ -221,8 +220,7 @@ class AchievementProgressTrackingTests(TestCase):
 
         check_achievements(self.player, 'craft')
 
-        pa = PlayerAchievement.objects.get(player=self.player, achievement=achievement)
-        self.assertEqual(pa.progress, 3)
+        self.assertEqual(AchievementService.get_progress(self.player, achievement), 3)
 
     def test_move_count_tracking(self):
         """Test move_count type tracks player movements"""
@@ -237,8 +235,7 @@ class AchievementProgressTrackingTests(TestCase):
 
         check_achievements(self.player, 'move')
 
-        pa = PlayerAchievement.objects.get(player=self.player, achievement=achievement)
-        self.assertEqual(pa.progress, 50)
+        self.assertEqual(AchievementService.get_progress(self.player, achievement), 50)
 
     def test_level_reached_tracking(self):
         """Test level_reached type checks player level"""
@@ -253,8 +250,7 @@ class AchievementProgressTrackingTests(TestCase):
 
         check_achievements(self.player, 'level_up')
 
-        pa = PlayerAchievement.objects.get(player=self.player, achievement=achievement)
-        self.assertEqual(pa.progress, 8)
+        self.assertEqual(AchievementService.get_progress(self.player, achievement), 8)
 
     def test_material_collected_tracking(self):
         """Test material_collected type tracks specific materials"""
@@ -278,8 +274,7 @@ class AchievementProgressTrackingTests(TestCase):
 
         check_achievements(self.player, 'gather', material_name='Pierre')
 
-        pa = PlayerAchievement.objects.get(player=self.player, achievement=achievement)
-        self.assertEqual(pa.progress, 10)
+        self.assertEqual(AchievementService.get_progress(self.player, achievement), 10)
 
 
 class AchievementListingTests(TestCase):
@@ -322,12 +317,8 @@ class AchievementListingTests(TestCase):
             requirement_value=50,
             hidden=False
         )
-        PlayerAchievement.objects.create(
-            player=self.player,
-            achievement=self.progress_achievement,
-            progress=25,
-            completed=False
-        )
+        self.player.total_moves = 25
+        self.player.save()
 
     def test_get_completed_achievements(self):
         """Test listing completed achievements"""
@@ -432,8 +423,7 @@ class BuildingAchievementsTests(TestCase):
 
         check_achievements(self.player, 'building_count')
 
-        pa = PlayerAchievement.objects.get(player=self.player, achievement=achievement)
-        self.assertEqual(pa.progress, 3)
+        self.assertEqual(AchievementService.get_progress(self.player, achievement), 3)
 
     def test_specific_building_constructed(self):
         """Test building_constructed type tracks specific buildings"""
@@ -458,5 +448,84 @@ class BuildingAchievementsTests(TestCase):
             building_name='Shelter'
         )
 
-        pa = PlayerAchievement.objects.get(player=self.player, achievement=achievement)
-        self.assertEqual(pa.progress, 1)
+        self.assertEqual(AchievementService.get_progress(self.player, achievement), 1)
+
+
+class AchievementCounterTests(TestCase):
+    """Test counter-based achievement progress"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.player = Player.objects.create(user=self.user)
+        self.cell = MapCell.objects.create(
+            grid_x=0,
+            grid_y=0,
+            center_lat=44.933,
+            center_lon=4.893,
+            biome='plains'
+        )
+        self.wood = Material.objects.create(name='Bois', category='resource')
+
+    def test_logs_increment_counters(self):
+        """Test gathering logs feed the total and per-material counters"""
+        for i in range(3):
+            GatheringLog.objects.create(player=self.player, material=self.wood, quantity=2, cell=self.cell)
+
+        counters = AchievementService.get_counters(self.player, ['gathers', 'gather_material:Bois'])
+        self.assertEqual(counters, {'gathers': 3, 'gather_material:Bois': 3})
+
+    def test_increment_counters_creates_and_adds(self):
+        """Test increment_counters creates missing counters and adds to existing ones"""
+        AchievementService.increment_counters(self.player.id, {'biome_visited:forest': 1})
+        AchievementService.increment_counters(self.player.id, {'biome_visited:forest': 2, 'biome_visited:plains': 1})
+
+        self.assertEqual(
+            AchievementService.get_counters(self.player, ['biome_visited:forest', 'biome_visited:plains']),
+            {'biome_visited:forest': 3, 'biome_visited:plains': 1}
+        )
+        self.assertEqual(PlayerCounter.objects.filter(player=self.player).count(), 2)
+
+    def test_only_crossed_achievements_are_written(self):
+        """Test evaluation writes no PlayerAchievement rows until a threshold is crossed"""
+        Achievement.objects.create(name='Small', requirement_type='gather_count', requirement_value=2)
+        Achievement.objects.create(name='Big', requirement_type='gather_count', requirement_value=100)
+
+        GatheringLog.objects.create(player=self.player, material=self.wood, quantity=1, cell=self.cell)
+        self.assertEqual(check_achievements(self.player, 'gather'), [])
+        self.assertFalse(PlayerAchievement.objects.filter(player=self.player).exists())
+
+        GatheringLog.objects.create(player=self.player, material=self.wood, quantity=1, cell=self.cell)
+        completed = check_achievements(self.player, 'gather')
+
+        self.assertEqual([a.name for a in completed], ['Small'])
+        self.assertEqual(
+            list(PlayerAchievement.objects.filter(player=self.player).values_list('achievement__name', 'completed')),
+            [('Small', True)]
+        )
+
+    def test_check_does_not_count_logs(self):
+        """Test evaluation reads counters rather than scanning log tables"""
+        Achievement.objects.create(name='Gatherer', requirement_type='gather_count', requirement_value=10)
+        Achievement.objects.create(
+            name='Woodcutter', requirement_type='material_collected',
+            requirement_target='Bois', requirement_value=10
+        )
+        GatheringLog.objects.create(player=self.player, material=self.wood, quantity=1, cell=self.cell)
+        catalog.get_catalog()
+
+        # achievements, completed rows, counters
+        with self.assertNumQueries(3):
+            check_achievements(self.player, 'gather', material_name='Bois')
+
+    def test_untargeted_event_skips_evaluation(self):
+        """Test an event no achievement listens to does not touch the database"""
+        Achievement.objects.create(
+            name='Woodcutter', requirement_type='material_collected',
+            requirement_target='Bois', requirement_value=1
+        )
+        catalog.get_catalog()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(check_achievements(self.player, 'gather', material_name='Pierre'), [])
+        self.assertEqual(len(check_achievements(self.player, 'gather', material_name='Bois')), 0)
@@ -0,0 +1,252 @@
+"""
+Unit tests for cell generation service
+
+Tests that new cells are generated procedurally without Overpass and that
+OSM enrichment patches them afterwards.
+"""
+from django.test import TestCase, override_settings
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.utils import timezone
+from game.models import MapCell, Material, CellMaterial, Player
+from game.services import cell_generation_service
+
+
+FOREST_FEATURES = [
+    {'type': 'way', 'id': 1, 'tags': {'landuse': 'forest'}, 'category': 'landuse', 'subcategory': 'forest'},
+]
+
+
+class CellGenerationTests(TestCase):
+    """Test the non-blocking cell generation pipeline"""
+
+    def setUp(self):
+        for name in ['Pierre', 'Bois', 'Viande']:
+            Material.objects.create(name=name)
+        cell_generation_service._IN_FLIGHT.clear()
+        cell_generation_service._PREFETCHING.clear()
+
+    @patch('game.osm_utils._query_overpass')
+    def test_new_cell_does_not_query_overpass(self, mock_query):
+        """Creating a cell only uses the procedural generator"""
+        cell, created = cell_generation_service.get_or_create_cell(3, 4, 44.94, 4.90)
+
+        self.assertTrue(created)
+        self.assertIsNone(cell.osm_enriched_at)
+        self.assertTrue(cell.materials.exists())
+        mock_query.assert_not_called()
+
+    @patch('game.services.cell_generation_service._submit')
+    def test_enrichment_scheduled_on_commit_and_deduplicated(self, mock_submit):
+        """Enrichment is queued once per cell after the transaction commits"""
+        with self.captureOnCommitCallbacks(execute=True):
+            cell, _ = cell_generation_service.get_or_create_cell(3, 4, 44.94, 4.90)
+            cell_generation_service.get_or_create_cell(3, 4, 44.94, 4.90)
+
+        mock_submit.assert_called_once_with(cell.id)
+
+    @patch('game.osm_utils._query_overpass', return_value=FOREST_FEATURES)
+    def test_enrich_cell_patches_biome_and_materials(self, mock_query):
+        """OSM enrichment updates the biome and adds OSM-guaranteed materials"""
+        cell = MapCell.objects.create(grid_x=5, grid_y=5, center_lat=44.95, center_lon=4.91, biome='plains')
+
+        cell = cell_generation_service.enrich_cell(cell.id)
+
+        self.assertEqual(cell.biome, 'forest')
+        self.assertIsNotNone(cell.osm_enriched_at)
+        self.assertEqual(cell.osm_features, FOREST_FEATURES)
+        wood = CellMaterial.objects.get(cell=cell, material__name='Bois')
+        self.assertGreaterEqual(wood.quantity, 40)
+
+    @patch('game.osm_utils._query_overpass', return_value=None)
+    def test_enrich_cell_retries_later_when_overpass_down(self, mock_query):
+        """A failed fetch leaves the cell procedural and un-enriched"""
+        cell = MapCell.objects.create(grid_x=5, grid_y=5, center_lat=44.95, center_lon=4.91, biome='plains')
+
+        cell = cell_generation_service.enrich_cell(cell.id)
+
+        self.assertEqual(cell.biome, 'plains')
+        self.assertIsNone(cell.osm_enriched_at)
+
+    @override_settings(CELL_GENERATION={'async_osm': False})
+    @patch('game.osm_utils._query_overpass', return_value=FOREST_FEATURES)
+    def test_sync_mode_enriches_inline(self, mock_query):
+        """With async_osm disabled the cell is enriched before returning"""
+        cell, _ = cell_generation_service.get_or_create_cell(6, 6, 44.96, 4.92)
+
+        cell.refresh_from_db()
+        self.assertIsNotNone(cell.osm_enriched_at)
+        self.assertEqual(cell.biome, 'forest')
+
+
+class NeighbourPrefetchTests(TestCase):
+    """Test predictive prefetch of the cells around the player"""
+
+    def setUp(self):
+        Material.objects.create(name='Pierre')
+        self.user = User.objects.create_user(username='prefetcher', password='testpass')
+        self.player = Player.objects.create(
+            user=self.user, grid_x=2, grid_y=2, current_x=4.8948, current_y=44.9348
+        )
+        cell_generation_service._IN_FLIGHT.clear()
+        cell_generation_service._PREFETCHING.clear()
+
+    def test_neighbour_positions(self):
+        """Radius 1 is the four cells reachable in one move"""
+        positions = cell_generation_service.get_neighbour_positions(0, 0, 1)
+        self.assertCountEqual(positions, [(-1, 0), (1, 0), (0, -1), (0, 1)])
+        self.assertEqual(len(cell_generation_service.get_neighbour_positions(0, 0, 2)), 12)
+
+    @patch('game.services.cell_generation_service._submit_prefetch')
+    def test_prefetch_skips_warm_cells_and_dedupes(self, mock_submit):
+        """Enriched neighbours are skipped and in-flight positions are not queued twice"""
+        MapCell.objects.create(grid_x=3, grid_y=2, center_lat=44.9348, center_lon=4.8957,
+                               osm_enriched_at=timezone.now())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            queued = cell_generation_service.prefetch_neighbours(self.player)
+            requeued = cell_generation_service.prefetch_neighbours(self.player)
+
+        self.assertEqual(queued, 3)
+        self.assertEqual(requeued, 0)
+        submitted = {call.args[:2] for call in mock_submit.call_args_list}
+        self.assertEqual(submitted, {(1, 2), (2, 1), (2, 3)})
+
+    @override_settings(CELL_GENERATION={'prefetch_max_pending': 2})
+    @patch('game.services.cell_generation_service._submit_prefetch')
+    def test_prefetch_respects_budget(self, mock_submit):
+        """Prefetches beyond the pending budget are dropped"""
+        self.assertEqual(cell_generation_service.prefetch_neighbours(self.player), 2)
+
+    @patch('game.osm_utils._query_overpass', return_value=FOREST_FEATURES)
+    def test_prefetch_cell_generates_and_enriches(self, mock_query):
+        """A prefetched cell is fully ready for the next move"""
+        cell = cell_generation_service.prefetch_cell(2, 3, 44.9357, 4.8948)
+
+        self.assertIsNotNone(cell.osm_enriched_at)
+        self.assertEqual(cell.biome, 'forest')
+        self.assertTrue(cell.materials.exists())
+
+
+class PregenerateWorldTests(TestCase):
+    """Test bulk pre-generation of a region"""
+
+    def setUp(self):
+        for name in ['Pierre', 'Bois', 'Viande', 'Eau', 'Baie', 'Herbe']:
+            Material.objects.create(name=name)
+
+    @patch('game.osm_utils._query_overpass')
+    def test_region_matches_on_demand_generation(self, mock_query):
+        """Pre-generated cells carry the same content as cells created on first visit"""
+        from io import StringIO
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command('pregenerate_world', radius=2, stdout=out)
+
+        self.assertEqual(MapCell.objects.count(), 25)
+        self.assertIn('cells/s', out.getvalue())
+        mock_query.assert_not_called()
+
+        cell = MapCell.objects.get(grid_x=1, grid_y=-2)
+        pregenerated = (cell.biome, cell.location_description,
+                        set(cell.materials.values_list('material__name', 'quantity')))
+        self.assertTrue(pregenerated[2])
+        self.assertEqual(MapCell.objects.get(grid_x=0, grid_y=0).biome, 'plains')
+
+        cell.delete()
+        cell, _ = cell_generation_service.get_or_create_cell(
+            1, -2, cell.center_lat, cell.center_lon, schedule_enrichment=False
+        )
+        self.assertEqual(
+            (cell.biome, cell.location_description,
+             set(cell.materials.values_list('material__name', 'quantity'))),
+            pregenerated
+        )
+
+    def test_existing_cells_are_kept(self):
+        """Cells already created by players are not overwritten"""
+        from io import StringIO
+        from django.core.management import call_command
+
+        MapCell.objects.create(grid_x=0, grid_y=1, center_lat=44.0, center_lon=4.0, biome='water')
+        call_command('pregenerate_world', radius=1, stdout=StringIO())
+
+        self.assertEqual(MapCell.objects.count(), 9)
+        self.assertEqual(MapCell.objects.get(grid_x=0, grid_y=1).biome, 'water')
+
+
+    def test_write_batch_counts_only_new_cells(self):
+        """A cell created by a player after the existence check is neither counted nor restocked"""
+        from game.management.commands.pregenerate_world import Command
+        from game.resource_generator import generate_procedural_cells
+        from game.services.map_service import get_material_id_map
+
+        taken = MapCell.objects.create(grid_x=0, grid_y=1, center_lat=44.0, center_lon=4.0, biome='water')
+        batch = generate_procedural_cells([(0, 1, 44.9339, 4.893, None), (1, 1, 44.9339, 4.8939, None)])
+
+        cells, _ = Command()._write_batch(batch, get_material_id_map())
+
+        self.assertEqual(cells, 1)
+        self.assertEqual(MapCell.objects.count(), 2)
+        self.assertFalse(taken.materials.exists())
+
+    def test_grid_is_anchored_on_configured_start(self):
+        """The start cell sits on the configured player start, not the built-in default"""
+        from io import StringIO
+        from django.core.management import call_command
+        from game.models import GameConfig
+        from game.utils.config_helper import clear_config_cache
+
+        GameConfig.objects.create(key='player_start_lat', value='45.5')
+        GameConfig.objects.create(key='player_start_lon', value='5.5')
+        clear_config_cache()
+        self.addCleanup(clear_config_cache)
+
+        call_command('pregenerate_world', radius=0, stdout=StringIO())
+
+        cell = MapCell.objects.get()
+        self.assertEqual((cell.grid_x, cell.grid_y, cell.center_lat, cell.center_lon), (0, 0, 45.5, 5.5))
+        self.assertEqual(cell.biome, 'plains')
+
+class PopulateCellMaterialsTests(TestCase):
+    """Test the bulk population path of map_service.populate_cell_materials"""
+
+    def setUp(self):
+        for name in ['Pierre', 'Bois', 'Viande', 'Herbe', 'Baie', 'Eau']:
+            Material.objects.create(name=name)
+        self.cell = MapCell.objects.create(grid_x=5, grid_y=5, center_lat=44.94, center_lon=4.90, biome='forest')
+
+    def test_new_cell_population_query_count(self):
+        """Material ids come from the cached map and rows are upserted in one statement"""
+        from game.services import map_service
+
+        map_service.get_material_id_map()
+        with self.assertNumQueries(2):
+            map_service.populate_cell_materials(self.cell, features=[])
+
+        self.assertTrue(CellMaterial.objects.filter(cell=self.cell).exists())
+
+    def test_repopulation_keeps_depleted_quantities(self):
+        """Existing cell materials are not reset when a cell is populated again"""
+        from game.services import map_service
+
+        map_service.populate_cell_materials(self.cell, features=[])
+        cell_material = CellMaterial.objects.filter(cell=self.cell).first()
+        cell_material.quantity = 1
+        cell_material.save()
+
+        map_service.populate_cell_materials(self.cell, features=FOREST_FEATURES)
+
+        cell_material.refresh_from_db()
+        self.assertEqual(cell_material.quantity, 1)
+        self.assertTrue(CellMaterial.objects.filter(cell=self.cell, material__name='Bois').exists())
+
+    def test_material_map_invalidated_on_create(self):
+        """New materials are visible to the cached name -> id map"""
+        from game.services import map_service
+
+        map_service.get_material_id_map()
+        fer = Material.objects.create(name='Minerai de Fer')
+
+        self.assertEqual(map_service.get_material_id_map()['Minerai de Fer'], fer.id)
@@ -33,6 +33,15 @@ class MoneyManagementTests(TestCase):
         self.assertIsNotNone(trans)
         self.assertEqual(trans.amount, 50)
 
+    def test_add_money_keeps_concurrent_rewards(self):
+        """Test money is added to the stored balance, not to a stale one"""
+        Player.objects.filter(id=self.player.id).update(money=130)
+
+        trans = EconomyService.add_money(self.player, 50, 'sale', 'Sold item')
+
+        self.assertEqual(Player.objects.get(id=self.player.id).money, 180)
+        self.assertEqual((self.player.money, trans.balance_after), (180, 180))
+
     def test_add_money_creates_transaction(self):
         """Test adding money creates transaction record"""
         EconomyService.add_money(self.player, 25, 'sale', 'Sold item')
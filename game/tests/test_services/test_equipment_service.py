@@ -197,3 +197,44 @@ class EquipmentServiceTestCase(TestCase):
         self.assertTrue(
             EquippedItem.objects.filter(player=self.player, slot='main_hand').exists()
         )
+
+    def test_equipment_carry_bonus_follows_gear(self):
+        """Test the stored carry bonus tracks equip and unequip"""
+        backpack = Material.objects.create(
+            name='Backpack',
+            is_equipment=True,
+            equipment_slot='backpack',
+            weight=1.0,
+            weight_capacity_bonus=15.0
+        )
+        inv = Inventory.objects.create(player=self.player, material=backpack, quantity=1)
+        base_capacity = self.player.effective_carry_capacity
+
+        equip_item(self.player, inv.id)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.player.effective_carry_capacity, base_capacity + 15.0)
+        self.player.refresh_from_db()
+        self.assertEqual((self.player.equipment_carry_bonus, self.player.current_carry_weight), (15.0, 0.0))
+
+        unequip_item(self.player, 'backpack')
+
+        self.assertEqual(self.player.effective_carry_capacity, base_capacity)
+        self.player.refresh_from_db()
+        self.assertEqual(self.player.current_carry_weight, 1.0)
+
+    def test_equipment_stats_stored_on_player(self):
+        """Test attack/defense totals are stored when gear changes and read without queries"""
+        inv_helmet = Inventory.objects.create(player=self.player, material=self.helmet, quantity=1)
+        inv_sword = Inventory.objects.create(player=self.player, material=self.sword, quantity=1)
+
+        equip_item(self.player, inv_helmet.id)
+        equip_item(self.player, inv_sword.id)
+
+        with self.assertNumQueries(0):
+            self.assertEqual((self.player.total_attack, self.player.total_defense), (10, 5))
+
+        unequip_item(self.player, 'head')
+
+        player = Player.objects.get(id=self.player.id)
+        self.assertEqual((player.total_attack, player.total_defense, player.total_speed_bonus), (10, 0, 0))
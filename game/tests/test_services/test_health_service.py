@@ -3,15 +3,21 @@ Unit tests for health service
 
 Tests detailed health system including body parts, injuries, and diseases.
 """
+from io import StringIO
 from django.test import TestCase
 from django.contrib.auth.models import User
+from django.core.management import call_command
 from game.models import (
     Player, BodyPart, PlayerBodyPart, PlayerHealthStatus,
     Disease, PlayerDisease, MedicalItem
 )
 from game.services.health_service import (
     initialize_player_health,
-    apply_damage_to_body_part
+    apply_damage_to_body_part,
+    process_bleeding,
+    tick_bleeding,
+    tick_diseases,
+    tick_healing
 )
 
 
@@ -256,6 +262,74 @@ class BleedingTests(TestCase):
             self.assertIsNotNone(player_arm)
 
 
+class WorldTickTests(TestCase):
+    """Test the batched world tick"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.arm = BodyPart.objects.create(
+            body_part_type='left_arm',
+            name='Bras gauche',
+            critical_multiplier=1.0
+        )
+        self.players = []
+        for i in range(3):
+            player = Player.objects.create(user=User.objects.create_user(username=f'ticker{i}', password='testpass'))
+            initialize_player_health(player)
+            self.players.append(player)
+
+        PlayerBodyPart.objects.filter(player__in=self.players).update(
+            health=60.0, is_bleeding=True, bleeding_rate=10.0, bleeding_severity='severe'
+        )
+
+    def test_bleeding_batch_across_players(self):
+        """Test every bleeding player loses blood in one pass"""
+        result = tick_bleeding()
+
+        volumes = PlayerHealthStatus.objects.filter(player__in=self.players).values_list('blood_volume', flat=True)
+        self.assertEqual(sorted(volumes), [99.0, 99.0, 99.0])
+        self.assertEqual(result['rows'], 6)
+
+    def test_bleeding_query_count_independent_of_players(self):
+        """Test the tick runs the same queries for one player or many"""
+        # parts read, parts update, statuses read, statuses update, critical players read
+        with self.assertNumQueries(5):
+            tick_bleeding()
+
+    def test_per_player_bleeding_uses_the_batch(self):
+        """Test the per-player function only touches that player"""
+        result = process_bleeding(self.players[0])
+
+        self.assertEqual(result['current_blood_volume'], 99.0)
+        self.assertEqual(PlayerHealthStatus.objects.get(player=self.players[1]).blood_volume, 100.0)
+
+    def test_cured_players_are_no_longer_sick(self):
+        """Test a player whose diseases are gone is reset by the tick"""
+        PlayerHealthStatus.objects.filter(player=self.players[0]).update(is_sick=True, body_temperature=39.0)
+
+        tick_diseases()
+
+        health_status = PlayerHealthStatus.objects.get(player=self.players[0])
+        self.assertFalse(health_status.is_sick)
+        self.assertEqual(health_status.body_temperature, 37.0)
+
+    def test_healing_updates_player_health(self):
+        """Test healed body parts raise the player's overall health"""
+        tick_healing()
+
+        for player in self.players:
+            player.refresh_from_db()
+            self.assertEqual(player.health, 61)
+
+    def test_command_reports_rows_and_duration(self):
+        """Test the world tick command reports what it did"""
+        out = StringIO()
+        call_command('world_tick', '--steps', 'bleeding', 'healing', stdout=out)
+
+        self.assertIn('bleeding: 6 rows', out.getvalue())
+        self.assertIn('rows touched in', out.getvalue())
+
+
 class FractureTests(TestCase):
     """Test fracture mechanics"""
 
@@ -0,0 +1,164 @@
+"""
+Unit tests for the inventory ledger service
+
+Tests batched inventory deltas, validation and the stored carry weight.
+"""
+from io import StringIO
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from game.models import Player, Material, Inventory
+from game import catalog
+from game.services.inventory_ledger_service import (
+    InsufficientQuantity, ItemDelta, apply_deltas
+)
+
+
+class InventoryLedgerTests(TestCase):
+    """Test applying batches of inventory deltas"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.player = Player.objects.create(user=self.user)
+
+        self.wood = Material.objects.create(name='Bois', category='resource', weight=2.0)
+        self.stone = Material.objects.create(name='Pierre', category='resource', weight=3.0)
+        self.axe = Material.objects.create(name='Hache', category='tool', weight=1.5)
+
+        Inventory.objects.create(player=self.player, material=self.wood, quantity=10)
+
+    def test_deltas_on_same_stack_are_merged(self):
+        """Test several deltas on one stack end up as a single write"""
+        results = apply_deltas([
+            ItemDelta(self.player.id, self.wood.id, -3),
+            ItemDelta(self.player.id, self.wood.id, 5),
+            ItemDelta(self.player.id, self.stone.id, 2),
+        ])
+
+        self.assertEqual(results[(self.player.id, self.wood.id)].quantity, 12)
+        self.assertEqual(Inventory.objects.get(player=self.player, material=self.wood).quantity, 12)
+        self.assertEqual(Inventory.objects.get(player=self.player, material=self.stone).quantity, 2)
+
+    def test_emptied_stack_is_removed(self):
+        """Test a stack reaching zero is deleted"""
+        results = apply_deltas([ItemDelta(self.player.id, self.wood.id, -10)])
+
+        self.assertIsNone(results[(self.player.id, self.wood.id)])
+        self.assertFalse(Inventory.objects.filter(player=self.player, material=self.wood).exists())
+
+    def test_insufficient_quantity_writes_nothing(self):
+        """Test a batch taking too much is rejected as a whole"""
+        with self.assertRaises(InsufficientQuantity) as ctx:
+            apply_deltas([
+                ItemDelta(self.player.id, self.stone.id, 5),
+                ItemDelta(self.player.id, self.wood.id, -11),
+            ])
+
+        self.assertEqual((ctx.exception.available, ctx.exception.required), (10, 11))
+        self.assertTrue(ctx.exception.has_stack)
+        self.assertEqual(Inventory.objects.get(player=self.player, material=self.wood).quantity, 10)
+        self.assertFalse(Inventory.objects.filter(player=self.player, material=self.stone).exists())
+
+    def test_items_received_cannot_be_spent_in_same_batch(self):
+        """Test removals are checked against the stack held before the batch"""
+        with self.assertRaises(InsufficientQuantity) as ctx:
+            apply_deltas([
+                ItemDelta(self.player.id, self.stone.id, 5),
+                ItemDelta(self.player.id, self.stone.id, -1),
+            ])
+
+        self.assertFalse(ctx.exception.has_stack)
+
+    def test_durability_set_on_stack(self):
+        """Test durability is set, or only initialised when asked"""
+        apply_deltas([ItemDelta(self.player.id, self.axe.id, 1, durability=(40, 60))])
+        apply_deltas([ItemDelta(self.player.id, self.axe.id, 1, durability=(90, 90), init_durability_only=True)])
+
+        axe_inv = Inventory.objects.get(player=self.player, material=self.axe)
+        self.assertEqual((axe_inv.quantity, axe_inv.durability_current, axe_inv.durability_max), (2, 40, 60))
+
+    def test_query_count_independent_of_batch_size(self):
+        """Test a large batch runs the same number of queries as a small one"""
+        materials = [Material.objects.create(name=f'Item {i}', category='resource') for i in range(10)]
+        Inventory.objects.bulk_create([
+            Inventory(player=self.player, material=material, quantity=5) for material in materials[:5]
+        ])
+        catalog.get_catalog()
+
+        # savepoint, player lock, locked read, update, create, carry weight, release
+        with self.assertNumQueries(7):
+            apply_deltas([ItemDelta(self.player.id, material.id, 1) for material in materials])
+
+
+class CarryWeightTests(TestCase):
+    """Test the stored carry weight"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.player = Player.objects.create(user=self.user)
+        self.wood = Material.objects.create(name='Bois', category='resource', weight=2.0)
+        self.stone = Material.objects.create(name='Pierre', category='resource', weight=3.0)
+        Inventory.objects.create(player=self.player, material=self.wood, quantity=4)
+        self.player.refresh_from_db()
+
+    def test_carry_weight_read_without_queries(self):
+        """Test reading the carry weight does not scan the inventory"""
+        with self.assertNumQueries(0):
+            self.assertEqual(self.player.current_carry_weight, 8.0)
+
+    def test_ledger_batch_shifts_carry_weight(self):
+        """Test a batch moves the stored weight, in memory and in the database"""
+        apply_deltas([
+            ItemDelta(self.player.id, self.wood.id, -1),
+            ItemDelta(self.player.id, self.stone.id, 2),
+        ], players=[self.player])
+
+        self.assertEqual(self.player.current_carry_weight, 12.0)
+        self.player.refresh_from_db()
+        self.assertEqual(self.player.current_carry_weight, 12.0)
+
+    def test_direct_inventory_writes_shift_carry_weight(self):
+        """Test saves and deletes outside the ledger keep the weight consistent"""
+        stone_inv = Inventory.objects.create(player=self.player, material=self.stone, quantity=1)
+        wood_inv = Inventory.objects.get(player=self.player, material=self.wood)
+        wood_inv.quantity = 1
+        wood_inv.save()
+        stone_inv.delete()
+
+        self.player.refresh_from_db()
+        self.assertEqual(self.player.current_carry_weight, 2.0)
+
+    def test_returned_stacks_can_be_saved_directly(self):
+        """Test stacks returned by a batch shift the weight from their new quantity"""
+        from game.services.inventory_ledger_service import add_items
+
+        wood_inv = add_items(self.player, self.wood.id, 2)
+        stone_inv = add_items(self.player, self.stone.id, 1)
+        wood_inv.quantity -= 1
+        wood_inv.save()
+        stone_inv.delete()
+
+        self.player.refresh_from_db()
+        self.assertEqual(self.player.current_carry_weight, 10.0)
+
+    def test_stale_player_save_keeps_carry_weight(self):
+        """Test saving an outdated player instance does not overwrite the weight"""
+        stale = Player.objects.get(id=self.player.id)
+        Inventory.objects.create(player=self.player, material=self.stone, quantity=1)
+
+        stale.energy = 50
+        stale.save()
+
+        self.player.refresh_from_db()
+        self.assertEqual((self.player.energy, self.player.current_carry_weight), (50, 11.0))
+
+    def test_repair_command_fixes_drift(self):
+        """Test the repair command rebuilds drifted totals"""
+        Player.objects.filter(id=self.player.id).update(carry_weight=99.0)
+
+        call_command('repair_player_totals', '--fix', stdout=StringIO())
+
+        self.player.refresh_from_db()
+        self.assertEqual(self.player.current_carry_weight, 8.0)
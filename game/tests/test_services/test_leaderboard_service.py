@@ -0,0 +1,199 @@
+"""
+Unit tests for leaderboard service
+
+Tests event-driven score updates, full category rebuilds and windowed rank computation.
+"""
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from game.models import Player, Leaderboard
+from game import ranking
+from game.services.leaderboard_service import LeaderboardService
+
+
+class LeaderboardSyncTests(TestCase):
+    """Test incremental leaderboard updates"""
+
+    def setUp(self):
+        self.players = []
+        for i, (level, money) in enumerate([(3, 50), (5, 10), (3, 50)]):
+            user = User.objects.create_user(username=f'player{i}', password='testpass')
+            self.players.append(Player.objects.create(user=user, level=level, money=money))
+
+    def test_initial_sync_ranks_players(self):
+        """A first rebuild creates one entry per player, ties share a rank"""
+        LeaderboardService.rebuild_all_leaderboards()
+
+        ranks = dict(Leaderboard.objects.filter(category='wealth').values_list('player_id', 'rank'))
+        self.assertEqual(ranks, {self.players[0].id: 1, self.players[1].id: 3, self.players[2].id: 1})
+        self.assertEqual(LeaderboardService.get_player_rank(self.players[1], 'level')['rank'], 1)
+
+    def test_second_update_only_writes_changed_players(self):
+        """Unchanged players are not rewritten"""
+        LeaderboardService.rebuild_all_leaderboards()
+        self.assertEqual(LeaderboardService.rebuild_all_leaderboards(), 0)
+
+        self.players[2].level = 9
+        self.players[2].save()
+        self.assertEqual(LeaderboardService.update_level_leaderboard(), 1)
+
+        entry = Leaderboard.objects.get(category='level', player=self.players[2])
+        self.assertEqual((entry.rank, entry.metadata['level']), (1, 9))
+        self.assertEqual(Leaderboard.objects.get(category='level', player=self.players[1]).rank, 2)
+
+    def test_sync_removes_players_without_score(self):
+        """Entries of players no longer ranked in a category are dropped"""
+        LeaderboardService.sync_category('gatherer', {self.players[0].id: (5, {}), self.players[1].id: (2, {})})
+        LeaderboardService.sync_category('gatherer', {self.players[1].id: (2, {})})
+
+        entry = Leaderboard.objects.get(category='gatherer')
+        self.assertEqual((entry.player_id, entry.rank), (self.players[1].id, 1))
+
+
+@override_settings(GAME_EVENTS={'async': False})
+class PlayerStatsTests(TestCase):
+    """Test level/wealth/explorer entries following the players that changed"""
+
+    def setUp(self):
+        self.players = []
+        for i in range(2):
+            user = User.objects.create_user(username=f'stats{i}', password='testpass')
+            self.players.append(Player.objects.create(user=user, money=10 * (i + 1)))
+
+    def test_saved_player_updates_its_entries(self):
+        """A save touching ranked columns resyncs that player's entries only"""
+        LeaderboardService.rebuild_all_leaderboards()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            player = Player.objects.get(id=self.players[0].id)
+            player.money = 500
+            player.save()
+
+        entry = Leaderboard.objects.get(category='wealth', player=self.players[0])
+        self.assertEqual((entry.score, entry.metadata['money']), (500, 500))
+        self.assertEqual(LeaderboardService.update_all_leaderboards(), 2)
+        self.assertEqual(Leaderboard.objects.get(category='wealth', player=self.players[0]).rank, 1)
+
+    def test_unranked_columns_publish_nothing(self):
+        """Saves of other columns do not queue a leaderboard sync"""
+        player = Player.objects.get(id=self.players[0].id)
+        with patch('game.events.publish') as publish:
+            player.health = 50
+            player.save(update_fields=['health'])
+        publish.assert_not_called()
+
+    def test_update_all_reads_no_player_or_log(self):
+        """Refreshing ranks only touches the Leaderboard table"""
+        LeaderboardService.rebuild_all_leaderboards()
+
+        with CaptureQueriesContext(connection) as queries:
+            LeaderboardService.update_all_leaderboards()
+
+        tables = ('game_player"', 'game_gatheringlog', 'game_craftinglog', 'game_combatlog', 'game_playerquest')
+        self.assertFalse([q['sql'] for q in queries if any(table in q['sql'] for table in tables)])
+
+
+class LiveRankingTests(TestCase):
+    """Test event-fed scores (persisted with F() increments) and live ranks"""
+
+    def setUp(self):
+        ranking.reset_index()
+        self.players = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'live{i}', password='testpass')
+            self.players.append(Player.objects.create(user=user))
+
+    def tearDown(self):
+        ranking.reset_index()
+
+    def test_events_update_ranks(self):
+        """Recorded events are persisted at once and move live ranks"""
+        LeaderboardService.record_event(self.players[0].id, 'crafter', 3)
+        LeaderboardService.record_event(self.players[1].id, 'crafter', 5)
+        LeaderboardService.record_event(self.players[0].id, 'crafter', 1)
+
+        entry = Leaderboard.objects.get(category='crafter', player=self.players[0])
+        self.assertEqual((entry.score, entry.metadata), (4, {'total_crafted': 4}))
+        self.assertEqual(LeaderboardService.get_player_rank(self.players[1], 'crafter')['rank'], 1)
+        rank_info = LeaderboardService.get_player_rank(self.players[0], 'crafter')
+        self.assertEqual((rank_info['rank'], rank_info['score']), (2, 4))
+        top = LeaderboardService.get_live_top('crafter', 10)
+        self.assertEqual([row['player_id'] for row in top], [self.players[1].id, self.players[0].id])
+        self.assertIsNone(LeaderboardService.get_player_rank(self.players[2], 'crafter'))
+
+    def test_events_from_other_processes_add_up(self):
+        """Scores live in the table, not in a per-process index: stale readers still see every event"""
+        Leaderboard.objects.create(category='combatant', player=self.players[1], score=10, rank=1)
+        LeaderboardService.record_event(self.players[1].id, 'combatant')
+        # Another worker incremented the same row meanwhile
+        Leaderboard.objects.filter(category='combatant', player=self.players[1]).update(score=F('score') + 2)
+        LeaderboardService.record_event(self.players[1].id, 'combatant')
+
+        self.assertEqual(LeaderboardService.get_player_rank(self.players[1], 'combatant')['score'], 14)
+
+    def test_rolled_back_events_are_ignored(self):
+        """Events are written in the action's transaction and roll back with it"""
+        try:
+            with transaction.atomic():
+                LeaderboardService.record_event(self.players[0].id, 'gatherer')
+                raise ValueError
+        except ValueError:
+            pass
+
+        self.assertIsNone(LeaderboardService.get_player_rank(self.players[0], 'gatherer'))
+
+    def test_snapshot_recomputes_stored_ranks(self):
+        """Snapshots write the rank column of event-fed categories"""
+        LeaderboardService.record_event(self.players[2].id, 'quests', 2)
+        LeaderboardService.record_event(self.players[0].id, 'quests', 1)
+
+        self.assertEqual(LeaderboardService.snapshot_index(), 2)
+
+        entry = Leaderboard.objects.get(category='quests', player=self.players[2])
+        self.assertEqual((entry.rank, entry.score, entry.metadata), (1, 2, {'quests_completed': 2}))
+
+    def test_live_ranks_share_ties(self):
+        """Live ranks match the stored RANK(): equal scores share a rank"""
+        for player in self.players:
+            LeaderboardService.record_event(player.id, 'gatherer', 2)
+        LeaderboardService.record_event(self.players[2].id, 'gatherer')
+
+        ranks = [LeaderboardService.get_player_rank(p, 'gatherer')['rank'] for p in self.players]
+        self.assertEqual(ranks, [2, 2, 1])
+
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+@skipUnless(fakeredis, 'fakeredis is not installed')
+@override_settings(LEADERBOARD_INDEX={'enabled': True, 'redis_url': 'redis://localhost:6379/15', 'key_prefix': 'test'})
+class RedisLiveRankingTests(LiveRankingTests):
+    """The live ranking tests, with ranks and top lists served by the Redis sorted sets"""
+
+    def setUp(self):
+        server = fakeredis.FakeServer()
+        from_url = patch('redis.Redis.from_url', side_effect=lambda url: fakeredis.FakeRedis(server=server))
+        from_url.start()
+        self.addCleanup(from_url.stop)
+        self.addCleanup(setattr, ranking, '_BACKEND', None)
+        ranking._BACKEND = None
+        self.assertIsInstance(ranking.get_backend(), ranking.RedisRankingBackend)
+        super().setUp()
+
+    def test_backend_ranks_share_ties(self):
+        """Members with equal scores share a rank and the next score skips past them"""
+        backend = ranking.get_backend()
+        backend.load('crafter', [(1, 10), (2, 10), (3, 5)])
+        backend.increment('crafter', 4, 7)
+
+        self.assertEqual([backend.rank('crafter', member) for member in (1, 2, 4, 3)], [1, 1, 3, 4])
+        self.assertIsNone(backend.rank('crafter', 5))
+        self.assertEqual(backend.range('crafter', 2, 4), [(4, 7), (3, 5)])
@@ -0,0 +1,79 @@
+"""
+Unit tests for the player payload read model
+
+Tests parity with PlayerSerializer, query counts and field selection.
+"""
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from game import catalog
+from game.models import EquippedItem, Inventory, Material, Player, PlayerWorkstation, Workstation
+from game.serializers import PlayerSerializer
+from game.services.player_payload_service import build_player_payload, build_player_payloads
+
+
+class PlayerPayloadTests(TestCase):
+    """Test the player payload builder"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username='testuser', password='testpass', email='t@example.com')
+        self.player = Player.objects.create(user=self.user, money=42)
+        self.other = Player.objects.create(user=User.objects.create_user(username='other', password='testpass'))
+
+        wood = Material.objects.create(name='Bois', category='resource', weight=1.0)
+        axe = Material.objects.create(name='Hache', category='tool', is_equipment=True, max_durability=50)
+        for player in (self.player, self.other):
+            Inventory.objects.create(player=player, material=wood, quantity=5)
+            Inventory.objects.create(player=player, material=axe, quantity=1, durability_current=20, durability_max=50)
+            EquippedItem.objects.create(player=player, material=axe, slot='main_hand')
+        PlayerWorkstation.objects.create(
+            player=self.player, workstation=Workstation.objects.create(name='Établi', description='')
+        )
+        catalog.get_catalog()
+
+    def test_matches_player_serializer(self):
+        """Test the payload is the same JSON as PlayerSerializer"""
+        player = Player.objects.get(id=self.player.id)
+        expected = json.loads(json.dumps(PlayerSerializer(player).data))
+        payload = json.loads(json.dumps(build_player_payload(player)))
+
+        for key in ('inventory', 'equipped_items', 'workstations'):
+            by_id = sorted(payload.pop(key), key=lambda row: row['id'])
+            self.assertEqual(by_id, sorted(expected.pop(key), key=lambda row: row['id']))
+        self.assertEqual(payload, expected)
+
+    def test_one_query_per_related_set(self):
+        """Test related sets cost one query each, whatever the number of players or rows"""
+        players = list(Player.objects.select_related('user'))
+
+        with self.assertNumQueries(3):
+            payloads = build_player_payloads(players)
+
+        self.assertEqual([len(p['inventory']) for p in payloads], [2, 2])
+        self.assertEqual([len(p['workstations']) for p in payloads], [1, 0])
+
+    def test_field_selection_skips_unused_sets(self):
+        """Test only the selected fields are built and queried"""
+        player = Player.objects.get(id=self.player.id)
+
+        with self.assertNumQueries(0):
+            payload = build_player_payload(player, {'energy', 'money'})
+
+        self.assertEqual(payload, {'energy': player.energy, 'money': 42})
+
+    def test_me_fields_parameter(self):
+        """Test /players/me/ honours ?fields= and rejects unknown fields"""
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get(reverse('player-me'), {'fields': 'money,survival_warnings'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), {'money', 'survival_warnings'})
+
+        response = client.get(reverse('player-me'), {'fields': 'money,password'})
+        self.assertEqual(response.status_code, 400)
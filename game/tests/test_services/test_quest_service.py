@@ -7,9 +7,11 @@ from django.test import TestCase
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import timedelta
+from unittest.mock import patch
 from game.models import (
     Player, Quest, PlayerQuest, Material, Inventory
 )
+from game import catalog
 from game.services.quest_service import QuestService
 
 
@@ -167,6 +169,60 @@ class QuestPrerequisiteTests(TestCase):
         self.assertIn('Quest 2', quest_names)
 
 
+class QuestBoardTests(TestCase):
+    """Test the quest board"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.player = Player.objects.create(user=self.user, level=5)
+
+        self.quests = [
+            Quest.objects.create(name=f'Quest {i}', description='', quest_type='gather', required_level=1)
+            for i in range(5)
+        ]
+        self.repeatable = Quest.objects.create(
+            name='Daily', description='', quest_type='gather', required_level=1,
+            is_repeatable=True, cooldown_hours=24, prerequisite_quest=self.quests[0]
+        )
+        catalog.get_catalog()
+
+    def test_board_is_one_query(self):
+        """Test the board costs one query whatever the number of quests"""
+        with self.assertNumQueries(1):
+            available = QuestService.get_available_quests(self.player)
+        self.assertEqual(len(available), 5)
+
+    def test_accept_complete_abandon_refresh_board(self):
+        """Test quest status changes show on the board"""
+        QuestService.get_available_quests(self.player)
+
+        player_quest, _ = QuestService.accept_quest(self.player, self.quests[0].id)
+        self.assertNotIn(self.quests[0], QuestService.get_available_quests(self.player))
+
+        QuestService.complete_quest(self.player, player_quest.id)
+        self.assertIn(self.repeatable, QuestService.get_available_quests(self.player))
+
+        daily, _ = QuestService.accept_quest(self.player, self.repeatable.id)
+        self.assertNotIn(self.repeatable, QuestService.get_available_quests(self.player))
+
+        QuestService.abandon_quest(self.player, daily.id)
+        self.assertIn(self.repeatable, QuestService.get_available_quests(self.player))
+
+    def test_board_expires_with_cooldown(self):
+        """Test a repeatable quest comes back once its cooldown ends"""
+        PlayerQuest.objects.create(player=self.player, quest=self.quests[0], status='completed')
+        PlayerQuest.objects.create(
+            player=self.player, quest=self.repeatable, status='completed',
+            can_repeat_at=timezone.now() + timedelta(hours=1)
+        )
+        self.assertNotIn(self.repeatable, QuestService.get_available_quests(self.player))
+
+        later = timezone.now() + timedelta(hours=2)
+        with patch('game.services.quest_service.timezone.now', return_value=later):
+            self.assertIn(self.repeatable, QuestService.get_available_quests(self.player))
+
+
 class QuestAcceptanceTests(TestCase):
     """Test quest acceptance"""
 
@@ -300,6 +356,35 @@ class QuestProgressTrackingTests(TestCase):
         self.assertEqual(self.player_quest.status, 'completed')
         self.assertIsNotNone(self.player_quest.completed_at)
 
+    def test_unrelated_action_skips_active_quests(self):
+        """Test actions on targets no quest mentions do not load or save quests"""
+        stone = Material.objects.create(name='Pierre', category='resource')
+        catalog.get_catalog()
+
+        with self.assertNumQueries(0):
+            completed = QuestService.update_quest_progress(
+                self.player,
+                'gather',
+                material_id=stone.id,
+                quantity=5
+            )
+
+        self.assertEqual(completed, [])
+        self.player_quest.refresh_from_db()
+        self.assertEqual(self.player_quest.progress, {})
+
+    def test_requirement_edits_update_trigger_index(self):
+        """Test editing quest requirements is picked up by the trigger index"""
+        stone = Material.objects.create(name='Pierre', category='resource')
+        catalog.get_catalog()
+
+        self.quest.requirements = {'gather': [{'material_id': stone.id, 'quantity': 10}]}
+        self.quest.save()
+        QuestService.update_quest_progress(self.player, 'gather', material_id=stone.id, quantity=2)
+
+        self.player_quest.refresh_from_db()
+        self.assertEqual(self.player_quest.progress['gather'][str(stone.id)], 2)
+
 
 class QuestRewardTests(TestCase):
     """Test quest reward distribution"""
@@ -357,6 +442,19 @@ class QuestRewardTests(TestCase):
         self.assertEqual(self.player_quest.status, 'completed')
         self.assertIsNotNone(self.player_quest.completed_at)
 
+    def test_complete_quest_items_go_through_ledger(self):
+        """Test reward items land in the inventory and move the carry weight"""
+        self.wood.weight = 2.0
+        self.wood.save()
+        self.quest.reward_items = [{'material_id': self.wood.id, 'quantity': 3}]
+        self.quest.save()
+
+        QuestService.complete_quest(self.player, self.player_quest.id)
+
+        self.assertEqual(Inventory.objects.get(player=self.player, material=self.wood).quantity, 3)
+        self.player.refresh_from_db()
+        self.assertEqual(self.player.carry_weight, 6.0)
+
     def test_complete_repeatable_sets_cooldown(self):
         """Test completing repeatable quest sets cooldown"""
         self.quest.is_repeatable = True
@@ -53,6 +53,37 @@ class SurvivalServiceTests(TestCase):
         self.assertIn('thirst', result)
         self.assertIn('health', result)
 
+    def test_update_survival_stats_without_change_does_not_write(self):
+        """Test nothing is saved when only the closed-form vitals moved"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.player.health = 100
+        self.player.last_hunger_update = timezone.now() - timedelta(minutes=5)
+        self.player.save()
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = SurvivalService.update_survival_stats(self.player)
+
+        self.assertLess(result['hunger'], 50)
+        self.assertFalse([q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE "game_player"')])
+
+    def test_level_bucket_edges(self):
+        """Test fractional and out-of-range values get the level of the range below them"""
+        hunger = {
+            100.5: 'full', 80: 'full', 79.99: 'satisfied', 60: 'satisfied', 59.5: 'normal', 40: 'normal',
+            39.99: 'hungry', 20: 'hungry', 19.99: 'very_hungry', 10: 'very_hungry', 9.99: 'starving',
+            0: 'starving', -0.1: 'starving',
+        }
+        thirst = {
+            80: 'hydrated', 79.99: 'satisfied', 40: 'normal', 39.99: 'thirsty', 25: 'thirsty',
+            24.99: 'very_thirsty', 10: 'very_thirsty', 9.99: 'dehydrated', 0: 'dehydrated',
+        }
+        for value, level in hunger.items():
+            self.assertEqual(SurvivalService.get_hunger_level(value), level, value)
+        for value, level in thirst.items():
+            self.assertEqual(SurvivalService.get_thirst_level(value), level, value)
+
     def test_consume_food(self):
         result = SurvivalService.consume_food(self.player, self.food)
         
@@ -117,3 +148,84 @@ class SurvivalServiceTests(TestCase):
         status = SurvivalService.get_survival_status(self.player)
         self.assertIsInstance(status, list)
         self.assertTrue(len(status) > 0)
+
+
+class LazyVitalsTests(TestCase):
+    """Test the closed-form catch-up of stored vitals"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='lazyuser', password='password')
+        anchor = timezone.now() - timedelta(hours=2)
+        self.player = Player.objects.create(
+            user=self.user,
+            hunger=80,
+            thirst=80,
+            satiety=90,
+            hydration=90,
+            radiation=40,
+            energy=100,
+            max_energy=100,
+            last_energy_update=anchor,
+            last_hunger_update=anchor,
+            last_thirst_update=anchor,
+            last_radiation_update=anchor,
+        )
+
+    def test_catch_up_is_path_independent(self):
+        """Test catching up in two steps gives the same vitals as in one"""
+        now = timezone.now()
+        once = Player.objects.get(id=self.player.id)
+        twice = Player.objects.get(id=self.player.id)
+
+        SurvivalService.catch_up(once, now=now)
+        SurvivalService.catch_up(twice, now=now - timedelta(minutes=47))
+        SurvivalService.catch_up(twice, now=now)
+
+        for field in ('hunger', 'thirst', 'satiety', 'hydration'):
+            self.assertAlmostEqual(getattr(once, field), getattr(twice, field), places=6)
+        self.assertEqual(once.radiation, twice.radiation)
+        self.assertLess(once.hunger, 80)
+        self.assertLess(once.radiation, 40)
+
+    def test_polling_me_does_not_write(self):
+        """Test the player endpoint catches up in memory only"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(reverse('player-me'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(response.data['hunger'], 80)
+        writes = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith(('UPDATE', 'INSERT', 'DELETE'))]
+        self.assertEqual(writes, [])
+
+    def test_writer_catches_up_first(self):
+        """Test a vitals write on an instance loaded earlier keeps the elapsed time"""
+        stale = Player.objects.get(id=self.player.id)
+        food = Material.objects.create(name='Berry', is_food=True, hunger_restore=5)
+
+        SurvivalService.consume_food(stale, food)
+
+        self.player.refresh_from_db()
+        expected_hunger, _ = SurvivalService.project_hunger(80, 90, 120)
+        self.assertAlmostEqual(self.player.hunger, expected_hunger + 5, delta=0.1)
+        self.assertGreater(self.player.last_hunger_update, timezone.now() - timedelta(minutes=1))
+        self.assertLess(self.player.radiation, 40)
+
+    def test_vitals_write_leaves_other_columns(self):
+        """Test a vitals write only saves the vitals, keeping rewards stored meanwhile"""
+        from django.db.models import F
+
+        stale = Player.objects.get(id=self.player.id)
+        Player.objects.filter(id=self.player.id).update(experience=F('experience') + 500, money=F('money') + 10)
+
+        SurvivalService.update_survival_stats(stale)
+
+        self.player.refresh_from_db()
+        self.assertEqual((self.player.experience, self.player.money), (500, stale.money + 10))
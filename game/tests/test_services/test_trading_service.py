@@ -8,6 +8,7 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import timedelta
 from game.models import Player, Material, Inventory, TradeOffer
+from game import catalog
 from game.services.trading_service import TradingService
 
 
@@ -246,6 +247,57 @@ class TradeAcceptanceTests(TestCase):
         self.assertFalse(success)
         self.assertIn('offrant', error.lower())
 
+    def test_query_count_independent_of_item_count(self):
+        """Test a many-item trade runs the same number of queries as a one-item trade"""
+        materials = [Material.objects.create(name=f'Item {i}', category='resource') for i in range(12)]
+        Inventory.objects.bulk_create([
+            Inventory(player=self.player1, material=material, quantity=10) for material in materials
+        ])
+        trade = TradeOffer.objects.create(
+            from_player=self.player1,
+            to_player=self.player2,
+            offered_items=[{'material_id': m.id, 'quantity': 4} for m in materials] + [
+                {'material_id': self.wood.id, 'quantity': 20}
+            ],
+            offered_money=10,
+            requested_items=[{'material_id': self.stone.id, 'quantity': 15}],
+            requested_money=0,
+            status='pending',
+            expires_at=timezone.now() + timedelta(hours=24)
+        )
+        catalog.get_catalog()
+
+        # savepoint, trade, players, ledger (savepoint, players, inventory, update, create,
+        # collect + delete, carry weights, release), money, trade status, release
+        with self.assertNumQueries(15):
+            success, error = TradingService.accept_trade(trade.id, self.player2)
+
+        self.assertTrue(success, error)
+        self.assertEqual(
+            Inventory.objects.get(player=self.player1, material=materials[0]).quantity, 6
+        )
+        self.assertEqual(Inventory.objects.get(player=self.player2, material=materials[-1]).quantity, 4)
+        self.assertEqual(Inventory.objects.get(player=self.player1, material=self.stone).quantity, 15)
+        # Emptied stacks are removed
+        self.assertFalse(Inventory.objects.filter(player=self.player1, material=self.wood).exists())
+        self.assertFalse(Inventory.objects.filter(player=self.player2, material=self.stone).exists())
+        self.player1.refresh_from_db()
+        self.assertEqual((self.player1.money, self.player2.money), (90, 110))
+
+    def test_failed_validation_writes_nothing(self):
+        """Test a trade rejected during validation leaves both inventories untouched"""
+        self.trade.offered_items = self.trade.offered_items + [{'material_id': self.stone.id, 'quantity': 1}]
+        self.trade.save()
+
+        success, error = TradingService.accept_trade(self.trade.id, self.player2)
+
+        self.assertFalse(success)
+        self.assertEqual(error, "L'offre n'est plus valide")
+        self.assertEqual(Inventory.objects.get(player=self.player1, material=self.wood).quantity, 20)
+        self.assertEqual(Inventory.objects.get(player=self.player2, material=self.stone).quantity, 15)
+        self.trade.refresh_from_db()
+        self.assertEqual(self.trade.status, 'pending')
+
 
 class TradeCancellationTests(TestCase):
     """Test canceling and rejecting trades"""
@@ -12,7 +12,7 @@ from .views.trading_views import TradeViewSet
 from .views.leaderboard_views import LeaderboardViewSet
 from .views.biome_views import BiomeViewSet
 from .views.encounter_views import EncounterViewSet
-from .views import combat_views, vehicle_views, upload_views, bank_views, nutrition_views, health_views, character_sheet_views
+from .views import combat_views, vehicle_views, upload_views, bank_views, nutrition_views, health_views, character_sheet_views, stream_views
 from . import views
 
 router = DefaultRouter()
@@ -95,4 +95,7 @@ urlpatterns = [
 
     # Time endpoint
     path('time/', views.time_views.get_game_time, name='game-time'),
+
+    # Server push of state diffs (Server-Sent Events), replaces polling of the endpoints above
+    path('stream/', stream_views.state_stream, name='state-stream'),
 ]
@@ -71,6 +71,37 @@ class BiomeViewSet(viewsets.ViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    @action(detail=False, methods=['get'])
+    def region(self, request):
+        """Get procedural biomes for the cells around the player (map preview)"""
+        try:
+            radius = int(request.query_params.get('radius', 5))
+        except ValueError:
+            return Response(
+                {'error': 'radius must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        radius = max(0, min(radius, 50))
+        
+        try:
+            player = Player.objects.get(user=request.user)
+            cells = BiomeService.get_biome_map(player, radius)
+            return Response({
+                'center': {'grid_x': player.grid_x, 'grid_y': player.grid_y},
+                'radius': radius,
+                'cells': cells,
+            })
+        except Player.DoesNotExist:
+            return Response(
+                {'error': 'Player not found'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
+        except Exception as e:
+            return Response(
+                {'error': f'Failed to compute biome region: {str(e)}'}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+    
     @action(detail=False, methods=['get'])
     def details(self, request):
         """Get details about a specific biome"""
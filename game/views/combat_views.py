@@ -6,6 +6,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from ..services import combat_service
+from .. import events
 from ..models import Player
 import logging
 
@@ -79,6 +80,7 @@ def combat_action(request):
     updated_state['player_current_energy'] = player.energy
     updated_state['player_level'] = player.level
     updated_state['player_experience'] = player.experience
+    events.attach_notifications(player.id, updated_state)
     
     return Response(updated_state, status=status.HTTP_200_OK)
 
@@ -6,6 +6,7 @@ from django.db.models import Count
 from ..models import Recipe, Workstation, PlayerWorkstation, RecipeIngredient, Player
 from ..serializers import RecipeSerializer, WorkstationSerializer, PlayerWorkstationSerializer, RecipeIngredientAdminSerializer
 from ..services import crafting_service
+from .. import events
 
 class WorkstationViewSet(viewsets.ModelViewSet):
     queryset = Workstation.objects.all()
@@ -156,6 +157,8 @@ class CraftingViewSet(viewsets.ViewSet):
         player = request.user.player
 
         result, status_code = crafting_service.craft_recipe(player, recipe_id, quantity)
+        if status_code == 200:
+            events.attach_notifications(player.id, result)
         return Response(result, status=status_code)
 
     @action(detail=False, methods=['post'])
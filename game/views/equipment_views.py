@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from django.db import transaction
 from ..models import Player, Material, Inventory, EquippedItem
 from ..serializers import EquippedItemSerializer
+from ..services.inventory_ledger_service import ItemDelta, add_items, apply_deltas
 
 class EquipmentViewSet(viewsets.ViewSet):
     permission_classes = [permissions.IsAuthenticated]
@@ -41,22 +42,12 @@ class EquipmentViewSet(viewsets.ViewSet):
 
                 # Check if slot is already occupied
                 existing_item = EquippedItem.objects.filter(player=player, slot=slot).first()
+                # Swap in one ledger batch: existing item back to inventory, new one out
+                item_deltas = [ItemDelta(player.id, material.id, -1)]
                 if existing_item:
-                    # Unequip existing item (return to inventory)
-                    existing_inv, created = Inventory.objects.get_or_create(
-                        player=player, 
-                        material=existing_item.material
-                    )
-                    existing_inv.quantity += 1
-                    existing_inv.save()
+                    item_deltas.append(ItemDelta(player.id, existing_item.material_id, 1))
                     existing_item.delete()
-
-                # Remove from inventory
-                inventory_item.quantity -= 1
-                if inventory_item.quantity <= 0:
-                    inventory_item.delete()
-                else:
-                    inventory_item.save()
+                apply_deltas(item_deltas, players=[player])
 
                 # Create equipped item
                 EquippedItem.objects.create(
@@ -86,12 +77,7 @@ class EquipmentViewSet(viewsets.ViewSet):
                 equipped_item = EquippedItem.objects.select_for_update().get(player=player, slot=slot)
                 
                 # Return to inventory
-                inventory_item, created = Inventory.objects.get_or_create(
-                    player=player,
-                    material=equipped_item.material
-                )
-                inventory_item.quantity += 1
-                inventory_item.save()
+                add_items(player, equipped_item.material_id, 1)
                 
                 equipped_item.delete()
 
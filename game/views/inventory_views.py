@@ -3,8 +3,9 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from ..models import Inventory, DroppedItem, MapCell, Player
-from ..serializers import InventorySerializer, PlayerSerializer
-from ..services import inventory_service
+from ..serializers import InventorySerializer
+from ..services import inventory_service, player_payload_service
+from ..services.inventory_ledger_service import InsufficientQuantity, add_items, remove_items
 
 class InventoryViewSet(viewsets.ModelViewSet):
     queryset = Inventory.objects.all()
@@ -87,6 +88,15 @@ class InventoryViewSet(viewsets.ModelViewSet):
                 }
             )
 
+            # Deduct from inventory
+            try:
+                remove_items(player, inv_item.material_id, quantity)
+            except InsufficientQuantity as exc:
+                return Response(
+                    {'error': f'Quantité insuffisante. Disponible: {exc.available}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
             # Create dropped item
             dropped = DroppedItem.objects.create(
                 cell=cell,
@@ -97,13 +107,6 @@ class InventoryViewSet(viewsets.ModelViewSet):
                 dropped_by=player
             )
 
-            # Deduct from inventory
-            inv_item.quantity -= quantity
-            if inv_item.quantity == 0:
-                inv_item.delete()
-            else:
-                inv_item.save()
-
             # Refresh player
             player.refresh_from_db()
 
@@ -111,7 +114,7 @@ class InventoryViewSet(viewsets.ModelViewSet):
                 'success': True,
                 'message': f'✅ Déposé {quantity}x {inv_item.material.name} sur le sol',
                 'dropped_item_id': dropped.id,
-                'player': PlayerSerializer(player).data
+                'player': player_payload_service.build_player_payload(player)
             })
 
         except Exception as e:
@@ -156,25 +159,9 @@ class InventoryViewSet(viewsets.ModelViewSet):
                     'error': f'Trop lourd ! Cet objet pèse {additional_weight:.1f}kg. Capacité: {player.current_carry_weight:.1f}/{player.effective_carry_capacity:.1f}kg'
                 }, status=status.HTTP_400_BAD_REQUEST)
 
-            # Add to inventory
-            inv_item, created = Inventory.objects.get_or_create(
-                player=player,
-                material=dropped.material,
-                defaults={
-                    'quantity': 0,
-                    'durability_current': 0,
-                    'durability_max': 0
-                }
-            )
-
-            inv_item.quantity += dropped.quantity
-
-            # For tools with durability, preserve durability
-            if dropped.durability_max > 0:
-                inv_item.durability_max = dropped.durability_max
-                inv_item.durability_current = dropped.durability_current
-
-            inv_item.save()
+            # Add to inventory (for tools with durability, preserve durability)
+            durability = (dropped.durability_current, dropped.durability_max) if dropped.durability_max > 0 else None
+            add_items(player, dropped.material_id, dropped.quantity, durability=durability)
 
             # Delete dropped item
             material_name = dropped.material.name
@@ -187,7 +174,7 @@ class InventoryViewSet(viewsets.ModelViewSet):
             return Response({
                 'success': True,
                 'message': f'✅ Ramassé {quantity}x {material_name}',
-                'player': PlayerSerializer(player).data
+                'player': player_payload_service.build_player_payload(player)
             })
 
         except Exception as e:
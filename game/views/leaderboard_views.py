@@ -84,6 +84,27 @@ class LeaderboardViewSet(viewsets.ReadOnlyModelViewSet):
 
         return Response(result)
 
+    @action(detail=False, methods=['get'])
+    def live(self, request):
+        """Get live top players of an event-fed category (gatherer, crafter, combatant, quests)"""
+        category = request.query_params.get('category')
+        limit = min(int(request.query_params.get('limit', 10)), 100)
+
+        top = LeaderboardService.get_live_top(category, limit)
+        if top is None:
+            return Response(
+                {'error': 'Catégorie sans classement en direct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        from game.models import Player
+        names = dict(
+            Player.objects.filter(id__in=[row['player_id'] for row in top]).values_list('id', 'user__username')
+        )
+        for row in top:
+            row['player_name'] = names.get(row['player_id'])
+        return Response({'category': category, 'entries': top})
+
     @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
     def update_all(self, request):
         """Update all leaderboards (admin only)"""
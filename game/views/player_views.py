@@ -4,9 +4,17 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from ..models import Player, PlayerSkill, PlayerTalent, TalentNode
 from ..serializers import PlayerSerializer, PlayerSkillSerializer, PlayerTalentSerializer, TalentNodeSerializer
-from ..services import player_service
-from ..services.energy_service import regenerate_player_energy
+from ..services import cell_generation_service, player_payload_service, player_service
+from ..services.energy_service import catch_up_energy
 from ..services.survival_service import SurvivalService
+from .. import events
+
+# Fields of /players/me/ selectable with ?fields=
+ME_FIELDS = player_payload_service.PLAYER_FIELDS + (
+    'is_staff', 'energy_regenerated', 'minutes_offline', 'health_regenerated',
+    'survival_warnings', 'survival_status', 'survival_multipliers',
+)
+
 
 class PlayerViewSet(viewsets.ModelViewSet):
     queryset = Player.objects.all()
@@ -24,7 +32,7 @@ class PlayerViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def me(self, request):
-        player, created = Player.objects.get_or_create(user=request.user)
+        player, created = Player.objects.select_related('user').get_or_create(user=request.user)
 
         # If player was just created, ensure all vital stats are at 100%
         if created:
@@ -41,38 +49,55 @@ class PlayerViewSet(viewsets.ModelViewSet):
             player.last_energy_update = timezone.now()
             player.last_hunger_update = timezone.now()
             player.last_thirst_update = timezone.now()
+            player.last_radiation_update = timezone.now()
+            player.current_y, player.current_x = cell_generation_service.start_position()
             player.save()
 
-        # Regenerate energy passively based on time and buildings
-        energy_restored, minutes_passed = regenerate_player_energy(player)
-
-        # Update survival stats (hunger, thirst, radiation)
-        survival_status = SurvivalService.update_survival_stats(player)
-
-        # Refresh player data after regeneration
-        player.refresh_from_db()
-
-        serializer = self.get_serializer(player)
-        data = serializer.data
-        data['is_staff'] = bool(request.user and request.user.is_staff)
+        # Polling is read-only: energy and survival stats are caught up in memory from their
+        # anchors, and only written by actions (or once, to anchor a player that has none)
+        unanchored = [
+            field for field in ('last_energy_update', 'last_hunger_update', 'last_thirst_update', 'last_radiation_update')
+            if getattr(player, field) is None
+        ]
+        energy_restored, minutes_passed = catch_up_energy(player)
+        minutes = SurvivalService.catch_up(player)
+        minutes_passed_survival = max(minutes['hunger_minutes'], minutes['thirst_minutes'])
+        health_regen = SurvivalService.regenerate_health(player, minutes_passed_survival)
+        SurvivalService.apply_survival_effects(player, minutes_passed_survival, commit=False)
+        if unanchored:
+            player.save(update_fields=unanchored)
+
+        fields = player_payload_service.parse_fields(request.query_params.get('fields'), ME_FIELDS)
+
+        def wanted(name):
+            return fields is None or name in fields
+
+        data = player_payload_service.build_player_payload(player, fields)
+        if wanted('is_staff'):
+            data['is_staff'] = bool(request.user and request.user.is_staff)
 
         # Add regeneration info if any energy was restored
         if energy_restored > 0:
-            data['energy_regenerated'] = energy_restored
-            data['minutes_offline'] = minutes_passed
+            if wanted('energy_regenerated'):
+                data['energy_regenerated'] = energy_restored
+            if wanted('minutes_offline'):
+                data['minutes_offline'] = minutes_passed
 
         # Add survival warnings
-        data['survival_warnings'] = survival_status['warnings']
+        if wanted('survival_warnings'):
+            data['survival_warnings'] = SurvivalService.get_survival_warnings(player)
         
         # Add survival status (new!)
-        data['survival_status'] = SurvivalService.get_survival_status(player)
+        if wanted('survival_status'):
+            data['survival_status'] = SurvivalService.get_survival_status(player)
         
         # Add survival multipliers (new!)
-        data['survival_multipliers'] = SurvivalService.get_survival_multipliers(player)
+        if wanted('survival_multipliers'):
+            data['survival_multipliers'] = SurvivalService.get_survival_multipliers(player)
         
         # Add health regen info if any
-        if survival_status.get('health_regen', 0) > 0:
-            data['health_regenerated'] = survival_status['health_regen']
+        if health_regen > 0 and wanted('health_regenerated'):
+            data['health_regenerated'] = health_regen
 
         return Response(data)
 
@@ -164,8 +189,17 @@ class PlayerViewSet(viewsets.ModelViewSet):
         if encounter_data:
             response_data['encounter'] = encounter_data
 
+        # Achievements/quests resolved by the event bus since the last response
+        events.attach_notifications(player_obj.id, response_data)
+
         return Response(response_data)
 
+    @action(detail=False, methods=['get'])
+    def notifications(self, request):
+        """Achievements unlocked and quests completed since the last response"""
+        player = Player.objects.get(user=request.user)
+        return Response(events.pop_notifications(player.id))
+
     @action(detail=False, methods=['post'])
     def equip(self, request):
         player = Player.objects.get(user=request.user)
@@ -193,4 +227,6 @@ class PlayerViewSet(viewsets.ModelViewSet):
         player = Player.objects.get(user=request.user)
         from ..services import map_service
         result, status_code = map_service.hunt_at_location(player)
+        if status_code == 200:
+            events.attach_notifications(player.id, result)
         return Response(result, status=status_code)
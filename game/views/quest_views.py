@@ -6,8 +6,9 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db import models
-from game.models import Quest, PlayerQuest, DynamicEvent
+from game.models import Quest, PlayerQuest, DynamicEvent, Material
 from game.serializers import QuestSerializer, PlayerQuestSerializer, DynamicEventSerializer
+from game.services.inventory_ledger_service import add_items
 from game.services.quest_service import QuestService
 import logging
 
@@ -191,7 +192,6 @@ class DynamicEventViewSet(viewsets.ReadOnlyModelViewSet):
                 rewards_granted['money'] = rewards['money']
 
             if 'items' in rewards:
-                from game.models import Material, Inventory
                 reward_items = []
 
                 for item_data in rewards['items']:
@@ -200,22 +200,16 @@ class DynamicEventViewSet(viewsets.ReadOnlyModelViewSet):
 
                     try:
                         material = Material.objects.get(id=material_id)
-                        inventory_item, created = Inventory.objects.get_or_create(
-                            player=player,
-                            material=material,
-                            defaults={'quantity': 0}
-                        )
-                        inventory_item.quantity += quantity
-                        inventory_item.save()
-
-                        reward_items.append({
-                            'material': material.name,
-                            'quantity': quantity,
-                            'icon': material.icon
-                        })
-
                     except Material.DoesNotExist:
                         logger.warning(f"Event reward material {material_id} not found")
+                        continue
+                    add_items(player, material.id, quantity)
+
+                    reward_items.append({
+                        'material': material.name,
+                        'quantity': quantity,
+                        'icon': material.icon
+                    })
 
                 rewards_granted['items'] = reward_items
 
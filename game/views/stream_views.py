@@ -0,0 +1,54 @@
+"""
+Server-Sent Events endpoint pushing player, health, world and time updates (see game.push)
+"""
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.authtoken.models import Token
+
+from ..models import Player
+from .. import push
+
+
+def _stream_player_id(request):
+    """
+    EventSource cannot send an Authorization header, so the DRF token is also
+    accepted as ?token=; the session is used otherwise
+    """
+    key = request.GET.get('token')
+    header = request.headers.get('Authorization', '')
+    if not key and header.startswith('Token '):
+        key = header[len('Token '):]
+
+    if key:
+        user_id = Token.objects.filter(key=key).values_list('user_id', flat=True).first()
+    else:
+        user_id = request.user.id if request.user.is_authenticated else None
+
+    if user_id is None:
+        return None
+    return Player.objects.filter(user_id=user_id).values_list('id', flat=True).first()
+
+
+def state_stream(request):
+    """
+    Open a push channel of state diffs
+
+    GET /api/stream/?token=<token>&topics=player,health,world,time
+
+    Each topic is sent in full first ({"full": ...}), then only as JSON merge
+    patches ({"patch": ...}) when the player's state changes or a world tick
+    runs. The server closes the stream after GAME_PUSH['max_duration'] seconds
+    and EventSource reconnects on its own.
+    """
+    player_id = _stream_player_id(request)
+    if player_id is None:
+        return JsonResponse({'error': 'Authentification requise'}, status=401)
+
+    topics = [topic for topic in request.GET.get('topics', '').split(',') if topic in push.TOPICS]
+    stream = push.StateStream(player_id, topics or None)
+    frames = stream.aiter_frames() if isinstance(request, ASGIRequest) else stream.iter_frames()
+
+    response = StreamingHttpResponse(frames, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # no proxy buffering (nginx)
+    return response
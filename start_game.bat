@@ -23,13 +23,22 @@ if errorlevel 1 (
     echo Migrations necessaires detectees, application...
     python manage.py migrate
 )
+python manage.py createcachetable
 
 REM Creer le dossier logs s'il n'existe pas
 if not exist "logs" mkdir logs
 
-REM Demarrer le backend Django en arriere-plan
+REM Demarrer le backend Django en arriere-plan, sous ASGI (uvicorn) : le flux temps reel
+REM /api/stream/ n'y occupe aucun thread par client, contrairement a runserver (WSGI)
 echo [3/4] Demarrage du backend Django en arriere-plan...
-start /B "" venv\Scripts\python.exe manage.py runserver > logs\backend.log 2>&1
+python -c "import uvicorn" >nul 2>&1
+if errorlevel 1 (
+    echo ATTENTION: uvicorn absent ^(pip install uvicorn^), repli sur runserver :
+    echo   chaque client du flux temps reel y bloque un thread du serveur
+    start /B "" venv\Scripts\python.exe manage.py runserver > logs\backend.log 2>&1
+) else (
+    start /B "" venv\Scripts\python.exe -m uvicorn backend.asgi:application --host 127.0.0.1 --port 8000 > logs\backend.log 2>&1
+)
 
 REM Attendre que le backend demarre
 echo Attente du demarrage du backend...
@@ -23,10 +23,18 @@ if [ $? -ne 0 ]; then
     echo "Migrations nécessaires détectées, application..."
     python manage.py migrate
 fi
+python manage.py createcachetable
 
-# Démarrer le backend Django en arrière-plan
+# Démarrer le backend Django en arrière-plan, sous ASGI (uvicorn) : le flux temps réel
+# /api/stream/ n'y occupe aucun thread par client, contrairement à runserver (WSGI)
 echo "[3/4] Démarrage du backend Django..."
-python manage.py runserver > logs/backend.log 2>&1 &
+if python -c "import uvicorn" > /dev/null 2>&1; then
+    uvicorn backend.asgi:application --host 127.0.0.1 --port 8000 > logs/backend.log 2>&1 &
+else
+    echo "ATTENTION: uvicorn absent (pip install uvicorn), repli sur runserver :"
+    echo "  chaque client du flux temps réel y bloque un thread du serveur"
+    python manage.py runserver > logs/backend.log 2>&1 &
+fi
 BACKEND_PID=$!
 echo "Backend démarré (PID: $BACKEND_PID)"
 
@@ -8,7 +8,10 @@ echo ""
 # Arrêter les processus Django
 echo "Arrêt du backend Django..."
 pkill -f "manage.py runserver"
-if [ $? -eq 0 ]; then
+RUNSERVER=$?
+pkill -f "uvicorn backend.asgi"
+UVICORN=$?
+if [ $RUNSERVER -eq 0 ] || [ $UVICORN -eq 0 ]; then
     echo "  [OK] Backend arrêté"
 else
     echo "  [INFO] Aucun processus Django en cours"